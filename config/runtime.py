@@ -0,0 +1,511 @@
+"""
+Typed runtime configuration: one validated, immutable snapshot built from
+the environment, config/settings.py and config/strategy_knobs.py.
+
+  from config import runtime
+  cfg = runtime.current()            # Snapshot (frozen dataclasses)
+  cfg.sell.dry_run, cfg.sell.exit.tp1_pct, cfg.buy.slippage_bps
+  cfg.exit_for(pos)                  # ExitProfile recorded on the position (exit_profile column)
+  cfg.settings["MIN_LIQUIDITY_USD"], cfg.knobs["SCORE_MIN"]
+
+Engines take current() once per tick and keep it for the whole tick, so a
+tick never mixes two configurations, and hot loops read attributes instead
+of os.getenv.
+
+Hot reload (long-lived processes, i.e. run_live / SellEngine):
+  - SIGHUP (install()) or a change of config/settings.py, config/strategy_knobs.py
+    or CONFIG_ENV_FILE (KEY=VALUE lines, applied on top of the process env)
+  - maybe_reload() is called from the loop between ticks: it re-imports the two
+    config modules, rebuilds and validates a new Snapshot and swaps it in.
+    A snapshot that fails validation is rejected and the previous one stays.
+  - at startup there is no previous snapshot: bad values are logged and
+    replaced by their defaults, the process keeps running (as before).
+  - consumers compare current() with the snapshot they hold and re-apply it in
+    place (SellEngine keeps its caches / cooldowns).
+
+Exit profiles: PUMP / NORMAL (the former trader_exec DUAL_PROFILE_V1 values,
+overridable with PROFILE_<NAME>_<FIELD>, e.g. PROFILE_PUMP_TP1_PCT=0.5) are
+opt-in with SELL_USE_POSITION_PROFILE=1: the profile is then chosen at buy
+time and recorded on the position (exit_profile column), and SellEngine
+applies it. Off (default), every position uses the SELL_* settings (BASE),
+which is what live selling always did.
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import signal
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+CONFIG_ENV_FILE = os.getenv("CONFIG_ENV_FILE", "state/runtime.env")
+CONFIG_WATCH_S = float(os.getenv("CONFIG_WATCH_S", "2"))  # min gap between mtime checks (0 = SIGHUP only)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_TRUE = ("1", "true", "yes", "y", "on")
+
+
+class ConfigError(ValueError):
+    """Invalid configuration value(s); .problems lists every offending key."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+# -----------------------------
+# typed env readers (collect errors instead of silently defaulting)
+# -----------------------------
+class _Reader:
+    def __init__(self, env: Mapping[str, str]):
+        self.env = env
+        self.problems: List[str] = []
+
+    def raw(self, *names: str) -> Tuple[Optional[str], str]:
+        for n in names:
+            v = self.env.get(n)
+            if v is not None and str(v).strip() != "":
+                return str(v).strip(), n
+        return None, names[0]
+
+    def str(self, *names: str, default: str = "") -> str:
+        v, _ = self.raw(*names)
+        return default if v is None else v
+
+    def bool(self, *names: str, default: bool = False) -> bool:
+        v, _ = self.raw(*names)
+        return default if v is None else v.lower() in _TRUE
+
+    def float(self, *names: str, default: float) -> float:
+        v, n = self.raw(*names)
+        if v is None:
+            return float(default)
+        try:
+            return float(v)
+        except ValueError:
+            self.problems.append(f"{n}={v!r} is not a number")
+            return float(default)
+
+    def int(self, *names: str, default: int) -> int:
+        return int(self.float(*names, default=default))
+
+    def check(self, ok: bool, msg: str) -> None:
+        if not ok:
+            self.problems.append(msg)
+
+
+# -----------------------------
+# snapshot types
+# -----------------------------
+@dataclass(frozen=True)
+class ExitProfile:
+    """SellEngine exit rules. Fractions (0.25 = 25%); hard_sl_pct is a positive distance."""
+    name: str = "BASE"
+    hard_sl_pct: float = 0.25
+    tp1_pct: float = 0.30
+    tp1_size: float = 0.35
+    tp2_pct: float = 0.80
+    tp2_size: float = 0.35
+    trail_tight: float = 0.10
+    trail_wide: float = 0.20
+    time_stop_sec: int = 900
+    time_stop_min_pnl: float = 0.05
+
+    def params(self) -> Dict[str, float]:
+        """Fields without the name (core.backtest.ExitParams keywords)."""
+        d = asdict(self)
+        d.pop("name")
+        return d
+
+
+# trader_exec DUAL_PROFILE_V1 (mint suffix "pump" -> PUMP)
+PROFILE_DEFAULTS: Dict[str, Dict[str, float]] = {
+    "PUMP": {"hard_sl_pct": 0.35, "tp1_pct": 0.40, "tp2_pct": 1.00, "time_stop_sec": 600},
+    "NORMAL": {"hard_sl_pct": 0.20, "tp1_pct": 0.20, "tp2_pct": 0.50, "time_stop_sec": 1800},
+}
+
+
+@dataclass(frozen=True)
+class SellConfig:
+    exit: ExitProfile = field(default_factory=ExitProfile)
+    force_all: bool = False
+    dry_run: bool = False
+    wrap_simulate_map: str = ""
+    only_mint: str = ""
+    use_position_profile: bool = False  # opt-in: per-position PUMP / NORMAL exits
+    cooldown_429_sec: int = 90
+    route_fail_cooldown_sec: int = 2700
+    max_429_retry: int = 2
+    backoff_429_sec: int = 20
+    jup_custom_cooldown_sec: int = 21600
+    price_cache_ttl_s: int = 30
+    price_429_cooldown_s: int = 90
+
+
+@dataclass(frozen=True)
+class BuyConfig:
+    dual_profile: bool = True
+    dry_run: bool = False
+    stop_after_build_tx: bool = False
+    slippage_bps: int = 120
+    buy_amount_sol: float = 0.01
+    rl_skip_sec: int = 180
+    ignore_holding_below: float = 0.0
+    trades_db_path: str = "state/trades.sqlite"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    loaded_ts: float
+    reason: str
+    sell: SellConfig
+    buy: BuyConfig
+    profiles: Mapping[str, ExitProfile]
+    settings: Mapping[str, Any]
+    knobs: Mapping[str, Any]
+
+    def profile(self, name: Optional[str]) -> ExitProfile:
+        """Named profile, the SELL_* one (BASE) for unknown / empty names."""
+        return self.profiles.get(str(name or "").strip().upper(), self.sell.exit)
+
+    def profile_name_for_mint(self, mint: str) -> str:
+        """Profile picked at buy time (DUAL_PROFILE_V1 rule), "" when dual profiles are off."""
+        if not self.buy.dual_profile:
+            return ""
+        return "PUMP" if str(mint or "").lower().endswith("pump") else "NORMAL"
+
+    def recorded_profile_for_mint(self, mint: str) -> str:
+        """Profile to store on a new position: only when SellEngine will apply it (opt-in)."""
+        return self.profile_name_for_mint(mint) if self.sell.use_position_profile else ""
+
+    def exit_for(self, pos: Any) -> ExitProfile:
+        """Exit rules for one open position: its recorded exit_profile, else BASE."""
+        if not self.sell.use_position_profile:
+            return self.sell.exit
+        try:
+            name = pos.get("exit_profile") if hasattr(pos, "get") else getattr(pos, "exit_profile", "")
+        except Exception:
+            name = ""
+        return self.profile(name)
+
+
+def _module_values(mod) -> Mapping[str, Any]:
+    return MappingProxyType({k: getattr(mod, k) for k in dir(mod)
+                             if k.isupper() and isinstance(getattr(mod, k), (int, float, str, bool))})
+
+
+def _exit_profile(r: _Reader, name: str, base: ExitProfile, prefix: str, fallback: ExitProfile) -> ExitProfile:
+    kw: Dict[str, Any] = {}
+    for f in fields(ExitProfile):
+        if f.name == "name":
+            continue
+        cur = getattr(base, f.name)
+        v = r.float(f"{prefix}{f.name.upper()}", default=cur)
+        kw[f.name] = int(v) if isinstance(cur, int) else v
+    kw["hard_sl_pct"] = abs(kw["hard_sl_pct"])
+    return _validate_exit(r, ExitProfile(name=name, **kw), fallback)
+
+
+def _exit_problems(p: ExitProfile) -> List[Tuple[str, str]]:
+    bad: List[Tuple[str, str]] = []
+    if not 0.0 < p.hard_sl_pct < 1.0:
+        bad.append(("hard_sl_pct", f"{p.name}: hard_sl_pct={p.hard_sl_pct} not in (0, 1)"))
+    if not p.tp1_pct > 0:
+        bad.append(("tp1_pct", f"{p.name}: tp1_pct={p.tp1_pct} <= 0"))
+    elif not p.tp2_pct >= p.tp1_pct:
+        bad.append(("tp2_pct", f"{p.name}: tp2_pct={p.tp2_pct} < tp1_pct={p.tp1_pct}"))
+    for k in ("tp1_size", "tp2_size"):
+        v = getattr(p, k)
+        if not 0.0 <= v <= 1.0:
+            bad.append((k, f"{p.name}: {k}={v} not in [0, 1]"))
+    for k in ("trail_tight", "trail_wide"):
+        v = getattr(p, k)
+        if not 0.0 < v < 1.0:
+            bad.append((k, f"{p.name}: {k}={v} not in (0, 1)"))
+    if not p.time_stop_sec > 0:
+        bad.append(("time_stop_sec", f"{p.name}: time_stop_sec={p.time_stop_sec} <= 0"))
+    return bad
+
+
+def _validate_exit(r: _Reader, p: ExitProfile, fallback: ExitProfile) -> ExitProfile:
+    """Records every bad field; returns p with those fields taken from fallback (whole fallback if still bad)."""
+    bad = _exit_problems(p)
+    if not bad:
+        return p
+    r.problems.extend(msg for _, msg in bad)
+    fixed = replace(p, **{k: getattr(fallback, k) for k, _ in bad})
+    return fixed if not _exit_problems(fixed) else replace(fallback, name=p.name)
+
+
+def _fix(r: _Reader, obj: Any, ok: Callable[[Any], bool], keys: Sequence[str], msg: str) -> Any:
+    """Bad fields of a config dataclass are recorded and reset to the dataclass default."""
+    bad = {k: getattr(type(obj)(), k) for k in keys if not ok(getattr(obj, k))}
+    for k in bad:
+        r.problems.append(msg.format(k=k, v=getattr(obj, k)))
+    return replace(obj, **bad) if bad else obj
+
+
+KNOWN_MODES = ("PAPER", "REAL", "SELL_ONLY", "FULL")
+
+
+def build(env: Optional[Mapping[str, str]] = None, version: int = 0, reason: str = "build",
+          reload_modules: bool = False, strict: bool = True) -> Snapshot:
+    """
+    Read + validate everything. strict: raises ConfigError listing every bad value;
+    otherwise bad values are logged and replaced by their defaults.
+    """
+    env = os.environ if env is None else env
+    from config import settings, strategy_knobs
+    if reload_modules:
+        settings = importlib.reload(settings)
+        strategy_knobs = importlib.reload(strategy_knobs)
+    r = _Reader(env)
+
+    # same keys / precedence as SellEngine.__init__
+    base = ExitProfile(
+        name="BASE",
+        hard_sl_pct=abs(r.float("HARD_SL_PCT", "SELL_HARD_SL_PCT", default=0.25)),
+        tp1_pct=r.float("SELL_TP1_PCT", default=0.30), tp1_size=r.float("SELL_TP1_SIZE", default=0.35),
+        tp2_pct=r.float("SELL_TP2_PCT", default=0.80), tp2_size=r.float("SELL_TP2_SIZE", default=0.35),
+        trail_tight=r.float("SELL_TRAIL_TIGHT", default=0.10), trail_wide=r.float("SELL_TRAIL_WIDE", default=0.20),
+        time_stop_sec=r.int("SELL_TIME_STOP_SEC", default=900),
+        time_stop_min_pnl=r.float("SELL_TIME_STOP_MIN_PNL", default=0.05),
+    )
+    base = _validate_exit(r, base, ExitProfile())
+    profiles = {"BASE": base}
+    for name, over in PROFILE_DEFAULTS.items():
+        named = replace(base, name=name, **over)
+        profiles[name] = _exit_profile(r, name, named, f"PROFILE_{name}_", named)
+
+    sell = SellConfig(
+        exit=base,
+        force_all=r.bool("SELL_FORCE_ALL"),
+        dry_run=r.bool("SELL_DRY_RUN"),
+        wrap_simulate_map=r.str("SELL_WRAP_SIMULATE_MAP"),
+        only_mint=r.str("SELL_ONLY_MINT"),
+        use_position_profile=r.bool("SELL_USE_POSITION_PROFILE", default=False),
+        cooldown_429_sec=r.int("SELL_429_COOLDOWN_SEC", default=90),
+        route_fail_cooldown_sec=r.int("SELL_ROUTE_FAIL_COOLDOWN_SEC", default=2700),
+        max_429_retry=r.int("SELL_429_MAX_RETRY", default=2),
+        backoff_429_sec=r.int("SELL_429_BACKOFF_SEC", default=20),
+        jup_custom_cooldown_sec=r.int("SELL_COOLDOWN_JUP_CUSTOM_SEC", default=21600),
+        price_cache_ttl_s=r.int("PRICE_CACHE_TTL_S", default=30),
+        price_429_cooldown_s=r.int("PRICE_429_COOLDOWN_S", default=90),
+    )
+    sell = _fix(r, sell, lambda v: v >= 0, ("cooldown_429_sec", "route_fail_cooldown_sec", "backoff_429_sec",
+                                             "price_cache_ttl_s", "price_429_cooldown_s", "max_429_retry"),
+                "sell.{k}={v} < 0")
+
+    buy = BuyConfig(
+        dual_profile=r.bool("DUAL_PROFILE", default=True),
+        dry_run=r.bool("TRADER_DRY_RUN"),
+        stop_after_build_tx=r.bool("STOP_AFTER_BUILD_TX"),
+        slippage_bps=r.int("SLIPPAGE_BPS", "TRADER_SLIPPAGE_BPS", default=120),
+        buy_amount_sol=r.float("BUY_AMOUNT_SOL", "TRADER_SOL_AMOUNT", default=0.01),
+        rl_skip_sec=r.int("RL_SKIP_SEC", default=180),
+        ignore_holding_below=r.float("IGNORE_HOLDING_BELOW", default=0.0),
+        trades_db_path=r.str("TRADES_DB_PATH", "DB_PATH", default="state/trades.sqlite"),
+    )
+    buy = _fix(r, buy, lambda v: 0 < v <= 5000, ("slippage_bps",), "SLIPPAGE_BPS={v} not in (0, 5000]")
+    buy = _fix(r, buy, lambda v: v > 0, ("buy_amount_sol",), "BUY_AMOUNT_SOL={v} <= 0")
+    buy = _fix(r, buy, lambda v: v >= 0, ("rl_skip_sec",), "RL_SKIP_SEC={v} < 0")
+
+    # MODE is only checked (settings keeps the value): run_live / launchers read it themselves
+    mode = str(getattr(settings, "MODE", "PAPER"))
+    r.check(mode in KNOWN_MODES, f"MODE={mode!r} not in {'/'.join(KNOWN_MODES)}")
+    if r.problems:
+        if strict:
+            raise ConfigError(r.problems)
+        print(f"[CONFIG] {reason}: {len(r.problems)} bad value(s), default used: {'; '.join(r.problems)}", flush=True)
+    return Snapshot(version=version, loaded_ts=time.time(), reason=reason, sell=sell, buy=buy,
+                    profiles=MappingProxyType(profiles), settings=_module_values(settings),
+                    knobs=_module_values(strategy_knobs))
+
+
+# -----------------------------
+# current snapshot + hot reload
+# -----------------------------
+_LOCK = threading.Lock()
+_CURRENT: Optional[Snapshot] = None
+_SUBSCRIBERS: List[Callable[[Snapshot, Snapshot], None]] = []
+_PENDING = False          # set by SIGHUP
+_LAST_CHECK = 0.0
+_MTIMES: Dict[str, float] = {}
+_OVERLAY: Dict[str, Optional[str]] = {}  # keys set from CONFIG_ENV_FILE -> value they had before
+
+
+def current() -> Snapshot:
+    """The active snapshot (built on first use; bad startup values are logged and defaulted)."""
+    global _CURRENT
+    snap = _CURRENT
+    if snap is not None:
+        return snap
+    with _LOCK:
+        if _CURRENT is None:
+            _apply_env_file()
+            _MTIMES.update(_mtimes())
+            # no previous snapshot to fall back to: tolerate bad values (logged, defaults used)
+            _CURRENT = build(version=1, reason="startup", strict=False)
+        return _CURRENT
+
+
+def subscribe(fn: Callable[[Snapshot, Snapshot], None]) -> None:
+    """fn(old, new) after every accepted reload (exceptions are logged and ignored)."""
+    _SUBSCRIBERS.append(fn)
+
+
+def _watched_paths() -> List[str]:
+    paths = [os.path.join(_HERE, "settings.py"), os.path.join(_HERE, "strategy_knobs.py")]
+    if CONFIG_ENV_FILE:
+        paths.append(CONFIG_ENV_FILE)
+    return paths
+
+
+def _mtimes() -> Dict[str, float]:
+    out = {}
+    for p in _watched_paths():
+        try:
+            out[p] = os.stat(p).st_mtime
+        except OSError:
+            out[p] = 0.0
+    return out
+
+
+def _read_env_file(path: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("export "):
+                    line = line[7:]
+                k, sep, v = line.partition("=")
+                if sep and k.strip():
+                    out[k.strip()] = v.strip().strip("'\"")
+    except FileNotFoundError:
+        pass
+    return out
+
+
+def _apply_env_file() -> Dict[str, Optional[str]]:
+    """
+    Overlay CONFIG_ENV_FILE on os.environ (subprocesses inherit it); keys dropped from the
+    file get their pre-overlay value back. Returns {changed key: value before this call}.
+    """
+    if not CONFIG_ENV_FILE:
+        return {}
+    new = _read_env_file(CONFIG_ENV_FILE)
+    before: Dict[str, Optional[str]] = {}
+    for k in list(_OVERLAY):
+        if k not in new:
+            before[k] = os.environ.get(k)
+            _set_env(k, _OVERLAY.pop(k))
+    for k, v in new.items():
+        if k not in _OVERLAY:
+            _OVERLAY[k] = os.environ.get(k)
+        if os.environ.get(k) != v:
+            before.setdefault(k, os.environ.get(k))
+            os.environ[k] = v
+    return before
+
+
+def _set_env(k: str, v: Optional[str]) -> None:
+    if v is None:
+        os.environ.pop(k, None)
+    else:
+        os.environ[k] = v
+
+
+def reload(reason: str = "manual") -> bool:
+    """Rebuild now; True if a new snapshot was swapped in. Invalid config keeps the previous snapshot."""
+    global _CURRENT
+    old = current()
+    with _LOCK:
+        overlay = dict(_OVERLAY)
+        changed: Dict[str, Optional[str]] = {}
+        try:
+            changed = _apply_env_file()
+            _MTIMES.update(_mtimes())
+            new = build(version=old.version + 1, reason=reason, reload_modules=True)
+        except Exception as e:
+            # back to the env the current snapshot was built from
+            for k, v in changed.items():
+                _set_env(k, v)
+            _OVERLAY.clear()
+            _OVERLAY.update(overlay)
+            why = str(e) if isinstance(e, ConfigError) else repr(e)
+            print(f"[CONFIG] reload rejected ({reason}): {why} -> keeping v{old.version}", flush=True)
+            return False
+        _CURRENT = new
+    diff = describe_diff(old, new)
+    print(f"[CONFIG] v{old.version} -> v{new.version} ({reason}) env_keys={len(changed)} "
+          f"{' '.join(diff) if diff else 'no value changed'}", flush=True)
+    for fn in list(_SUBSCRIBERS):
+        try:
+            fn(old, new)
+        except Exception as e:
+            print(f"[CONFIG] subscriber {getattr(fn, '__name__', fn)} failed: {e!r}", flush=True)
+    return True
+
+
+def maybe_reload() -> bool:
+    """Loop hook: reload after SIGHUP or when a watched file changed (mtime checked every CONFIG_WATCH_S)."""
+    global _PENDING, _LAST_CHECK
+    current()
+    if _PENDING:
+        _PENDING = False
+        return reload("sighup")
+    if CONFIG_WATCH_S <= 0:
+        return False
+    now = time.time()
+    if now - _LAST_CHECK < CONFIG_WATCH_S:
+        return False
+    _LAST_CHECK = now
+    mt = _mtimes()
+    if mt != _MTIMES:
+        moved = [os.path.basename(p) for p, t in mt.items() if _MTIMES.get(p) != t]
+        return reload("file:" + ",".join(moved))
+    return False
+
+
+def _on_sighup(signum, frame) -> None:
+    global _PENDING
+    _PENDING = True  # applied by maybe_reload() between ticks
+
+
+def install() -> Snapshot:
+    """Build the startup snapshot and route SIGHUP to a reload (main thread only)."""
+    snap = current()
+    try:
+        signal.signal(signal.SIGHUP, _on_sighup)
+    except (ValueError, AttributeError, OSError):
+        pass
+    print(f"[CONFIG] v{snap.version} loaded: exit(BASE)={snap.sell.exit.params()} profiles={sorted(snap.profiles)} "
+          f"watch={CONFIG_WATCH_S}s env_file={CONFIG_ENV_FILE or '-'} (kill -HUP {os.getpid()} to reload)", flush=True)
+    return snap
+
+
+def describe_diff(old: Snapshot, new: Snapshot) -> List[str]:
+    """["sell.exit.tp1_pct=0.3->0.4", "knobs.SCORE_MIN=6.8->7.0", ...]"""
+    out: List[str] = []
+
+    def walk(prefix: str, a: Any, b: Any) -> None:
+        if isinstance(a, Mapping) and isinstance(b, Mapping):
+            for k in sorted(set(a) | set(b), key=str):
+                walk(f"{prefix}.{k}" if prefix else str(k), a.get(k), b.get(k))
+        elif hasattr(a, "__dataclass_fields__") and type(a) is type(b):
+            for f in fields(a):
+                walk(f"{prefix}.{f.name}", getattr(a, f.name), getattr(b, f.name))
+        elif a != b:
+            out.append(f"{prefix}={a}->{b}")
+
+    for part in ("sell", "buy", "profiles", "settings", "knobs"):
+        walk(part, getattr(old, part), getattr(new, part))
+    return out
@@ -0,0 +1,299 @@
+"""
+Token account cleanup: CloseAccount / Burn+Close packing and parallel submit.
+
+- lists token accounts for both SPL Token and Token-2022 (one call each)
+- packs as many instruction groups per v0 transaction as fit the 1232-byte
+  packet limit and the compute budget (a Burn+Close pair is never split)
+- one blockhash shared by a whole batch, bounded in-flight sends, and
+  batched getSignatureStatuses confirmation
+- groups from a failed transaction are retried one per transaction, so a
+  single bad account (e.g. Token-2022 withheld fees) cannot sink the rest
+
+Used by scripts/reclaim_rent.py and scripts/burn_close_mint.py.
+"""
+from __future__ import annotations
+
+import base64
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core import http_pool, single_flight
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+TOKEN_2022_PROGRAM_ID = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+COMPUTE_BUDGET_PROGRAM_ID = Pubkey.from_string("ComputeBudget111111111111111111111111111111")
+
+PACKET_DATA_SIZE = 1232
+MAX_TX_CU = 1_400_000
+# conservative per-instruction CU estimates (Token-2022 costs more)
+CU_CLOSE = {TOKEN_PROGRAM_ID: 3_000, TOKEN_2022_PROGRAM_ID: 6_000}
+CU_BURN = {TOKEN_PROGRAM_ID: 4_500, TOKEN_2022_PROGRAM_ID: 8_000}
+CU_BASE = 1_000
+
+MAX_INFLIGHT = int(os.getenv("CLOSE_MAX_INFLIGHT", "4"))
+CU_PRICE_MICRO = int(os.getenv("CLOSE_CU_PRICE_MICRO", "0"))
+BLOCKHASH_MAX_AGE_S = float(os.getenv("CLOSE_BLOCKHASH_MAX_AGE_S", "45"))
+CONFIRM_TIMEOUT_S = float(os.getenv("CLOSE_CONFIRM_TIMEOUT_S", "60"))
+
+
+# -----------------------------
+# rpc
+# -----------------------------
+class Rpc:
+    def __init__(self, url: str, timeout_s: float = 25.0):
+        self.url = url
+        self.timeout_s = float(timeout_s)
+        self._s = http_pool.session()
+
+    def call(self, method: str, params: list) -> Any:
+        key = single_flight.rpc_key(self.url, method, params)
+        return single_flight.do_sync(key, lambda: self._call(method, params))
+
+    def _call(self, method: str, params: list) -> Any:
+        r = self._s.post(self.url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params}, timeout=self.timeout_s)
+        r.raise_for_status()
+        out = r.json()
+        if out.get("error"):
+            raise RuntimeError(out["error"])
+        return out.get("result")
+
+    def latest_blockhash(self, commitment: str = "confirmed") -> Hash:
+        return Hash.from_string(self.call("getLatestBlockhash", [{"commitment": commitment}])["value"]["blockhash"])
+
+    def sol_balance(self, owner: str) -> float:
+        return self.call("getBalance", [owner])["value"] / 1e9
+
+
+# -----------------------------
+# accounts + instructions
+# -----------------------------
+@dataclass
+class TokenAccount:
+    pubkey: str
+    mint: str
+    program: Pubkey
+    amount: int
+    decimals: int
+    ui: float
+
+
+def list_token_accounts(rpc: Rpc, owner: str, programs: Sequence[Pubkey] = (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)) -> List[TokenAccount]:
+    out: List[TokenAccount] = []
+    for prog in programs:
+        res = rpc.call("getTokenAccountsByOwner", [owner, {"programId": str(prog)}, {"encoding": "jsonParsed"}]) or {}
+        for it in res.get("value") or []:
+            info = it["account"]["data"]["parsed"]["info"]
+            tok = info.get("tokenAmount") or {}
+            out.append(TokenAccount(
+                pubkey=it["pubkey"],
+                mint=info.get("mint") or "",
+                program=prog,
+                amount=int(tok.get("amount") or 0),
+                decimals=int(tok.get("decimals") or 0),
+                ui=float(tok.get("uiAmount") or 0.0),
+            ))
+    return out
+
+
+def ix_close_account(account: Pubkey, destination: Pubkey, owner: Pubkey, program: Pubkey = TOKEN_PROGRAM_ID) -> Instruction:
+    # CloseAccount: tag=9 (same layout in Token-2022)
+    return Instruction(program, bytes([9]), [
+        AccountMeta(account, is_signer=False, is_writable=True),
+        AccountMeta(destination, is_signer=False, is_writable=True),
+        AccountMeta(owner, is_signer=True, is_writable=False),
+    ])
+
+
+def ix_burn(source: Pubkey, mint: Pubkey, owner: Pubkey, amount: int, program: Pubkey = TOKEN_PROGRAM_ID) -> Instruction:
+    # Burn: tag=8, amount=u64 LE
+    return Instruction(program, struct.pack("<BQ", 8, int(amount)), [
+        AccountMeta(source, is_signer=False, is_writable=True),
+        AccountMeta(mint, is_signer=False, is_writable=True),
+        AccountMeta(owner, is_signer=True, is_writable=False),
+    ])
+
+
+def _ix_cu_limit(units: int) -> Instruction:
+    return Instruction(COMPUTE_BUDGET_PROGRAM_ID, struct.pack("<BI", 2, int(units)), [])
+
+
+def _ix_cu_price(micro_lamports: int) -> Instruction:
+    return Instruction(COMPUTE_BUDGET_PROGRAM_ID, struct.pack("<BQ", 3, int(micro_lamports)), [])
+
+
+@dataclass
+class Group:
+    """Instructions that must land together (e.g. Burn + Close of one account)."""
+    ixs: List[Instruction]
+    cu: int
+    label: str
+
+
+def close_group(acc: TokenAccount, owner: Pubkey, burn: bool = False) -> Group:
+    pk = Pubkey.from_string(acc.pubkey)
+    ixs: List[Instruction] = []
+    cu = CU_CLOSE.get(acc.program, 6_000)
+    if burn and acc.amount > 0:
+        ixs.append(ix_burn(pk, Pubkey.from_string(acc.mint), owner, acc.amount, acc.program))
+        cu += CU_BURN.get(acc.program, 8_000)
+    ixs.append(ix_close_account(pk, owner, owner, acc.program))
+    return Group(ixs, cu, f"{acc.mint}:{acc.pubkey}")
+
+
+# -----------------------------
+# packing
+# -----------------------------
+def _build(kp: Keypair, groups: Sequence[Group], bh: Hash) -> VersionedTransaction:
+    cu = CU_BASE + sum(g.cu for g in groups)
+    ixs = [_ix_cu_limit(min(MAX_TX_CU, cu))]
+    if CU_PRICE_MICRO > 0:
+        ixs.append(_ix_cu_price(CU_PRICE_MICRO))
+    for g in groups:
+        ixs.extend(g.ixs)
+    msg = MessageV0.try_compile(kp.pubkey(), ixs, [], bh)
+    return VersionedTransaction(msg, [kp])
+
+
+def pack(kp: Keypair, groups: Sequence[Group], bh: Hash, max_groups: int = 0,
+         skipped: Optional[List[Tuple[Group, str]]] = None) -> List[Tuple[VersionedTransaction, List[Group]]]:
+    """
+    Greedy: add groups while the signed tx fits PACKET_DATA_SIZE and the CU cap.
+    A group that can't make a valid tx even alone is left out (appended to `skipped` with the error).
+    """
+    out: List[Tuple[VersionedTransaction, List[Group]]] = []
+    cur: List[Group] = []
+    cur_tx: Optional[VersionedTransaction] = None
+    for g in groups:
+        trial = cur + [g]
+        fits = CU_BASE + sum(x.cu for x in trial) <= MAX_TX_CU and (max_groups <= 0 or len(trial) <= max_groups)
+        tx = None
+        if fits:
+            try:
+                tx = _build(kp, trial, bh)
+                fits = len(bytes(tx)) <= PACKET_DATA_SIZE
+            except Exception:
+                fits = False
+        if fits:
+            cur, cur_tx = trial, tx
+            continue
+        if cur:
+            out.append((cur_tx, cur))
+        cur, cur_tx = [], None
+        try:
+            tx = _build(kp, [g], bh)
+            n = len(bytes(tx))
+            if n > PACKET_DATA_SIZE:
+                raise ValueError(f"tx {n} bytes > {PACKET_DATA_SIZE}")
+        except Exception as e:
+            if skipped is not None:
+                skipped.append((g, f"{type(e).__name__}: {e}"))
+            continue
+        cur, cur_tx = [g], tx
+    if cur:
+        out.append((cur_tx, cur))
+    return out
+
+
+# -----------------------------
+# submit + confirm
+# -----------------------------
+def _send(rpc: Rpc, tx: VersionedTransaction) -> Tuple[Optional[str], Optional[str]]:
+    b64 = base64.b64encode(bytes(tx)).decode("ascii")
+    try:
+        sig = rpc.call("sendTransaction", [b64, {"encoding": "base64", "skipPreflight": False, "preflightCommitment": "processed"}])
+        return str(sig), None
+    except Exception as e:
+        return None, str(e)
+
+
+def confirm_many(rpc: Rpc, sigs: Sequence[str], timeout_s: float = CONFIRM_TIMEOUT_S, poll_s: float = 0.8) -> Dict[str, Optional[bool]]:
+    """sig -> True (landed ok) / False (landed with err) / None (not seen before timeout)."""
+    pending = list(sigs)
+    out: Dict[str, Optional[bool]] = {s: None for s in sigs}
+    t0 = time.time()
+    while pending and time.time() - t0 < timeout_s:
+        nxt: List[str] = []
+        for i in range(0, len(pending), 256):
+            chunk = pending[i:i + 256]
+            try:
+                vals = rpc.call("getSignatureStatuses", [chunk, {"searchTransactionHistory": True}])["value"]
+            except Exception:
+                nxt.extend(chunk)
+                continue
+            for s, st in zip(chunk, vals):
+                if st and st.get("confirmationStatus") in ("confirmed", "finalized"):
+                    out[s] = st.get("err") is None
+                else:
+                    nxt.append(s)
+        pending = nxt
+        if pending:
+            time.sleep(poll_s)
+    return out
+
+
+def run_groups(rpc: Rpc, kp: Keypair, groups: Sequence[Group], *, max_inflight: int = MAX_INFLIGHT,
+               max_groups_per_tx: int = 0, confirm_timeout_s: float = CONFIRM_TIMEOUT_S,
+               dry_run: bool = False, log=print) -> Dict[str, Any]:
+    """
+    Pack, send (bounded concurrency), confirm. Multi-group txs that failed (not sent, or landed
+    with an error) are retried one group per tx; unconfirmed ones are not resent, they may still
+    land (same rule as core.liquidation) and are counted in unconfirmed_groups.
+    """
+    stats = {"groups": len(groups), "txs": 0, "ok_groups": 0, "failed_groups": 0, "unconfirmed_groups": 0,
+             "rounds": 0}
+    todo = list(groups)
+    per_tx = max_groups_per_tx
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, int(max_inflight))) as pool:
+        while todo and stats["rounds"] < 2:
+            stats["rounds"] += 1
+            bh, bh_ts = rpc.latest_blockhash(), time.time()
+            skipped: List[Tuple[Group, str]] = []
+            packed = pack(kp, todo, bh, max_groups=per_tx, skipped=skipped)
+            log(f"[PACK] round={stats['rounds']} groups={len(todo)} txs={len(packed)} "
+                f"max_per_tx={max(len(g) for _, g in packed) if packed else 0}")
+            for g, why in skipped:
+                log(f"[PACK] skip group={g.label} (cannot build a tx): {why[:160]}")
+            stats["failed_groups"] += len(skipped)
+            if dry_run:
+                stats["txs"] += len(packed)
+                return stats
+
+            retry: List[Group] = []
+            for i in range(0, len(packed), 64):
+                window = packed[i:i + 64]
+                if time.time() - bh_ts > BLOCKHASH_MAX_AGE_S:
+                    bh, bh_ts = rpc.latest_blockhash(), time.time()
+                    window = [(_build(kp, g, bh), g) for _, g in window]
+                sent = list(pool.map(lambda p: (_send(rpc, p[0]), p[1]), window))
+                stats["txs"] += len(sent)
+                sigs = [sig for (sig, _), _ in sent if sig]
+                st = confirm_many(rpc, sigs, timeout_s=confirm_timeout_s) if sigs else {}
+                for (sig, err), grp in sent:
+                    res = st.get(sig) if sig else False
+                    ok = res is True
+                    log(f"[TX] sig={sig} ok={ok if res is not None else 'unconfirmed'} groups={len(grp)}"
+                        + (f" err={err[:160]}" if err else ""))
+                    if ok:
+                        stats["ok_groups"] += len(grp)
+                    elif res is None:
+                        # may still land: never resend its burn/close on top of it
+                        stats["unconfirmed_groups"] += len(grp)
+                    elif len(grp) > 1:
+                        retry.extend(grp)
+                    else:
+                        stats["failed_groups"] += 1
+            todo, per_tx = retry, 1
+    stats["failed_groups"] += len(todo)
+    stats["dt_s"] = round(time.time() - t0, 2)
+    return stats
@@ -3,15 +3,32 @@ import logging
 log = logging.getLogger("AntiRug")
 
 import asyncio
+import base64
+import struct
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional: pure-python decode below
+    np = None
 
 from core.solana_rpc_async import TOKEN_2022_PROGRAM_ID, TOKEN_PROGRAM_ID
 
 # --- knobs (env overridable)
 MAX_FALLBACK_ACCOUNTS = int(__import__("os").getenv("ANTI_RUG_FALLBACK_MAX_ACCOUNTS", "5000"))
 FALLBACK_CONCURRENCY_SLEEP_S = float(__import__("os").getenv("ANTI_RUG_FALLBACK_SLEEP_S", "0.0"))
+MAX_FALLBACK_ACCOUNTS_COMPACT = int(__import__("os").getenv("ANTI_RUG_FALLBACK_MAX_ACCOUNTS_COMPACT", "200000"))
+
+# SPL token account layout: mint[0:32] owner[32:64] amount[64:72] ... (165 bytes for legacy Token)
+TOKEN_ACCOUNT_SIZE = 165
+_ACC_SLICE = {"offset": 32, "length": 40}  # owner + amount only
+_ACC_REC = struct.Struct("<32sQ")
+
+# structural mint facts (token program, renounced authorities) cannot change back -> long TTL
+FACTS_TTL_S = float(__import__("os").getenv("ANTI_RUG_FACTS_TTL_S", "86400"))
+FACTS_CACHE_MAX = int(__import__("os").getenv("ANTI_RUG_FACTS_CACHE_MAX", "20000"))
 
 
 @dataclass
@@ -29,13 +46,76 @@ class AntiRug:
       - require renounced: mintAuthority=None AND freezeAuthority=None
       - holders concentration: top1/top10 %
         primary: getTokenLargestAccounts
-        fallback on 429: getTokenAccountsByMint + aggregate owners (bounded)
+        fallback on 429: getProgramAccounts (base64, dataSlice owner+amount,
+        decoded in bulk) then getTokenAccountsByMint jsonParsed (bounded)
+    Final mint facts (program owner, renounced authorities) are cached
+    in-process for ANTI_RUG_FACTS_TTL_S, so a resurfacing mint skips getAccountInfo.
     """
 
     def __init__(self, rpc, logger, *, block_token_2022: bool = True):
         self.rpc = rpc
         self.logger = logger
         self.block_token_2022 = bool(block_token_2022)
+        # mint -> (ts, {"program_owner","mint_authority","freeze_authority","decimals"})
+        self._facts: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.stats = {"facts_hit": 0, "facts_miss": 0}
+
+    # ----------------------------
+    # structural facts cache
+    # ----------------------------
+    def _facts_get(self, mint: str) -> Optional[Dict[str, Any]]:
+        rec = self._facts.get(mint)
+        if rec is None:
+            return None
+        ts, facts = rec
+        if FACTS_TTL_S <= 0 or time.time() - ts > FACTS_TTL_S:
+            self._facts.pop(mint, None)
+            return None
+        return facts
+
+    def _facts_put(self, mint: str, facts: Dict[str, Any]) -> None:
+        if FACTS_TTL_S <= 0:
+            return
+        if len(self._facts) >= FACTS_CACHE_MAX:
+            # drop the oldest half; cheap and keeps the dict bounded
+            keep = sorted(self._facts.items(), key=lambda kv: kv[1][0])[len(self._facts) // 2:]
+            self._facts = dict(keep)
+        self._facts[mint] = (time.time(), dict(facts))
+
+    async def _mint_facts(self, mint: str) -> Tuple[Optional[Dict[str, Any]], Optional[RiskResult]]:
+        """
+        Program owner + authorities + decimals for `mint`.
+        Only final facts (both authorities renounced) are cached: a live
+        authority can still be renounced later, so those mints are re-read.
+        """
+        facts = self._facts_get(mint)
+        if facts is not None:
+            self.stats["facts_hit"] += 1
+            return facts, None
+        self.stats["facts_miss"] += 1
+
+        ok, res, err = await self._call(
+            "getAccountInfo",
+            [mint, {"encoding": "jsonParsed"}],
+        )
+        if not ok:
+            return None, RiskResult(False, f"mint introuvable (RPC)", details={"rpc_error": err})
+
+        value = (res or {}).get("value")
+        if not value:
+            return None, RiskResult(False, "mint introuvable (RPC)", details={"rpc": "no value"})
+
+        parsed = (((value.get("data") or {}).get("parsed") or {}).get("info") or {})
+        facts = {
+            "program_owner": value.get("owner"),
+            "mint_authority": parsed.get("mintAuthority"),
+            "freeze_authority": parsed.get("freezeAuthority"),
+            "decimals": parsed.get("decimals"),
+            "supply_str": parsed.get("supply"),
+        }
+        if facts["mint_authority"] is None and facts["freeze_authority"] is None and facts["program_owner"]:
+            self._facts_put(mint, facts)
+        return facts, None
 
     # ----------------------------
     # low-level helpers
@@ -76,19 +156,12 @@ class AntiRug:
     ) -> RiskResult:
         details: Dict[str, Any] = {}
 
-        # 1) mint account info (program owner + parsed mint authorities)
-        ok, res, err = await self._call(
-            "getAccountInfo",
-            [mint, {"encoding": "jsonParsed"}],
-        )
-        if not ok:
-            return RiskResult(False, f"mint introuvable (RPC)", details={"rpc_error": err})
-
-        value = (res or {}).get("value")
-        if not value:
-            return RiskResult(False, "mint introuvable (RPC)", details={"rpc": "no value"})
+        # 1) mint account info (program owner + parsed mint authorities), cached once final
+        facts, fail = await self._mint_facts(mint)
+        if fail is not None:
+            return fail
 
-        owner = value.get("owner")
+        owner = facts.get("program_owner")
         details["program_owner"] = owner
 
         if self.block_token_2022 and owner == TOKEN_2022_PROGRAM_ID:
@@ -97,11 +170,10 @@ class AntiRug:
         if owner != TOKEN_PROGRAM_ID and owner != TOKEN_2022_PROGRAM_ID:
             return RiskResult(False, f"unexpected mint owner {owner}", details)
 
-        parsed = (((value.get("data") or {}).get("parsed") or {}).get("info") or {})
-        mint_auth = parsed.get("mintAuthority")
-        freeze_auth = parsed.get("freezeAuthority")
-        decimals = parsed.get("decimals")
-        supply_str = parsed.get("supply")
+        mint_auth = facts.get("mint_authority")
+        freeze_auth = facts.get("freeze_authority")
+        decimals = facts.get("decimals")
+        supply_str = facts.get("supply_str")
 
         details["decimals"] = decimals
         details["mint_authority"] = mint_auth
@@ -130,7 +202,7 @@ class AntiRug:
         details["supply_decimals"] = supply_decimals
 
         # 3) holders check: primary then fallback
-        rr = await self._holders_check(mint, supply_amount, max_top1=max_top1, max_top10=max_top10)
+        rr = await self._holders_check(mint, supply_amount, max_top1=max_top1, max_top10=max_top10, program_id=owner)
         rr.details = {**details, **(rr.details or {})}
         return rr
 
@@ -141,6 +213,7 @@ class AntiRug:
         *,
         max_top1: float,
         max_top10: float,
+        program_id: Optional[str] = None,
     ) -> RiskResult:
         # --- primary: getTokenLargestAccounts
         ok, res, err = await self._call("getTokenLargestAccounts", [mint])
@@ -149,7 +222,10 @@ class AntiRug:
 
         # if not ok: if 429 -> fallback bounded
         if self._is_429(err):
-            self.logger and self.logger.info("[AntiRug] 429 on getTokenLargestAccounts -> fallback getTokenAccountsByMint")
+            self.logger and self.logger.info("[AntiRug] 429 on getTokenLargestAccounts -> fallback getProgramAccounts(dataSlice)")
+            fb = await self._fallback_compact(mint, supply_amount, max_top1=max_top1, max_top10=max_top10, program_id=program_id)
+            if fb is not None:
+                return fb
             fb = await self._fallback_accounts_by_mint(mint, supply_amount, max_top1=max_top1, max_top10=max_top10)
             return fb
 
@@ -190,6 +266,93 @@ class AntiRug:
 
         return RiskResult(True, "ok", det)
 
+    @staticmethod
+    def _concentration(accounts: List[Any]) -> Tuple[int, int, int]:
+        """
+        accounts: getProgramAccounts base64 items sliced to owner(32)+amount(8).
+        Returns (top1, top10, n_owners) aggregated per owner.
+        """
+        buf = bytearray()
+        for it in accounts:
+            d = (((it or {}).get("account") or {}).get("data") or [None])[0]
+            if not d:
+                continue
+            raw = base64.b64decode(d)
+            if len(raw) == _ACC_REC.size:
+                buf += raw
+        if not buf:
+            return 0, 0, 0
+
+        if np is not None:
+            rec = np.frombuffer(memoryview(buf), dtype=np.dtype([("owner", "<u8", (4,)), ("amount", "<u8")]))
+            owners, inv = np.unique(rec["owner"], axis=0, return_inverse=True)
+            sums = np.zeros(len(owners), dtype=np.uint64)
+            np.add.at(sums, inv.reshape(-1), rec["amount"])
+            n = len(sums)
+            k = min(10, n)
+            top = np.partition(sums, n - k)[n - k:]
+            return int(top.max()), int(top.sum(dtype=np.uint64)), n
+
+        owner_amt: Dict[bytes, int] = {}
+        for owner, amt in _ACC_REC.iter_unpack(memoryview(buf)):
+            owner_amt[owner] = owner_amt.get(owner, 0) + amt
+        top = sorted(owner_amt.values(), reverse=True)[:10]
+        return top[0], sum(top), len(owner_amt)
+
+    async def _fallback_compact(
+        self,
+        mint: str,
+        supply_amount: int,
+        *,
+        max_top1: float,
+        max_top10: float,
+        program_id: Optional[str] = None,
+    ) -> Optional[RiskResult]:
+        """
+        Holder concentration from getProgramAccounts with base64 + dataSlice:
+        40 bytes per account instead of a jsonParsed object. Returns None when
+        the RPC refuses the call for a non-rate-limit reason (caller falls back).
+        """
+        program_id = program_id or TOKEN_PROGRAM_ID
+        filters: List[Dict[str, Any]] = [{"memcmp": {"offset": 0, "bytes": mint}}]
+        if program_id == TOKEN_PROGRAM_ID:
+            # Token-2022 accounts carry extensions, so only the legacy size is fixed
+            filters.insert(0, {"dataSize": TOKEN_ACCOUNT_SIZE})
+
+        ok, res, err = await self._call(
+            "getProgramAccounts",
+            [program_id, {"encoding": "base64", "dataSlice": _ACC_SLICE, "filters": filters}],
+        )
+        src = "getProgramAccounts"
+        if not ok:
+            if self._is_429(err) or "429" in str(err) or "too many requests" in str(err).lower():
+                return RiskResult(False, f"holders fallback fail: {err}", {"source": src, "rpc_error": err})
+            return None
+
+        vals = res.get("value") if isinstance(res, dict) else res
+        vals = vals or []
+        n = len(vals)
+        if n == 0:
+            return RiskResult(False, "holders fallback empty", {"source": src, "n": 0})
+        if n > MAX_FALLBACK_ACCOUNTS_COMPACT:
+            return RiskResult(False, f"holders fallback too many accounts ({n} > {MAX_FALLBACK_ACCOUNTS_COMPACT})", {"source": src, "n": n})
+
+        top1, top10, n_owners = self._concentration(vals)
+        if n_owners == 0:
+            return RiskResult(False, "holders fallback parse empty", {"source": src, "n": n})
+
+        p1 = top1 / supply_amount
+        p10 = top10 / supply_amount
+
+        det = {"top1_pct": p1, "top10_pct": p10, "source": src, "n_accounts": n, "n_owners": n_owners}
+
+        if p1 > max_top1:
+            return RiskResult(False, f"top1 too high {p1:.3f} > {max_top1:.3f}", det)
+        if p10 > max_top10:
+            return RiskResult(False, f"top10 too high {p10:.3f} > {max_top10:.3f}", det)
+
+        return RiskResult(True, "ok", det)
+
     async def _fallback_accounts_by_mint(
         self,
         mint: str,
@@ -0,0 +1,570 @@
+"""
+Replay recorded price paths through SellEngine's exit rules, over a grid of settings.
+
+Positions come from the positions table (trades.sqlite), price paths from
+core.tick_store. Each position's path is resampled on the sell-loop grid
+(entry_ts + k * step_s, last tick at or before each step, i.e. what the
+engine's price cache would have returned), then every (setting, position)
+pair is stepped through the same branches, in the same order, as
+SellEngine._handle_one_decide:
+
+  1. high-water sanity reset (hw > 50 x price -> hw = price)
+  2. hw = max(hw, price)
+  3. HARD_SL      pnl <= -hard_sl_pct                     -> sell all
+  4. TIME_STOP    age > time_stop_sec and pnl < time_stop_min_pnl
+                  -> the live guard returns WITHOUT selling (and the trailing
+                     check is skipped that tick); time_stop_sells=True models
+                     the intended "sell all" instead
+  5. TP1          not tp1 and pnl >= tp1_pct               -> sell tp1_size
+  6. TP2          tp1 and not tp2 and pnl >= tp2_pct       -> sell tp2_size
+  7. TRAIL        price <= hw * (1 - (trail_wide if tp2 else trail_tight)) -> sell all
+
+TP sizes are fractions of the ORIGINAL quantity (qty_token is not
+decremented after a partial sell; the on-chain clamp caps the last sell to
+what is left). A position still open when its path ends is marked to its
+last price (reason "open").
+
+Entry filters (min_liq_usd, min_vol_m5, max_mcap_usd) use the last
+liquidity/volume/mcap tick at or before entry; filtered positions are not
+traded for that setting.
+
+replay_grid() is vectorized with NumPy across settings x positions (the
+pnl / high-water paths do not depend on the setting, only the branch tests
+do, and finished pairs are compacted away). replay_one() is the scalar
+reference, used when NumPy is missing. CLI: scripts/backtest.py.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import runtime
+from core import tick_store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKTEST_DB = os.getenv("BACKTEST_DB", os.getenv("TRADES_DB_PATH", "state/trades.sqlite"))
+BACKTEST_STEP_S = float(os.getenv("BACKTEST_STEP_S", os.getenv("LOOP_SLEEP_S", "10")))
+BACKTEST_HORIZON_S = float(os.getenv("BACKTEST_HORIZON_S", str(6 * 3600)))
+BACKTEST_MAX_GAP_S = float(os.getenv("BACKTEST_MAX_GAP_S", "600"))  # path ends this long after the last tick
+BACKTEST_SOURCES = tuple(s for s in os.getenv("BACKTEST_SOURCES", "sell,price_feed,scanner,sim").split(",") if s)
+BACKTEST_FEE_PCT = float(os.getenv("BACKTEST_FEE_PCT", "0.0"))  # per sell leg, fraction
+BACKTEST_SIZE_SOL = float(os.getenv("BACKTEST_SIZE_SOL", os.getenv("BUY_AMOUNT_SOL", "0.01")))
+
+REASONS = ("open", "hard_sl", "time_stop", "tp", "trailing_stop", "filtered")
+_R_OPEN, _R_SL, _R_TS, _R_TP, _R_TRAIL, _R_FILT = range(len(REASONS))
+_EPS = 1e-9
+
+
+def _env_f(*names: str, default: float) -> float:
+    for n in names:
+        v = os.getenv(n)
+        if v not in (None, ""):
+            try:
+                return float(v)
+            except ValueError:
+                pass
+    return default
+
+
+@dataclass(frozen=True)
+class ExitParams:
+    """One setting. Fractions (0.25 = 25%); hard_sl_pct is a positive distance."""
+    hard_sl_pct: float = 0.25
+    tp1_pct: float = 0.30
+    tp1_size: float = 0.35
+    tp2_pct: float = 0.80
+    tp2_size: float = 0.35
+    trail_tight: float = 0.10
+    trail_wide: float = 0.20
+    time_stop_sec: float = 900.0
+    time_stop_min_pnl: float = 0.05
+    min_liq_usd: float = 0.0
+    min_vol_m5: float = 0.0
+    max_mcap_usd: float = 0.0  # 0 = no cap
+
+    @classmethod
+    def from_env(cls) -> "ExitParams":
+        """Same env keys / defaults as SellEngine.__init__."""
+        return cls(
+            hard_sl_pct=abs(_env_f("HARD_SL_PCT", "SELL_HARD_SL_PCT", default=0.25)),
+            tp1_pct=_env_f("SELL_TP1_PCT", default=0.30), tp1_size=_env_f("SELL_TP1_SIZE", default=0.35),
+            tp2_pct=_env_f("SELL_TP2_PCT", default=0.80), tp2_size=_env_f("SELL_TP2_SIZE", default=0.35),
+            trail_tight=_env_f("SELL_TRAIL_TIGHT", default=0.10), trail_wide=_env_f("SELL_TRAIL_WIDE", default=0.20),
+            time_stop_sec=_env_f("SELL_TIME_STOP_SEC", default=900.0),
+            time_stop_min_pnl=_env_f("SELL_TIME_STOP_MIN_PNL", default=0.05),
+        )
+
+
+def _profiles() -> Dict[str, Dict[str, float]]:
+    """Exit profiles recorded on positions at buy time (config.runtime, mint suffix "pump" -> PUMP)."""
+    try:
+        snap = runtime.current()
+        return {n: {k: float(v) for k, v in snap.profile(n).params().items()} for n in runtime.PROFILE_DEFAULTS}
+    except runtime.ConfigError:
+        return {n: {k: float(v) for k, v in d.items()} for n, d in runtime.PROFILE_DEFAULTS.items()}
+
+
+PROFILES: Dict[str, Dict[str, float]] = _profiles()
+
+PARAM_NAMES = tuple(f.name for f in fields(ExitParams))
+
+
+def parse_grid(spec: str, base: Optional[ExitParams] = None) -> List[ExitParams]:
+    """
+    "tp1_pct=0.2:0.6:0.1;hard_sl_pct=0.15,0.25;trail_tight=0.08"
+    -> cartesian product over base. lo:hi:step ranges include hi.
+    """
+    base = base or ExitParams.from_env()
+    axes: List[Tuple[str, List[float]]] = []
+    for part in (spec or "").replace(" ", "").split(";"):
+        if not part:
+            continue
+        k, sep, v = part.partition("=")
+        if not sep or k not in PARAM_NAMES:
+            raise ValueError(f"bad grid axis {part!r} (params: {', '.join(PARAM_NAMES)})")
+        if ":" in v:
+            lo, hi, st = (float(x) for x in v.split(":"))
+            n = int(math.floor((hi - lo) / st + 1e-9)) + 1
+            vals = [round(lo + i * st, 10) for i in range(max(1, n))]
+        else:
+            vals = [float(x) for x in v.split(",") if x]
+        axes.append((k, vals))
+    if not axes:
+        return [base]
+    names = [a[0] for a in axes]
+    return [replace(base, **dict(zip(names, combo))) for combo in itertools.product(*(a[1] for a in axes))]
+
+
+# -----------------------------
+# data
+# -----------------------------
+@dataclass
+class Position:
+    mint: str
+    entry_ts: float
+    entry_price: float
+    size_sol: float
+    status: str = ""
+    close_reason: str = ""
+    liq_usd: float = math.nan  # entry features (last tick at or before entry)
+    vol_m5: float = math.nan
+    mcap: float = math.nan
+
+
+def load_positions(db_path: str = BACKTEST_DB, since: Optional[float] = None, until: Optional[float] = None,
+                   mints: Optional[Sequence[str]] = None) -> List[Position]:
+    """Positions (open or closed) entered in [since, until], from the positions table."""
+    if not os.path.exists(db_path):
+        return []
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    try:
+        cols = {r[1] for r in con.execute("PRAGMA table_info(positions)")}
+        if not cols:
+            return []
+        ts_col = next((c for c in ("entry_ts", "opened_ts", "created_ts") if c in cols), None)
+        if ts_col is None:
+            return []
+        rows = con.execute(f"SELECT * FROM positions WHERE {ts_col} IS NOT NULL AND {ts_col} > 0 ORDER BY {ts_col}").fetchall()
+    finally:
+        con.close()
+    want = set(mints) if mints else None
+    out = []
+    for r in rows:
+        d = dict(r)
+        ts = float(d.get(ts_col) or 0)
+        if ts > 1e12:  # ms
+            ts /= 1000.0
+        if (since and ts < since) or (until and ts > until):
+            continue
+        mint = str(d.get("mint") or "")
+        if not mint or (want is not None and mint not in want):
+            continue
+        entry = d.get("entry_price") or d.get("entry_price_usd") or 0.0
+        size = d.get("size_sol") or 0.0
+        out.append(Position(mint, ts, float(entry or 0.0), float(size or 0.0) or BACKTEST_SIZE_SOL,
+                            str(d.get("status") or ""), str(d.get("close_reason") or "")))
+    return out
+
+
+@dataclass
+class Paths:
+    """Positions resampled on the sell-loop grid (NaN after a path ends)."""
+    positions: List[Position]
+    step_s: float
+    prices: Any  # [N, T] (numpy) or list of lists
+    entry: Any  # [N]
+
+    @property
+    def n(self) -> int:
+        return len(self.positions)
+
+
+def _resample(ts: Sequence[float], px: Sequence[float], t0: float, step_s: float, horizon_s: float,
+              max_gap_s: float) -> List[float]:
+    t_steps = int(horizon_s // step_s) + 1
+    out = [math.nan] * t_steps
+    if not len(ts):
+        return out
+    last_ts = ts[-1]
+    j = -1
+    for k in range(t_steps):
+        t = t0 + k * step_s
+        if t > last_ts + max_gap_s:
+            break
+        while j + 1 < len(ts) and ts[j + 1] <= t:
+            j += 1
+        if j >= 0:
+            out[k] = px[j]
+    return out
+
+
+def build_paths(positions: Sequence[Position], step_s: float = BACKTEST_STEP_S, horizon_s: float = BACKTEST_HORIZON_S,
+                sources: Sequence[str] = BACKTEST_SOURCES, max_gap_s: float = BACKTEST_MAX_GAP_S,
+                tick_dir: Optional[str] = None, drop_empty: bool = True) -> Paths:
+    """Price path per position from the tick store; entry features from the last tick before entry."""
+    keep: List[Position] = []
+    rows: List[List[float]] = []
+    for p in positions:
+        r = tick_store.scan(mint=p.mint, t0=p.entry_ts - 3600.0, t1=p.entry_ts + horizon_s + step_s,
+                            sources=sources, columns=("price", "liq_usd", "vol_m5", "mcap"), base=tick_dir)
+        ts, px = list(r["ts"]), list(r["price"])
+        pre = [i for i, t in enumerate(ts) if t <= p.entry_ts]
+        for name in ("liq_usd", "vol_m5", "mcap"):
+            col = list(r[name])
+            v = next((col[i] for i in reversed(pre) if not math.isnan(col[i])), math.nan)
+            setattr(p, name, float(v))
+        pts = [(t, x) for t, x in zip(ts, px) if x == x and x > 0]
+        # the engine sees a price from the first tick at or after entry (the pre-entry window is only for features)
+        first = next((i for i, (t, _) in enumerate(pts) if t >= p.entry_ts), None)
+        if first is not None and first > 0 and pts[first - 1][0] > p.entry_ts - step_s:
+            first -= 1
+        pts = pts[first:] if first is not None else []
+        path = _resample([t for t, _ in pts], [x for _, x in pts], p.entry_ts, step_s, horizon_s, max_gap_s)
+        if drop_empty and all(math.isnan(x) for x in path):
+            continue
+        if p.entry_price <= 0:
+            # BOOTSTRAP_ENTRY_FROM_PRICE
+            p.entry_price = next((x for x in path if not math.isnan(x)), 0.0)
+        keep.append(p)
+        rows.append(path)
+    if np is not None:
+        t_steps = int(horizon_s // step_s) + 1
+        prices = np.array(rows, dtype=np.float64) if rows else np.empty((0, t_steps))
+        entry = np.array([p.entry_price for p in keep], dtype=np.float64)
+    else:
+        prices, entry = rows, [p.entry_price for p in keep]
+    return Paths(keep, float(step_s), prices, entry)
+
+
+# -----------------------------
+# scalar reference (mirrors SellEngine._handle_one_decide)
+# -----------------------------
+def _filtered(pos: Position, prm: ExitParams) -> bool:
+    if prm.min_liq_usd > 0 and not (pos.liq_usd >= prm.min_liq_usd):
+        return True
+    if prm.min_vol_m5 > 0 and not (pos.vol_m5 >= prm.min_vol_m5):
+        return True
+    if prm.max_mcap_usd > 0 and pos.mcap > prm.max_mcap_usd:
+        return True
+    return False
+
+
+ALL = math.inf  # decide_exit(): sell everything left
+
+
+def decide_exit(price: float, entry: float, hw: float, tp1: bool, tp2: bool, age_s: float, prm: ExitParams,
+                time_stop_sells: bool = False) -> Tuple[float, str, float]:
+    """
+    One SellEngine tick for one position -> (new high-water, action, fraction of the original qty).
+    action "" = hold; a TP with size 0 returns (hw, "tp1"/"tp2", 0.0): the live engine skips the
+    rest of the tick without marking the TP.
+    """
+    if hw > 0 and hw > price * 50.0:
+        hw = price
+    pnl = (price - entry) / entry
+    if price > hw:
+        hw = price
+    if pnl <= -abs(prm.hard_sl_pct):
+        return hw, "hard_sl", ALL
+    if age_s > prm.time_stop_sec and pnl < prm.time_stop_min_pnl:
+        return (hw, "time_stop", ALL) if time_stop_sells else (hw, "", 0.0)
+    if (not tp1) and pnl >= prm.tp1_pct:
+        return hw, "tp1", max(0.0, prm.tp1_size)
+    if tp1 and (not tp2) and pnl >= prm.tp2_pct:
+        return hw, "tp2", max(0.0, prm.tp2_size)
+    trail = prm.trail_wide if tp2 else prm.trail_tight
+    if hw > 0 and price <= hw * (1 - trail):
+        return hw, "trailing_stop", ALL
+    return hw, "", 0.0
+
+
+def replay_one(path: Sequence[float], entry: float, prm: ExitParams, step_s: float = BACKTEST_STEP_S,
+               fee_pct: float = BACKTEST_FEE_PCT, time_stop_sells: bool = False) -> Dict[str, Any]:
+    """One position, one setting -> {ret, reason, exit_k, hold_s, fills}."""
+    remaining, proceeds = 1.0, 0.0
+    hw, tp1, tp2 = entry, False, False
+    fills: List[Tuple[int, str, float, float]] = []
+    last_k, last_px = -1, math.nan
+    if entry <= 0:
+        return {"ret": 0.0, "reason": "open", "exit_k": -1, "hold_s": 0.0, "fills": fills}
+
+    for k, price in enumerate(path):
+        if not (price > 0):
+            continue
+        last_k, last_px = k, price
+        hw, act, frac = decide_exit(price, entry, hw, tp1, tp2, k * step_s, prm, time_stop_sells)
+        if not act or frac <= 0:
+            continue
+        frac = min(frac, remaining)
+        proceeds += frac * (price / entry) * (1.0 - fee_pct)
+        remaining -= frac
+        fills.append((k, act, frac, price))
+        tp1 = tp1 or act == "tp1"
+        tp2 = tp2 or act == "tp2"
+        if remaining <= _EPS:
+            break
+    if remaining > _EPS and last_k >= 0:
+        proceeds += remaining * (last_px / entry)  # mark to market, no exit fee
+        reason = "open"
+    else:
+        reason = fills[-1][1] if fills else "open"
+        if reason in ("tp1", "tp2"):
+            reason = "tp"
+    exit_k = fills[-1][0] if fills and reason != "open" else last_k
+    return {"ret": proceeds - 1.0 if last_k >= 0 else 0.0, "reason": reason, "exit_k": exit_k,
+            "hold_s": max(0, exit_k) * step_s, "fills": fills}
+
+
+# -----------------------------
+# vectorized grid replay
+# -----------------------------
+def _param_arrays(grid: Sequence[ExitParams]) -> Dict[str, Any]:
+    return {k: np.array([getattr(g, k) for g in grid], dtype=np.float64) for k in PARAM_NAMES}
+
+
+def replay_grid(paths: Paths, grid: Sequence[ExitParams], fee_pct: float = BACKTEST_FEE_PCT,
+                time_stop_sells: bool = False) -> Dict[str, Any]:
+    """
+    All settings x all positions. Returns per-pair arrays [G, N]:
+    ret (fraction of size), reason (index into REASONS), exit_k, traded (bool).
+    """
+    if np is None:
+        return _replay_grid_py(paths, grid, fee_pct, time_stop_sells)
+    G, N = len(grid), paths.n
+    P = np.asarray(paths.prices, dtype=np.float64)
+    T = P.shape[1] if N else 0
+    entry = np.asarray(paths.entry, dtype=np.float64)
+    prm = _param_arrays(grid)
+
+    ret = np.zeros((G, N))
+    reason = np.full((G, N), _R_OPEN, dtype=np.int8)
+    exit_k = np.full((G, N), -1, dtype=np.int32)
+    if not N or not G:
+        return {"ret": ret, "reason": reason, "exit_k": exit_k, "traded": np.zeros((G, N), dtype=bool)}
+
+    # param-independent paths: pnl and price / high-water
+    valid = np.isfinite(P) & (P > 0)
+    Pf = np.where(valid, P, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pnl = (Pf - entry[:, None]) / entry[:, None]
+        hw = np.empty_like(Pf)
+        h = entry.copy()
+        for k in range(T):
+            p = Pf[:, k]
+            ok = valid[:, k]
+            h = np.where(ok & (h > 0) & (h > p * 50.0), p, h)  # HW_SANITY_RESET
+            h = np.where(ok & (p > h), p, h)
+            hw[:, k] = h
+        dd = Pf / hw  # price / high-water
+    last_k = np.where(valid.any(axis=1), T - 1 - np.argmax(valid[:, ::-1], axis=1), -1)
+    last_px = np.where(last_k >= 0, Pf[np.arange(N), np.maximum(last_k, 0)], np.nan)
+
+    # entry filters -> pairs never traded
+    liq = np.array([p.liq_usd for p in paths.positions])
+    v5 = np.array([p.vol_m5 for p in paths.positions])
+    mc = np.array([p.mcap for p in paths.positions])
+    with np.errstate(invalid="ignore"):
+        filt = ((prm["min_liq_usd"][:, None] > 0) & ~(liq[None, :] >= prm["min_liq_usd"][:, None])) \
+            | ((prm["min_vol_m5"][:, None] > 0) & ~(v5[None, :] >= prm["min_vol_m5"][:, None])) \
+            | ((prm["max_mcap_usd"][:, None] > 0) & (mc[None, :] > prm["max_mcap_usd"][:, None]))
+    filt |= (entry <= 0)[None, :] | (last_k < 0)[None, :]
+    reason[filt] = _R_FILT
+
+    # active pairs (flattened g * N + n)
+    idx = np.flatnonzero(~filt.ravel())
+    gi, ni = np.divmod(idx, N)
+    remaining = np.ones(idx.size)
+    proceeds = np.zeros(idx.size)
+    tp1 = np.zeros(idx.size, dtype=bool)
+    tp2 = np.zeros(idx.size, dtype=bool)
+    sl = -np.abs(prm["hard_sl_pct"])
+    fee = 1.0 - float(fee_pct)
+    ret_f, reason_f, exit_f = ret.ravel(), reason.ravel(), exit_k.ravel()
+
+    for k in range(T):
+        if not idx.size:
+            break
+        # paths that ended: mark to market
+        ended = last_k[ni] < k
+        if ended.any():
+            e = np.flatnonzero(ended)
+            ret_f[idx[e]] = proceeds[e] + remaining[e] * last_px[ni[e]] / entry[ni[e]] - 1.0
+            exit_f[idx[e]] = last_k[ni[e]]
+            keep = ~ended
+            idx, gi, ni = idx[keep], gi[keep], ni[keep]
+            remaining, proceeds, tp1, tp2 = remaining[keep], proceeds[keep], tp1[keep], tp2[keep]
+            if not idx.size:
+                break
+        ok = valid[ni, k]
+        x = pnl[ni, k]
+        ratio = x + 1.0
+        g = gi
+        with np.errstate(invalid="ignore"):
+            hit_sl = ok & (x <= sl[g])
+            in_ts = ok & ~hit_sl & (k * paths.step_s > prm["time_stop_sec"][g]) & (x < prm["time_stop_min_pnl"][g])
+            rest = ok & ~hit_sl & ~in_ts
+            hit_tp1 = rest & ~tp1 & (x >= prm["tp1_pct"][g]) & (prm["tp1_size"][g] > 0)
+            skip_tp1 = rest & ~tp1 & (x >= prm["tp1_pct"][g]) & ~(prm["tp1_size"][g] > 0)
+            rest2 = rest & ~hit_tp1 & ~skip_tp1
+            hit_tp2 = rest2 & tp1 & ~tp2 & (x >= prm["tp2_pct"][g]) & (prm["tp2_size"][g] > 0)
+            skip_tp2 = rest2 & tp1 & ~tp2 & (x >= prm["tp2_pct"][g]) & ~(prm["tp2_size"][g] > 0)
+            rest3 = rest2 & ~hit_tp2 & ~skip_tp2
+            trail = np.where(tp2, prm["trail_wide"][g], prm["trail_tight"][g])
+            hit_trail = rest3 & (dd[ni, k] <= 1.0 - trail)
+        full = hit_sl | hit_trail
+        if time_stop_sells:
+            full |= in_ts
+        if hit_tp1.any():
+            q = np.minimum(prm["tp1_size"][g[hit_tp1]], remaining[hit_tp1])
+            proceeds[hit_tp1] += q * ratio[hit_tp1] * fee
+            remaining[hit_tp1] -= q
+            tp1 |= hit_tp1
+        if hit_tp2.any():
+            q = np.minimum(prm["tp2_size"][g[hit_tp2]], remaining[hit_tp2])
+            proceeds[hit_tp2] += q * ratio[hit_tp2] * fee
+            remaining[hit_tp2] -= q
+            tp2 |= hit_tp2
+        if full.any():
+            proceeds[full] += remaining[full] * ratio[full] * fee
+            remaining[full] = 0.0
+        done = (remaining <= _EPS) & ok
+        if done.any():
+            d = np.flatnonzero(done)
+            ret_f[idx[d]] = proceeds[d] - 1.0
+            exit_f[idx[d]] = k
+            r = np.full(d.size, _R_TP, dtype=np.int8)
+            r[hit_sl[d]] = _R_SL
+            r[hit_trail[d]] = _R_TRAIL
+            if time_stop_sells:
+                r[in_ts[d]] = _R_TS
+            reason_f[idx[d]] = r
+            keep = ~done
+            idx, gi, ni = idx[keep], gi[keep], ni[keep]
+            remaining, proceeds, tp1, tp2 = remaining[keep], proceeds[keep], tp1[keep], tp2[keep]
+    if idx.size:  # horizon reached
+        ret_f[idx] = proceeds + remaining * last_px[ni] / entry[ni] - 1.0
+        exit_f[idx] = last_k[ni]
+    return {"ret": ret, "reason": reason, "exit_k": exit_k, "traded": ~filt}
+
+
+def _replay_grid_py(paths: Paths, grid: Sequence[ExitParams], fee_pct: float, time_stop_sells: bool) -> Dict[str, Any]:
+    ret, reason, exit_k, traded = [], [], [], []
+    for prm in grid:
+        r_row, rs_row, k_row, t_row = [], [], [], []
+        for pos, path, e in zip(paths.positions, paths.prices, paths.entry):
+            if _filtered(pos, prm) or e <= 0 or all(math.isnan(x) for x in path):
+                r_row.append(0.0), rs_row.append(_R_FILT), k_row.append(-1), t_row.append(False)
+                continue
+            o = replay_one(path, e, prm, paths.step_s, fee_pct, time_stop_sells)
+            r_row.append(o["ret"]), rs_row.append(REASONS.index(o["reason"])), k_row.append(o["exit_k"])
+            t_row.append(True)
+        ret.append(r_row), reason.append(rs_row), exit_k.append(k_row), traded.append(t_row)
+    return {"ret": ret, "reason": reason, "exit_k": exit_k, "traded": traded}
+
+
+# -----------------------------
+# metrics
+# -----------------------------
+def summarize(paths: Paths, grid: Sequence[ExitParams], res: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per setting: trades, PnL (SOL), mean return, win rate, max drawdown (SOL, by exit time), exits."""
+    sizes = [p.size_sol for p in paths.positions]
+    t_entry = [p.entry_ts for p in paths.positions]
+    out = []
+    for gi, prm in enumerate(grid):
+        rets, reasons, ks, traded = (list(res[k][gi]) for k in ("ret", "reason", "exit_k", "traded"))
+        ev = []
+        for n, tr in enumerate(traded):
+            if tr:
+                ev.append((t_entry[n] + max(0, int(ks[n])) * paths.step_s, float(rets[n]) * sizes[n], float(rets[n]),
+                           int(ks[n])))
+        ev.sort()
+        eq = peak = mdd = 0.0
+        for _, pnl_sol, _, _ in ev:
+            eq += pnl_sol
+            peak = max(peak, eq)
+            mdd = max(mdd, peak - eq)
+        n = len(ev)
+        row = {"i": gi, "params": asdict(prm), "trades": n, "pnl_sol": round(eq, 6),
+               "ret_mean": round(sum(e[2] for e in ev) / n, 6) if n else 0.0,
+               "win_rate": round(sum(1 for e in ev if e[2] > 0) / n, 4) if n else 0.0,
+               "max_dd_sol": round(mdd, 6),
+               "hold_mean_s": round(sum(max(0, e[3]) for e in ev) / n * paths.step_s, 1) if n else 0.0,
+               "exits": {REASONS[r]: sum(1 for x, t in zip(reasons, traded) if t and int(x) == r)
+                         for r in range(len(REASONS) - 1)}}
+        out.append(row)
+    return out
+
+
+def summarize_fast(paths: Paths, grid: Sequence[ExitParams], res: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """summarize() with NumPy (large grids)."""
+    if np is None:
+        return summarize(paths, grid, res)
+    G, N = len(grid), paths.n
+    ret, reason, exit_k, traded = (np.asarray(res[k]) for k in ("ret", "reason", "exit_k", "traded"))
+    size = np.array([p.size_sol for p in paths.positions])
+    t_exit = np.array([p.entry_ts for p in paths.positions])[None, :] + np.maximum(exit_k, 0) * paths.step_s
+    pnl = np.where(traded, ret * size[None, :], 0.0)
+    order = np.argsort(np.where(traded, t_exit, np.inf), axis=1, kind="stable")
+    eq = np.cumsum(np.take_along_axis(pnl, order, axis=1), axis=1) if N else np.zeros((G, 0))
+    peak = np.maximum.accumulate(np.maximum(eq, 0.0), axis=1) if N else eq
+    mdd = (peak - eq).max(axis=1) if N else np.zeros(G)
+    n = traded.sum(axis=1)
+    wins = (traded & (ret > 0)).sum(axis=1)
+    rsum = np.where(traded, ret, 0.0).sum(axis=1)
+    hold = np.where(traded, np.maximum(exit_k, 0), 0).sum(axis=1) * paths.step_s
+    out = []
+    for gi, prm in enumerate(grid):
+        c = int(n[gi])
+        out.append({"i": gi, "params": asdict(prm), "trades": c, "pnl_sol": round(float(pnl[gi].sum()), 6),
+                    "ret_mean": round(float(rsum[gi] / c), 6) if c else 0.0,
+                    "win_rate": round(float(wins[gi] / c), 4) if c else 0.0,
+                    "max_dd_sol": round(float(mdd[gi]), 6),
+                    "hold_mean_s": round(float(hold[gi] / c), 1) if c else 0.0,
+                    "exits": {REASONS[r]: int((traded[gi] & (reason[gi] == r)).sum()) for r in range(len(REASONS) - 1)}})
+    return out
+
+
+def run(grid: Sequence[ExitParams], db_path: str = BACKTEST_DB, since: Optional[float] = None,
+        until: Optional[float] = None, step_s: float = BACKTEST_STEP_S, horizon_s: float = BACKTEST_HORIZON_S,
+        sources: Sequence[str] = BACKTEST_SOURCES, fee_pct: float = BACKTEST_FEE_PCT, time_stop_sells: bool = False,
+        tick_dir: Optional[str] = None, mints: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    positions = load_positions(db_path, since, until, mints)
+    paths = build_paths(positions, step_s, horizon_s, sources, tick_dir=tick_dir)
+    t1 = time.perf_counter()
+    res = replay_grid(paths, grid, fee_pct, time_stop_sells)
+    t2 = time.perf_counter()
+    rows = summarize_fast(paths, grid, res)
+    return {"positions": len(positions), "with_ticks": paths.n, "settings": len(grid), "step_s": step_s,
+            "horizon_s": horizon_s, "fee_pct": fee_pct, "time_stop_sells": time_stop_sells,
+            "numpy": np is not None, "load_s": round(t1 - t0, 3), "replay_s": round(t2 - t1, 3), "rows": rows}
@@ -0,0 +1,585 @@
+"""
+Benchmark suite for the buy / sell / scoring hot paths, run against core.sim_service.
+
+  python scripts/bench.py run                       # everything, results -> state/bench/
+  python scripts/bench.py run --only cpu. --quick
+  python scripts/bench.py run --save-baseline
+  python scripts/bench.py compare state/bench/<result>.json [--baseline ...] [--threshold 0.10]
+  python scripts/bench.py list
+
+Benchmarks (name -> primary value):
+  cpu.score_overview / cpu.rank_and_filter / cpu.strat_gate_and_score / cpu.score_ready_v2
+                           overviews scored per second (higher is better)
+  scanner.scan_once_async  overviews per second through TokenScanner (higher is better)
+  sell.run_once[N]         ms per SellEngine tick with N open positions, price cache cold
+  brain.run_once[N]        ms per brain_loop.run_once with N ready candidates
+  trader.buy_cold / trader.buy_warm
+                           ms wall time of a trader_exec ONE_SHOT buy subprocess (first
+                           spawn with an empty bytecode cache vs later spawns)
+
+Each run starts its own simulator (seeded, SIM latency "0" by default so results track
+the bot's own overhead), works in a throwaway directory and writes one JSON file with
+machine info, git revision, sim config and per-benchmark stats. A benchmark whose
+dependencies are missing is recorded as skipped, not failed.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import platform
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.getenv("BENCH_DIR", os.path.join(REPO, "state", "bench"))
+BENCH_BASELINE = os.getenv("BENCH_BASELINE", os.path.join(BENCH_DIR, "baseline.json"))
+BENCH_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.10"))  # 10% worse = regression
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "7"))
+BENCH_SEED = int(os.getenv("BENCH_SEED", "1"))
+BENCH_SIM_LATENCY = os.getenv("BENCH_SIM_LATENCY", "0")
+CPU_BATCH = int(os.getenv("BENCH_CPU_BATCH", "2000"))
+CPU_MIN_SAMPLE_S = float(os.getenv("BENCH_CPU_MIN_SAMPLE_S", "0.2"))
+SELL_SIZES = (10, 100, 1000)
+BRAIN_SIZES = (100, 1000, 5000)
+# --quick: a SellEngine cold tick costs ~90 ms per position against the sim, so the
+# big sizes are skipped (sell.run_once[1000] alone is minutes)
+QUICK_MAX_POSITIONS = int(os.getenv("BENCH_QUICK_MAX_POSITIONS", "10"))
+QUICK_MAX_CANDIDATES = int(os.getenv("BENCH_QUICK_MAX_CANDIDATES", "1000"))
+# compare statuses that make `scripts/bench.py compare` exit 1
+FAIL_STATUSES = ("REGRESSION", "error", "missing")
+
+# les modules du bot lisent leurs knobs a l'import: on les fixe avant tout import
+_BENCH_ENV = {
+    "DECISION_SINK": "off", "DECISION_ECHO": "0", "LATENCY_TRACE": "0", "PROFILER": "0",
+    "SELL_DRY_RUN": "1", "LOCAL_QUOTE_CROSSCHECK": "0", "READY_STORE": "0",
+    "SIM_PRICE_VOL": "0.0005", "SIM_JUMP_RATE": "0", "SIM_LAUNCH_EVERY_S": "0",
+}
+
+_BENCHES: Dict[str, Tuple[Callable[["Context"], Dict[str, Any]], str, str]] = {}
+
+
+def bench(name: str, unit: str = "ms", better: str = "lower"):
+    def deco(fn: Callable[["Context"], Dict[str, Any]]):
+        _BENCHES[name] = (fn, unit, better)
+        return fn
+    return deco
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose dependencies are not available."""
+
+
+# -----------------------------
+# timing
+# -----------------------------
+def stats(ms: List[float]) -> Dict[str, float]:
+    s = sorted(ms)
+    n = len(s)
+    return {"n": n, "median": round(statistics.median(s), 4), "min": round(s[0], 4), "max": round(s[-1], 4),
+            "mean": round(statistics.fmean(s), 4), "p90": round(s[min(n - 1, int(0.9 * n))], 4),
+            "stdev": round(statistics.stdev(s), 4) if n > 1 else 0.0}
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1, number: int = 1) -> Dict[str, float]:
+    """ms per call of fn (warmup calls discarded); each sample averages `number` calls."""
+    for _ in range(warmup):
+        fn()
+    ms = []
+    for _ in range(max(1, repeat)):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        ms.append((time.perf_counter() - t) * 1000.0 / number)
+    return stats(ms)
+
+
+def autorange(fn: Callable[[], Any], min_s: float = CPU_MIN_SAMPLE_S) -> int:
+    """Calls per sample so that one sample lasts at least min_s (like timeit.autorange)."""
+    t = time.perf_counter()
+    fn()
+    dt = max(time.perf_counter() - t, 1e-6)
+    return max(1, int(min_s / dt + 0.999))
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w") as dn, contextlib.redirect_stdout(dn):
+        yield
+
+
+# -----------------------------
+# context: simulator + scratch dir + synthetic data
+# -----------------------------
+class Context:
+    def __init__(self, seed: int = BENCH_SEED, sim_latency: str = BENCH_SIM_LATENCY, quick: bool = False):
+        for k, v in _BENCH_ENV.items():
+            os.environ.setdefault(k, v)
+        from core import sim_service
+
+        self.sim_service = sim_service
+        self.seed = seed
+        self.quick = quick
+        self.repeat = 3 if quick else BENCH_REPEAT
+        self.workdir = tempfile.mkdtemp(prefix="lino-bench-")
+        os.makedirs(os.path.join(self.workdir, "state"), exist_ok=True)
+        self.sim = sim_service.Sim(seed=seed, latency_ms=sim_latency, confirm_ms=sim_latency, launch_every_s=0)
+        with _quiet():
+            self.srv = sim_service.serve("127.0.0.1", 0, sim=self.sim)
+        self.env = sim_service.env_for(self.srv)
+        os.environ.update(self.env)
+        self._cwd = os.getcwd()
+        os.chdir(self.workdir)
+
+    def close(self) -> None:
+        os.chdir(self._cwd)
+        try:
+            self.srv.shutdown()
+            self.srv.server_close()
+        except Exception:
+            pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.workdir, name)
+
+    def mints(self, n: int) -> List[str]:
+        """n tradable mints: the sim's listed tokens first, then seeded extras created on demand."""
+        out = list(self.sim.tokens)[:n]
+        i = 0
+        while len(out) < n:
+            m = self.sim_service.b58encode(self.sim_service._h(self.seed, "bench_mint", i))
+            self.sim.token(m)
+            out.append(m)
+            i += 1
+        return out
+
+    def pairs(self, n: int) -> List[Dict[str, Any]]:
+        t = time.time()
+        return [self.sim.pair(self.sim.token(m), t) for m in self.mints(n)]
+
+    def overviews(self, n: int) -> List[Dict[str, Any]]:
+        """TokenScanner-shaped overviews (flat fields + raw pair under data/_raw)."""
+        out = []
+        for p in self.pairs(n):
+            base = p["baseToken"]
+            tx = p["txns"]["m5"]
+            ov = dict(p)
+            ov.update({"mint": base["address"], "sym": base["symbol"], "symbol": base["symbol"],
+                       "liq": p["liquidity"]["usd"], "liquidity_usd": p["liquidity"]["usd"],
+                       "vol_m5": p["volume"]["m5"], "volume_m5_usd": p["volume"]["m5"],
+                       "txns_m5": tx["buys"] + tx["sells"], "tpm": (tx["buys"] + tx["sells"]) / 5.0,
+                       "price_usd": float(p["priceUsd"]), "data": p, "_raw": p})
+            out.append(ov)
+        return out
+
+    def ready_rows(self, n: int) -> List[Dict[str, Any]]:
+        """Enriched ready rows (brain_loop / trader_exec input)."""
+        out = []
+        for p in self.pairs(n):
+            tx = p["txns"]
+            out.append({"mint": p["baseToken"]["address"], "symbol": p["baseToken"]["symbol"],
+                        "liquidity_usd": p["liquidity"]["usd"], "liq": p["liquidity"]["usd"],
+                        "vol_1h": p["volume"]["h1"], "vol24": p["volume"]["h24"],
+                        "txns_5m": tx["m5"]["buys"] + tx["m5"]["sells"],
+                        "tx1h": tx["h1"]["buys"] + tx["h1"]["sells"],
+                        "chg_5m": p["priceChange"]["m5"], "chg_1h": p["priceChange"]["h1"],
+                        "chg1h": p["priceChange"]["h1"], "dex_id": p["dexId"], "dex": p["dexId"],
+                        "market_cap": p["marketCap"], "mcap": p["marketCap"], "fdv": p["fdv"],
+                        "price_usd": float(p["priceUsd"]), "score": 1.0})
+        return out
+
+
+def _cpu_result(st: Dict[str, float]) -> Dict[str, Any]:
+    # best-of-N pour le CPU pur: le min est bien moins bruite que la mediane
+    return {"value": round(CPU_BATCH / (st["min"] / 1000.0), 1), "stats": st, "params": {"batch": CPU_BATCH, "stat": "min"}}
+
+
+def _cpu_bench(ctx: Context, fn: Callable[[Dict[str, Any]], Any], copy: bool = False) -> Dict[str, Any]:
+    ovs = ctx.overviews(CPU_BATCH)
+
+    def run():
+        for ov in ovs:
+            fn(dict(ov) if copy else ov)
+
+    st = measure(run, ctx.repeat, number=autorange(run))
+    return _cpu_result(st)
+
+
+# -----------------------------
+# CPU scoring
+# -----------------------------
+@bench("cpu.score_overview", unit="ov/s", better="higher")
+def _b_score_overview(ctx: Context) -> Dict[str, Any]:
+    from core.alpha_filters import score_overview
+    return _cpu_bench(ctx, score_overview)
+
+
+@bench("cpu.rank_and_filter", unit="ov/s", better="higher")
+def _b_rank_and_filter(ctx: Context) -> Dict[str, Any]:
+    from core.quality import rank_and_filter
+
+    class _Cfg:
+        MIN_SCORE_TO_BUY = 35.0
+        MAX_CANDIDATES_PER_LOOP = 5
+
+    ovs = ctx.overviews(CPU_BATCH)
+    run = lambda: rank_and_filter(ovs, _Cfg)
+    st = measure(run, ctx.repeat, number=autorange(run))
+    return _cpu_result(st)
+
+
+@bench("cpu.strat_gate_and_score", unit="ov/s", better="higher")
+def _b_strat_gate(ctx: Context) -> Dict[str, Any]:
+    try:
+        from core.trading import strat_gate_and_score
+    except ImportError as e:
+        raise Skip(f"core.trading import: {e}")
+    return _cpu_bench(ctx, strat_gate_and_score)
+
+
+@bench("cpu.score_ready_v2", unit="ov/s", better="higher")
+def _b_score_ready_v2(ctx: Context) -> Dict[str, Any]:
+    from scripts import score_ready_v2 as sr
+    return _cpu_bench(ctx, lambda ov: sr.score(sr.get_metrics(ov)))
+
+
+# -----------------------------
+# scanner
+# -----------------------------
+@bench("scanner.scan_once_async", unit="ov/s", better="higher")
+def _b_scanner(ctx: Context) -> Dict[str, Any]:
+    import asyncio
+    try:
+        from core.token_scanner import ScannerConfig, TokenScanner
+    except ImportError as e:
+        raise Skip(f"core.token_scanner import: {e}")
+
+    async def go() -> Tuple[Dict[str, float], int]:
+        sc = TokenScanner(ScannerConfig(global_rps=10_000.0, max_concurrency=8, min_liquidity_usd=0.0,
+                                        min_tx_per_min=0.0, dexes=[]))
+        try:
+            n = len(await sc.scan_once_async())  # warmup (connexions, caches)
+            ms = []
+            for _ in range(ctx.repeat):
+                t = time.perf_counter()
+                n = len(await sc.scan_once_async())
+                ms.append((time.perf_counter() - t) * 1000.0)
+            return stats(ms), n
+        finally:
+            await sc.aclose()
+
+    with _quiet():
+        st, n = asyncio.run(go())
+    return {"value": round(n / (st["median"] / 1000.0), 1), "stats": st,
+            "params": {"overviews_per_scan": n, "queries": 5}}
+
+
+# -----------------------------
+# sell engine
+# -----------------------------
+def _sell_bench(ctx: Context, n: int) -> Dict[str, Any]:
+    if ctx.quick and n > QUICK_MAX_POSITIONS:
+        raise Skip(f"quick mode (positions > BENCH_QUICK_MAX_POSITIONS={QUICK_MAX_POSITIONS})")
+    try:
+        from core import db as core_db
+        from core.positions_db_adapter import PositionsDBAdapter
+        from core.price_feed_dex import DexScreenerPriceFeed
+        from core.sell_engine import SellEngine
+        feed = DexScreenerPriceFeed()
+    except Exception as e:
+        raise Skip(f"sell engine deps: {type(e).__name__}: {e}")
+
+    path = ctx.path(f"sell_{n}.sqlite")
+    core_db.init_db(path)
+    now = int(time.time())
+    con = sqlite3.connect(path)
+    for m in ctx.mints(n):
+        px = float(feed.get_price(m) or 0.0)
+        if px <= 0:
+            raise Skip(f"price feed returned nothing for {m} (sim unreachable?)")
+        con.execute("INSERT INTO positions(mint,status,entry_price,entry_price_usd,qty_token,entry_ts) "
+                    "VALUES (?,?,?,?,?,?)", (m, "open", px, px, 1000.0, now))
+    con.commit()
+    con.close()
+    db = PositionsDBAdapter(path)
+
+    def cold_tick():
+        eng = SellEngine(db=db, price_feed=feed)
+        eng.run_once()
+
+    with _quiet():
+        # cold ticks are the slow part: fewer samples, no discarded warmup from 100 positions up
+        big = n >= 100
+        st = measure(cold_tick, max(1, ctx.repeat // 2 if big else ctx.repeat), warmup=0 if big else 1)
+        eng = SellEngine(db=db, price_feed=feed)
+        eng.run_once()
+        warm = measure(eng.run_once, ctx.repeat, warmup=0)
+    return {"value": st["median"], "stats": st, "params": {"positions": n},
+            "extra": {"cached_tick": warm, "per_position_ms": round(st["median"] / n, 4)}}
+
+
+for _n in SELL_SIZES:
+    bench(f"sell.run_once[{_n}]")(lambda ctx, _n=_n: _sell_bench(ctx, _n))
+
+
+# -----------------------------
+# brain loop
+# -----------------------------
+def _brain_bench(ctx: Context, n: int) -> Dict[str, Any]:
+    if ctx.quick and n > QUICK_MAX_CANDIDATES:
+        raise Skip(f"quick mode (candidates > BENCH_QUICK_MAX_CANDIDATES={QUICK_MAX_CANDIDATES})")
+    ready = ctx.path("brain_ready.jsonl")
+    brain_db = ctx.path("brain.sqlite")
+    os.environ.update({"READY_FILE": ready, "BRAIN_DB": brain_db, "BRAIN_DB_PATH": brain_db,
+                       "TRADES_DB": ctx.path("brain_trades.sqlite"), "TRADES_DB_PATH": ctx.path("brain_trades.sqlite"),
+                       "BRAIN_READY_OUT": ctx.path("brain_out.jsonl"), "BRAIN_SKIP_MINTS_FILE": ctx.path("skip.txt"),
+                       "RL_SKIP_FILE": ctx.path("rl_skip.json")})
+    if not os.path.exists(brain_db):
+        con = sqlite3.connect(brain_db)
+        with open(os.path.join(REPO, "src", "brain", "schema.sql"), encoding="utf-8") as f:
+            con.executescript(f.read())
+        con.close()
+    from src.brain import brain_loop
+
+    with open(ready, "w", encoding="utf-8") as f:
+        for r in ctx.ready_rows(n):
+            f.write(json.dumps(r) + "\n")
+    with _quiet():
+        st = measure(lambda: brain_loop.run_once(note="bench"), ctx.repeat)
+    return {"value": st["median"], "stats": st, "params": {"candidates": n},
+            "extra": {"per_candidate_ms": round(st["median"] / n, 4)}}
+
+
+for _n in BRAIN_SIZES:
+    bench(f"brain.run_once[{_n}]")(lambda ctx, _n=_n: _brain_bench(ctx, _n))
+
+
+# -----------------------------
+# trader_exec (subprocess, like trader_loop)
+# -----------------------------
+def _trader_setup(ctx: Context) -> Dict[str, str]:
+    if getattr(ctx, "_trader_env", None):
+        return ctx._trader_env
+    import importlib.util
+    for mod in ("solders", "requests"):
+        if importlib.util.find_spec(mod) is None:
+            raise Skip(f"trader_exec needs {mod}")
+    from solders.keypair import Keypair
+
+    kp = Keypair.from_seed(ctx.sim_service._h(ctx.seed, "bench_keypair"))
+    kp_path = ctx.path("keypair.json")
+    with open(kp_path, "w") as f:
+        json.dump(list(bytes(kp)), f)
+    ready = ctx.path("trader_ready.jsonl")
+    with open(ready, "w", encoding="utf-8") as f:
+        for r in ctx.ready_rows(50):
+            f.write(json.dumps(r) + "\n")
+    env = dict(os.environ)
+    env.update(ctx.env)
+    env.update({"READY_FILE": ready, "READY_SCORED_FILE": ready, "KEYPAIR_PATH": kp_path, "SOLANA_KEYPAIR": kp_path,
+                "WALLET_PUBKEY": str(kp.pubkey()), "TRADER_USER_PUBLIC_KEY": str(kp.pubkey()),
+                "ONE_SHOT": "1", "TRADER_ONE_SHOT": "1", "TRADER_DRY_RUN": "0", "DRY_RUN": "0",
+                "BUY_AMOUNT_SOL": "0.01", "BYPASS_COOLDOWN": "1", "LAST_BUY_COOLDOWN_S": "0", "DB_PATH": ctx.path("trader.sqlite"),
+                "TRADES_DB_PATH": ctx.path("trader.sqlite"), "LAST_BUYS_FILE": ctx.path("last_buys.json"),
+                "LATENCY_TRACE": "1", "LATENCY_DIR": ctx.path("latency"), "LATENCY_BUY_CONFIRM_S": "10",
+                "PYTHONPYCACHEPREFIX": ctx.path("pycache"), "PYTHONUNBUFFERED": "1"})
+    ctx._trader_env = env
+    return env
+
+
+def _trader_run(ctx: Context, env: Dict[str, str]) -> Tuple[float, int, str]:
+    ctx.sim.wallets.clear()  # chaque run achete depuis un wallet neuf (pas de "already holding")
+    t = time.perf_counter()
+    p = subprocess.run([sys.executable, "-u", os.path.join(REPO, "src", "trader_exec.py")], env=env,
+                       cwd=ctx.workdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=120)
+    ms = (time.perf_counter() - t) * 1000.0
+    return ms, p.returncode, p.stdout.decode("utf-8", "replace")[-600:]
+
+
+def _span_means(latency_dir: str) -> Dict[str, float]:
+    """Mean ms per span from the trader's latency_trace histogram dumps."""
+    tot: Dict[str, List[float]] = {}
+    try:
+        for fn in os.listdir(latency_dir):
+            if not fn.startswith("hist-"):
+                continue
+            with open(os.path.join(latency_dir, fn), encoding="utf-8") as f:
+                for line in f:
+                    for k, h in (json.loads(line).get("h") or {}).items():
+                        a = tot.setdefault(k, [0.0, 0.0])
+                        a[0] += float(h.get("sum") or 0.0)
+                        a[1] += float(h.get("n") or 0)
+    except Exception:
+        pass
+    return {k: round(s / n, 3) for k, (s, n) in sorted(tot.items()) if n}
+
+
+@bench("trader.buy_cold")
+def _b_trader_cold(ctx: Context) -> Dict[str, Any]:
+    env = _trader_setup(ctx)
+    shutil.rmtree(env["PYTHONPYCACHEPREFIX"], ignore_errors=True)
+    ms, rc, tail = _trader_run(ctx, env)
+    if rc != 2:
+        raise RuntimeError(f"trader_exec rc={rc} (2 = bought): {tail}")
+    return {"value": round(ms, 3), "stats": stats([ms]), "params": {"rc": rc}}
+
+
+@bench("trader.buy_warm")
+def _b_trader_warm(ctx: Context) -> Dict[str, Any]:
+    env = _trader_setup(ctx)
+    shutil.rmtree(env["LATENCY_DIR"], ignore_errors=True)
+    _trader_run(ctx, env)  # warmup: bytecode cache, page cache
+    ms, rcs = [], []
+    for _ in range(ctx.repeat):
+        m, rc, tail = _trader_run(ctx, env)
+        if rc != 2:
+            raise RuntimeError(f"trader_exec rc={rc} (2 = bought): {tail}")
+        ms.append(m)
+        rcs.append(rc)
+    st = stats(ms)
+    return {"value": st["median"], "stats": st, "params": {"runs": len(ms)},
+            "extra": {"span_mean_ms": _span_means(env["LATENCY_DIR"])}}
+
+
+# -----------------------------
+# run / save / compare
+# -----------------------------
+def names() -> List[str]:
+    return list(_BENCHES)
+
+
+def machine_info() -> Dict[str, Any]:
+    info: Dict[str, Any] = {"host": socket.gethostname(), "platform": platform.platform(),
+                            "python": platform.python_version(), "impl": platform.python_implementation(),
+                            "cpus": os.cpu_count(), "machine": platform.machine()}
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    info["cpu"] = line.split(":", 1)[1].strip()
+                    break
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            info["mem_gb"] = round(int(f.readline().split()[1]) / 1024 / 1024, 1)
+        info["loadavg"] = [round(x, 2) for x in os.getloadavg()]
+    except Exception:
+        pass
+    return info
+
+
+def git_info() -> Dict[str, Any]:
+    def _git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=REPO, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                  timeout=30).stdout.decode().strip()
+        except Exception:
+            return ""
+    return {"commit": _git("rev-parse", "--short", "HEAD"), "branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def selected(name: str, only: Optional[List[str]] = None) -> bool:
+    return not only or any(name.startswith(o) or o in name for o in only)
+
+
+def run(only: Optional[List[str]] = None, quick: bool = False, seed: int = BENCH_SEED,
+        sim_latency: str = BENCH_SIM_LATENCY, label: str = "") -> Dict[str, Any]:
+    sel = [n for n in _BENCHES if selected(n, only)]
+    ctx = Context(seed=seed, sim_latency=sim_latency, quick=quick)
+    results: Dict[str, Any] = {}
+    try:
+        for name in sel:
+            fn, unit, better = _BENCHES[name]
+            t = time.time()
+            try:
+                r = fn(ctx)
+                r.update({"unit": unit, "better": better})
+                print(f"[bench] {name:<28} {r['value']:>14,.3f} {unit:<5} ({better} is better) "
+                      f"{time.time() - t:.1f}s", flush=True)
+            except Skip as e:
+                r = {"skip": str(e)}
+                print(f"[bench] {name:<28} skipped: {e}", flush=True)
+            except Exception as e:
+                r = {"error": f"{type(e).__name__}: {e}"[:800]}
+                print(f"[bench] {name:<28} ERROR {r['error'][:200]}", flush=True)
+            results[name] = r
+        sim_stats = ctx.sim.stats()
+    finally:
+        ctx.close()
+    return {"ts": round(time.time(), 3), "label": label, "quick": quick, "only": list(only or []), "git": git_info(),
+            "machine": machine_info(), "sim": {"seed": seed, "latency": sim_latency,
+                                                "requests": sum(v.get("n", 0) for k, v in sim_stats["routes"].items()
+                                                                if not k.startswith("rpc."))},
+            "results": results}
+
+
+def save(res: Dict[str, Any], path: Optional[str] = None) -> str:
+    if not path:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        tag = time.strftime("%Y%m%d-%H%M%S", time.localtime(res["ts"]))
+        suffix = f"-{res['label']}" if res.get("label") else ""
+        path = os.path.join(BENCH_DIR, f"bench-{tag}-{res['git'].get('commit') or 'nogit'}{suffix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(res, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+    return path
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(cur: Dict[str, Any], base: Dict[str, Any], threshold: float = BENCH_THRESHOLD) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Per-benchmark deltas (+ = worse) and warnings. A row regresses when it is worse than threshold;
+    see failures() for what fails a compare (a broken or vanished benchmark counts too).
+    """
+    rows: List[Dict[str, Any]] = []
+    warns: List[str] = []
+    cm, bm = cur.get("machine") or {}, base.get("machine") or {}
+    for k in ("cpu", "cpus", "python", "host"):
+        if cm.get(k) != bm.get(k):
+            warns.append(f"machine differs: {k} {bm.get(k)!r} -> {cm.get(k)!r}")
+    if (cur.get("sim") or {}).get("latency") != (base.get("sim") or {}).get("latency"):
+        warns.append(f"sim latency differs: {base.get('sim', {}).get('latency')!r} -> {cur.get('sim', {}).get('latency')!r}")
+    for tag, m in (("baseline", bm), ("current", cm)):
+        la = (m.get("loadavg") or [0.0])[0]
+        if m.get("cpus") and la > 0.5 * m["cpus"]:
+            warns.append(f"{tag} ran under load (loadavg {la} on {m['cpus']} cpus): timings are noisy")
+    if cur.get("quick") != base.get("quick"):
+        warns.append("quick mode differs (fewer repeats, noisier)")
+    for name, r in (cur.get("results") or {}).items():
+        b = (base.get("results") or {}).get(name)
+        row = {"name": name, "cur": r.get("value"), "base": (b or {}).get("value"), "unit": r.get("unit", ""),
+               "delta": None, "status": "new"}
+        if "value" not in r:
+            row["status"] = "skip" if "skip" in r else "error"
+        elif b and "value" in b and b["value"]:
+            worse = (r["value"] - b["value"]) / b["value"]
+            if r.get("better") == "higher":
+                worse = -worse
+            row["delta"] = round(worse, 4)
+            row["status"] = "REGRESSION" if worse > threshold else ("improved" if worse < -threshold else "ok")
+        rows.append(row)
+    for name in (base.get("results") or {}):
+        if name not in (cur.get("results") or {}):
+            # outside the current run's --only selection: not run, not missing
+            st = "missing" if selected(name, cur.get("only")) else "not_run"
+            rows.append({"name": name, "cur": None, "base": base["results"][name].get("value"), "unit": "",
+                         "delta": None, "status": st})
+    return rows, warns
+
+
+def failures(rows: List[Dict[str, Any]]) -> int:
+    """Rows that fail a compare: regressions, benchmarks that errored, baseline ones that no longer run."""
+    return sum(1 for r in rows if r["status"] in FAIL_STATUSES)
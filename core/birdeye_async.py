@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-import httpx
+from core import http_pool
 
 
 class BirdeyeAsyncClient:
@@ -20,7 +20,6 @@ class BirdeyeAsyncClient:
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.chain = chain
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=20.0)
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -30,7 +29,8 @@ class BirdeyeAsyncClient:
         }
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        r = await self._client.get(path, headers=self._headers(), params=params or {})
+        r = await http_pool.arequest("GET", f"{self.base_url}{path}", headers=self._headers(), params=params or {},
+                                     timeout=20.0, raise_for_status=False)
         # Laisse le message clair en cas d'erreur
         if r.status_code >= 400:
             raise RuntimeError(f"HTTP {r.status_code} for {self.base_url}{path} | body={r.text}")
@@ -46,4 +46,5 @@ class BirdeyeAsyncClient:
         return await self._get("/defi/multi_price", params={"list_address": ",".join(list_address)})
 
     async def aclose(self) -> None:
-        await self._client.aclose()
+        # shared transport (core.http_pool): nothing to close per client
+        return None
@@ -0,0 +1,312 @@
+"""
+Size- and TTL-bounded LRU caches for long-lived engines.
+
+BoundedCache is a dict-like LRU (get / [] / set / pop / in / items ...):
+- max_items: least recently used entry evicted past the cap
+- ttl_s: entry expires ttl_s after its last write (None = no expiry)
+- on_evict(key, value, reason): hook for callers that mirror the cache
+  (reason: "lru" | "ttl" | "retain")
+- retain(keys): drop everything not in keys (e.g. per-mint state of closed
+  positions)
+
+BoundedSet is the same thing for dedup sets (seen signatures...).
+
+Entries are __slots__ objects. Every cache registers itself by name;
+stats() / prometheus() / log_stats() report size, hit rate, evictions and
+approximate bytes (sampled shallow getsizeof), and core.latency_trace's
+/metrics endpoint includes them.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+SIZE_SAMPLE = 64  # entries sampled for approx_bytes
+STATS_EVERY_S = 300.0
+
+
+class _Entry:
+    __slots__ = ("value", "expires")
+
+    def __init__(self, value: Any, expires: float):
+        self.value = value
+        self.expires = expires
+
+
+def _deep_size(o: Any, depth: int = 2) -> int:
+    n = sys.getsizeof(o)
+    if depth <= 0:
+        return n
+    if isinstance(o, dict):
+        for k, v in o.items():
+            n += _deep_size(k, depth - 1) + _deep_size(v, depth - 1)
+    elif isinstance(o, (list, tuple, set, frozenset)):
+        for v in o:
+            n += _deep_size(v, depth - 1)
+    elif hasattr(o, "__slots__"):
+        for s in o.__slots__:
+            n += _deep_size(getattr(o, s, None), depth - 1)
+    return n
+
+
+class BoundedCache:
+    def __init__(self, name: str, max_items: int = 10_000, ttl_s: Optional[float] = None,
+                 on_evict: Optional[Callable[[Hashable, Any, str], None]] = None, register: bool = True):
+        self.name = name
+        self.max_items = max(1, int(max_items))
+        self.ttl_s = float(ttl_s) if ttl_s else None
+        self.on_evict = on_evict
+        self._d: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if register:
+            _register(self)
+
+    # ---- internals ----
+    def _expired(self, e: _Entry, now: float) -> bool:
+        return e.expires > 0 and now >= e.expires
+
+    def _drop(self, key: Hashable, reason: str) -> None:
+        e = self._d.pop(key, None)
+        if e is None:
+            return
+        if reason == "ttl":
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        if self.on_evict is not None:
+            try:
+                self.on_evict(key, e.value, reason)
+            except Exception:
+                pass
+
+    def _lookup(self, key: Hashable, count: bool) -> Any:
+        with self._lock:
+            e = self._d.get(key)
+            if e is None:
+                if count:
+                    self.misses += 1
+                return _MISSING
+            if self._expired(e, time.time()):
+                self._drop(key, "ttl")
+                if count:
+                    self.misses += 1
+                return _MISSING
+            self._d.move_to_end(key)
+            if count:
+                self.hits += 1
+            return e.value
+
+    # ---- dict-like API ----
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        v = self._lookup(key, True)
+        return default if v is _MISSING else v
+
+    def set(self, key: Hashable, value: Any, ttl_s: Optional[float] = None) -> None:
+        ttl = self.ttl_s if ttl_s is None else float(ttl_s)
+        with self._lock:
+            self._d[key] = _Entry(value, time.time() + ttl if ttl else 0.0)
+            self._d.move_to_end(key)
+            while len(self._d) > self.max_items:
+                self._drop(next(iter(self._d)), "lru")
+
+    def __getitem__(self, key: Hashable) -> Any:
+        v = self._lookup(key, True)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            if self._d.pop(key, None) is None:
+                raise KeyError(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key, False) is not _MISSING
+
+    def pop(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            e = self._d.pop(key, None)
+        if e is None or self._expired(e, time.time()):
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return e.value
+
+    def setdefault(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            v = self._lookup(key, True)
+            if v is _MISSING:
+                self.set(key, default)
+                return default
+            return v
+
+    def update(self, other: Any = (), **kw) -> None:
+        items = other.items() if hasattr(other, "items") else other
+        for k, v in items:
+            self.set(k, v)
+        for k, v in kw.items():
+            self.set(k, v)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            dead = [k for k, e in self._d.items() if self._expired(e, now)]
+            for k in dead:
+                self._drop(k, "ttl")
+        return len(dead)
+
+    def retain(self, keys: Iterable[Hashable]) -> int:
+        """Drop every entry whose key is not in keys."""
+        keep = set(keys)
+        with self._lock:
+            dead = [k for k in self._d if k not in keep]
+            for k in dead:
+                self._drop(k, "retain")
+        return len(dead)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of live (key, value), oldest first; safe to mutate the cache while iterating."""
+        now = time.time()
+        with self._lock:
+            return [(k, e.value) for k, e in self._d.items() if not self._expired(e, now)]
+
+    def keys(self) -> List[Hashable]:
+        return [k for k, _ in self.items()]
+
+    def values(self) -> List[Any]:
+        return [v for _, v in self.items()]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def __bool__(self) -> bool:
+        return bool(self._d)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._d.clear()
+
+    # ---- accounting ----
+    def approx_bytes(self) -> int:
+        with self._lock:
+            n = len(self._d)
+            if not n:
+                return sys.getsizeof(self._d)
+            sample = []
+            for i, (k, e) in enumerate(self._d.items()):
+                if i >= SIZE_SAMPLE:
+                    break
+                sample.append((k, e))
+        per = sum(_deep_size(k) + _deep_size(e) for k, e in sample) / len(sample)
+        return int(sys.getsizeof(self._d) + per * n)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name, "size": len(self._d), "max": self.max_items, "ttl_s": self.ttl_s,
+            "hits": self.hits, "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions, "expirations": self.expirations,
+            "approx_bytes": self.approx_bytes(),
+        }
+
+
+class BoundedSet:
+    """Bounded dedup set: add / in / len / discard, same eviction rules as BoundedCache."""
+
+    def __init__(self, name: str, max_items: int = 10_000, ttl_s: Optional[float] = None, register: bool = True):
+        self._c = BoundedCache(name, max_items=max_items, ttl_s=ttl_s, register=register)
+
+    def add(self, key: Hashable) -> None:
+        self._c.set(key, None)
+
+    def discard(self, key: Hashable) -> None:
+        self._c.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # a membership test is this structure's "lookup": count it
+        hit = key in self._c
+        if hit:
+            self._c.hits += 1
+        else:
+            self._c.misses += 1
+        return hit
+
+    def __len__(self) -> int:
+        return len(self._c)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._c.keys())
+
+    def stats(self) -> Dict[str, Any]:
+        return self._c.stats()
+
+
+# -----------------------------
+# registry / export
+# -----------------------------
+_REGISTRY: "weakref.WeakValueDictionary[str, BoundedCache]" = weakref.WeakValueDictionary()
+_REG_LOCK = threading.Lock()
+_last_log = 0.0
+
+
+def _register(c: BoundedCache) -> None:
+    with _REG_LOCK:
+        name, i = c.name, 1
+        while name in _REGISTRY:
+            i += 1
+            name = f"{c.name}#{i}"
+        c.name = name
+        _REGISTRY[name] = c
+
+
+def stats() -> List[Dict[str, Any]]:
+    with _REG_LOCK:
+        caches = list(_REGISTRY.values())
+    return [c.stats() for c in sorted(caches, key=lambda c: c.name)]
+
+
+def prometheus() -> str:
+    rows = stats()
+    if not rows:
+        return ""
+    lines = ["# HELP lino_cache_size Entries in a bounded cache.", "# TYPE lino_cache_size gauge",
+             "# HELP lino_cache_bytes Approximate bytes held by a bounded cache.", "# TYPE lino_cache_bytes gauge",
+             "# HELP lino_cache_hit_rate Lookups served from the cache.", "# TYPE lino_cache_hit_rate gauge",
+             "# TYPE lino_cache_evictions_total counter"]
+    for s in rows:
+        lbl = f'cache="{s["name"]}"'
+        lines.append(f"lino_cache_size{{{lbl}}} {s['size']}")
+        lines.append(f"lino_cache_bytes{{{lbl}}} {s['approx_bytes']}")
+        lines.append(f"lino_cache_hit_rate{{{lbl}}} {s['hit_rate']}")
+        lines.append(f"lino_cache_evictions_total{{{lbl}}} {s['evictions'] + s['expirations']}")
+    return "\n".join(lines) + "\n"
+
+
+def log_stats(prefix: str = "[cache]") -> None:
+    for s in stats():
+        print(f"{prefix} {s['name']} size={s['size']}/{s['max']} hit={s['hit_rate']:.2f} "
+              f"evict={s['evictions']} exp={s['expirations']} ~{s['approx_bytes'] / 1024:.0f}KB", flush=True)
+
+
+def maybe_log_stats(every_s: float = STATS_EVERY_S) -> None:
+    global _last_log
+    now = time.time()
+    if now - _last_log >= every_s:
+        _last_log = now
+        log_stats()
@@ -23,6 +23,8 @@ def _connect(path: str) -> sqlite3.Connection:
     _mkdir_parent(path)
     con = sqlite3.connect(path, timeout=30)
     con.row_factory = sqlite3.Row
+    # must precede WAL / first table: only takes effect on new files (see core.retention)
+    con.execute("PRAGMA auto_vacuum=INCREMENTAL;")
     con.execute("PRAGMA journal_mode=WAL;")
     con.execute("PRAGMA synchronous=NORMAL;")
     con.execute("PRAGMA foreign_keys=ON;")
@@ -113,6 +115,9 @@ def init_db(path: str = DEFAULT_DB_PATH) -> None:
         _add_col(con, "trades", "created_ts", "INTEGER")
         _add_col(con, "trades", "updated_ts", "INTEGER")
 
+        # retention (core.retention) scans events by ts
+        con.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)")
+
         con.commit()
     finally:
         con.close()
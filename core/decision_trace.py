@@ -1,10 +1,403 @@
-import logging
-from typing import Any, Dict, Optional
+"""
+Structured decision / event sink.
+
+Hot paths (SellEngine loop, trader_exec pick/guards) call event() with a
+typed record: event type, mint, action, reason and numeric features. The
+call only samples, rate-limits and enqueues; a background writer thread
+(QueueHandler-style) batches the records into:
+
+- sqlite (default): DECISION_DB, WAL, indexed by (mint, ts) and (etype, ts)
+- jsonl: daily DECISION_DIR/decisions-YYYYMMDD.jsonl
+
+and optionally echoes a compact line to stdout (DECISION_ECHO=1, off by
+default), so the caller never blocks on terminal or file I/O.
+
+Per-event-type sampling: DECISION_SAMPLE="price=0.1,loop_item=0" (default 1).
+Repeated identical (etype, mint, action, reason) records inside
+DECISION_DEDUP_S are folded: the next one written (or a folded_only record
+at exit) carries repeat=<n>, the number of records folded into it.
+Event types in DECISION_NODEDUP (default "price") are never folded: their
+features change every tick, use DECISION_SAMPLE to thin them instead.
+When the queue is full records are dropped (counted), never waited on.
+
+query() / scripts/decisions.py answer "why was this mint skipped".
+trace() keeps the old signature for existing callers.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+DECISION_SINK = os.getenv("DECISION_SINK", "sqlite").strip().lower()  # sqlite | jsonl | off
+DECISION_DB = os.getenv("DECISION_DB", "state/decisions.sqlite")
+DECISION_DIR = os.getenv("DECISION_DIR", "state/decisions")
+DECISION_ECHO = os.getenv("DECISION_ECHO", "0").strip().lower() in ("1", "true", "yes", "on")
+DECISION_DEDUP_S = float(os.getenv("DECISION_DEDUP_S", "30"))  # 0 = pas de dédup
+DECISION_NODEDUP = {t.strip() for t in os.getenv("DECISION_NODEDUP", "price").split(",") if t.strip()}
+DECISION_QUEUE_MAX = int(os.getenv("DECISION_QUEUE_MAX", "20000"))
+DECISION_BATCH = int(os.getenv("DECISION_BATCH", "500"))
+DECISION_FLUSH_S = float(os.getenv("DECISION_FLUSH_S", "1.0"))
+DECISION_KEEP_DAYS = float(os.getenv("DECISION_KEEP_DAYS", "7"))
+
+
+def _parse_rates(raw: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in (raw or "").split(","):
+        k, sep, v = part.partition("=")
+        if not sep or not k.strip():
+            continue
+        try:
+            out[k.strip()] = max(0.0, min(1.0, float(v)))
+        except Exception:
+            pass
+    return out
+
+
+DECISION_SAMPLE = _parse_rates(os.getenv("DECISION_SAMPLE", ""))
+
+
+@dataclass
+class Decision:
+    etype: str  # "pick", "buy_skip", "price", "sell", "sell_skip", ...
+    mint: str = ""
+    action: str = ""
+    reason: str = ""
+    sym: str = ""
+    features: Dict[str, Any] = field(default_factory=dict)  # numeric features (pnl, score, price...)
+    ts: float = field(default_factory=time.time)
+    pid: int = field(default_factory=os.getpid)
+    repeat: int = 0  # identical records folded (not written) before this one
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"ts": round(self.ts, 3), "etype": self.etype, "mint": self.mint, "action": self.action,
+             "reason": self.reason, "sym": self.sym, "pid": self.pid, "f": self.features}
+        if self.repeat:
+            d["repeat"] = self.repeat
+        return d
+
+    def line(self) -> str:
+        feats = " ".join(f"{k}={_fmt(v)}" for k, v in self.features.items())
+        rep = f" (+{self.repeat} folded)" if self.repeat else ""
+        return f"[DECISION] {self.etype} {self.action} mint={self.mint} reason={self.reason} {feats}{rep}".rstrip()
+
+
+def _fmt(v: Any) -> str:
+    if isinstance(v, float):
+        return f"{v:.6g}"
+    return str(v)
+
+
+# -----------------------------
+# stats
+# -----------------------------
+_STATS = {"emitted": 0, "sampled_out": 0, "deduped": 0, "dropped": 0, "written": 0, "write_errors": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _bump(k: str, n: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[k] += n
+
+
+def stats() -> Dict[str, int]:
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+# -----------------------------
+# sinks
+# -----------------------------
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    ts REAL NOT NULL,
+    etype TEXT NOT NULL,
+    mint TEXT,
+    sym TEXT,
+    action TEXT,
+    reason TEXT,
+    features TEXT,
+    repeat INTEGER DEFAULT 0,
+    pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_mint_ts ON decisions(mint, ts);
+CREATE INDEX IF NOT EXISTS idx_decisions_etype_ts ON decisions(etype, ts);
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    con = sqlite3.connect(path, timeout=10)
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA synchronous=NORMAL;")
+    con.executescript(_SCHEMA)
+    return con
+
+
+class _SqliteSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.con: Optional[sqlite3.Connection] = None
+        self._last_prune = 0.0
+
+    def write(self, recs: List[Decision]) -> None:
+        if self.con is None:
+            self.con = _connect(self.path)
+        with self.con:
+            self.con.executemany(
+                "INSERT INTO decisions(ts, etype, mint, sym, action, reason, features, repeat, pid) VALUES (?,?,?,?,?,?,?,?,?)",
+                [(r.ts, r.etype, r.mint, r.sym, r.action, r.reason,
+                  json.dumps(r.features, separators=(",", ":"), default=str), r.repeat, r.pid) for r in recs],
+            )
+        now = time.time()
+        if DECISION_KEEP_DAYS > 0 and now - self._last_prune > 3600:
+            self._last_prune = now
+            with self.con:
+                self.con.execute("DELETE FROM decisions WHERE ts < ?", (now - DECISION_KEEP_DAYS * 86400,))
+
+    def close(self) -> None:
+        if self.con is not None:
+            try:
+                self.con.close()
+            except Exception:
+                pass
+            self.con = None
+
+
+class _JsonlSink:
+    def __init__(self, d: str):
+        self.dir = d
+
+    def write(self, recs: List[Decision]) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        by_day: Dict[str, List[str]] = {}
+        for r in recs:
+            day = time.strftime("%Y%m%d", time.localtime(r.ts))
+            by_day.setdefault(day, []).append(json.dumps(r.to_dict(), separators=(",", ":"), default=str) + "\n")
+        for day, lines in by_day.items():
+            # one write() per batch, O_APPEND: lines from several processes don't interleave
+            with open(os.path.join(self.dir, f"decisions-{day}.jsonl"), "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+    def close(self) -> None:
+        pass
+
+
+# -----------------------------
+# background writer
+# -----------------------------
+_Q: "queue.Queue[Optional[Decision]]" = queue.Queue(maxsize=max(1, DECISION_QUEUE_MAX))
+_WRITER: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+_SINK: Any = None
+
+
+def _make_sink():
+    if DECISION_SINK == "jsonl":
+        return _JsonlSink(DECISION_DIR)
+    if DECISION_SINK == "sqlite":
+        return _SqliteSink(DECISION_DB)
+    return None
+
+
+def _drain(batch: List[Decision]) -> None:
+    if not batch:
+        return
+    if DECISION_ECHO:
+        try:
+            print("\n".join(r.line() for r in batch), flush=True)
+        except Exception:
+            pass
+    if _SINK is None:
+        return
+    try:
+        _SINK.write(batch)
+        _bump("written", len(batch))
+    except Exception as e:
+        _bump("write_errors")
+        print(f"⚠️ decision sink write failed ({DECISION_SINK}): {e}", flush=True)
+
+
+def _writer() -> None:
+    stop = False
+    while not stop:
+        batch: List[Decision] = []
+        try:
+            r = _Q.get(timeout=DECISION_FLUSH_S)
+            if r is None:
+                stop = True
+            else:
+                batch.append(r)
+            while len(batch) < DECISION_BATCH:
+                r = _Q.get_nowait()
+                if r is None:
+                    stop = True
+                    break
+                batch.append(r)
+        except queue.Empty:
+            pass
+        _drain(batch)
+    if _SINK is not None:
+        _SINK.close()
+
+
+def _ensure_writer() -> None:
+    global _WRITER, _SINK
+    if _WRITER is not None:
+        return
+    with _WRITER_LOCK:
+        if _WRITER is not None:
+            return
+        _SINK = _make_sink()
+        t = threading.Thread(target=_writer, name="decision-sink", daemon=True)
+        t.start()
+        _WRITER = t
+
+
+def close(timeout_s: float = 5.0) -> None:
+    """Flush everything queued and stop the writer (atexit)."""
+    global _WRITER
+    t = _WRITER
+    if t is None:
+        return
+    _flush_folded()
+    try:
+        _Q.put(None, timeout=timeout_s)
+    except Exception:
+        pass
+    t.join(timeout_s)
+    _WRITER = None
+
+
+atexit.register(close)
+
+
+# -----------------------------
+# sampling + rate limiting (caller side, cheap)
+# -----------------------------
+_DEDUP: Dict[Tuple[str, str, str, str], List[float]] = {}  # key -> [last_written_ts, folded_count]
+_DEDUP_LOCK = threading.Lock()
+_DEDUP_MAX = 50_000
+
+
+def _enqueue(rec: Decision) -> None:
+    _ensure_writer()
+    try:
+        _Q.put_nowait(rec)
+        _bump("emitted")
+    except queue.Full:
+        _bump("dropped")
+
+
+def _flush_folded() -> None:
+    """On exit, write one record per key that still has folded repeats pending."""
+    with _DEDUP_LOCK:
+        pending = [(k, int(v[1])) for k, v in _DEDUP.items() if v[1] > 0]
+        _DEDUP.clear()
+    for (etype, mint, action, reason), n in pending:
+        _enqueue(Decision(etype, mint, action, reason, repeat=n, features={"folded_only": 1}))
+
+
+def emit(rec: Decision) -> None:
+    """Sample, rate-limit and enqueue a record. Never blocks, never raises."""
+    try:
+        if DECISION_SINK == "off" and not DECISION_ECHO:
+            return
+        rate = DECISION_SAMPLE.get(rec.etype, 1.0)
+        if rate < 1.0 and (rate <= 0.0 or random.random() >= rate):
+            _bump("sampled_out")
+            return
+        if DECISION_DEDUP_S > 0 and rec.etype not in DECISION_NODEDUP:
+            key = (rec.etype, rec.mint, rec.action, rec.reason)
+            with _DEDUP_LOCK:
+                st = _DEDUP.get(key)
+                if st is not None and rec.ts - st[0] < DECISION_DEDUP_S:
+                    st[1] += 1
+                    _bump("deduped")
+                    return
+                if st is not None:
+                    rec.repeat = int(st[1])
+                if len(_DEDUP) >= _DEDUP_MAX:
+                    _DEDUP.clear()
+                _DEDUP[key] = [rec.ts, 0]
+        _enqueue(rec)
+    except Exception:
+        pass
+
+
+def event(etype: str, mint: str = "", action: str = "", reason: str = "", sym: str = "", **features) -> None:
+    """Typed record shortcut: event("sell_skip", mint, "SKIP", "mint_cooldown", left_s=42)."""
+    emit(Decision(etype, str(mint or ""), str(action or ""), str(reason or ""), str(sym or ""), features))
 
-log = logging.getLogger("DecisionTrace")
 
 def trace(mint: str, sym: str, action: str, reason: str, extra: Optional[Dict[str, Any]] = None):
-    payload = {"mint": mint, "sym": sym, "action": action, "reason": reason}
-    if extra:
-        payload.update(extra)
-    log.info("[DECISION] %s", payload)
+    """Compat: old logging-based entry point (etype 'decision')."""
+    emit(Decision("decision", str(mint or ""), str(action or ""), str(reason or ""), str(sym or ""), dict(extra or {})))
+
+
+# -----------------------------
+# query
+# -----------------------------
+def query(mint: Optional[str] = None, etype: Optional[str] = None, action: Optional[str] = None,
+          since_s: Optional[float] = None, limit: int = 200) -> List[Dict[str, Any]]:
+    """Most recent records first, from the configured sink."""
+    since = time.time() - since_s if since_s else 0.0
+    if DECISION_SINK == "jsonl":
+        return _query_jsonl(mint, etype, action, since, limit)
+    if not os.path.exists(DECISION_DB):
+        return []
+    con = _connect(DECISION_DB)
+    try:
+        sql = "SELECT ts, etype, mint, sym, action, reason, features, repeat, pid FROM decisions WHERE ts >= ?"
+        args: List[Any] = [since]
+        for col, val in (("mint", mint), ("etype", etype), ("action", action)):
+            if val:
+                sql += f" AND {col} = ?"
+                args.append(val)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        args.append(int(limit))
+        out = []
+        for ts, et, m, sym, act, rsn, feats, rep, pid in con.execute(sql, args):
+            try:
+                f = json.loads(feats or "{}")
+            except Exception:
+                f = {}
+            out.append({"ts": ts, "etype": et, "mint": m, "sym": sym, "action": act,
+                        "reason": rsn, "f": f, "repeat": rep, "pid": pid})
+        return out
+    finally:
+        con.close()
+
+
+def _query_jsonl(mint, etype, action, since, limit) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    try:
+        files = sorted((f for f in os.listdir(DECISION_DIR) if f.startswith("decisions-")), reverse=True)
+    except FileNotFoundError:
+        return out
+    for fn in files:
+        rows = []
+        with open(os.path.join(DECISION_DIR, fn), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                except Exception:
+                    continue
+                if r.get("ts", 0) < since:
+                    continue
+                if (mint and r.get("mint") != mint) or (etype and r.get("etype") != etype) or (action and r.get("action") != action):
+                    continue
+                rows.append(r)
+        out.extend(sorted(rows, key=lambda r: r.get("ts", 0), reverse=True))
+        if len(out) >= limit:
+            break
+    return out[:limit]
@@ -1,60 +1,30 @@
-import json
-import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, Optional
+
+from core.reputation_store import LEGACY_DEV_DB, ReputationStore, get_store
 
 
 class DevProfiler:
     """
     Maintient un profil par dev (creator / deployer).
-    Stocké en JSON local (dev_db.json).
+    Stocké dans core.reputation_store (SQLite, upsert par event);
+    `path` (ancien dev_db.json) est importé une seule fois par fichier dans le store
+    (les devs déjà présents sont gardés).
     """
 
-    def __init__(self, path: str = "dev_db.json"):
+    def __init__(self, path: str = LEGACY_DEV_DB, store: Optional[ReputationStore] = None):
         self.path = Path(path)
-        self.db: Dict[str, Dict[str, Any]] = {}
-        self._load()
-
-    def _load(self) -> None:
-        if self.path.exists():
-            try:
-                self.db = json.loads(self.path.read_text(encoding="utf-8"))
-            except Exception:
-                self.db = {}
-
-    def _save(self) -> None:
-        try:
-            self.path.write_text(json.dumps(self.db, indent=2), encoding="utf-8")
-        except Exception:
-            pass
+        self.store = store or get_store()
+        self.store.import_legacy_devs(str(self.path))
 
     def get(self, dev: str) -> Dict[str, Any]:
-        return self.db.get(
-            dev,
-            {
-                "score": 0,
-                "tokens": 0,
-                "rugs": 0,
-                "blacklisted": False,
-                "last_seen": None,
-            },
-        )
+        return self.store.get_dev(dev)
 
     def update_on_new_token(self, dev: str) -> None:
-        p = self.get(dev)
-        p["tokens"] = int(p.get("tokens") or 0) + 1
-        p["last_seen"] = time.time()
-        self.db[dev] = p
-        self._save()
+        self.store.dev_new_token(dev)
 
     def flag_rug(self, dev: str) -> None:
-        p = self.get(dev)
-        p["rugs"] = int(p.get("rugs") or 0) + 1
-        p["score"] = int(p.get("score") or 0) - 5
-        if p["rugs"] >= 2:
-            p["blacklisted"] = True
-        self.db[dev] = p
-        self._save()
+        self.store.dev_flag_rug(dev, blacklist_after=2)
 
     def allow(self, dev: str) -> bool:
         p = self.get(dev)
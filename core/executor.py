@@ -7,6 +7,14 @@ class Fill:
     ok: bool
     price: float
     reason: str = ""
+    # renseignés par core.sim_executor (0 pour les fills instantanés)
+    qty: float = 0.0
+    out: float = 0.0
+    fee_sol: float = 0.0
+    latency_ms: float = 0.0
+    ts: float = 0.0
+    impact: float = 0.0
+    mark: float = 0.0
 
 class Executor:
     def buy(self, mint: str, price: float, sol_amount: float) -> Fill:
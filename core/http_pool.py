@@ -0,0 +1,657 @@
+"""
+Shared HTTP transport (Jupiter, DexScreener, Birdeye, GeckoTerminal, RPC).
+
+One place for connection pooling instead of one-off requests.post / urlopen /
+per-client sessions:
+
+- sync:  one requests.Session, per-host keep-alive pools (HTTPAdapter)
+- async: one aiohttp.ClientSession per event loop (per-host limit, DNS cache,
+         keep-alive) and one httpx.AsyncClient per loop (HTTP/2 when `h2`
+         is installed) for hosts listed in HTTP2_HOSTS
+- getaddrinfo TTL cache scoped to the sync pool's connections (aiohttp has
+  its own per connector; httpx keeps its h2 connections open instead)
+- unified timeouts / retries / classification (ok, rate_limited, retryable, fatal);
+  by default only idempotent methods (GET / HEAD / OPTIONS) are retried: a
+  POST (sendTransaction, swap builds) gets one attempt unless the caller
+  passes retries= (JSON-RPC reads do)
+- per-host stats: requests, errors, 429s, retries, new vs reused
+  connections, latency (ewma / max) -> stats(), log_stats()
+
+Shared sessions are owned by this module: clients must not close them.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib.util
+import json as _json
+import os
+import random
+import socket
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core import single_flight
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:  # pragma: no cover - optional
+    requests = None
+    HTTPAdapter = None
+
+try:
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+    from urllib3.util import connection as _u3_connection
+except Exception:  # pragma: no cover - optional
+    HTTPConnection = None
+
+try:
+    import aiohttp
+except Exception:  # pragma: no cover - optional
+    aiohttp = None
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - optional
+    httpx = None
+
+# presence only (httpx imports it itself for http2=True)
+_H2 = importlib.util.find_spec("h2") is not None
+
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "32"))
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+HTTP_POOL_TOTAL = int(os.getenv("HTTP_POOL_TOTAL", "256"))
+HTTP_KEEPALIVE_S = float(os.getenv("HTTP_KEEPALIVE_S", "60"))
+HTTP_DNS_TTL_S = float(os.getenv("HTTP_DNS_TTL_S", "300"))
+HTTP_DNS_CACHE = os.getenv("HTTP_DNS_CACHE", "1").strip().lower() in ("1", "true", "yes", "on")
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "20"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))  # attempts for idempotent methods (see _tries)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+HTTP_BACKOFF_BASE_S = float(os.getenv("HTTP_BACKOFF_BASE_S", "0.35"))
+HTTP_BACKOFF_CAP_S = float(os.getenv("HTTP_BACKOFF_CAP_S", "8"))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "1").strip().lower() in ("1", "true", "yes", "on")
+HTTP_STATS_EVERY_S = float(os.getenv("HTTP_STATS_EVERY_S", "300"))
+HTTP2_HOSTS = {h.strip().lower() for h in os.getenv(
+    "HTTP2_HOSTS",
+    "api.jup.ag,lite-api.jup.ag,public-api.birdeye.so,api.geckoterminal.com,api.dexscreener.com,transaction-v1.raydium.io",
+).split(",") if h.strip()}
+
+OK = "ok"
+RATE_LIMITED = "rate_limited"
+RETRYABLE = "retryable"
+FATAL = "fatal"
+
+
+class HttpError(RuntimeError):
+    def __init__(self, status: Optional[int], url: str, body: str = "", kind: str = FATAL):
+        self.status = status
+        self.url = url
+        self.body = body
+        self.kind = kind
+        super().__init__(f"HTTP {status} {kind} for {url} | body={body[:300]}")
+
+
+def host_of(url: str) -> str:
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except Exception:
+        return ""
+
+
+def classify(status: Optional[int] = None, exc: Optional[BaseException] = None) -> str:
+    """HTTP status / transport exception -> ok | rate_limited | retryable | fatal."""
+    if exc is not None:
+        if isinstance(exc, HttpError):
+            return exc.kind
+        # timeouts, resets, DNS hiccups: transport level, worth a retry
+        return RETRYABLE
+    if status is None:
+        return RETRYABLE
+    if status == 429:
+        return RATE_LIMITED
+    if 200 <= status < 400:
+        return OK
+    if status in (408, 425) or status >= 500:
+        return RETRYABLE
+    return FATAL
+
+
+def retry_after_s(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    try:
+        v = (headers or {}).get("Retry-After") or (headers or {}).get("retry-after")
+        return max(0.0, float(v)) if v is not None else None
+    except Exception:
+        return None
+
+
+def _tries(method: str, retries: Optional[int]) -> int:
+    """Explicit retries win; otherwise HTTP_RETRIES for idempotent methods, a single attempt for the rest."""
+    if retries is not None:
+        return max(1, int(retries))
+    return max(1, HTTP_RETRIES) if method.upper() in IDEMPOTENT_METHODS else 1
+
+
+def backoff_s(attempt: int, retry_after: Optional[float] = None) -> float:
+    if retry_after is not None:
+        return min(HTTP_BACKOFF_CAP_S, retry_after)
+    base = min(HTTP_BACKOFF_CAP_S, HTTP_BACKOFF_BASE_S * (2 ** max(0, attempt)))
+    return base * (0.8 + 0.4 * random.random())
+
+
+# -----------------------------
+# stats
+# -----------------------------
+@dataclass
+class HostStats:
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    new_conns: int = 0
+    reused_conns: int = 0
+    lat_ewma_ms: float = 0.0
+    lat_max_ms: float = 0.0
+    lat_sum_ms: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["lat_avg_ms"] = round(self.lat_sum_ms / self.requests, 2) if self.requests else 0.0
+        seen = self.new_conns + self.reused_conns
+        d["reuse_ratio"] = round(self.reused_conns / seen, 3) if seen else None
+        d["lat_ewma_ms"] = round(self.lat_ewma_ms, 2)
+        d["lat_max_ms"] = round(self.lat_max_ms, 2)
+        d.pop("lat_sum_ms", None)
+        return d
+
+
+_STATS: Dict[str, HostStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def record(host: str, kind: str, dt_ms: Optional[float], new_conn: Optional[bool] = None) -> None:
+    with _STATS_LOCK:
+        hs = _STATS.get(host)
+        if hs is None:
+            hs = _STATS[host] = HostStats()
+        hs.requests += 1
+        if kind == OK:
+            hs.ok += 1
+        elif kind == RATE_LIMITED:
+            hs.rate_limited += 1
+        else:
+            hs.errors += 1
+        if new_conn is True:
+            hs.new_conns += 1
+        elif new_conn is False:
+            hs.reused_conns += 1
+        if dt_ms is not None:
+            hs.lat_sum_ms += dt_ms
+            hs.lat_max_ms = max(hs.lat_max_ms, dt_ms)
+            hs.lat_ewma_ms = dt_ms if hs.requests == 1 else (0.8 * hs.lat_ewma_ms + 0.2 * dt_ms)
+
+
+def record_retry(host: str) -> None:
+    with _STATS_LOCK:
+        hs = _STATS.get(host)
+        if hs is None:
+            hs = _STATS[host] = HostStats()
+        hs.retries += 1
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    with _STATS_LOCK:
+        return {h: s.snapshot() for h, s in sorted(_STATS.items())}
+
+
+def log_stats(prefix: str = "[http]") -> None:
+    for h, s in stats().items():
+        print(f"{prefix} host={h} req={s['requests']} ok={s['ok']} err={s['errors']} 429={s['rate_limited']} "
+              f"retry={s['retries']} conn_new={s['new_conns']} conn_reused={s['reused_conns']} "
+              f"reuse={s['reuse_ratio']} lat_avg={s['lat_avg_ms']}ms ewma={s['lat_ewma_ms']}ms max={s['lat_max_ms']}ms",
+              flush=True)
+
+
+_last_stats_log = 0.0
+
+
+def maybe_log_stats(prefix: str = "[http]") -> None:
+    """log_stats() at most every HTTP_STATS_EVERY_S (0 = off); cheap to call from any loop tick."""
+    global _last_stats_log
+    if HTTP_STATS_EVERY_S <= 0:
+        return
+    now = time.monotonic()
+    if now - _last_stats_log < HTTP_STATS_EVERY_S:
+        return
+    _last_stats_log = now
+    log_stats(prefix)
+    single_flight.log_stats()
+
+
+# -----------------------------
+# DNS cache (getaddrinfo), used only by the sync pool's connections
+# -----------------------------
+_DNS: Dict[Tuple, Tuple[float, Any]] = {}
+_DNS_LOCK = threading.Lock()
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    with _DNS_LOCK:
+        hit = _DNS.get(key)
+        if hit is not None and now - hit[0] < HTTP_DNS_TTL_S:
+            return hit[1]
+    res = socket.getaddrinfo(host, port, family, type, proto, flags)
+    with _DNS_LOCK:
+        if len(_DNS) > 4096:
+            _DNS.clear()
+        _DNS[key] = (now, res)
+    return res
+
+
+def _dns_cache_on() -> bool:
+    return HTTP_DNS_CACHE and HTTP_DNS_TTL_S > 0 and HTTPConnection is not None
+
+
+if HTTPConnection is not None:
+    class _CachedDNSConn:
+        """urllib3 connection mixin: connect to cached addresses; host (SNI / cert check) is untouched."""
+
+        def _new_conn(self):
+            try:
+                addrs = _cached_getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+            except OSError:
+                return super()._new_conn()  # urllib3 raises its own NameResolutionError
+            err: Optional[OSError] = None
+            for *_, sa in addrs:
+                try:
+                    return _u3_connection.create_connection(
+                        (sa[0], self.port), self.timeout,
+                        source_address=self.source_address, socket_options=self.socket_options,
+                    )
+                except OSError as e:
+                    err = e
+            if isinstance(err, socket.timeout):
+                raise ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})") from err
+            raise NewConnectionError(self, f"Failed to establish a new connection: {err}") from err
+
+    class _HTTPConn(_CachedDNSConn, HTTPConnection):
+        pass
+
+    class _HTTPSConn(_CachedDNSConn, HTTPSConnection):
+        pass
+
+    class _HTTPPool(HTTPConnectionPool):
+        ConnectionCls = _HTTPConn
+
+    class _HTTPSPool(HTTPSConnectionPool):
+        ConnectionCls = _HTTPSConn
+
+
+if HTTPAdapter is not None:
+    class _PoolAdapter(HTTPAdapter):
+        """HTTPAdapter whose own pools resolve through the DNS cache (nothing patched process-wide)."""
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            if _dns_cache_on():
+                self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+
+# -----------------------------
+# sync (requests)
+# -----------------------------
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_ADAPTER = None
+
+
+def session():
+    """Shared requests.Session with per-host keep-alive pools."""
+    global _SESSION, _ADAPTER
+    if _SESSION is not None:
+        return _SESSION
+    if requests is None:
+        raise RuntimeError("requests not installed")
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            s = requests.Session()
+            _ADAPTER = _PoolAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST, max_retries=0)
+            s.mount("https://", _ADAPTER)
+            s.mount("http://", _ADAPTER)
+            _SESSION = s
+    return _SESSION
+
+
+def _sync_conn_count(url: str) -> Optional[int]:
+    try:
+        return int(_ADAPTER.poolmanager.connection_from_url(url).num_connections)
+    except Exception:
+        return None
+
+
+def request(method: str, url: str, *, params=None, json=None, data=None, headers=None,
+            timeout: Optional[float] = None, retries: Optional[int] = None, raise_for_status: bool = True):
+    """requests-compatible call through the shared pool, with unified retry on 429 / 5xx / transport errors."""
+    s = session()
+    host = host_of(url)
+    tries = _tries(method, retries)
+    last_exc: Optional[BaseException] = None
+    r = None
+    for attempt in range(tries):
+        if attempt:
+            record_retry(host)
+        c0 = _sync_conn_count(url)
+        t0 = time.perf_counter()
+        try:
+            r = s.request(method, url, params=params, json=json, data=data, headers=headers,
+                          timeout=timeout or HTTP_TIMEOUT_S)
+        except Exception as e:
+            record(host, RETRYABLE, (time.perf_counter() - t0) * 1000.0)
+            last_exc = e
+            if attempt + 1 < tries:
+                time.sleep(backoff_s(attempt))
+                continue
+            raise
+        c1 = _sync_conn_count(url)
+        kind = classify(r.status_code)
+        record(host, kind, (time.perf_counter() - t0) * 1000.0,
+               None if c0 is None or c1 is None else (c1 > c0))
+        if kind in (RATE_LIMITED, RETRYABLE) and attempt + 1 < tries:
+            time.sleep(backoff_s(attempt, retry_after_s(r.headers)))
+            continue
+        break
+    if raise_for_status and r is not None and classify(r.status_code) != OK:
+        raise HttpError(r.status_code, url, r.text or "", classify(r.status_code))
+    if r is None and last_exc is not None:
+        raise last_exc
+    return r
+
+
+def get(url: str, **kw):
+    """requests.get drop-in (pooled, single attempt, no raise): same semantics, shared keep-alive + stats."""
+    kw.setdefault("retries", 1)
+    kw.setdefault("raise_for_status", False)
+    return request("GET", url, **kw)
+
+
+def post(url: str, **kw):
+    """requests.post drop-in (pooled, single attempt, no raise)."""
+    kw.setdefault("retries", 1)
+    kw.setdefault("raise_for_status", False)
+    return request("POST", url, **kw)
+
+
+def get_json(url: str, *, params=None, headers=None, **kw) -> Any:
+    return single_flight.do_sync(
+        single_flight.http_key(url, params or {}),
+        lambda: request("GET", url, params=params, headers=headers, **kw).json(),
+    )
+
+
+def post_json(url: str, payload: Any, *, headers=None, **kw) -> Any:
+    return request("POST", url, json=payload, headers=headers, **kw).json()
+
+
+def _rpc_err_is_429(err: Any) -> bool:
+    try:
+        return isinstance(err, dict) and int(err.get("code", 0)) == 429
+    except Exception:
+        return False
+
+
+def rpc_call(url: str, method: str, params: list, *, timeout: Optional[float] = None, retries: Optional[int] = None) -> Any:
+    """Solana JSON-RPC over the shared pool. Pure reads are single-flighted and retried, writes get one attempt."""
+    return single_flight.do_sync(
+        single_flight.rpc_key(url, method, params),
+        lambda: _rpc_call_upstream(url, method, params, timeout=timeout, retries=retries),
+    )
+
+
+def _rpc_call_upstream(url: str, method: str, params: list, *, timeout: Optional[float] = None,
+                       retries: Optional[int] = None) -> Any:
+    """JSON-level 429 is retried like HTTP 429 (rejected, not executed: safe for writes too)."""
+    tries = max(1, HTTP_RETRIES if retries is None else int(retries))
+    if retries is None and method in single_flight.RPC_READ_METHODS:
+        retries = HTTP_RETRIES  # idempotent read over POST: transport errors / 5xx are retried too
+    body = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    for attempt in range(tries):
+        j = post_json(url, body, timeout=timeout, retries=retries)
+        err = (j or {}).get("error")
+        if err:
+            if _rpc_err_is_429(err) and attempt + 1 < tries:
+                record_retry(host_of(url))
+                time.sleep(backoff_s(attempt))
+                continue
+            raise RuntimeError(err)
+        return (j or {}).get("result")
+    return None
+
+
+# -----------------------------
+# async
+# -----------------------------
+_AIO: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_HX: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _aio_trace():
+    tc = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx, params):
+        ctx.t0 = time.perf_counter()
+        ctx.new_conn = None
+
+    async def on_create(session, ctx, params):
+        ctx.new_conn = True
+
+    async def on_reuse(session, ctx, params):
+        ctx.new_conn = False
+
+    async def on_end(session, ctx, params):
+        record(host_of(str(params.url)), classify(params.response.status),
+               (time.perf_counter() - getattr(ctx, "t0", time.perf_counter())) * 1000.0, getattr(ctx, "new_conn", None))
+
+    async def on_exc(session, ctx, params):
+        record(host_of(str(params.url)), RETRYABLE,
+               (time.perf_counter() - getattr(ctx, "t0", time.perf_counter())) * 1000.0, getattr(ctx, "new_conn", None))
+
+    tc.on_request_start.append(on_start)
+    tc.on_connection_create_end.append(on_create)
+    tc.on_connection_reuseconn.append(on_reuse)
+    tc.on_request_end.append(on_end)
+    tc.on_request_exception.append(on_exc)
+    return tc
+
+
+async def aio_session():
+    """Shared aiohttp.ClientSession for the running loop (do not close it)."""
+    if aiohttp is None:
+        raise RuntimeError("aiohttp not installed")
+    loop = asyncio.get_running_loop()
+    s = _AIO.get(loop)
+    if s is None or s.closed:
+        conn = aiohttp.TCPConnector(
+            limit=HTTP_POOL_TOTAL,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            ttl_dns_cache=int(HTTP_DNS_TTL_S),
+            keepalive_timeout=HTTP_KEEPALIVE_S,
+        )
+        s = aiohttp.ClientSession(
+            connector=conn,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_S),
+            trace_configs=[_aio_trace()],
+        )
+        _AIO[loop] = s
+    return s
+
+
+@contextlib.asynccontextmanager
+async def aio_borrow():
+    """Drop-in for `async with aiohttp.ClientSession() as s:` that reuses the shared pool (never closes it)."""
+    yield await aio_session()
+
+
+async def httpx_client():
+    """Shared httpx.AsyncClient for the running loop, HTTP/2 when available (do not close it)."""
+    if httpx is None:
+        raise RuntimeError("httpx not installed")
+    loop = asyncio.get_running_loop()
+    c = _HX.get(loop)
+    if c is None or c.is_closed:
+        async def on_req(req):
+            req.extensions["t0"] = time.perf_counter()
+
+        async def on_resp(resp):
+            t0 = resp.request.extensions.get("t0")
+            record(host_of(str(resp.request.url)), classify(resp.status_code),
+                   (time.perf_counter() - t0) * 1000.0 if t0 else None)
+
+        c = httpx.AsyncClient(
+            http2=bool(HTTP_HTTP2 and _H2),
+            timeout=HTTP_TIMEOUT_S,
+            limits=httpx.Limits(max_connections=HTTP_POOL_TOTAL,
+                                max_keepalive_connections=HTTP_POOL_PER_HOST,
+                                keepalive_expiry=HTTP_KEEPALIVE_S),
+            event_hooks={"request": [on_req], "response": [on_resp]},
+        )
+        _HX[loop] = c
+    return c
+
+
+@dataclass
+class AResponse:
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+    url: str
+
+    @property
+    def status_code(self) -> int:
+        return self.status
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self) -> Any:
+        return _json.loads(self.content or b"null")
+
+    def raise_for_status(self) -> None:
+        k = classify(self.status)
+        if k != OK:
+            raise HttpError(self.status, self.url, self.text, k)
+
+
+def _use_httpx(host: str) -> bool:
+    if httpx is None:
+        return False
+    if aiohttp is None:
+        return True
+    return bool(HTTP_HTTP2 and _H2 and host in HTTP2_HOSTS)
+
+
+async def _send_once(method: str, url: str, *, params, json, data, headers, timeout) -> AResponse:
+    if _use_httpx(host_of(url)):
+        c = await httpx_client()
+        r = await c.request(method, url, params=params, json=json, content=data, headers=headers,
+                            timeout=timeout or HTTP_TIMEOUT_S)
+        return AResponse(r.status_code, dict(r.headers), r.content, str(r.url))
+    s = await aio_session()
+    to = aiohttp.ClientTimeout(total=timeout or HTTP_TIMEOUT_S)
+    async with s.request(method, url, params=params, json=json, data=data, headers=headers, timeout=to) as r:
+        body = await r.read()
+        return AResponse(r.status, dict(r.headers), body, str(r.url))
+
+
+async def arequest(method: str, url: str, *, params=None, json=None, data=None, headers=None,
+                   timeout: Optional[float] = None, retries: Optional[int] = None,
+                   raise_for_status: bool = True) -> AResponse:
+    """Async call through the shared pools (httpx/h2 for HTTP2_HOSTS, aiohttp otherwise), unified retries."""
+    host = host_of(url)
+    tries = _tries(method, retries)
+    r: Optional[AResponse] = None
+    for attempt in range(tries):
+        if attempt:
+            record_retry(host)
+        try:
+            r = await _send_once(method, url, params=params, json=json, data=data, headers=headers, timeout=timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if attempt + 1 < tries:
+                await asyncio.sleep(backoff_s(attempt))
+                continue
+            raise
+        kind = classify(r.status)
+        if kind in (RATE_LIMITED, RETRYABLE) and attempt + 1 < tries:
+            await asyncio.sleep(backoff_s(attempt, retry_after_s(r.headers)))
+            continue
+        break
+    if raise_for_status and r is not None:
+        r.raise_for_status()
+    return r
+
+
+class AClient:
+    """httpx.AsyncClient-shaped facade over arequest (get/post/aclose, async with), bound to headers + timeout."""
+
+    def __init__(self, headers: Optional[Mapping[str, str]] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None):
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.retries = retries
+
+    def _h(self, headers):
+        return {**self.headers, **(headers or {})}
+
+    async def get(self, url: str, *, params=None, headers=None) -> AResponse:
+        return await arequest("GET", url, params=params, headers=self._h(headers), timeout=self.timeout,
+                              retries=self.retries, raise_for_status=False)
+
+    async def post(self, url: str, *, json=None, data=None, headers=None) -> AResponse:
+        return await arequest("POST", url, json=json, data=data, headers=self._h(headers), timeout=self.timeout,
+                              retries=self.retries, raise_for_status=False)
+
+    async def aclose(self) -> None:
+        return None
+
+    async def __aenter__(self) -> "AClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+def aclient(headers: Optional[Mapping[str, str]] = None, timeout: Optional[float] = None,
+            retries: Optional[int] = None) -> AClient:
+    return AClient(headers=headers, timeout=timeout, retries=retries)
+
+
+async def aget_json(url: str, *, params=None, headers=None, **kw) -> Any:
+    async def _go() -> Any:
+        return (await arequest("GET", url, params=params, headers=headers, **kw)).json()
+    return await single_flight.do(single_flight.http_key(url, params or {}), _go)
+
+
+async def apost_json(url: str, payload: Any, *, headers=None, **kw) -> Any:
+    return (await arequest("POST", url, json=payload, headers=headers, **kw)).json()
+
+
+async def aclose_all() -> None:
+    """Close the shared async clients of the running loop (process shutdown)."""
+    loop = asyncio.get_running_loop()
+    s = _AIO.pop(loop, None)
+    if s is not None and not s.closed:
+        await s.close()
+    c = _HX.pop(loop, None)
+    if c is not None and not c.is_closed:
+        await c.aclose()
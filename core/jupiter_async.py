@@ -8,6 +8,8 @@ from typing import Any, Dict, Optional
 
 import aiohttp
 
+from core import http_pool, single_flight
+
 
 @dataclass
 class JupiterError(Exception):
@@ -54,14 +56,12 @@ class JupiterAsync:
         self._session: Optional[aiohttp.ClientSession] = session
 
     async def _ensure_session(self) -> aiohttp.ClientSession:
-        if self._session is None:
-            timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-            self._session = aiohttp.ClientSession(timeout=timeout)
-        return self._session
+        if self._external_session is not None:
+            return self._external_session
+        # shared pooled session (core.http_pool), owned by the pool
+        return await http_pool.aio_session()
 
     async def close(self) -> None:
-        if self._session is not None and self._external_session is None:
-            await self._session.close()
         self._session = None
 
     def _headers(self) -> Dict[str, str]:
@@ -81,12 +81,17 @@ class JupiterAsync:
             self._last_call_ts = time.time()
 
     async def _get_json(self, path: str, *, params: Optional[Dict[str, Any]] = None) -> Any:
+        # identical GETs in flight collapse into one upstream call
+        key = single_flight.http_key(f"{self.base_url}{path}", params or {})
+        return await single_flight.do(key, lambda: self._get_json_upstream(path, params=params))
+
+    async def _get_json_upstream(self, path: str, *, params: Optional[Dict[str, Any]] = None) -> Any:
         await self._throttle()
         async with self._sem:
             s = await self._ensure_session()
             url = f"{self.base_url}{path}"
             try:
-                async with s.get(url, params=params or {}, headers=self._headers()) as resp:
+                async with s.get(url, params=params or {}, headers=self._headers(), timeout=aiohttp.ClientTimeout(total=self.timeout_s)) as resp:
                     txt = await resp.text()
                     if resp.status != 200:
                         raise JupiterError(f"Jupiter HTTP {resp.status}", txt[:400])
@@ -105,7 +110,7 @@ class JupiterAsync:
             url = f"{self.base_url}{path}"
             headers = {"content-type": "application/json", **self._headers()}
             try:
-                async with s.post(url, json=payload, headers=headers) as resp:
+                async with s.post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout_s)) as resp:
                     txt = await resp.text()
                     if resp.status != 200:
                         raise JupiterError(f"Jupiter HTTP {resp.status}", txt[:400])
@@ -2,6 +2,7 @@ import os
 import time
 import random
 from core.jup_rate_limit import wait_for_slot, note_result
+from core import http_pool, single_flight
 from collections import OrderedDict
 
 
@@ -152,7 +153,7 @@ def _headers() -> Dict[str, str]:
         h["x-api-key"] = JUP_API_KEY
     return h
 
-async def _get_json(session: aiohttp.ClientSession, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+async def _get_json(session: aiohttp.ClientSession, url: str, params: Dict[str, Any], _sf_inner: bool = False) -> Dict[str, Any]:
     if JUP_QUOTE_CACHE_DEBUG:
         try:
             qs = "&".join([f"{k}={params[k]}" for k in sorted(params.keys())]) if isinstance(params, dict) else ""
@@ -179,6 +180,13 @@ async def _get_json(session: aiohttp.ClientSession, url: str, params: Dict[str,
             if JUP_QUOTE_CACHE_DEBUG:
                 print(f"[jup_cache] MISS key={cache_key[:120]}...", flush=True)
 
+    # --- single-flight: identical quotes in flight (this process or others) share one upstream call ---
+    if is_quote and not _sf_inner:
+        return await single_flight.do(
+            cache_key or single_flight.http_key(url, params if isinstance(params, dict) else {}),
+            lambda: _get_json(session, url, params, _sf_inner=True),
+        )
+
     # --- adaptive rate limit gate (quotes only) ---
     if is_quote:
         try:
@@ -481,7 +489,7 @@ async def jup_buy_exact_in(
     allowed_dexes: List[str] | None = None,
 ) -> str:
     user_pubkey = str(wallet.pubkey())
-    async with aiohttp.ClientSession() as session:
+    async with http_pool.aio_borrow() as session:
         tx_b64 = await jup_build_swap_tx(
             session=session,
             user_pubkey=user_pubkey,
@@ -501,7 +509,7 @@ async def jup_sell_exact_in(
     allowed_dexes: List[str] | None = None,
 ) -> str:
     user_pubkey = str(wallet.pubkey())
-    async with aiohttp.ClientSession() as session:
+    async with http_pool.aio_borrow() as session:
         tx_b64 = await jup_build_swap_tx(
             session=session,
             user_pubkey=user_pubkey,
@@ -0,0 +1,470 @@
+"""
+Latency tracing for the buy and sell paths.
+
+A trace is one buy attempt (trader_loop tick -> trader_exec) or one sell
+(SellEngine._handle_one -> sell_exec_wrap -> sell_exec). Named spans are
+timed inside it:
+
+  buy : exec, (child) spawn, pick, guards, quote, swap_build, sign, send, db_record,
+        confirm (only with LATENCY_BUY_CONFIRM_S > 0: it holds the buy subprocess)
+  sell: price, decide, throttle, exec, (child) spawn, decimals, quote, swap_build, sign, send,
+        confirm, close
+
+The context crosses subprocess boundaries through one env var
+(LINO_TRACE_CTX, see child_env()/from_env()), so the child's spans land under
+the same trace id and kind.
+
+Every span feeds a per-span log-bucket histogram ("<kind>.<span>", in ms).
+Histogram deltas and finished traces are appended to daily rolling files
+under LATENCY_DIR (hist-YYYYMMDD.jsonl / spans-YYYYMMDD.jsonl, flock'd like
+core.jup_rate_limit), so short-lived subprocesses contribute too. serve()
+exposes p50/p90/p99 over LATENCY_WINDOW_S on a local HTTP endpoint:
+/metrics (Prometheus text) and /metrics.json, together with this process'
+core.bounded_cache stats.
+
+Everything is best-effort: tracing never raises into the trading code.
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - non-posix
+    fcntl = None
+
+LATENCY_TRACE = os.getenv("LATENCY_TRACE", "1").strip().lower() in ("1", "true", "yes", "on")
+LATENCY_DIR = os.getenv("LATENCY_DIR", "state/latency")
+LATENCY_DUMP_EVERY_S = float(os.getenv("LATENCY_DUMP_EVERY_S", "30"))
+LATENCY_DUMP_KEEP_DAYS = int(os.getenv("LATENCY_DUMP_KEEP_DAYS", "7"))
+LATENCY_WINDOW_S = float(os.getenv("LATENCY_WINDOW_S", "3600"))
+LATENCY_METRICS_HOST = os.getenv("LATENCY_METRICS_HOST", "127.0.0.1")
+LATENCY_METRICS_PORT = int(os.getenv("LATENCY_METRICS_PORT", "0"))  # 0 = pas d'endpoint
+LATENCY_LOG_EVERY_S = float(os.getenv("LATENCY_LOG_EVERY_S", "300"))  # 0 = pas de résumé périodique
+LATENCY_LOG_SPANS = os.getenv("LATENCY_LOG_SPANS", "0").strip().lower() in ("1", "true", "yes", "on")
+
+ENV_KEY = "LINO_TRACE_CTX"
+QUANTILES = (0.5, 0.9, 0.99)
+
+# log-scale buckets: 0.5ms * 1.25^i, i=0..59 (upper bound ~265s) + overflow
+BOUNDS_MS: List[float] = [0.5 * (1.25 ** i) for i in range(60)]
+
+
+# -----------------------------
+# histogram
+# -----------------------------
+class Histogram:
+    __slots__ = ("counts", "n", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.n = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        ms = max(0.0, float(ms))
+        i = bisect.bisect_left(BOUNDS_MS, ms)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.min = ms if self.n == 0 else min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.n += 1
+        self.sum += ms
+
+    def merge(self, d: Dict[str, Any]) -> None:
+        n = int(d.get("n") or 0)
+        if n <= 0:
+            return
+        for k, v in (d.get("b") or {}).items():
+            i = int(k)
+            self.counts[i] = self.counts.get(i, 0) + int(v)
+        mn = float(d.get("min") or 0.0)
+        self.min = mn if self.n == 0 else min(self.min, mn)
+        self.max = max(self.max, float(d.get("max") or 0.0))
+        self.n += n
+        self.sum += float(d.get("sum") or 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "sum": round(self.sum, 3), "min": round(self.min, 3),
+                "max": round(self.max, 3), "b": {str(k): v for k, v in self.counts.items()}}
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample, clamped to [min, max]."""
+        if self.n <= 0:
+            return 0.0
+        rank = q * self.n
+        acc = 0
+        for i in sorted(self.counts):
+            acc += self.counts[i]
+            if acc >= rank:
+                ub = BOUNDS_MS[i] if i < len(BOUNDS_MS) else self.max
+                return min(max(ub, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        out = {"n": self.n, "mean": round(self.sum / self.n, 3) if self.n else 0.0, "max": round(self.max, 3)}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}"] = round(self.quantile(q), 3)
+        return out
+
+
+# -----------------------------
+# registry (deltas since last dump)
+# -----------------------------
+_LOCK = threading.Lock()
+_DELTA: Dict[str, Histogram] = {}
+_PENDING: List[Dict[str, Any]] = []  # finished traces waiting for the next dump
+_last_dump = time.time()
+_last_log = time.time()
+
+
+def record(key: str, ms: float) -> None:
+    """Add one sample (ms) to histogram `key` (e.g. "buy.quote")."""
+    if not LATENCY_TRACE:
+        return
+    with _LOCK:
+        h = _DELTA.get(key)
+        if h is None:
+            h = _DELTA[key] = Histogram()
+        h.add(ms)
+    if LATENCY_LOG_SPANS:
+        print(f"[LAT] {key} {ms:.1f}ms", flush=True)
+    maybe_dump()
+
+
+# -----------------------------
+# traces
+# -----------------------------
+class Trace:
+    def __init__(self, kind: str, trace_id: Optional[str] = None, t0: Optional[float] = None,
+                 last: Optional[float] = None, remote: bool = False, **attrs):
+        self.kind = kind
+        self.id = trace_id or uuid.uuid4().hex[:16]
+        self.t0 = float(t0 if t0 is not None else time.time())
+        self.last = float(last if last is not None else self.t0)  # wall ts of the last span end
+        self.remote = remote  # continued from a parent process
+        self.attrs: Dict[str, Any] = {k: v for k, v in attrs.items() if v not in (None, "")}
+        self.spans: Dict[str, float] = {}
+        self.done = False
+
+    def add(self, name: str, ms: float) -> None:
+        self.spans[name] = round(self.spans.get(name, 0.0) + ms, 3)
+        self.last = time.time()
+        record(f"{self.kind}.{name}", ms)
+
+    def to_ctx(self) -> str:
+        mint = str(self.attrs.get("mint") or "")
+        return f"{self.id}:{self.kind}:{self.t0:.6f}:{time.time():.6f}:{mint}"
+
+
+_CURRENT: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("lino_trace", default=None)
+
+
+def current() -> Optional[Trace]:
+    return _CURRENT.get()
+
+
+def start(kind: str, **attrs) -> Optional[Trace]:
+    """Open a new trace and make it current (None when tracing is off)."""
+    if not LATENCY_TRACE:
+        return None
+    tr = Trace(kind, **attrs)
+    _CURRENT.set(tr)
+    return tr
+
+
+def from_env(env: Optional[dict] = None) -> Optional[Trace]:
+    """Continue the parent's trace from LINO_TRACE_CTX (None if absent/invalid)."""
+    if not LATENCY_TRACE:
+        return None
+    raw = (env if env is not None else os.environ).get(ENV_KEY) or ""
+    try:
+        tid, kind, t0, last, mint = raw.split(":", 4)
+        tr = Trace(kind, trace_id=tid, t0=float(t0), last=float(last), remote=True, mint=mint)
+    except Exception:
+        return None
+    _CURRENT.set(tr)
+    return tr
+
+
+def child_env(env: Optional[dict] = None) -> dict:
+    """Copy of env (default os.environ) carrying the current trace context."""
+    out = dict(os.environ if env is None else env)
+    tr = current()
+    if tr is not None:
+        out[ENV_KEY] = tr.to_ctx()
+    else:
+        out.pop(ENV_KEY, None)
+    return out
+
+
+def annotate(**attrs) -> None:
+    tr = current()
+    if tr is not None:
+        tr.attrs.update({k: v for k, v in attrs.items() if v not in (None, "")})
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as span `name` of the current trace (no-op without one)."""
+    tr = current()
+    if tr is None:
+        yield
+        return
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        try:
+            tr.add(name, (time.perf_counter() - t) * 1000.0)
+        except Exception:
+            pass
+
+
+def lap(name: str) -> None:
+    """Record the time since the previous span ended (or the trace started) as `name`."""
+    tr = current()
+    if tr is None:
+        return
+    try:
+        tr.add(name, max(0.0, (time.time() - tr.last) * 1000.0))
+    except Exception:
+        pass
+
+
+def has(name: str) -> bool:
+    tr = current()
+    return tr is not None and name in tr.spans
+
+
+def finish(outcome: str = "", keep: bool = True) -> None:
+    """Close the current trace. keep=False drops it (no e2e sample, no spans line)."""
+    tr = current()
+    if tr is None:
+        return
+    _CURRENT.set(None)
+    if tr.done:
+        return
+    tr.done = True
+    if not keep:
+        return
+    e2e = max(0.0, (time.time() - tr.t0) * 1000.0)
+    if not tr.remote:
+        record(f"{tr.kind}.e2e", e2e)
+    rec = {"ts": round(time.time(), 3), "trace": tr.id, "kind": tr.kind, "pid": os.getpid(),
+           "child": int(tr.remote), "outcome": outcome, "e2e_ms": round(e2e, 3), "spans": tr.spans}
+    rec.update(tr.attrs)
+    with _LOCK:
+        _PENDING.append(rec)
+
+
+# -----------------------------
+# rolling files
+# -----------------------------
+def _day(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.localtime(ts))
+
+
+def _append_lines(path: str, lines: List[str]) -> None:
+    if not lines:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.write("".join(lines))
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _prune(now: float) -> None:
+    if LATENCY_DUMP_KEEP_DAYS <= 0:
+        return
+    cutoff = _day(now - LATENCY_DUMP_KEEP_DAYS * 86400)
+    for p in glob.glob(os.path.join(LATENCY_DIR, "*-????????.jsonl")):
+        try:
+            if os.path.basename(p).rsplit("-", 1)[1][:8] < cutoff:
+                os.unlink(p)
+        except Exception:
+            pass
+
+
+def dump() -> None:
+    """Append histogram deltas + finished traces to today's files."""
+    global _last_dump
+    with _LOCK:
+        delta = {k: h.to_dict() for k, h in _DELTA.items() if h.n}
+        pending = list(_PENDING)
+        _DELTA.clear()
+        _PENDING.clear()
+        _last_dump = time.time()
+    if not delta and not pending:
+        return
+    now = time.time()
+    try:
+        os.makedirs(LATENCY_DIR, exist_ok=True)
+        day = _day(now)
+        if delta:
+            _append_lines(os.path.join(LATENCY_DIR, f"hist-{day}.jsonl"),
+                          [json.dumps({"ts": round(now, 3), "pid": os.getpid(), "h": delta}, separators=(",", ":")) + "\n"])
+        if pending:
+            _append_lines(os.path.join(LATENCY_DIR, f"spans-{day}.jsonl"),
+                          [json.dumps(r, separators=(",", ":"), default=str) + "\n" for r in pending])
+        _prune(now)
+    except Exception as e:
+        print(f"⚠️ latency dump failed: {e}", flush=True)
+
+
+def maybe_dump() -> None:
+    if time.time() - _last_dump >= LATENCY_DUMP_EVERY_S:
+        dump()
+
+
+def flush() -> None:
+    """Finish the current trace and dump now (call before os._exit).
+
+    A trace still open here is kept only if it got as far as sending a tx.
+    """
+    try:
+        finish(outcome="exit", keep=has("send"))
+        dump()
+    except Exception:
+        pass
+
+
+atexit.register(flush)
+
+
+# -----------------------------
+# aggregation / export
+# -----------------------------
+def aggregate(window_s: Optional[float] = None) -> Dict[str, Histogram]:
+    """Merge file deltas newer than window_s with this process' undumped samples."""
+    window_s = LATENCY_WINDOW_S if window_s is None else float(window_s)
+    now = time.time()
+    since = now - window_s
+    out: Dict[str, Histogram] = {}
+    days = sorted({_day(since), _day(now)})
+    for day in days:
+        try:
+            with open(os.path.join(LATENCY_DIR, f"hist-{day}.jsonl"), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except Exception:
+                        continue
+                    if float(rec.get("ts") or 0.0) < since:
+                        continue
+                    for k, d in (rec.get("h") or {}).items():
+                        out.setdefault(k, Histogram()).merge(d)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            pass
+    with _LOCK:
+        for k, h in _DELTA.items():
+            out.setdefault(k, Histogram()).merge(h.to_dict())
+    return out
+
+
+def summary(window_s: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    return {k: h.summary() for k, h in sorted(aggregate(window_s).items())}
+
+
+def prometheus(window_s: Optional[float] = None) -> str:
+    lines = ["# HELP lino_span_latency_ms Span latency over the rolling window (ms).",
+             "# TYPE lino_span_latency_ms summary"]
+    for k, h in sorted(aggregate(window_s).items()):
+        kind, _, name = k.partition(".")
+        lbl = f'kind="{kind}",span="{name}"'
+        for q in QUANTILES:
+            lines.append(f'lino_span_latency_ms{{{lbl},quantile="{q}"}} {h.quantile(q):.3f}')
+        lines.append(f"lino_span_latency_ms_sum{{{lbl}}} {h.sum:.3f}")
+        lines.append(f"lino_span_latency_ms_count{{{lbl}}} {h.n}")
+    # bounded caches of this process (size, hit rate, approx bytes)
+    from core import bounded_cache
+    return "\n".join(lines) + "\n" + bounded_cache.prometheus()
+
+
+def log_summary(prefix: str = "[latency]", window_s: Optional[float] = None) -> None:
+    for k, s in summary(window_s).items():
+        print(f"{prefix} {k} n={s['n']} p50={s['p50']:.0f}ms p90={s['p90']:.0f}ms p99={s['p99']:.0f}ms max={s['max']:.0f}ms",
+              flush=True)
+
+
+def maybe_log_summary() -> None:
+    """Periodic dump + one summary line per span (for long-running loops)."""
+    global _last_log
+    maybe_dump()
+    if LATENCY_LOG_EVERY_S <= 0 or time.time() - _last_log < LATENCY_LOG_EVERY_S:
+        return
+    _last_log = time.time()
+    try:
+        log_summary()
+    except Exception:
+        pass
+
+
+_SERVER = None
+
+
+def serve(port: Optional[int] = None, host: Optional[str] = None):
+    """Start the local metrics endpoint in a daemon thread (idempotent, None if disabled)."""
+    global _SERVER
+    port = LATENCY_METRICS_PORT if port is None else int(port)
+    if not LATENCY_TRACE or port <= 0:
+        return None
+    if _SERVER is not None:
+        return _SERVER
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            u = urlparse(self.path)
+            try:
+                w = float((parse_qs(u.query).get("window") or [LATENCY_WINDOW_S])[0])
+            except Exception:
+                w = LATENCY_WINDOW_S
+            if u.path == "/metrics":
+                body, ctype = prometheus(w).encode("utf-8"), "text/plain; version=0.0.4"
+            elif u.path == "/metrics.json":
+                from core import bounded_cache
+                body = json.dumps({"window_s": w, "spans": summary(w), "caches": bounded_cache.stats()},
+                                  indent=2).encode("utf-8")
+                ctype = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *a):
+            pass
+
+    try:
+        srv = ThreadingHTTPServer((host or LATENCY_METRICS_HOST, port), _Handler)
+    except Exception as e:
+        print(f"⚠️ latency metrics endpoint failed on {host or LATENCY_METRICS_HOST}:{port}: {e}", flush=True)
+        return None
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, name="latency-metrics", daemon=True).start()
+    _SERVER = srv
+    print(f"📊 latency metrics: http://{host or LATENCY_METRICS_HOST}:{port}/metrics (window={int(LATENCY_WINDOW_S)}s)", flush=True)
+    return srv
@@ -0,0 +1,361 @@
+"""
+Wallet liquidation engine (emergency flatten).
+
+- one batched pricing pass (Jupiter price v3, 50 ids per call) -> SOL value per holding
+- holdings sold by descending SOL value; DENY list + min-value threshold
+- bounded concurrency (threads); every quote goes through the shared
+  cross-process Jupiter limiter (core.jup_rate_limit)
+- route failures retried with a slippage ladder, then alternative DEX sets
+- live progress lines + final realized-value report (SOL delta read from
+  the landed transaction, not from the quote)
+
+Used by scripts/sell_all.py.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from solders.keypair import Keypair
+from solders.transaction import VersionedTransaction
+
+from core import http_pool
+from core.account_cleanup import Rpc, TokenAccount, confirm_many, list_token_accounts
+from core.jup_rate_limit import note_result, wait_for_slot
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+JUP_BASE = os.getenv("JUP_BASE_URL", "https://lite-api.jup.ag").rstrip("/")
+JUP_API_KEY = os.getenv("JUP_API_KEY", "").strip()
+JUP_TIMEOUT_S = float(os.getenv("JUP_TIMEOUT_S", "15"))
+# Jupiter's prioritizationFeeLamports is the TOTAL priority fee in lamports. LIQ_PRIORITY_FEE_LAMPORTS
+# sets it directly; otherwise a JUP_PRIORITY_FEE_MICROLAMPORTS price (micro-lamports per CU) is
+# converted over LIQ_SWAP_COMPUTE_UNITS.
+LIQ_SWAP_COMPUTE_UNITS = int(os.getenv("LIQ_SWAP_COMPUTE_UNITS", "300000"))
+PRIORITY_FEE_LAMPORTS = int(os.getenv("LIQ_PRIORITY_FEE_LAMPORTS", "0") or 0) or (
+    int(os.getenv("JUP_PRIORITY_FEE_MICROLAMPORTS", "0") or 0) * LIQ_SWAP_COMPUTE_UNITS // 1_000_000)
+
+
+def _headers() -> Dict[str, str]:
+    # same rule as core.jupiter_exec: key only for api.jup.ag
+    return {"x-api-key": JUP_API_KEY} if ("api.jup.ag" in JUP_BASE and JUP_API_KEY) else {}
+
+
+@dataclass
+class Holding:
+    mint: str
+    account: str
+    amount: int
+    ui: float
+    decimals: int
+    value_sol: Optional[float] = None
+
+
+@dataclass
+class SellResult:
+    mint: str
+    ok: bool = False
+    sig: Optional[str] = None
+    attempts: int = 0
+    slippage_bps: Optional[int] = None
+    dexes: Optional[str] = None
+    route: str = ""
+    expected_sol: float = 0.0
+    realized_sol: Optional[float] = None
+    value_sol: Optional[float] = None
+    err: Optional[str] = None
+    dt_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+# -----------------------------
+# pricing
+# -----------------------------
+def price_usd_many(mints: Sequence[str], session: Optional[requests.Session] = None, chunk: int = 50) -> Dict[str, float]:
+    """mint -> usdPrice via /price/v3 (max 50 ids per call). Missing mints are absent."""
+    s = session or http_pool.session()
+    out: Dict[str, float] = {}
+    uniq = list(dict.fromkeys(mints))
+    for i in range(0, len(uniq), chunk):
+        ids = uniq[i:i + chunk]
+        try:
+            r = s.get(f"{JUP_BASE}/price/v3", params={"ids": ",".join(ids)}, headers=_headers(), timeout=JUP_TIMEOUT_S)
+            if r.status_code != 200:
+                continue
+            j = r.json() or {}
+            data = j.get("data") if isinstance(j.get("data"), dict) else j
+            for m in ids:
+                p = (data.get(m) or {}).get("usdPrice") if isinstance(data.get(m), dict) else None
+                if p:
+                    out[m] = float(p)
+        except Exception:
+            continue
+    return out
+
+
+def price_holdings(holdings: List[Holding], session: Optional[requests.Session] = None) -> int:
+    """Fill value_sol in place (one batched pass). Returns the number priced."""
+    px = price_usd_many([SOL_MINT] + [h.mint for h in holdings], session=session)
+    sol_usd = px.get(SOL_MINT)
+    n = 0
+    for h in holdings:
+        p = px.get(h.mint)
+        if p and sol_usd:
+            h.value_sol = h.ui * p / sol_usd
+            n += 1
+    return n
+
+
+def plan(holdings: List[Holding], deny: Sequence[str] = (), min_value_sol: float = 0.0,
+         sell_unpriced: bool = True) -> Tuple[List[Holding], List[Tuple[Holding, str]]]:
+    """(ordered sell list, skipped with reason). Priced holdings by value desc, unpriced last by ui desc."""
+    deny_s = set(deny)
+    keep: List[Holding] = []
+    skipped: List[Tuple[Holding, str]] = []
+    for h in holdings:
+        if h.mint == SOL_MINT:
+            skipped.append((h, "SOL"))
+        elif h.mint in deny_s:
+            skipped.append((h, "DENY"))
+        elif h.value_sol is None and not sell_unpriced:
+            skipped.append((h, "UNPRICED"))
+        elif h.value_sol is not None and h.value_sol < min_value_sol:
+            skipped.append((h, f"VALUE<{min_value_sol:g}"))
+        else:
+            keep.append(h)
+    keep.sort(key=lambda h: (h.value_sol is None, -(h.value_sol or 0.0), -h.ui))
+    return keep, skipped
+
+
+# -----------------------------
+# engine
+# -----------------------------
+class Liquidator:
+    def __init__(
+        self,
+        rpc: Rpc,
+        kp: Keypair,
+        *,
+        slippage_ladder_bps: Sequence[int] = (600,),
+        dex_sets: Sequence[str] = (),
+        concurrency: int = 4,
+        dry_run: bool = True,
+        confirm_timeout_s: float = 60.0,
+        log: Callable[[str], None] = print,
+    ):
+        self.rpc = rpc
+        self.kp = kp
+        self.owner = str(kp.pubkey())
+        self.ladder = [int(x) for x in slippage_ladder_bps] or [600]
+        self.dex_sets = [d for d in dex_sets if d]
+        self.concurrency = max(1, int(concurrency))
+        self.dry_run = bool(dry_run)
+        self.confirm_timeout_s = float(confirm_timeout_s)
+        self.log = log
+        self._lock = threading.Lock()
+        self.done = 0
+        self.ok = 0
+        self.realized_sol = 0.0
+        self.expected_sol = 0.0
+
+    def _session(self) -> requests.Session:
+        return http_pool.session()
+
+    def attempts(self) -> List[Tuple[int, Optional[str]]]:
+        """Slippage ladder on any route, then each alternative DEX set at the widest slippage."""
+        out: List[Tuple[int, Optional[str]]] = [(b, None) for b in self.ladder]
+        out += [(self.ladder[-1], d) for d in self.dex_sets]
+        return out
+
+    # ---- jupiter ----
+    def _quote(self, mint: str, amount: int, slippage_bps: int, dexes: Optional[str]) -> Dict[str, Any]:
+        params = {"inputMint": mint, "outputMint": SOL_MINT, "amount": str(int(amount)), "slippageBps": str(int(slippage_bps))}
+        if dexes:
+            params["dexes"] = dexes
+        try:
+            wait_for_slot()
+        except Exception:
+            pass
+        r = self._session().get(f"{JUP_BASE}/swap/v1/quote", params=params, headers=_headers(), timeout=JUP_TIMEOUT_S)
+        try:
+            note_result(r.status_code == 200, was_429=(r.status_code == 429))
+        except Exception:
+            pass
+        if r.status_code != 200:
+            raise RuntimeError(f"quote_http={r.status_code} {r.text[:160]}")
+        q = r.json()
+        if not q or not q.get("outAmount"):
+            raise RuntimeError("quote_no_route")
+        return q
+
+    def _swap_tx(self, quote: Dict[str, Any]) -> str:
+        body: Dict[str, Any] = {"quoteResponse": quote, "userPublicKey": self.owner, "wrapAndUnwrapSol": True}
+        if PRIORITY_FEE_LAMPORTS > 0:
+            body["prioritizationFeeLamports"] = PRIORITY_FEE_LAMPORTS
+        r = self._session().post(f"{JUP_BASE}/swap/v1/swap", json=body, headers=_headers(), timeout=JUP_TIMEOUT_S)
+        if r.status_code != 200:
+            raise RuntimeError(f"swap_http={r.status_code} {r.text[:160]}")
+        txb64 = (r.json() or {}).get("swapTransaction")
+        if not txb64:
+            raise RuntimeError("swap_no_tx")
+        return txb64
+
+    def _send(self, txb64: str) -> str:
+        vtx = VersionedTransaction.from_bytes(base64.b64decode(txb64))
+        vtx = VersionedTransaction(vtx.message, [self.kp])
+        raw64 = base64.b64encode(bytes(vtx)).decode("ascii")
+        return str(self.rpc.call("sendTransaction", [raw64, {"encoding": "base64", "skipPreflight": False, "preflightCommitment": "processed"}]))
+
+    def _realized_sol(self, sig: str) -> Optional[float]:
+        """Owner SOL delta of the landed tx (fee included)."""
+        try:
+            tx = self.rpc.call("getTransaction", [sig, {"encoding": "json", "commitment": "confirmed", "maxSupportedTransactionVersion": 0}])
+            meta = (tx or {}).get("meta") or {}
+            pre, post = meta.get("preBalances") or [], meta.get("postBalances") or []
+            if pre and post:
+                return (int(post[0]) - int(pre[0])) / 1e9
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def _route(q: Dict[str, Any]) -> str:
+        try:
+            return " > ".join((x.get("swapInfo") or {}).get("label", "?") for x in (q.get("routePlan") or [])[:5])
+        except Exception:
+            return ""
+
+    # ---- one holding ----
+    def sell_one(self, h: Holding) -> SellResult:
+        t0 = time.time()
+        res = SellResult(mint=h.mint, value_sol=h.value_sol)
+        for slip, dexes in self.attempts():
+            res.attempts += 1
+            res.slippage_bps, res.dexes = slip, dexes
+            try:
+                q = self._quote(h.mint, h.amount, slip, dexes)
+                res.route = self._route(q)
+                res.expected_sol = int(q.get("outAmount") or 0) / 1e9
+                txb64 = self._swap_tx(q)
+                if self.dry_run:
+                    res.ok, res.err = True, None
+                    break
+                sig = self._send(txb64)
+                st = confirm_many(self.rpc, [sig], timeout_s=self.confirm_timeout_s).get(sig)
+                res.sig = sig
+                if st is True:
+                    res.ok, res.err = True, None
+                    res.realized_sol = self._realized_sol(sig)
+                    break
+                if st is None:
+                    # may still land: never resend on top of it
+                    res.err = "tx_unconfirmed"
+                    res.errors.append(f"slip={slip} dexes={dexes or '*'} tx_unconfirmed")
+                    break
+                raise RuntimeError("tx_failed")
+            except Exception as e:
+                res.err = str(e)[:200]
+                res.errors.append(f"slip={slip} dexes={dexes or '*'} {res.err}")
+        res.dt_s = round(time.time() - t0, 2)
+        return res
+
+    def _progress(self, total: int, res: SellResult) -> None:
+        with self._lock:
+            self.done += 1
+            if res.ok:
+                self.ok += 1
+                self.expected_sol += res.expected_sol
+                self.realized_sol += res.realized_sol or 0.0
+            done, ok, exp, real = self.done, self.ok, self.expected_sol, self.realized_sol
+        v = f"{res.value_sol:.4f}" if res.value_sol is not None else "?"
+        tag = "OK" if res.ok else "FAIL"
+        self.log(f"[{done}/{total}] {tag} mint={res.mint} value~{v} exp={res.expected_sol:.6f} "
+                 f"real={res.realized_sol if res.realized_sol is not None else '-'} slip={res.slippage_bps} "
+                 f"tries={res.attempts} dt={res.dt_s}s sig={res.sig or '-'}"
+                 + (f" err={res.err}" if not res.ok else "")
+                 + f" | ok={ok} expected_total={exp:.6f} realized_total={real:.6f}")
+
+    def run(self, holdings: Sequence[Holding]) -> List[SellResult]:
+        total = len(holdings)
+        results: List[SellResult] = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            # submit in value order: the biggest bags start first
+            futs = [pool.submit(self.sell_one, h) for h in holdings]
+            for f in as_completed(futs):
+                try:
+                    r = f.result()
+                except Exception as e:
+                    r = SellResult(mint="?", err=str(e)[:200])
+                self._progress(total, r)
+                results.append(r)
+        order = {h.mint: i for i, h in enumerate(holdings)}
+        results.sort(key=lambda r: order.get(r.mint, total))
+        return results
+
+
+def holdings_from_accounts(accounts: Sequence[TokenAccount], min_ui: float = 0.0) -> List[Holding]:
+    """One Holding per mint (balances of all its token accounts summed), so a mint is sold once.
+    .account is the account with the largest balance."""
+    by_mint: Dict[str, Holding] = {}
+    top: Dict[str, int] = {}
+    for a in accounts:
+        if a.amount <= 0:
+            continue
+        h = by_mint.get(a.mint)
+        if h is None:
+            by_mint[a.mint] = Holding(a.mint, a.pubkey, a.amount, a.ui, a.decimals)
+            top[a.mint] = a.amount
+            continue
+        h.amount += a.amount
+        h.ui += a.ui
+        if a.amount > top[a.mint]:
+            h.account, top[a.mint] = a.pubkey, a.amount
+    return [h for h in by_mint.values() if h.ui > min_ui]
+
+
+def report(results: Sequence[SellResult], skipped: Sequence[Tuple[Holding, str]], path: Optional[str] = None) -> Dict[str, Any]:
+    ok = [r for r in results if r.ok]
+    rep = {
+        "ts": time.time(),
+        "sold": len(ok),
+        "failed": len(results) - len(ok),
+        "skipped": len(skipped),
+        "value_sol_est": round(sum(r.value_sol or 0.0 for r in ok), 9),
+        "expected_sol": round(sum(r.expected_sol for r in ok), 9),
+        "realized_sol": round(sum(r.realized_sol or 0.0 for r in ok), 9),
+        "results": [asdict(r) for r in results],
+        "skipped_list": [{"mint": h.mint, "ui": h.ui, "value_sol": h.value_sol, "reason": why} for h, why in skipped],
+    }
+    if path:
+        try:
+            d = os.path.dirname(path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rep, f, indent=2)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[LIQ] report write failed: {e}", flush=True)
+    return rep
+
+
+def liquidate_wallet(rpc: Rpc, kp: Keypair, *, deny: Sequence[str] = (), min_ui: float = 0.0,
+                     min_value_sol: float = 0.0, sell_unpriced: bool = True, **kw) -> Tuple[List[SellResult], List[Tuple[Holding, str]]]:
+    owner = str(kp.pubkey())
+    holdings = holdings_from_accounts(list_token_accounts(rpc, owner), min_ui=min_ui)
+    priced = price_holdings(holdings)
+    todo, skipped = plan(holdings, deny=deny, min_value_sol=min_value_sol, sell_unpriced=sell_unpriced)
+    log = kw.get("log", print)
+    log(f"[LIQ] holdings={len(holdings)} priced={priced} to_sell={len(todo)} skipped={len(skipped)} "
+        f"value_est={sum(h.value_sol or 0.0 for h in todo):.6f} SOL")
+    for h, why in skipped:
+        log(f"[LIQ] skip mint={h.mint} ui={h.ui} value={h.value_sol} reason={why}")
+    return Liquidator(rpc, kp, **kw).run(todo), skipped
@@ -0,0 +1,400 @@
+"""
+Local quote engine: prices and exact-in quotes computed from pool state.
+
+Reads pool accounts with getMultipleAccounts (base64) and applies the
+constant-product formula with the pool fee:
+  - pump.fun bonding curve (virtual SOL / token reserves)
+  - Raydium AMM v4 (vault balances minus pending PnL)
+  - Raydium CPMM (vault balances minus protocol/fund fees)
+
+Used for monitoring and sizing (SellEngine price feed, drift checks) so
+those paths need no Jupiter/DexScreener call; remote quotes stay the
+source of truth at execution time, where `cross_check` flags drift.
+"""
+from __future__ import annotations
+
+import base64
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from core import http_pool
+
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+PUMPFUN_PROGRAM_ID = os.getenv("PUMPFUN_PROGRAM_ID", "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+RAYDIUM_AMM_V4_PROGRAM_ID = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+RAYDIUM_CPMM_PROGRAM_ID = "CPMMoo8L3F4NbTegBCKVNunggL7H1ZpdTHKxQB5qKP1C"
+
+KIND_PUMP = "pumpfun"
+KIND_AMM_V4 = "raydium_amm_v4"
+KIND_CPMM = "raydium_cpmm"
+_KIND_BY_OWNER = {
+    PUMPFUN_PROGRAM_ID: KIND_PUMP,
+    RAYDIUM_AMM_V4_PROGRAM_ID: KIND_AMM_V4,
+    RAYDIUM_CPMM_PROGRAM_ID: KIND_CPMM,
+}
+
+LOCAL_QUOTE_TTL_S = float(os.getenv("LOCAL_QUOTE_TTL_S", "5"))
+LOCAL_QUOTE_TIMEOUT_S = float(os.getenv("LOCAL_QUOTE_TIMEOUT_S", "6"))
+LOCAL_QUOTE_DRIFT_BPS = float(os.getenv("LOCAL_QUOTE_DRIFT_BPS", "150"))
+PUMP_FEE_BPS = int(os.getenv("PUMP_FEE_BPS", "100"))
+CPMM_FEE_BPS = int(os.getenv("CPMM_FEE_BPS", "25"))
+PUMP_DECIMALS = 6
+
+_MAX_KEYS = 100  # getMultipleAccounts limit
+
+_U64 = struct.Struct("<Q")
+
+
+# -----------------------------
+# math
+# -----------------------------
+def cp_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = 0) -> int:
+    """Constant product exact-in with the fee taken on input (Raydium style)."""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    net = amount_in * (10_000 - int(fee_bps)) // 10_000
+    return reserve_out * net // (reserve_in + net)
+
+
+def drift_bps(local: float, remote: float) -> float:
+    if remote <= 0:
+        return float("inf") if local > 0 else 0.0
+    return (local - remote) / remote * 10_000.0
+
+
+# -----------------------------
+# base58 (pool account fields are raw 32-byte keys)
+# -----------------------------
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def b58encode(b: bytes) -> str:
+    n = int.from_bytes(b, "big")
+    out = []
+    while n > 0:
+        n, r = divmod(n, 58)
+        out.append(_B58[r])
+    pad = len(b) - len(b.lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(out))
+
+
+def _key(data: bytes, off: int) -> str:
+    return b58encode(data[off:off + 32])
+
+
+def _u64(data: bytes, off: int) -> int:
+    return _U64.unpack_from(data, off)[0]
+
+
+def pump_curve_address(mint: str) -> Optional[str]:
+    """Bonding-curve PDA for a pump.fun mint (needs solders; None without it)."""
+    try:
+        from solders.pubkey import Pubkey
+    except Exception:
+        return None
+    try:
+        pda, _ = Pubkey.find_program_address(
+            [b"bonding-curve", bytes(Pubkey.from_string(mint))],
+            Pubkey.from_string(PUMPFUN_PROGRAM_ID),
+        )
+        return str(pda)
+    except Exception:
+        return None
+
+
+# -----------------------------
+# pool state
+# -----------------------------
+@dataclass
+class PoolState:
+    kind: str
+    address: str
+    mint: str              # the token we price
+    token_reserve: int     # base units
+    sol_reserve: int       # lamports
+    token_decimals: int
+    fee_bps: int
+    ts: float
+    complete: bool = False  # pump.fun curve migrated
+
+    def price_sol(self) -> float:
+        """SOL per 1 UI token at the margin."""
+        if self.token_reserve <= 0:
+            return 0.0
+        return (self.sol_reserve / 1e9) / (self.token_reserve / (10 ** self.token_decimals))
+
+    def quote_exact_in(self, amount_in: int, side: str) -> int:
+        """side='buy': lamports in -> token base units out; side='sell': token in -> lamports out."""
+        if self.kind == KIND_PUMP:
+            # pump.fun charges its fee in SOL: on input for buys, on output for sells
+            if side == "buy":
+                return cp_out(amount_in, self.sol_reserve, self.token_reserve, self.fee_bps)
+            gross = cp_out(amount_in, self.token_reserve, self.sol_reserve, 0)
+            return gross * (10_000 - self.fee_bps) // 10_000
+        if side == "buy":
+            return cp_out(amount_in, self.sol_reserve, self.token_reserve, self.fee_bps)
+        return cp_out(amount_in, self.token_reserve, self.sol_reserve, self.fee_bps)
+
+
+def decode_pump_curve(mint: str, address: str, data: bytes, now: float) -> Optional[PoolState]:
+    # disc[8] virtual_token u64, virtual_sol u64, real_token u64, real_sol u64, total_supply u64, complete bool
+    if len(data) < 49:
+        return None
+    return PoolState(
+        kind=KIND_PUMP,
+        address=address,
+        mint=mint,
+        token_reserve=_u64(data, 8),
+        sol_reserve=_u64(data, 16),
+        token_decimals=PUMP_DECIMALS,
+        fee_bps=PUMP_FEE_BPS,
+        ts=now,
+        complete=bool(data[48]),
+    )
+
+
+def decode_amm_v4(data: bytes) -> Optional[Dict[str, Any]]:
+    # LIQUIDITY_STATE_LAYOUT_V4 (752 bytes)
+    if len(data) < 752:
+        return None
+    return {
+        "base_decimals": _u64(data, 32),
+        "quote_decimals": _u64(data, 40),
+        "fee_num": _u64(data, 176),
+        "fee_den": _u64(data, 184),
+        "base_pnl": _u64(data, 192),
+        "quote_pnl": _u64(data, 200),
+        "base_vault": _key(data, 336),
+        "quote_vault": _key(data, 368),
+        "base_mint": _key(data, 400),
+        "quote_mint": _key(data, 432),
+    }
+
+
+def decode_cpmm(data: bytes) -> Optional[Dict[str, Any]]:
+    # cp-swap PoolState: disc[8], amm_config, creator, vault0, vault1, lp_mint, mint0, mint1, ...
+    if len(data) < 373:
+        return None
+    return {
+        "base_vault": _key(data, 72),
+        "quote_vault": _key(data, 104),
+        "base_mint": _key(data, 168),
+        "quote_mint": _key(data, 200),
+        "base_decimals": data[331],
+        "quote_decimals": data[332],
+        "base_pnl": _u64(data, 341) + _u64(data, 357),   # protocol + fund fees sit in the vault
+        "quote_pnl": _u64(data, 349) + _u64(data, 365),
+        "fee_num": CPMM_FEE_BPS,
+        "fee_den": 10_000,
+    }
+
+
+# -----------------------------
+# engine
+# -----------------------------
+class LocalQuoteEngine:
+    """
+    mint -> pool registry + cached PoolState.
+    Pools are registered explicitly (e.g. DexScreener pairAddress) or, for
+    pump.fun, derived from the mint. The pool kind is inferred from the
+    account owner, so register() only needs an address.
+    """
+
+    def __init__(self, rpc_url: Optional[str] = None, ttl_s: float = LOCAL_QUOTE_TTL_S, session: Optional[requests.Session] = None):
+        self.rpc_url = rpc_url or os.getenv("LOCAL_QUOTE_RPC") or os.getenv("SOLANA_RPC_HTTP") or os.getenv("RPC_HTTP") or "https://api.mainnet-beta.solana.com"
+        self.ttl_s = float(ttl_s)
+        self._s = session or http_pool.session()
+        self._lock = threading.Lock()
+        self._pools: Dict[str, str] = {}            # mint -> pool address
+        self._state: Dict[str, PoolState] = {}      # mint -> last decoded state
+        self._dead: Dict[str, float] = {}           # mint -> ts (no usable pool)
+        self.stats = {"rpc_calls": 0, "accounts": 0, "hits": 0, "misses": 0, "drift_flags": 0}
+
+    # ---- registry ----
+    def register(self, mint: str, pool_address: str) -> None:
+        if mint and pool_address:
+            with self._lock:
+                self._pools[mint] = pool_address
+                self._dead.pop(mint, None)
+
+    def register_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Register pools from ready/enriched rows (mint + pair_address/pairAddress)."""
+        n = 0
+        for r in rows or ():
+            mint = str(r.get("mint") or r.get("outputMint") or "").strip()
+            pair = str(r.get("pair_address") or r.get("pairAddress") or "").strip()
+            if mint and pair:
+                self.register(mint, pair)
+                n += 1
+        return n
+
+    # ---- rpc ----
+    def _get_multiple(self, keys: List[str]) -> List[Optional[Tuple[str, bytes]]]:
+        """[(owner, data)|None] aligned with keys."""
+        out: List[Optional[Tuple[str, bytes]]] = []
+        for i in range(0, len(keys), _MAX_KEYS):
+            chunk = keys[i:i + _MAX_KEYS]
+            body = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getMultipleAccounts",
+                "params": [chunk, {"encoding": "base64", "commitment": "processed"}],
+            }
+            self.stats["rpc_calls"] += 1
+            r = self._s.post(self.rpc_url, json=body, timeout=LOCAL_QUOTE_TIMEOUT_S)
+            r.raise_for_status()
+            j = r.json()
+            if j.get("error"):
+                raise RuntimeError(f"getMultipleAccounts error: {j['error']}")
+            vals = ((j.get("result") or {}).get("value") or [None] * len(chunk))
+            for v in vals:
+                if not v:
+                    out.append(None)
+                    continue
+                d = (v.get("data") or [""])[0]
+                out.append((v.get("owner") or "", base64.b64decode(d) if d else b""))
+        self.stats["accounts"] += len(keys)
+        return out
+
+    # ---- refresh ----
+    def refresh(self, mints: Iterable[str]) -> int:
+        """Re-read pool state for `mints` in two batched RPC round trips. Returns #states updated."""
+        now = time.time()
+        want: Dict[str, str] = {}
+        for m in dict.fromkeys(mints):
+            if not m or m == WSOL_MINT:
+                continue
+            if now - self._dead.get(m, 0.0) < 60.0:
+                continue
+            addr = self._pools.get(m) or pump_curve_address(m)
+            if addr:
+                want[m] = addr
+        if not want:
+            return 0
+
+        mints_l = list(want)
+        pools = self._get_multiple([want[m] for m in mints_l])
+
+        updated: Dict[str, PoolState] = {}
+        vault_jobs: List[Tuple[str, Dict[str, Any], str, int]] = []  # (mint, decoded, kind, fee_bps)
+        for m, acc in zip(mints_l, pools):
+            if acc is None:
+                self._dead[m] = now
+                continue
+            owner, data = acc
+            kind = _KIND_BY_OWNER.get(owner)
+            if kind == KIND_PUMP:
+                st = decode_pump_curve(m, want[m], data, now)
+                if st is None or st.complete:
+                    self._dead[m] = now  # migrated: needs a registered AMM pool
+                    continue
+                updated[m] = st
+            elif kind in (KIND_AMM_V4, KIND_CPMM):
+                dec = decode_amm_v4(data) if kind == KIND_AMM_V4 else decode_cpmm(data)
+                if dec is None or WSOL_MINT not in (dec["base_mint"], dec["quote_mint"]):
+                    self._dead[m] = now
+                    continue
+                fee_bps = int(dec["fee_num"] * 10_000 // max(1, dec["fee_den"]))
+                vault_jobs.append((m, dec, kind, fee_bps))
+            else:
+                self._dead[m] = now
+
+        if vault_jobs:
+            vkeys: List[str] = []
+            for _, dec, _, _ in vault_jobs:
+                vkeys += [dec["base_vault"], dec["quote_vault"]]
+            vaults = self._get_multiple(vkeys)
+            for j, (m, dec, kind, fee_bps) in enumerate(vault_jobs):
+                b, q = vaults[2 * j], vaults[2 * j + 1]
+                if b is None or q is None or len(b[1]) < 72 or len(q[1]) < 72:
+                    continue
+                base_res = max(0, _u64(b[1], 64) - dec["base_pnl"])
+                quote_res = max(0, _u64(q[1], 64) - dec["quote_pnl"])
+                if dec["quote_mint"] == WSOL_MINT:
+                    tok_res, sol_res, tok_dec = base_res, quote_res, int(dec["base_decimals"])
+                else:
+                    tok_res, sol_res, tok_dec = quote_res, base_res, int(dec["quote_decimals"])
+                updated[m] = PoolState(kind, want[m], m, tok_res, sol_res, tok_dec, fee_bps, now)
+
+        with self._lock:
+            self._state.update(updated)
+        return len(updated)
+
+    def state(self, mint: str, max_age_s: Optional[float] = None) -> Optional[PoolState]:
+        ttl = self.ttl_s if max_age_s is None else float(max_age_s)
+        st = self._state.get(mint)
+        if st is not None and time.time() - st.ts < ttl:
+            self.stats["hits"] += 1
+            return st
+        self.stats["misses"] += 1
+        try:
+            self.refresh([mint])
+        except Exception as e:
+            print(f"[LOCAL_QUOTE] refresh failed mint={mint} err={type(e).__name__}:{e}", flush=True)
+            return None
+        return self._state.get(mint)
+
+    # ---- quotes ----
+    def price_sol(self, mint: str) -> Optional[float]:
+        st = self.state(mint)
+        p = st.price_sol() if st is not None else 0.0
+        return p if p > 0 else None
+
+    def get_price(self, mint: str) -> Optional[float]:
+        """
+        Price feed interface. Same definition as DexScreenerPriceFeed: SOL
+        received per token when selling PRICE_QUOTE_TOKENS (fees + impact
+        included), so SL/TP thresholds keep their meaning.
+        """
+        st = self.state(mint)
+        if st is None:
+            return None
+        tokens_q = max(1.0, float(os.getenv("PRICE_QUOTE_TOKENS", "10000") or "10000"))
+        out = st.quote_exact_in(int(tokens_q * (10 ** st.token_decimals)), "sell")
+        return (out / 1e9) / tokens_q if out > 0 else None
+
+    def quote_exact_in(self, mint: str, amount_in: int, side: str = "sell") -> Optional[int]:
+        st = self.state(mint)
+        if st is None:
+            return None
+        return st.quote_exact_in(int(amount_in), side)
+
+    def cross_check(self, mint: str, side: str, amount_in: int, remote_out: int, tag: str = "") -> Optional[float]:
+        """Compare a remote (execution) quote with the local one; flag when |drift| > LOCAL_QUOTE_DRIFT_BPS."""
+        local = self.quote_exact_in(mint, amount_in, side)
+        if not local or not remote_out:
+            return None
+        d = drift_bps(float(local), float(remote_out))
+        if abs(d) > LOCAL_QUOTE_DRIFT_BPS:
+            self.stats["drift_flags"] += 1
+            print(
+                f"[LOCAL_QUOTE][DRIFT] {tag} mint={mint} side={side} in={amount_in} "
+                f"local_out={local} remote_out={remote_out} drift_bps={d:.0f}",
+                flush=True,
+            )
+        return d
+
+
+class LocalFirstPriceFeed:
+    """get_price() from pool state, falling back to a remote feed when the pool is unknown."""
+
+    def __init__(self, local: LocalQuoteEngine, remote: Any = None):
+        self.local = local
+        self.remote = remote
+        self.stats = {"local": 0, "remote": 0}
+
+    def get_price(self, mint: str) -> Optional[float]:
+        p = self.local.get_price(mint)
+        if p:
+            self.stats["local"] += 1
+            return p
+        if self.remote is None:
+            return None
+        self.stats["remote"] += 1
+        return self.remote.get_price(mint)
@@ -1,7 +1,9 @@
 # /home/tng25/lino/core/logger.py
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 _LOGGER = None
 
@@ -22,21 +24,35 @@ def get_logger(name: str = "lino") -> logging.Logger:
 
     fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 
+    handlers = []
+
     # Console handler
     ch = logging.StreamHandler()
     ch.setFormatter(fmt)
-    logger.addHandler(ch)
+    handlers.append(ch)
 
     # File handler (optionnel)
     log_path = os.getenv("LOG_FILE", "/home/tng25/lino/lino.log")
     try:
         fh = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=3)
         fh.setFormatter(fmt)
-        logger.addHandler(fh)
+        handlers.append(fh)
     except Exception:
         # si le fichier n'est pas accessible, on continue en console
         pass
 
+    # LOG_ASYNC=1: le thread appelant ne fait qu'un put() ; console + fichier
+    # sont écrits par un QueueListener en arrière-plan
+    if os.getenv("LOG_ASYNC", "1").strip().lower() in ("1", "true", "yes", "on"):
+        q = queue.Queue(-1)
+        listener = QueueListener(q, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(QueueHandler(q))
+    else:
+        for h in handlers:
+            logger.addHandler(h)
+
     _LOGGER = logger
     return logger
 
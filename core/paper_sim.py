@@ -0,0 +1,379 @@
+"""
+Discrete-event paper trading over recorded ticks (core.tick_store), with
+core.sim_executor fills.
+
+Re-trades a recorded period under other settings, much faster than real
+time. The clock is driven the way src/run_live.py drives the live loop:
+
+  every loop (t):
+    1. SellEngine.run_once: open positions one after the other; each sees the
+       last tick at or before the current sim time, goes through
+       core.backtest.decide_exit (same branches as _handle_one_decide) and, on
+       an exit, sells through SimExecutor. The sell is sequential, so the
+       clock moves by the sampled latency before the next position is looked at.
+    2. trader_loop ONE_SHOT: at most one buy, the best candidate seen by the
+       scanner in the last cand_ttl_s that passes the entry filters, is not
+       open, not RL_SKIP'd, not in BUY_COOLDOWN_S.
+    3. t = clock + step_s (LOOP_SLEEP_S)
+
+Candidate flow = the "scanner" ticks (TokenScanner overviews: price, liquidity,
+volume, mcap). Failures follow the live cooldowns: buy quote 429 / no route ->
+RL_SKIP_SEC on that mint, sell 429 -> SELL_429_COOLDOWN_SEC, sell no route ->
+SELL_ROUTE_FAIL_COOLDOWN_SEC; failed landings retry next loop.
+
+run_many() replays several SimConfigs over one loaded Market; every run uses
+the same seed, so settings are compared on the same latency / failure draws
+(common random numbers). CLI: scripts/paper_sim.py.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core import tick_store
+from core.backtest import ALL, BACKTEST_MAX_GAP_S, ExitParams, decide_exit
+from core.sim_executor import PAPER_SIM_SEED, PAPER_SIM_SOL_USD, LatencyModel, SimExecutor
+
+PAPER_SIM_SOURCES = tuple(s for s in os.getenv("PAPER_SIM_SOURCES", "scanner").split(",") if s)
+PAPER_SIM_CAND_SOURCES = tuple(s for s in os.getenv("PAPER_SIM_CAND_SOURCES", "scanner").split(",") if s)
+PAPER_SIM_STEP_S = float(os.getenv("PAPER_SIM_STEP_S", os.getenv("LOOP_SLEEP_S", "10")))
+PAPER_SIM_BUY_SOL = float(os.getenv("PAPER_SIM_BUY_SOL", os.getenv("BUY_AMOUNT_SOL", "0.01")))
+PAPER_SIM_MAX_OPEN = int(os.getenv("PAPER_SIM_MAX_OPEN", "5"))
+PAPER_SIM_CAND_TTL_S = float(os.getenv("PAPER_SIM_CAND_TTL_S", "120"))
+PAPER_SIM_RANK = os.getenv("PAPER_SIM_RANK", "vol_m5")  # vol_m5 | vol_h1 | liq_usd | turnover
+
+RL_SKIP_SEC = float(os.getenv("RL_SKIP_SEC", "180"))
+BUY_COOLDOWN_S = float(os.getenv("BUY_COOLDOWN_S", "3600"))
+SELL_429_COOLDOWN_SEC = float(os.getenv("SELL_429_COOLDOWN_SEC", "90"))
+SELL_ROUTE_FAIL_COOLDOWN_SEC = float(os.getenv("SELL_ROUTE_FAIL_COOLDOWN_SEC", "2700"))
+
+
+# -----------------------------
+# market
+# -----------------------------
+class _Series:
+    __slots__ = ("ts", "price", "liq", "sol_usd")
+
+    def __init__(self):
+        self.ts: List[float] = []
+        self.price: List[float] = []
+        self.liq: List[float] = []
+        self.sol_usd: List[float] = []
+
+
+class Market:
+    """
+    Recorded ticks of [t0, t1], per mint, forward-filled: price_at / liq_at return what
+    the last tick at or before t said (nan once the mint has been silent max_gap_s).
+    """
+
+    def __init__(self, t0: float, t1: float, sources: Sequence[str] = PAPER_SIM_SOURCES,
+                 cand_sources: Sequence[str] = PAPER_SIM_CAND_SOURCES, max_gap_s: float = BACKTEST_MAX_GAP_S,
+                 tick_dir: Optional[str] = None):
+        self.t0, self.t1, self.max_gap_s = float(t0), float(t1), float(max_gap_s)
+        self.series: Dict[str, _Series] = {}
+        # candidate flow, time ordered: (ts, mint, liq_usd, vol_m5, vol_h1, mcap)
+        self.flow: List[Tuple[float, str, float, float, float, float]] = []
+        self.flow_ts: List[float] = []
+        cols = ("mint", "src", "price", "price_usd", "liq_usd", "vol_m5", "vol_h1", "mcap")
+        want_px, want_cand = set(sources), set(cand_sources)
+        r = tick_store.scan(t0=t0, t1=t1, sources=sorted(want_px | want_cand), columns=cols, base=tick_dir)
+        for ts, mint, src, px, pu, liq, v5, vh, mc in zip(*(_as_list(r[c]) for c in ("ts",) + cols)):
+            if src in want_cand:
+                self.flow.append((ts, mint, liq, v5, vh, mc))
+            if src not in want_px or not (px > 0):
+                continue
+            s = self.series.get(mint)
+            if s is None:
+                s = self.series[mint] = _Series()
+            sol_usd = pu / px if pu == pu and pu > 0 else (s.sol_usd[-1] if s.sol_usd else PAPER_SIM_SOL_USD)
+            lq = liq if liq == liq else (s.liq[-1] if s.liq else math.nan)
+            s.ts.append(ts)
+            s.price.append(px)
+            s.liq.append(lq)
+            s.sol_usd.append(sol_usd)
+        self.flow_ts = [f[0] for f in self.flow]
+
+    @property
+    def ticks(self) -> int:
+        return sum(len(s.ts) for s in self.series.values())
+
+    def _idx(self, mint: str, t: float) -> Tuple[Optional[_Series], int]:
+        s = self.series.get(mint)
+        if s is None:
+            return None, -1
+        i = bisect.bisect_right(s.ts, t) - 1
+        if i < 0 or t - s.ts[i] > self.max_gap_s:
+            return s, -1
+        return s, i
+
+    def price_at(self, mint: str, t: float) -> float:
+        s, i = self._idx(mint, t)
+        return s.price[i] if i >= 0 else math.nan
+
+    def liq_at(self, mint: str, t: float) -> Tuple[float, float]:
+        s, i = self._idx(mint, t)
+        if i < 0:
+            return 0.0, PAPER_SIM_SOL_USD
+        lq = s.liq[i]
+        return (lq if lq == lq else 0.0), s.sol_usd[i]
+
+
+def _as_list(v) -> list:
+    return v.tolist() if hasattr(v, "tolist") else list(v)
+
+
+# -----------------------------
+# config / state
+# -----------------------------
+@dataclass(frozen=True)
+class SimConfig:
+    name: str = "base"
+    exit: ExitParams = field(default_factory=ExitParams.from_env)
+    buy_sol: float = PAPER_SIM_BUY_SOL
+    max_open: int = PAPER_SIM_MAX_OPEN
+    step_s: float = PAPER_SIM_STEP_S
+    cand_ttl_s: float = PAPER_SIM_CAND_TTL_S
+    rank: str = PAPER_SIM_RANK
+    min_liq_usd: float = 15000.0
+    min_vol_m5: float = 3000.0
+    max_mcap_usd: float = 0.0  # 0 = no cap
+    rl_skip_s: float = RL_SKIP_SEC
+    buy_cooldown_s: float = BUY_COOLDOWN_S
+    sell_429_cooldown_s: float = SELL_429_COOLDOWN_SEC
+    sell_route_fail_cooldown_s: float = SELL_ROUTE_FAIL_COOLDOWN_SEC
+    time_stop_sells: bool = False
+    latency_scale: float = 1.0
+    slippage_bps: Optional[int] = None       # None = SimExecutor default
+    sell_slippage_bps: Optional[int] = None
+    rate_429: Optional[float] = None
+    rate_no_route: Optional[float] = None
+    rate_land_fail: Optional[float] = None
+
+
+CONFIG_NAMES = tuple(f for f in SimConfig.__dataclass_fields__ if f not in ("name", "exit"))
+
+
+def parse_overrides(spec: str, base: SimConfig) -> SimConfig:
+    """"tp1_pct=0.4,min_liq_usd=20000" -> base with SimConfig or ExitParams fields replaced."""
+    sim_kw: Dict[str, Any] = {}
+    exit_kw: Dict[str, float] = {}
+    for part in (spec or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        k, sep, v = part.partition("=")
+        if not sep:
+            raise ValueError(f"bad override {part!r}")
+        if k in ExitParams.__dataclass_fields__:
+            exit_kw[k] = float(v)
+        elif k in CONFIG_NAMES:
+            cur = getattr(base, k)
+            if isinstance(cur, bool):
+                sim_kw[k] = v.lower() in ("1", "true", "yes", "on")
+            elif isinstance(cur, str):
+                sim_kw[k] = v
+            elif isinstance(cur, int):
+                sim_kw[k] = int(float(v))
+            else:
+                sim_kw[k] = float(v)
+        else:
+            raise ValueError(f"unknown setting {k!r}")
+    return replace(base, name=spec or base.name, exit=replace(base.exit, **exit_kw), **sim_kw)
+
+
+@dataclass
+class SimPosition:
+    mint: str
+    t_entry: float
+    entry: float         # effective SOL/token paid
+    qty0: float          # tokens bought (TP sizes are fractions of this)
+    cost_sol: float      # SOL swapped in (fees in fees_sol)
+    qty: float = 0.0     # tokens left
+    hw: float = 0.0
+    tp1: bool = False
+    tp2: bool = False
+    proceeds_sol: float = 0.0
+    fees_sol: float = 0.0
+    friction_sol: float = 0.0  # vs filling at the price the decision saw
+    cool_until: float = 0.0
+    exits: List[str] = field(default_factory=list)
+    t_exit: float = 0.0
+    reason: str = ""
+
+
+def _rank(cfg: SimConfig, c: Tuple[float, str, float, float, float, float]) -> float:
+    _, _, liq, v5, vh, _ = c
+    if cfg.rank == "liq_usd":
+        return liq
+    if cfg.rank == "vol_h1":
+        return vh
+    if cfg.rank == "turnover":
+        return v5 / liq if liq > 0 else 0.0
+    return v5
+
+
+def _passes(cfg: SimConfig, c) -> bool:
+    _, _, liq, v5, _, mc = c
+    if cfg.min_liq_usd > 0 and not (liq >= cfg.min_liq_usd):
+        return False
+    if cfg.min_vol_m5 > 0 and not (v5 >= cfg.min_vol_m5):
+        return False
+    if cfg.max_mcap_usd > 0 and mc > cfg.max_mcap_usd:
+        return False
+    return True
+
+
+# -----------------------------
+# run
+# -----------------------------
+def simulate(market: Market, cfg: SimConfig, latency: Optional[LatencyModel] = None,
+             seed: int = PAPER_SIM_SEED, t0: Optional[float] = None, t1: Optional[float] = None) -> Dict[str, Any]:
+    """One setting over the market window -> report dict (see report())."""
+    t0 = market.t0 if t0 is None else float(t0)
+    t1 = market.t1 if t1 is None else float(t1)
+    lat = latency or LatencyModel.measured()
+    if cfg.latency_scale != 1.0:
+        lat = lat.scaled(cfg.latency_scale)
+    kw = {k: getattr(cfg, k) for k in ("slippage_bps", "sell_slippage_bps", "rate_429", "rate_no_route",
+                                       "rate_land_fail") if getattr(cfg, k) is not None}
+    ex = SimExecutor(market.price_at, market.liq_at, lat, seed=seed, **kw)
+    prm = cfg.exit
+
+    open_: Dict[str, SimPosition] = {}
+    closed: List[SimPosition] = []
+    rl_skip: Dict[str, float] = {}
+    last_buy: Dict[str, float] = {}
+    cands: Dict[str, Tuple[float, str, float, float, float, float]] = {}
+    fi = bisect.bisect_left(market.flow_ts, t0)
+    fails: Dict[str, int] = {}
+    fees_failed = 0.0
+    loops = 0
+    wall0 = time.perf_counter()
+
+    t = t0
+    while t < t1:
+        loops += 1
+        clock = t
+        # 1. sells (SellEngine.run_once)
+        for mint in list(open_):
+            pos = open_[mint]
+            px = market.price_at(mint, clock)
+            if not (px > 0):
+                continue
+            pos.hw, act, frac = decide_exit(px, pos.entry, pos.hw, pos.tp1, pos.tp2, clock - pos.t_entry, prm,
+                                            cfg.time_stop_sells)
+            if not act or frac <= 0 or clock < pos.cool_until:
+                continue
+            qty = pos.qty if frac == ALL else min(pos.qty, frac * pos.qty0)
+            f = ex.sell(mint, px, act, qty=qty, t=clock)
+            clock = max(clock, f.ts)
+            pos.fees_sol += f.fee_sol
+            if not f.ok:
+                fails[f"sell_{f.reason}"] = fails.get(f"sell_{f.reason}", 0) + 1
+                if f.reason == "quote_429":
+                    pos.cool_until = clock + cfg.sell_429_cooldown_s
+                elif f.reason == "no_route":
+                    pos.cool_until = clock + cfg.sell_route_fail_cooldown_s
+                continue
+            pos.proceeds_sol += f.out
+            pos.friction_sol += qty * px - f.out
+            pos.qty -= qty
+            pos.exits.append(act)
+            pos.tp1 = pos.tp1 or act == "tp1"
+            pos.tp2 = pos.tp2 or act == "tp2"
+            if pos.qty <= pos.qty0 * 1e-9:
+                pos.t_exit, pos.reason = clock, act
+                closed.append(open_.pop(mint))
+
+        # 2. one buy (trader_loop ONE_SHOT)
+        j = bisect.bisect_right(market.flow_ts, clock, lo=fi)
+        for c in market.flow[fi:j]:
+            cands[c[1]] = c
+        fi = j
+        if len(open_) < cfg.max_open:
+            best, best_s = None, -math.inf
+            for mint, c in list(cands.items()):
+                if clock - c[0] > cfg.cand_ttl_s:
+                    del cands[mint]
+                    continue
+                if mint in open_ or rl_skip.get(mint, 0.0) > clock or clock - last_buy.get(mint, -math.inf) < cfg.buy_cooldown_s:
+                    continue
+                if not _passes(cfg, c):
+                    continue
+                s = _rank(cfg, c)
+                if s > best_s:
+                    best, best_s = c, s
+            if best is not None:
+                mint = best[1]
+                px = market.price_at(mint, clock)
+                f = ex.buy(mint, px, cfg.buy_sol, t=clock)
+                clock = max(clock, f.ts)
+                if f.ok and f.qty > 0:
+                    last_buy[mint] = clock
+                    open_[mint] = SimPosition(mint=mint, t_entry=clock, entry=f.price, qty0=f.qty, qty=f.qty,
+                                              cost_sol=cfg.buy_sol, hw=f.price, fees_sol=f.fee_sol,
+                                              friction_sol=(cfg.buy_sol - f.qty * px) if px > 0 else 0.0)
+                else:
+                    fails[f"buy_{f.reason}"] = fails.get(f"buy_{f.reason}", 0) + 1
+                    fees_failed += f.fee_sol
+                    if f.reason in ("quote_429", "no_route"):
+                        rl_skip[mint] = clock + cfg.rl_skip_s
+
+        # 3. sleep
+        t = clock + cfg.step_s
+
+    # still open: marked to the last price, no exit fee
+    for mint, pos in open_.items():
+        px = market.price_at(mint, min(t, t1))
+        if not (px > 0):
+            s = market.series.get(mint)
+            px = s.price[-1] if s and s.price else 0.0
+        pos.proceeds_sol += pos.qty * px
+        pos.t_exit, pos.reason = min(t, t1), "open"
+        closed.append(pos)
+    return report(cfg, closed, fails, fees_failed, ex, loops, t1 - t0, time.perf_counter() - wall0)
+
+
+def report(cfg: SimConfig, trades: List[SimPosition], fails: Dict[str, int], fees_failed: float, ex: SimExecutor,
+           loops: int, sim_s: float, wall_s: float) -> Dict[str, Any]:
+    trades = sorted(trades, key=lambda p: p.t_exit)
+    eq = peak = mdd = 0.0
+    pnls = []
+    for p in trades:
+        pnl = p.proceeds_sol - p.cost_sol - p.fees_sol
+        pnls.append(pnl)
+        eq += pnl
+        peak = max(peak, eq)
+        mdd = max(mdd, peak - eq)
+    eq -= fees_failed
+    n = len(trades)
+    reasons: Dict[str, int] = {}
+    for p in trades:
+        reasons[p.reason] = reasons.get(p.reason, 0) + 1
+    st = ex.stats
+    att = sum(v for k, v in st.items() if k.endswith("_attempt"))
+    return {
+        "name": cfg.name, "config": {**{k: getattr(cfg, k) for k in CONFIG_NAMES}, "exit": asdict(cfg.exit)},
+        "trades": n, "open_at_end": reasons.get("open", 0),
+        "pnl_sol": round(eq, 6), "ret_mean": round(sum(pnls) / n / cfg.buy_sol, 6) if n and cfg.buy_sol else 0.0,
+        "win_rate": round(sum(1 for x in pnls if x > 0) / n, 4) if n else 0.0,
+        "max_dd_sol": round(mdd, 6),
+        "fees_sol": round(sum(p.fees_sol for p in trades) + fees_failed, 6),
+        "friction_sol": round(sum(p.friction_sol for p in trades), 6),
+        "hold_mean_s": round(sum(p.t_exit - p.t_entry for p in trades) / n, 1) if n else 0.0,
+        "exits": reasons, "failures": dict(sorted(fails.items())),
+        "fail_rate": round(sum(fails.values()) / att, 4) if att else 0.0,
+        "loops": loops, "sim_s": round(sim_s, 1), "wall_s": round(wall_s, 3),
+        "speedup": round(sim_s / wall_s, 1) if wall_s > 0 else 0.0,
+    }
+
+
+def run_many(market: Market, configs: Sequence[SimConfig], latency: Optional[LatencyModel] = None,
+             seed: int = PAPER_SIM_SEED) -> List[Dict[str, Any]]:
+    """Same market, same latency model and seed for every setting."""
+    lat = latency or LatencyModel.measured()
+    return [simulate(market, cfg, lat, seed=seed) for cfg in configs]
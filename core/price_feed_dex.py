@@ -1,28 +1,27 @@
 def _urlopen_json_429(req_or_url, timeout=20, retries=3, base_sleep=0.35, tag=""):
     """
-    urlopen -> json.loads with retry on HTTP 429 only.
-    retries=3 => up to 3 attempts (0,1,2).
+    url / urllib Request -> json via the shared pool (core.http_pool), retry on HTTP 429 only.
+    retries=3 => up to 3 attempts (0,1,2). A Request with data is sent as POST.
     """
-    import json, time, urllib.request, urllib.error
-    last = None
+    import time
+    from core import http_pool
+    if isinstance(req_or_url, str):
+        method, url, data, headers = "GET", req_or_url, None, None
+    else:
+        url = req_or_url.full_url
+        data = req_or_url.data
+        headers = dict(req_or_url.header_items())
+        method = "POST" if data is not None else "GET"
     for attempt in range(int(retries)):
-        try:
-            data = urllib.request.urlopen(req_or_url, timeout=timeout).read()
-            return json.loads(data)
-        except urllib.error.HTTPError as e:
-            last = e
-            code = getattr(e, "code", None)
-            if code == 429 and attempt < int(retries) - 1:
-                time.sleep(base_sleep * (2 ** attempt))
-                continue
-            raise
-        except Exception as e:
-            last = e
-            # no retry except 429
-            raise
-    raise last
-
-import requests
+        r = http_pool.request(method, url, data=data, headers=headers, timeout=timeout, retries=1, raise_for_status=False)
+        if r.status_code == 429 and attempt < int(retries) - 1:
+            time.sleep(base_sleep * (2 ** attempt))
+            continue
+        if r.status_code >= 400:
+            raise http_pool.HttpError(r.status_code, url, r.text or "", http_pool.classify(r.status_code))
+        return r.json()
+    raise http_pool.HttpError(429, url, "", http_pool.RATE_LIMITED)
+
 from typing import Optional
 import os
 DEX_TIMEOUT = float(os.getenv("DEX_TIMEOUT", "4"))
@@ -34,7 +33,8 @@ class DexScreenerPriceFeed:
     Retourne priceUsd float ou None.
     """
     def __init__(self):
-        self.s = requests.Session()
+        from core import http_pool
+        self.s = http_pool.session()
 
     def get_price(self, mint: str) -> Optional[float]:
 
@@ -0,0 +1,403 @@
+"""
+On-demand profiling for long-running processes (run_live, brain_loop,
+pump.fun pollers / listener), without a restart.
+
+install(name) arms two triggers:
+
+- signal PROFILER_SIGNAL (default SIGUSR2): toggles a profiling session.
+  Start = statistical sampler + task timing + tracemalloc baseline;
+  stop  = everything below is written under PROFILER_DIR.
+- a local control socket PROFILER_DIR/<name>-<pid>.sock (line protocol):
+
+    start [hz]   start sampler + task timing
+    stop         stop and write <name>-<pid>-<ts>.collapsed / .tasks.txt
+    mem [n]      tracemalloc snapshot: top-n + diff vs previous -> .mem.txt
+    mem_stop     stop tracemalloc
+    tasks        current asyncio tasks with their await stacks
+    status
+
+  e.g. `echo "mem 30" | nc -U state/profiles/run_live-1234.sock`
+  or   `python scripts/profctl.py run_live mem 30`.
+
+The sampler is a daemon thread reading sys._current_frames() at
+PROFILER_HZ; output is collapsed stacks ("a;b;c <count>"), the input format
+of flamegraph.pl / speedscope. Task timing wraps asyncio Handle._run only
+while a session is active and accumulates busy time per coroutine.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+PROFILER = os.getenv("PROFILER", "1").strip().lower() in ("1", "true", "yes", "on")
+PROFILER_DIR = os.getenv("PROFILER_DIR", "state/profiles")
+PROFILER_HZ = float(os.getenv("PROFILER_HZ", "99"))
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "64"))
+PROFILER_SIGNAL = os.getenv("PROFILER_SIGNAL", "SIGUSR2")
+PROFILER_SOCKET = os.getenv("PROFILER_SOCKET", "1").strip().lower() in ("1", "true", "yes", "on")
+PROFILER_MEM_TOP = int(os.getenv("PROFILER_MEM_TOP", "25"))
+PROFILER_MEM_FRAMES = int(os.getenv("PROFILER_MEM_FRAMES", "1"))
+
+_NAME = "proc"
+_LOCK = threading.Lock()
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+_SEQ = 0
+
+
+def _out(suffix: str) -> str:
+    global _SEQ
+    _SEQ += 1
+    os.makedirs(PROFILER_DIR, exist_ok=True)
+    return os.path.join(PROFILER_DIR, f"{_NAME}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{_SEQ}.{suffix}")
+
+
+# -----------------------------
+# statistical sampler (collapsed stacks)
+# -----------------------------
+class Sampler:
+    def __init__(self, hz: float = PROFILER_HZ):
+        self.hz = max(1.0, float(hz))
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self.t0 = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.t0 = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        iv = 1.0 / self.hz
+        while not self._stop.wait(iv):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                # skip our own threads (sampler, control socket)
+                if tid == me or str(names.get(tid, "")).startswith("profiler-"):
+                    continue
+                stack: List[str] = []
+                f = frame
+                while f is not None and len(stack) < PROFILER_MAX_DEPTH:
+                    co = f.f_code
+                    stack.append(f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})")
+                    f = f.f_back
+                stack.append(f"thread:{names.get(tid, tid)}")
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for k, n in sorted(self.counts.items(), key=lambda kv: -kv[1]):
+                f.write(f"{k} {n}\n")
+
+
+# -----------------------------
+# asyncio task timing (Handle._run wrapper, active only during a session)
+# -----------------------------
+_ORIG_RUN = asyncio.events.Handle._run
+_TASK_STATS: Dict[str, List[float]] = {}  # coro name -> [steps, busy_s, max_step_s]
+
+
+def _cb_name(cb: Any) -> str:
+    owner = getattr(cb, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        try:
+            return owner.get_coro().__qualname__
+        except Exception:
+            return owner.get_name()
+    return getattr(cb, "__qualname__", None) or type(cb).__name__
+
+
+def _timed_run(self):
+    t = time.perf_counter()
+    try:
+        return _ORIG_RUN(self)
+    finally:
+        dt = time.perf_counter() - t
+        try:
+            st = _TASK_STATS.setdefault(_cb_name(self._callback), [0, 0.0, 0.0])
+            st[0] += 1
+            st[1] += dt
+            if dt > st[2]:
+                st[2] = dt
+        except Exception:
+            pass
+
+
+def _task_timing(on: bool) -> None:
+    asyncio.events.Handle._run = _timed_run if on else _ORIG_RUN
+
+
+def _task_report(elapsed_s: float) -> str:
+    lines = [f"# per-coroutine loop time over {elapsed_s:.1f}s (busy = time holding the event loop)",
+             f"{'busy_s':>9} {'busy%':>6} {'steps':>8} {'avg_ms':>8} {'max_ms':>8}  coroutine"]
+    for name, (n, busy, mx) in sorted(_TASK_STATS.items(), key=lambda kv: -kv[1][1]):
+        pct = 100.0 * busy / elapsed_s if elapsed_s > 0 else 0.0
+        lines.append(f"{busy:9.3f} {pct:6.2f} {int(n):8d} {1000.0 * busy / max(1, n):8.3f} {1000.0 * mx:8.3f}  {name}")
+    return "\n".join(lines) + "\n"
+
+
+def tasks_dump() -> str:
+    """Current asyncio tasks of the registered loop, with their await stacks."""
+    loop = _LOOP
+    if loop is None:
+        return "no asyncio loop registered\n"
+    try:
+        tasks = list(asyncio.all_tasks(loop))
+    except Exception as e:
+        return f"all_tasks failed: {e}\n"
+    out = [f"# {len(tasks)} tasks"]
+    for t in tasks:
+        out.append(f"- {t.get_name()} {t.get_coro().__qualname__}{' done' if t.done() else ''}")
+        try:
+            for fr in t.get_stack(limit=8):
+                out.append(f"    {os.path.basename(fr.f_code.co_filename)}:{fr.f_lineno} {fr.f_code.co_name}")
+        except Exception:
+            pass
+    return "\n".join(out) + "\n"
+
+
+# -----------------------------
+# sessions
+# -----------------------------
+_SAMPLER: Optional[Sampler] = None
+
+
+def start(hz: Optional[float] = None) -> str:
+    global _SAMPLER
+    with _LOCK:
+        if _SAMPLER is not None:
+            return "already running\n"
+        _TASK_STATS.clear()
+        _task_timing(True)
+        _SAMPLER = Sampler(hz or PROFILER_HZ)
+        _SAMPLER.start()
+    print(f"🔬 profiler: started ({_SAMPLER.hz:.0f}Hz) name={_NAME} pid={os.getpid()}", flush=True)
+    return "started\n"
+
+
+def stop() -> str:
+    global _SAMPLER
+    with _LOCK:
+        s = _SAMPLER
+        _SAMPLER = None
+        if s is None:
+            return "not running\n"
+        _task_timing(False)
+        s.stop()
+    elapsed = time.time() - s.t0
+    path = _out("collapsed")
+    try:
+        s.write(path)
+        tpath = _out("tasks.txt")
+        with open(tpath, "w", encoding="utf-8") as f:
+            f.write(_task_report(elapsed))
+            f.write("\n")
+            f.write(tasks_dump())
+    except Exception as e:
+        return f"write failed: {e}\n"
+    msg = f"stopped samples={s.samples} stacks={len(s.counts)} elapsed={elapsed:.1f}s -> {path} {tpath}"
+    print(f"🔬 profiler: {msg}", flush=True)
+    return msg + "\n"
+
+
+_SESSION_TM = False  # tracemalloc started by the toggle session (stopped with it)
+
+
+def toggle() -> str:
+    global _SESSION_TM
+    if _SAMPLER is None:
+        out = start()
+        _SESSION_TM = not tracemalloc.is_tracing()
+        mem()  # baseline
+        return out
+    out = stop()
+    mem()  # diff vs start of the session
+    if _SESSION_TM:
+        # don't leave the tracemalloc overhead on after the session
+        mem_stop()
+    return out
+
+
+# -----------------------------
+# tracemalloc
+# -----------------------------
+_PREV_SNAP: Optional[tracemalloc.Snapshot] = None
+
+
+def mem(top: int = PROFILER_MEM_TOP) -> str:
+    """Snapshot + top-N by line + diff vs the previous snapshot, written to .mem.txt."""
+    global _PREV_SNAP
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(PROFILER_MEM_FRAMES)
+        _PREV_SNAP = tracemalloc.take_snapshot()
+        return "tracemalloc started (baseline taken; call mem again for top/diff)\n"
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    cur, peak = tracemalloc.get_traced_memory()
+    lines = [f"# tracemalloc current={cur / 1e6:.1f}MB peak={peak / 1e6:.1f}MB", f"## top {top} by line"]
+    lines += [str(s) for s in snap.statistics("lineno")[:top]]
+    if _PREV_SNAP is not None:
+        lines.append(f"## top {top} growth since previous snapshot")
+        lines += [str(s) for s in snap.compare_to(_PREV_SNAP, "lineno")[:top]]
+    _PREV_SNAP = snap
+    path = _out("mem.txt")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    except Exception as e:
+        return f"write failed: {e}\n"
+    print(f"🔬 profiler: mem snapshot current={cur / 1e6:.1f}MB -> {path}", flush=True)
+    return "\n".join(lines[:top + 2]) + f"\n-> {path}\n"
+
+
+def mem_stop() -> str:
+    global _PREV_SNAP, _SESSION_TM
+    tracemalloc.stop()
+    _SESSION_TM = False
+    _PREV_SNAP = None
+    return "tracemalloc stopped\n"
+
+
+def status() -> str:
+    s = _SAMPLER
+    run = f"running {time.time() - s.t0:.1f}s samples={s.samples}" if s is not None else "idle"
+    return f"name={_NAME} pid={os.getpid()} sampler={run} tracemalloc={tracemalloc.is_tracing()} loop={_LOOP is not None}\n"
+
+
+def command(line: str) -> str:
+    parts = (line or "").strip().split()
+    if not parts:
+        return status()
+    cmd, args = parts[0].lower(), parts[1:]
+    try:
+        if cmd == "start":
+            return start(float(args[0]) if args else None)
+        if cmd == "stop":
+            return stop()
+        if cmd == "toggle":
+            return toggle()
+        if cmd == "mem":
+            return mem(int(args[0]) if args else PROFILER_MEM_TOP)
+        if cmd == "mem_stop":
+            return mem_stop()
+        if cmd == "tasks":
+            return tasks_dump()
+        if cmd == "status":
+            return status()
+    except Exception as e:
+        return f"error: {type(e).__name__}: {e}\n{traceback.format_exc(limit=3)}"
+    return "commands: start [hz] | stop | toggle | mem [n] | mem_stop | tasks | status\n"
+
+
+# -----------------------------
+# triggers
+# -----------------------------
+def socket_path(name: Optional[str] = None, pid: Optional[int] = None) -> str:
+    return os.path.join(PROFILER_DIR, f"{name or _NAME}-{pid or os.getpid()}.sock")
+
+
+def _bind_socket(path: str) -> socket.socket:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        srv.bind(path)
+        os.chmod(path, 0o600)
+        srv.listen(4)
+    except Exception:
+        srv.close()
+        raise
+    return srv
+
+
+def _serve_socket(srv: socket.socket) -> None:
+    while True:
+        try:
+            conn, _ = srv.accept()
+        except Exception:
+            continue
+        with conn:
+            try:
+                conn.settimeout(5.0)
+                data = b""
+                while b"\n" not in data and len(data) < 4096:
+                    chunk = conn.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                conn.sendall(command(data.decode("utf-8", "replace")).encode("utf-8"))
+            except Exception:
+                pass
+
+
+def _cleanup_socket(path: str) -> None:
+    try:
+        os.unlink(path)
+    except Exception:
+        pass
+
+
+_INSTALLED = False
+
+
+def install(name: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Arm the signal + control socket once per process. Pass (or call from) the running loop for task dumps."""
+    global _INSTALLED, _NAME, _LOOP
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+    if loop is not None:
+        _LOOP = loop
+    if _INSTALLED or not PROFILER:
+        return
+    _INSTALLED = True
+    _NAME = name
+    sig = getattr(signal, PROFILER_SIGNAL, None)
+    if sig is not None and threading.current_thread() is threading.main_thread():
+        try:
+            signal.signal(sig, lambda *_: toggle())
+        except Exception as e:
+            print(f"⚠️ profiler: signal {PROFILER_SIGNAL} not armed: {e}", flush=True)
+            sig = None
+    sock = None
+    if PROFILER_SOCKET and hasattr(socket, "AF_UNIX"):
+        try:
+            os.makedirs(PROFILER_DIR, exist_ok=True)
+            sock = socket_path()
+            # bind here so a failure is reported, not lost inside the thread
+            srv = _bind_socket(sock)
+            threading.Thread(target=_serve_socket, args=(srv,), name="profiler-ctl", daemon=True).start()
+            import atexit
+            atexit.register(_cleanup_socket, sock)
+        except Exception as e:
+            print(f"⚠️ profiler: control socket failed: {e}", flush=True)
+            sock = None
+    print(f"🔬 profiler: kill -{PROFILER_SIGNAL.replace('SIG', '')} {os.getpid()} toggles a session"
+          + (f", control socket {sock}" if sock else ""), flush=True)
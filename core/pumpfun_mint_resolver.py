@@ -2,12 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import aiohttp
 
+from core import http_pool
+
 logger = logging.getLogger("PumpfunMintResolver")
 
+RESOLVE_CONCURRENCY = int(os.getenv("PUMPFUN_RESOLVE_CONC", "8"))
+TX_CACHE_SIZE = int(os.getenv("PUMPFUN_TX_CACHE_SIZE", "5000"))
+
 
 def _extract_new_mints_from_tx(tx: Dict[str, Any]) -> List[str]:
     """
@@ -48,20 +55,91 @@ def _extract_new_mints_from_tx(tx: Dict[str, Any]) -> List[str]:
     return out
 
 
+class _TxCache:
+    """signature -> parsed tx (confirmed txs never change). Bounded LRU."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max(1, int(max_items))
+        self._d: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sig: str) -> Optional[Dict[str, Any]]:
+        tx = self._d.get(sig)
+        if tx is None:
+            self.misses += 1
+            return None
+        self._d.move_to_end(sig)
+        self.hits += 1
+        return tx
+
+    def put(self, sig: str, tx: Dict[str, Any]) -> None:
+        self._d[sig] = tx
+        self._d.move_to_end(sig)
+        while len(self._d) > self.max_items:
+            self._d.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+
 class MintResolver:
-    def __init__(self, rpc_http: str = "https://api.mainnet-beta.solana.com", commitment: str = "confirmed"):
+    """
+    creator -> first new SPL mint seen in its recent txs.
+    - pooled aiohttp session shared process-wide (core.http_pool)
+    - fetched txs cached by signature (creators share recent slots)
+    - per-creator watermark: later scans only look at signatures newer than
+      the last one already scanned
+    - concurrent RPC calls bounded by `concurrency`
+    """
+
+    def __init__(
+        self,
+        rpc_http: str = "https://api.mainnet-beta.solana.com",
+        commitment: str = "confirmed",
+        *,
+        concurrency: int = RESOLVE_CONCURRENCY,
+        tx_cache_size: int = TX_CACHE_SIZE,
+    ):
         self.rpc_http = rpc_http
         self.commitment = commitment
+        self._sem = asyncio.Semaphore(max(1, int(concurrency)))
+        self.tx_cache = _TxCache(tx_cache_size)
+        self._watermark: Dict[str, str] = {}  # creator -> newest signature already scanned
+        self._tx_inflight: Dict[str, "asyncio.Future"] = {}
+        self.stats = {"rpc_calls": 0, "tx_fetched": 0}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # pooled session shared with the other clients (core.http_pool)
+        return await http_pool.aio_session()
+
+    def forget(self, creator: str) -> None:
+        self._watermark.pop(creator, None)
 
     async def _rpc(self, session: aiohttp.ClientSession, method: str, params: list) -> Any:
         payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
-        async with session.post(self.rpc_http, json=payload, timeout=aiohttp.ClientTimeout(total=25)) as r:
-            data = await r.json(content_type=None)
-            if "error" in data and data["error"]:
-                raise RuntimeError(data["error"])
-            return data.get("result")
+        async with self._sem:
+            self.stats["rpc_calls"] += 1
+            async with session.post(self.rpc_http, json=payload, timeout=aiohttp.ClientTimeout(total=25)) as r:
+                data = await r.json(content_type=None)
+        if "error" in data and data["error"]:
+            raise RuntimeError(data["error"])
+        return data.get("result")
 
     async def _get_tx_retry(self, session: aiohttp.ClientSession, sig: str) -> Optional[Dict[str, Any]]:
+        tx = self.tx_cache.get(sig)
+        if tx is not None:
+            return tx
+        # creators scanned in parallel often hit the same signature: share one fetch
+        fut = self._tx_inflight.get(sig)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.ensure_future(self._fetch_tx(session, sig))
+        self._tx_inflight[sig] = fut
+        fut.add_done_callback(lambda _f: self._tx_inflight.pop(sig, None))
+        return await asyncio.shield(fut)
+
+    async def _fetch_tx(self, session: aiohttp.ClientSession, sig: str) -> Optional[Dict[str, Any]]:
         delays = [0.0, 0.15, 0.25, 0.35, 0.5, 0.75, 1.0]
         for d in delays:
             if d:
@@ -80,6 +158,8 @@ class MintResolver:
                     ],
                 )
                 if isinstance(res, dict) and res:
+                    self.stats["tx_fetched"] += 1
+                    self.tx_cache.put(sig, res)
                     return res
             except Exception:
                 pass
@@ -87,37 +167,59 @@ class MintResolver:
 
     async def find_mint_for_creator(self, creator: str, lookback_limit: int = 25) -> Tuple[Optional[str], Optional[str]]:
         """
-        Scan les dernières tx du creator.
+        Scan les dernières tx du creator (plus récentes que le dernier scan).
         Retourne (mint, sig) dès qu'un mint SPL "nouveau" apparaît.
         """
         creator = str(creator).strip()
         if not creator:
             return None, None
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                sigs = await self._rpc(
-                    session,
-                    "getSignaturesForAddress",
-                    [creator, {"limit": int(lookback_limit)}],
-                )
-            except Exception as e:
-                logger.debug("getSignaturesForAddress fail creator=%s err=%s", creator, e)
-                return None, None
-
-            if not isinstance(sigs, list):
-                return None, None
-
-            # on parcourt du + récent au + ancien
-            for s in sigs:
-                sig = (s or {}).get("signature")
-                if not sig:
-                    continue
-                tx = await self._get_tx_retry(session, sig)
-                if not tx:
-                    continue
-                mints = _extract_new_mints_from_tx(tx)
-                if mints:
-                    return mints[0], sig
+        session = await self._get_session()
+        opts: Dict[str, Any] = {"limit": int(lookback_limit)}
+        until = self._watermark.get(creator)
+        if until:
+            opts["until"] = until
+        try:
+            sigs = await self._rpc(session, "getSignaturesForAddress", [creator, opts])
+        except Exception as e:
+            logger.debug("getSignaturesForAddress fail creator=%s err=%s", creator, e)
+            return None, None
 
+        if not isinstance(sigs, list) or not sigs:
+            return None, None
+
+        # on parcourt du + récent au + ancien; stop au premier mint trouvé
+        scanned_all = True
+        for s in sigs:
+            sig = (s or {}).get("signature")
+            if not sig or (s or {}).get("err"):
+                continue  # failed tx cannot have created a mint
+            tx = await self._get_tx_retry(session, sig)
+            if not tx:
+                scanned_all = False  # retry this window next time
+                continue
+            mints = _extract_new_mints_from_tx(tx)
+            if mints:
+                return mints[0], sig
+
+        newest = (sigs[0] or {}).get("signature")
+        if scanned_all and newest:
+            self._watermark[creator] = newest
         return None, None
+
+    async def find_mints(self, creators: Iterable[str], lookback_limit: int = 25) -> Dict[str, Tuple[str, str]]:
+        """Resolve many creators concurrently (RPC calls bounded by the resolver semaphore)."""
+        creators = [c for c in dict.fromkeys(creators) if c]
+
+        async def one(c: str):
+            try:
+                return c, await self.find_mint_for_creator(c, lookback_limit=lookback_limit)
+            except Exception as e:
+                logger.debug("find_mint_for_creator fail creator=%s err=%s", c, e)
+                return c, (None, None)
+
+        out: Dict[str, Tuple[str, str]] = {}
+        for c, (mint, sig) in await asyncio.gather(*(one(c) for c in creators)):
+            if mint:
+                out[c] = (mint, sig)
+        return out
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
 import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from core.bounded_cache import BoundedCache
 from core.pumpfun_mint_resolver import MintResolver
 
+# WATCH creators resolved per tick (all of them by default; 0 = no cap)
+RESOLVE_MAX_PER_TICK = int(os.getenv("PUMPFUN_RESOLVE_MAX_PER_TICK", "0"))
+# creators gardés en mémoire (LRU sur last_seen) et durée de vie sans nouvelle création
+TRACKER_MAX_CREATORS = int(os.getenv("PUMPFUN_TRACKER_MAX_CREATORS", "20000"))
+TRACKER_TTL_S = float(os.getenv("PUMPFUN_TRACKER_TTL_S", str(7 * 86400)))
+
 
 class PumpfunTracker:
     """
@@ -24,28 +34,102 @@ class PumpfunTracker:
         rpc_http: str = "https://api.mainnet-beta.solana.com",
         db_path: str = "pumpfun_dev_db.json",
         max_age_watch_s: float = 15 * 60,
+        state_db: Optional[str] = None,
     ):
+        # db_path: legacy JSON snapshot, imported once into the SQLite state db
         self.db_path = Path(db_path)
+        self.state_db = state_db or os.getenv("PUMPFUN_TRACKER_DB", "state/pumpfun_tracker.sqlite")
         self.max_age_watch_s = float(max_age_watch_s)
 
         self.resolver = MintResolver(rpc_http=rpc_http, commitment="confirmed")
 
-        # creator -> record
-        self.candidates: Dict[str, Dict[str, Any]] = {}
+        # creator -> record (bounded; evicted creators are deleted from the state db too)
+        self.candidates = BoundedCache("pumpfun_tracker.candidates", max_items=TRACKER_MAX_CREATORS,
+                                       ttl_s=TRACKER_TTL_S, on_evict=self._on_evict)
+        self._dirty: set = set()
+        self._deleted: set = set()
+        self._found: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self._con = self._open_db()
         self._load()
 
+    # ---- persistence: one row per creator, only changed rows are written ----
+    def _open_db(self) -> sqlite3.Connection:
+        d = os.path.dirname(self.state_db)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        con = sqlite3.connect(self.state_db, timeout=10)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS pumpfun_candidates ("
+            " creator TEXT PRIMARY KEY, status TEXT NOT NULL, first_seen REAL, rec_json TEXT NOT NULL)"
+        )
+        con.execute("CREATE INDEX IF NOT EXISTS idx_pumpfun_candidates_status ON pumpfun_candidates(status)")
+        con.commit()
+        return con
+
     def _load(self) -> None:
+        # oldest first so the LRU keeps the most recently seen creators
+        rows = self._con.execute(
+            "SELECT creator, rec_json FROM pumpfun_candidates ORDER BY json_extract(rec_json, '$.last_seen')"
+        ).fetchall()
+        if rows:
+            for creator, rj in rows:
+                try:
+                    self.candidates[creator] = json.loads(rj)
+                except Exception:
+                    continue
+            return
         if self.db_path.exists():
             try:
                 data = json.loads(self.db_path.read_text(encoding="utf-8"))
                 if isinstance(data, dict):
-                    self.candidates = data
+                    self.candidates.update(data)
+                    self._dirty.update(self.candidates.keys())
+                    self._save()
             except Exception:
-                self.candidates = {}
+                self.candidates.clear()
+
+    def _on_evict(self, creator: str, rec: Dict[str, Any], reason: str) -> None:
+        self._dirty.discard(creator)
+        self._deleted.add(creator)
+        try:
+            self.resolver.forget(creator)
+        except Exception:
+            pass
+
+    def _mark(self, creator: str) -> None:
+        self._dirty.add(creator)
+        self._deleted.discard(creator)
 
     def _save(self) -> None:
+        if not self._dirty and not self._deleted:
+            return
         try:
-            self.db_path.write_text(json.dumps(self.candidates, indent=2), encoding="utf-8")
+            with self._con:
+                if self._deleted:
+                    self._con.executemany(
+                        "DELETE FROM pumpfun_candidates WHERE creator=?", [(c,) for c in self._deleted]
+                    )
+                rows = []
+                for c in self._dirty:
+                    rec = self.candidates.get(c)
+                    if rec is not None:
+                        rows.append((c, str(rec.get("status") or ""), rec.get("first_seen"), json.dumps(rec)))
+                self._con.executemany(
+                    "INSERT OR REPLACE INTO pumpfun_candidates(creator, status, first_seen, rec_json) VALUES(?,?,?,?)",
+                    rows,
+                )
+            self._dirty.clear()
+            self._deleted.clear()
+        except Exception:
+            pass
+
+    async def aclose(self) -> None:
+        self._save()
+        # resolver has nothing to close: its HTTP session is core.http_pool's
+        try:
+            self._con.close()
         except Exception:
             pass
 
@@ -83,21 +167,23 @@ class PumpfunTracker:
             # on ne downgrade jamais ARMED -> WATCH
             if rec.get("status") not in ("ARMED", "BAN_DEV"):
                 rec["status"] = "WATCH_PUMPFUN"
+            self.candidates[creator] = rec  # refresh TTL
 
+        self._mark(creator)
         self._save()
         return str(self.candidates[creator].get("status") or "WATCH_PUMPFUN")
 
-    async def tick_find_mints(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+    async def tick_find_mints_many(self) -> List[Tuple[str, Dict[str, Any]]]:
         """
-        Cherche un mint pour les devs en WATCH.
-        Retour:
-          ("MINT_FOUND", {"creator":..., "mint":..., "age":..., ...}) ou None
+        Cherche les mints de tous les devs en WATCH en parallèle
+        (budget RPC = semaphore du resolver, tx partagées via son cache).
+        Retour: [("MINT_FOUND", payload), ...]
         """
         now = time.time()
 
         # cleanup vieux WATCH
         to_del = []
-        for creator, rec in (self.candidates or {}).items():
+        for creator, rec in self.candidates.items():
             st = rec.get("status")
             if st == "WATCH_PUMPFUN":
                 first_seen = float(rec.get("first_seen") or 0.0)
@@ -105,32 +191,53 @@ class PumpfunTracker:
                     to_del.append(creator)
         for c in to_del:
             self.candidates.pop(c, None)
-
-        # cherche mint pour 1 dev à la fois (évite spam RPC)
-        for creator, rec in (self.candidates or {}).items():
-            if rec.get("status") != "WATCH_PUMPFUN":
+            self.resolver.forget(c)
+            self._dirty.discard(c)
+            self._deleted.add(c)
+
+        watch = [c for c, rec in self.candidates.items() if rec.get("status") == "WATCH_PUMPFUN"]
+        # plus récents d'abord: ce sont ceux dont le mint arrive
+        watch.sort(key=lambda c: float(self.candidates[c].get("last_seen") or 0.0), reverse=True)
+        if RESOLVE_MAX_PER_TICK > 0:
+            watch = watch[:RESOLVE_MAX_PER_TICK]
+
+        found = await self.resolver.find_mints(watch, lookback_limit=25) if watch else {}
+
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        for creator, (mint, mint_sig) in found.items():
+            rec = self.candidates.get(creator)
+            if rec is None:
                 continue
-
-            mint, mint_sig = await self.resolver.find_mint_for_creator(creator, lookback_limit=25)
-            if mint:
-                rec["mint"] = mint
-                rec["mint_sig"] = mint_sig
-                rec["status"] = "ARMED"
-                rec["armed_ts"] = time.time()
-                self._save()
-
-                age = time.time() - float(rec.get("first_seen") or time.time())
-                payload = {
-                    "creator": creator,
-                    "mint": mint,
-                    "age": age,
-                    "first_seen": rec.get("first_seen"),
-                    "last_sig": rec.get("last_sig"),
-                    "mint_sig": mint_sig,
-                    "status": "ARMED",
-                    "source": "pumpfun",
-                }
-                return "MINT_FOUND", payload
+            rec["mint"] = mint
+            rec["mint_sig"] = mint_sig
+            rec["status"] = "ARMED"
+            rec["armed_ts"] = time.time()
+            self._mark(creator)
+            self.resolver.forget(creator)
+
+            age = time.time() - float(rec.get("first_seen") or time.time())
+            payload = {
+                "creator": creator,
+                "mint": mint,
+                "age": age,
+                "first_seen": rec.get("first_seen"),
+                "last_sig": rec.get("last_sig"),
+                "mint_sig": mint_sig,
+                "status": "ARMED",
+                "source": "pumpfun",
+            }
+            out.append(("MINT_FOUND", payload))
 
         self._save()
-        return None
+        return out
+
+    async def tick_find_mints(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Compat: un résultat par appel. Les mints trouvés en plus dans le même
+        tick sont rendus aux appels suivants sans nouveau scan RPC.
+        Retour:
+          ("MINT_FOUND", {"creator":..., "mint":..., "age":..., ...}) ou None
+        """
+        if not self._found:
+            self._found.extend(await self.tick_find_mints_many())
+        return self._found.popleft() if self._found else None
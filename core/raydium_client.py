@@ -14,7 +14,7 @@ import base64
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, List
 
-import httpx
+from core import http_pool
 
 WSOL_MINT = "So11111111111111111111111111111111111111112"
 RAYDIUM_SWAP_HOST = "https://transaction-v1.raydium.io"
@@ -45,8 +45,8 @@ class RaydiumClient:
         self.log = logger
         self.cfg = cfg or RaydiumConfig()
 
-        self._http = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0),
+        self._http = http_pool.aclient(
+            timeout=30.0,
             headers={**{"accept": "application/json"}, **_jup_headers()},
         )
 
@@ -425,7 +425,6 @@ class RaydiumClient:
         token_amount_ui: quantité en UI (ex: 12.34 tokens)
         """
         import os
-        import httpx
         from solders.pubkey import Pubkey
 
         SOL_MINT = "So11111111111111111111111111111111111111112"
@@ -460,7 +459,7 @@ class RaydiumClient:
         if api_key:
             headers["x-api-key"] = api_key
 
-        async with httpx.AsyncClient(timeout=20.0, headers=headers) as client:
+        async with http_pool.aclient(timeout=20.0, headers=headers) as client:
             # 2) quote
             qparams = {
                 "inputMint": token_mint,
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+In-process ready-candidate pipeline.
+
+Replaces the JSONL script chain
+  build_ready_from_dexscreener -> enrich_ready -> score_ready_v2
+  -> filter_ready_tradable -> brain_loop -> READY_FILE
+with async-generator stages connected by bounded queues, in one process.
+
+Each stage is `fn(inp) -> AsyncIterator[dict]` where `inp` is the upstream
+async iterator (None for the source). Stages reuse the scripts' own
+functions (enrich_iter, score_row, _probe, _brain_score_rows...) so the
+rows produced are the same as the file chain's.
+
+Usage:
+  python -m core.ready_pipeline                 # loop, PIPELINE_SLEEP_S between cycles
+  PIPELINE_ONE_SHOT=1 python -m core.ready_pipeline
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Union
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from core.ready_store import publish_ready, store_enabled, write_jsonl_atomic
+
+Row = Dict[str, Any]
+StageFn = Callable[[Optional[AsyncIterator[Row]]], AsyncIterator[Row]]
+
+_EOS = object()
+
+
+# ---------------------------------------------------------------------------
+# metrics
+# ---------------------------------------------------------------------------
+
+@dataclass
+class StageMetrics:
+    name: str
+    n_in: int = 0
+    n_out: int = 0
+    busy_s: float = 0.0         # time inside the stage, excluding upstream waits
+    wait_in_s: float = 0.0      # blocked on upstream queue
+    wait_out_s: float = 0.0     # blocked on downstream queue (backpressure)
+    t_start: float = 0.0
+    t_end: float = 0.0
+    lat: Deque[float] = field(default_factory=lambda: deque(maxlen=2048))
+
+    def pct(self, q: float) -> float:
+        if not self.lat:
+            return 0.0
+        xs = sorted(self.lat)
+        return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        wall = max(1e-9, (self.t_end or time.monotonic()) - self.t_start) if self.t_start else 0.0
+        return {
+            "stage": self.name,
+            "in": self.n_in,
+            "out": self.n_out,
+            "wall_s": round(wall, 3),
+            "busy_s": round(self.busy_s, 3),
+            "wait_in_s": round(self.wait_in_s, 3),
+            "wait_out_s": round(self.wait_out_s, 3),
+            "rows_per_s": round(self.n_out / wall, 2) if wall else 0.0,
+            "lat_p50_ms": round(self.pct(0.50) * 1000, 2),
+            "lat_p90_ms": round(self.pct(0.90) * 1000, 2),
+            "lat_max_ms": round(max(self.lat) * 1000, 2) if self.lat else 0.0,
+        }
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: StageFn
+
+
+# ---------------------------------------------------------------------------
+# runtime
+# ---------------------------------------------------------------------------
+
+class Pipeline:
+    """Runs stages as tasks linked by bounded asyncio.Queue (backpressure)."""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 256):
+        if not stages:
+            raise ValueError("Pipeline: no stages")
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.metrics: List[StageMetrics] = []
+
+    async def _run_stage(self, st: Stage, m: StageMetrics, inq: Optional[asyncio.Queue], outq: Optional[asyncio.Queue]) -> None:
+        async def _inp() -> AsyncIterator[Row]:
+            assert inq is not None
+            while True:
+                t0 = time.monotonic()
+                item = await inq.get()
+                m.wait_in_s += time.monotonic() - t0
+                if item is _EOS:
+                    return
+                m.n_in += 1
+                yield item
+
+        m.t_start = time.monotonic()
+        gen = st.fn(_inp() if inq is not None else None)
+        try:
+            while True:
+                t0 = time.monotonic()
+                w0 = m.wait_in_s
+                try:
+                    item = await gen.__anext__()
+                except StopAsyncIteration:
+                    m.busy_s += (time.monotonic() - t0) - (m.wait_in_s - w0)
+                    break
+                dt = (time.monotonic() - t0) - (m.wait_in_s - w0)
+                m.busy_s += dt
+                m.lat.append(dt)
+                m.n_out += 1
+                if outq is not None:
+                    t1 = time.monotonic()
+                    await outq.put(item)
+                    m.wait_out_s += time.monotonic() - t1
+        finally:
+            m.t_end = time.monotonic()
+            if outq is not None:
+                await outq.put(_EOS)
+
+    async def run(self) -> List[Dict[str, Any]]:
+        self.metrics = [StageMetrics(st.name) for st in self.stages]
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages[1:]]
+        tasks = []
+        for i, st in enumerate(self.stages):
+            inq = queues[i - 1] if i > 0 else None
+            outq = queues[i] if i < len(queues) else None
+            tasks.append(asyncio.create_task(self._run_stage(st, self.metrics[i], inq, outq), name=f"stage:{st.name}"))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return [m.as_dict() for m in self.metrics]
+
+
+async def _collect(inp: AsyncIterator[Row]) -> List[Row]:
+    return [r async for r in inp]
+
+
+def _mint(r: Row) -> str:
+    return str(r.get("mint") or r.get("outputMint") or "").strip()
+
+
+# ---------------------------------------------------------------------------
+# generic stages
+# ---------------------------------------------------------------------------
+
+def map_stage(name: str, fn: Callable[[Row], Optional[Row]]) -> Stage:
+    """Cheap per-row CPU function; None drops the row."""
+    async def _s(inp):
+        async for r in inp:
+            out = fn(r)
+            if out is not None:
+                yield out
+    return Stage(name, _s)
+
+
+def tee_jsonl_stage(name: str, path: str) -> Stage:
+    """Pass-through that also writes the rows to `path` (tmp + rename at end)."""
+    async def _s(inp):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        f = open(tmp, "w", encoding="utf-8")
+        try:
+            async for r in inp:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+                yield r
+        finally:
+            f.close()
+        os.replace(tmp, path)
+    return Stage(name, _s)
+
+
+# ---------------------------------------------------------------------------
+# sources
+# ---------------------------------------------------------------------------
+
+def jsonl_source(path: str, limit: int = 0, chunk: int = 500) -> Stage:
+    def _read_chunk(f, n):
+        out = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                o = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(o, dict) and _mint(o):
+                out.append(o)
+                if len(out) >= n:
+                    break
+        return out
+
+    async def _s(_inp):
+        if not os.path.exists(path):
+            return
+        n = 0
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            while True:
+                rows = await asyncio.to_thread(_read_chunk, f, chunk)
+                if not rows:
+                    return
+                for r in rows:
+                    if limit and n >= limit:
+                        return
+                    n += 1
+                    yield r
+    return Stage(f"source:{os.path.basename(path)}", _s)
+
+
+def dexscreener_source(limit: int = 250) -> Stage:
+    """Same lists as scripts/build_ready_from_dexscreener.py, fetched concurrently."""
+    from scripts import build_ready_from_dexscreener as bdx
+
+    async def _s(_inp):
+        now = int(time.time())
+        results = await asyncio.gather(*[asyncio.to_thread(bdx.fetch, url) for _, url in bdx.URLS], return_exceptions=True)
+        seen = set()
+        for (src, _url), data in zip(bdx.URLS, results):
+            if isinstance(data, BaseException):
+                print(f"[dex] FAIL src={src} err={data}", flush=True)
+                continue
+            items = data if isinstance(data, list) else data.get("data") or data.get("tokens") or data.get("pairs") or []
+            if not isinstance(items, list):
+                items = [items]
+            for it in items:
+                if not isinstance(it, dict):
+                    continue
+                chain = (it.get("chainId") or it.get("chain") or "").strip().lower()
+                if chain != "solana":
+                    continue
+                mint = (it.get("tokenAddress") or it.get("address") or it.get("baseToken", {}).get("address") or "").strip()
+                if not mint or mint in seen:
+                    continue
+                seen.add(mint)
+                yield {"mint": mint, "src": src, "ts": now}
+                if len(seen) >= limit:
+                    return
+    return Stage("source:dexscreener", _s)
+
+
+# ---------------------------------------------------------------------------
+# candidate stages (wrapping the scripts' logic)
+# ---------------------------------------------------------------------------
+
+def enrich_stage(linger_s: float = 0.05) -> Stage:
+    """scripts/enrich_ready batched DexScreener enrichment, windows run in a thread."""
+    from concurrent.futures import ThreadPoolExecutor
+    from scripts import enrich_ready as er
+
+    window_n = er.DS_BATCH * er.DS_CONC
+
+    async def _s(inp):
+        cache = er.PairCache(er.DS_CACHE, er.DS_CACHE_TTL_S)
+        pool = ThreadPoolExecutor(max_workers=er.DS_CONC)
+        # pump upstream into a local queue so window timeouts never cancel inp
+        q: asyncio.Queue = asyncio.Queue(maxsize=window_n * 2)
+
+        async def _pump():
+            try:
+                async for r in inp:
+                    await q.put(r)
+            finally:
+                await q.put(_EOS)
+
+        pump = asyncio.create_task(_pump())
+        done = False
+        try:
+            while not done:
+                window: List[Row] = []
+                # fill a window; flush early when upstream is slow
+                while len(window) < window_n:
+                    try:
+                        r = await (asyncio.wait_for(q.get(), linger_s) if window else q.get())
+                    except asyncio.TimeoutError:
+                        break
+                    if r is _EOS:
+                        done = True
+                        break
+                    window.append(r)
+                if not window:
+                    continue
+                feats = await asyncio.to_thread(lambda w=window: list(er.enrich_iter(w, cache=cache, pool=pool)))
+                for f in feats:
+                    yield f
+            await pump
+        finally:
+            if not pump.done():
+                pump.cancel()
+            pool.shutdown(wait=False)
+            cache.close()
+    return Stage("enrich", _s)
+
+
+def score_stage() -> Stage:
+    from scripts import score_ready_v2 as sr
+    gates = sr.load_gates()
+    return map_stage("score", lambda r: sr.score_row(r, gates))
+
+
+def tradable_stage(concurrency: int = 2) -> Stage:
+    """
+    scripts/filter_ready_tradable: anti-dump + score top-N (barrier), then
+    Jupiter quote probes with bounded concurrency and shared min interval.
+    """
+    from scripts import filter_ready_tradable as ft
+
+    args = ft._build_parser().parse_args(["--in", "-", "--out", "-"])
+
+    async def _s(inp):
+        rows = []
+        async for r in inp:
+            m = ft._get_mint(r)
+            if m:
+                r["_mint"] = m
+                rows.append(r)
+
+        if args.max_neg_pnl_pct and float(args.max_neg_pnl_pct) > 0:
+            thr = -abs(float(args.max_neg_pnl_pct))
+            rows = [r for r in rows if not ((ft._get_pnl_pct(r) is not None) and ft._get_pnl_pct(r) <= thr)]
+        for r in rows:
+            sc = ft._get_score(r)
+            r["_score"] = sc if sc is not None else -1e9
+        rows.sort(key=lambda x: x.get("_score", -1e9), reverse=True)
+        top = rows[: max(0, int(args.top_n))]
+
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+        lock = asyncio.Lock()
+        last = [0.0]
+
+        async def _one(r):
+            async with sem:
+                async with lock:
+                    dt = time.monotonic() - last[0]
+                    if dt < args.min_interval_sec:
+                        await asyncio.sleep(args.min_interval_sec - dt)
+                    last[0] = time.monotonic()
+                ok, _bad, _s429 = await asyncio.to_thread(ft._probe, args, r["_mint"])
+                return ok
+
+        oks = await asyncio.gather(*[_one(r) for r in top])
+        for r, ok in zip(top, oks):
+            if ok:
+                r.pop("_mint", None)
+                r.pop("_score", None)
+                yield r
+    return Stage("tradable", _s)
+
+
+def brain_stage() -> Stage:
+    """src/brain/brain_loop scoring + selection (barrier: sort/topN)."""
+    from src.brain import brain_loop as bl
+
+    def _score(rows: List[Row]) -> List[Row]:
+        bl._ensure_brain_db()
+        brain = bl._connect(bl.BRAIN_DB)
+        try:
+            stats = bl._compute_stats_from_trades()
+            if stats:
+                bl._upsert_mint_stats(brain, stats)
+            scored = bl._brain_score_rows(brain, rows, int(time.time()))
+            brain.commit()
+        finally:
+            brain.close()
+        return bl._brain_apply_skip(bl._brain_select(scored))
+
+    async def _s(inp):
+        rows = await _collect(inp)
+        for r in await asyncio.to_thread(_score, rows):
+            yield r
+    return Stage("brain", _s)
+
+
+# ---------------------------------------------------------------------------
+# sink
+# ---------------------------------------------------------------------------
+
+Publisher = Callable[[List[Row]], Union[None, Awaitable[None]]]
+
+
+def ready_sink(publishers: Iterable[Publisher] = (), jsonl_path: Optional[str] = None) -> Stage:
+    """Terminal stage: publishes the generation, optionally writes READY_FILE (atomic)."""
+    pubs = list(publishers)
+
+    async def _s(inp):
+        rows = await _collect(inp)
+        if jsonl_path:
+            await asyncio.to_thread(write_jsonl_atomic, jsonl_path, rows)
+        for p in pubs:
+            res = p(rows)
+            if asyncio.iscoroutine(res):
+                await res
+        for r in rows:
+            yield r
+    return Stage("sink", _s)
+
+
+# ---------------------------------------------------------------------------
+# default chain
+# ---------------------------------------------------------------------------
+
+def build_default(publishers: Iterable[Publisher] = ()) -> Pipeline:
+    src = (os.getenv("PIPELINE_SOURCE", "dexscreener") or "dexscreener").strip()
+    limit = int(os.getenv("PIPELINE_LIMIT", os.getenv("READY_LIMIT", "200")) or 200)
+    if src == "dexscreener":
+        source = dexscreener_source(limit=limit)
+    else:
+        source = jsonl_source(src.split(":", 1)[-1], limit=limit)
+
+    stages = [source, enrich_stage(), score_stage()]
+    scored_out = (os.getenv("PIPELINE_SCORED_OUT", "") or "").strip()
+    if scored_out:
+        stages.append(tee_jsonl_stage("tee:scored", scored_out))
+    if os.getenv("PIPELINE_TRADABLE", "1") == "1":
+        stages.append(tradable_stage(concurrency=int(os.getenv("FILTER_TRADABLE_CONC", "2"))))
+        tradable_out = (os.getenv("READY_TRADABLE_OUT", "") or "").strip()
+        if tradable_out:
+            stages.append(tee_jsonl_stage("tee:tradable", tradable_out))
+    if os.getenv("PIPELINE_BRAIN", "1") == "1":
+        stages.append(brain_stage())
+
+    publishers = list(publishers)
+    if store_enabled():
+        publishers.append(lambda rows: publish_ready(rows, source="ready_pipeline"))
+
+    ready_file = (os.getenv("PIPELINE_WRITE_READY", "1") == "1") and (os.getenv("READY_FILE", "state/ready_scored.jsonl") or "").strip()
+    stages.append(ready_sink(publishers, jsonl_path=ready_file or None))
+    return Pipeline(stages, queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "256")))
+
+
+def _print_metrics(ms: List[Dict[str, Any]], dt: float) -> None:
+    for m in ms:
+        print(
+            f"[PIPE] {m['stage']:<22} in={m['in']:<5} out={m['out']:<5} rps={m['rows_per_s']:<8} "
+            f"busy={m['busy_s']}s wait_in={m['wait_in_s']}s wait_out={m['wait_out_s']}s "
+            f"p50={m['lat_p50_ms']}ms p90={m['lat_p90_ms']}ms max={m['lat_max_ms']}ms",
+            flush=True,
+        )
+    print(f"[PIPE] cycle dt={dt:.2f}s", flush=True)
+
+
+async def run_forever(publishers: Iterable[Publisher] = ()) -> None:
+    one_shot = os.getenv("PIPELINE_ONE_SHOT", "0") == "1"
+    sleep_s = float(os.getenv("PIPELINE_SLEEP_S", "8") or 8)
+    pubs = list(publishers)
+    while True:
+        t0 = time.monotonic()
+        try:
+            ms = await build_default(pubs).run()
+            _print_metrics(ms, time.monotonic() - t0)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[PIPE] cycle error: {type(e).__name__}: {e}", flush=True)
+        if one_shot:
+            return
+        await asyncio.sleep(sleep_s)
+
+
+def main() -> None:
+    try:
+        asyncio.run(run_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Versioned ready-candidate store.
+
+Writers (brain_loop, core.ready_pipeline sink) publish a whole candidate set
+as a new generation in one SQLite transaction; readers (trader_exec,
+trader_loop) see either the previous or the new generation, never a partial
+file. Rows are indexed by (gen, score) and mint, so the trader reads the
+top-K without parsing everything, and `wait_for_gen` lets it re-rank only
+when a new generation lands.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_READY_STORE_DB = os.getenv("READY_STORE_DB", "state/ready_store.sqlite")
+KEEP_GENS = int(os.getenv("READY_STORE_KEEP_GENS", "2") or 2)
+
+_SCORE_KEYS = ("brain_score", "score", "final_score", "score_used")
+
+
+def row_mint(r: Dict[str, Any]) -> str:
+    return str(r.get("mint") or r.get("outputMint") or r.get("output_mint") or r.get("address") or "").strip()
+
+
+def row_score(r: Dict[str, Any]) -> float:
+    for k in _SCORE_KEYS:
+        v = r.get(k)
+        if v is None or v == "":
+            continue
+        try:
+            return float(v)
+        except Exception:
+            continue
+    return -1e9
+
+
+def write_jsonl_atomic(path: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """tmp + fsync + rename: readers see the old file or the new one, never a truncated one."""
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    tmp = os.path.join(d, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    n = 0
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for r in rows:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+                n += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.unlink(tmp)
+            except Exception:
+                pass
+    return n
+
+
+class ReadyStore:
+    def __init__(self, path: str = DEFAULT_READY_STORE_DB, keep_gens: int = KEEP_GENS):
+        self.path = path
+        self.keep_gens = max(1, int(keep_gens))
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        # trader_loop polls through asyncio.to_thread: the connection is used from
+        # worker threads, one call at a time (never concurrently)
+        self._con = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        self._con.execute("PRAGMA journal_mode=WAL;")
+        self._con.execute("PRAGMA synchronous=NORMAL;")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        self._con.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ready_meta (
+              k TEXT PRIMARY KEY,
+              v TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS ready_gens (
+              gen INTEGER PRIMARY KEY,
+              ts INTEGER NOT NULL,
+              n INTEGER NOT NULL,
+              source TEXT NOT NULL DEFAULT ''
+            );
+
+            CREATE TABLE IF NOT EXISTS ready_rows (
+              gen INTEGER NOT NULL,
+              mint TEXT NOT NULL,
+              score REAL NOT NULL,
+              rank INTEGER NOT NULL,
+              row_json TEXT NOT NULL,
+              PRIMARY KEY(gen, mint)
+            );
+            CREATE INDEX IF NOT EXISTS idx_ready_rows_gen_score ON ready_rows(gen, score DESC);
+            CREATE INDEX IF NOT EXISTS idx_ready_rows_mint ON ready_rows(mint, gen);
+            """
+        )
+        self._con.commit()
+
+    def close(self) -> None:
+        try:
+            self._con.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "ReadyStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- write side ----
+    def publish(self, rows: Iterable[Dict[str, Any]], source: str = "") -> int:
+        """Insert rows as a new generation and switch to it atomically. Returns the gen."""
+        items = []
+        seen = set()
+        for r in rows:
+            m = row_mint(r)
+            if not m or m in seen:
+                continue
+            seen.add(m)
+            items.append((m, row_score(r), json.dumps(r, ensure_ascii=False, separators=(",", ":"))))
+        # rank in file order (publishers already sort)
+        now = int(time.time())
+        con = self._con
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            row = con.execute("SELECT v FROM ready_meta WHERE k='gen'").fetchone()
+            gen = (int(row["v"]) if row else 0) + 1
+            con.executemany(
+                "INSERT INTO ready_rows(gen, mint, score, rank, row_json) VALUES(?,?,?,?,?)",
+                [(gen, m, sc, i, rj) for i, (m, sc, rj) in enumerate(items)],
+            )
+            con.execute("INSERT INTO ready_gens(gen, ts, n, source) VALUES(?,?,?,?)", (gen, now, len(items), source))
+            con.execute("INSERT OR REPLACE INTO ready_meta(k, v) VALUES('gen', ?)", (str(gen),))
+            old = gen - self.keep_gens
+            if old > 0:
+                con.execute("DELETE FROM ready_rows WHERE gen<=?", (old,))
+                con.execute("DELETE FROM ready_gens WHERE gen<=?", (old,))
+        return gen
+
+    # ---- read side ----
+    def current_gen(self) -> int:
+        row = self._con.execute("SELECT v FROM ready_meta WHERE k='gen'").fetchone()
+        return int(row["v"]) if row else 0
+
+    def gen_info(self, gen: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        gen = self.current_gen() if gen is None else int(gen)
+        row = self._con.execute("SELECT gen, ts, n, source FROM ready_gens WHERE gen=?", (gen,)).fetchone()
+        return dict(row) if row else None
+
+    def top_k(self, k: int, exclude: Optional[Iterable[str]] = None, gen: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Best-scored rows of a generation, skipping `exclude` mints, without loading the rest."""
+        gen = self.current_gen() if gen is None else int(gen)
+        ex = set(exclude or ())
+        out: List[Dict[str, Any]] = []
+        if k <= 0 or gen <= 0:
+            return out
+        cur = self._con.execute(
+            "SELECT mint, row_json FROM ready_rows WHERE gen=? ORDER BY score DESC, rank ASC",
+            (gen,),
+        )
+        for row in cur:
+            if row["mint"] in ex:
+                continue
+            try:
+                out.append(json.loads(row["row_json"]))
+            except Exception:
+                continue
+            if len(out) >= k:
+                break
+        cur.close()
+        return out
+
+    def get(self, mint: str, gen: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        gen = self.current_gen() if gen is None else int(gen)
+        row = self._con.execute("SELECT row_json FROM ready_rows WHERE gen=? AND mint=?", (gen, mint)).fetchone()
+        return json.loads(row["row_json"]) if row else None
+
+    def wait_for_gen(self, after_gen: int, timeout_s: float, poll_s: float = 0.5) -> int:
+        """Generation poll: returns the current gen as soon as it is > after_gen, or at timeout."""
+        deadline = time.monotonic() + max(0.0, float(timeout_s))
+        while True:
+            g = self.current_gen()
+            if g > after_gen or time.monotonic() >= deadline:
+                return g
+            time.sleep(max(0.05, float(poll_s)))
+
+
+def store_enabled() -> bool:
+    return (os.getenv("READY_STORE", "1") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def publish_ready(rows: List[Dict[str, Any]], source: str = "") -> Optional[int]:
+    """Best-effort publish helper for writers; never raises."""
+    if not store_enabled():
+        return None
+    try:
+        with ReadyStore() as st:
+            return st.publish(rows, source=source)
+    except Exception as e:
+        print(f"⚠️ ready_store publish failed: {e}", flush=True)
+        return None
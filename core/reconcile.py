@@ -0,0 +1,310 @@
+"""
+Batched on-chain reconciliation of the positions table.
+
+One getTokenAccountsByOwner call per token program (SPL Token + Token-2022)
+gives every wallet balance; the diff against open positions is done in
+memory and the fixes are applied in a single transaction.
+
+Findings:
+  ONCHAIN_ZERO  open position, nothing on-chain         -> close
+  QTY_DRIFT     open position, on-chain qty differs     -> sync qty
+  UNTRACKED     on-chain balance, no open position      -> report only
+
+Used by scripts/reconcile_positions.py and the older per-mint scripts
+(reconcile_onchain_zero_v2, close_db_onchain_zero, sync_positions_onchain,
+resync_qty0_positions, db_sync_close_if_zero), which now only pick a mode.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+
+MAX_RETRY = int(os.getenv("RECONCILE_MAX_RETRY", "10"))
+QTY_REL_TOL = float(os.getenv("RECONCILE_QTY_REL_TOL", "0.001"))  # 0.1%
+ZERO_CLOSE_REASON = os.getenv("RECONCILE_CLOSE_REASON", "onchain_zero")
+
+ONCHAIN_ZERO = "ONCHAIN_ZERO"
+QTY_DRIFT = "QTY_DRIFT"
+UNTRACKED = "UNTRACKED"
+
+
+def default_rpc_url() -> str:
+    return (
+        os.getenv("RPC_URL")
+        or os.getenv("RPC_HTTP")
+        or os.getenv("SOLANA_RPC")
+        or os.getenv("SOLANA_RPC_HTTP")
+        or "https://api.mainnet-beta.solana.com"
+    )
+
+
+def default_wallet() -> str:
+    w = os.getenv("WALLET_PUBKEY") or os.getenv("WALLET") or os.getenv("TRADER_USER_PUBLIC_KEY") or ""
+    if w:
+        return w.strip()
+    try:
+        from solders.keypair import Keypair
+        secret = json.load(open(os.getenv("KEYPAIR_PATH", "keypair.json"), "r", encoding="utf-8"))
+        return str(Keypair.from_bytes(bytes(secret)).pubkey())
+    except Exception:
+        return ""
+
+
+def rpc_call(rpc_url: str, method: str, params: list) -> Any:
+    payload = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode()
+    last: Optional[Exception] = None
+    for attempt in range(MAX_RETRY):
+        try:
+            req = urllib.request.Request(rpc_url, data=payload, headers={"Content-Type": "application/json"})
+            j = json.loads(urllib.request.urlopen(req, timeout=25).read().decode())
+            if j.get("error"):
+                raise RuntimeError(j["error"])
+            return j.get("result")
+        except urllib.error.HTTPError as e:
+            last = e
+            if e.code != 429:
+                raise
+            backoff = min(8.0, 0.5 * (2 ** attempt))
+            print(f"[429] {method} backoff={backoff:.2f}s attempt={attempt+1}/{MAX_RETRY}", flush=True)
+            time.sleep(backoff)
+        except Exception as e:
+            last = e
+            backoff = min(5.0, 0.25 * (2 ** attempt))
+            print(f"[ERR] {method} {type(e).__name__}: {e} backoff={backoff:.2f}s attempt={attempt+1}/{MAX_RETRY}", flush=True)
+            time.sleep(backoff)
+    raise RuntimeError(f"RPC {method} failed after {MAX_RETRY} retries: {last}")
+
+
+# -----------------------------
+# on-chain side
+# -----------------------------
+@dataclass
+class Holding:
+    mint: str
+    ui: float = 0.0
+    raw: int = 0
+    decimals: int = 0
+    accounts: List[str] = field(default_factory=list)
+    program: str = TOKEN_PROGRAM_ID
+
+
+def fetch_wallet_holdings(rpc_url: str, owner: str, programs: Sequence[str] = (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)) -> Dict[str, Holding]:
+    """All token balances of `owner`: one call per token program, summed per mint."""
+    out: Dict[str, Holding] = {}
+    for prog in programs:
+        res = rpc_call(rpc_url, "getTokenAccountsByOwner", [
+            owner, {"programId": prog}, {"encoding": "jsonParsed", "commitment": "processed"},
+        ]) or {}
+        for v in res.get("value") or []:
+            info = ((((v or {}).get("account") or {}).get("data") or {}).get("parsed") or {}).get("info") or {}
+            mint = info.get("mint")
+            ta = info.get("tokenAmount") or {}
+            if not mint:
+                continue
+            h = out.get(mint)
+            if h is None:
+                h = out[mint] = Holding(mint=mint, program=prog)
+            try:
+                h.raw += int(ta.get("amount") or 0)
+            except Exception:
+                pass
+            try:
+                h.ui += float(ta.get("uiAmountString") or ta.get("uiAmount") or 0.0)
+            except Exception:
+                pass
+            h.decimals = int(ta.get("decimals") or h.decimals or 0)
+            h.accounts.append(str(v.get("pubkey") or ""))
+    return out
+
+
+# -----------------------------
+# DB side (schema tolerant: trades.sqlite variants + older tables)
+# -----------------------------
+@dataclass
+class PositionsSchema:
+    table: str
+    cols: List[str]
+    mint_col: str
+    qty_col: Optional[str]
+    open_where: str
+
+
+def detect_schema(con: sqlite3.Connection) -> PositionsSchema:
+    table = None
+    for t in ("positions", "open_positions", "position"):
+        if con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (t,)).fetchone():
+            table = t
+            break
+    if table is None:
+        raise RuntimeError("No positions-like table found (positions/open_positions/position)")
+    cols = [r[1] for r in con.execute(f"PRAGMA table_info({table})").fetchall()]
+    mint_col = "mint" if "mint" in cols else ("input_mint" if "input_mint" in cols else None)
+    if not mint_col:
+        raise RuntimeError(f"{table}: missing mint column. cols={cols}")
+    qty_col = next((c for c in ("qty_token", "qty", "ui_qty", "qty_ui", "ui_amount", "amount_ui") if c in cols), None)
+    if "is_open" in cols:
+        where = "is_open=1"
+    elif "status" in cols:
+        where = "LOWER(status) IN ('open','active')"
+    elif "open" in cols:
+        where = "open=1"
+    elif "closed_at" in cols:
+        where = "(closed_at IS NULL OR closed_at=0 OR closed_at='')"
+    else:
+        where = "1=1"
+    return PositionsSchema(table, cols, mint_col, qty_col, where)
+
+
+def load_open_positions(con: sqlite3.Connection, sch: PositionsSchema) -> List[Dict[str, Any]]:
+    con.row_factory = sqlite3.Row
+    rows = con.execute(f"SELECT rowid AS _rowid, * FROM {sch.table} WHERE {sch.open_where}").fetchall()
+    return [dict(r) for r in rows]
+
+
+def _close_sets(sch: PositionsSchema, ts: int, reason: str) -> Tuple[List[str], List[Any]]:
+    c = set(sch.cols)
+    sets: List[str] = []
+    params: List[Any] = []
+    if "is_open" in c:
+        sets.append("is_open=0")
+    if "open" in c:
+        sets.append("open=0")
+    if "status" in c:
+        sets.append("status=?"); params.append("CLOSED")
+    for tcol in ("closed_at", "close_ts"):
+        if tcol in c:
+            sets.append(f"{tcol}=?"); params.append(ts)
+    if "close_reason" in c:
+        sets.append("close_reason=?"); params.append(reason)
+    if "updated_at" in c:
+        sets.append("updated_at=?"); params.append(ts)
+    for q in ("qty_token", "qty", "ui_qty", "qty_ui", "ui_amount", "amount_ui"):
+        if q in c:
+            sets.append(f"{q}=0")
+    return sets, params
+
+
+# -----------------------------
+# diff + apply
+# -----------------------------
+@dataclass
+class Finding:
+    kind: str
+    mint: str
+    rowid: Optional[int] = None
+    db_qty: Optional[float] = None
+    onchain_qty: float = 0.0
+
+    def line(self) -> str:
+        dbq = "-" if self.db_qty is None else f"{self.db_qty:.6f}"
+        return f"{self.kind:13} mint={self.mint} rowid={self.rowid} db_qty={dbq} onchain={self.onchain_qty:.6f}"
+
+
+def diff(positions: Iterable[Dict[str, Any]], holdings: Dict[str, Holding], sch: PositionsSchema,
+         rel_tol: float = QTY_REL_TOL, dust_ui: float = 0.0) -> List[Finding]:
+    out: List[Finding] = []
+    tracked = set()
+    for p in positions:
+        mint = str(p.get(sch.mint_col) or "")
+        if not mint:
+            continue
+        tracked.add(mint)
+        h = holdings.get(mint)
+        oc = h.ui if h is not None else 0.0
+        dbq = None
+        if sch.qty_col:
+            try:
+                dbq = float(p.get(sch.qty_col) or 0.0)
+            except Exception:
+                dbq = 0.0
+        if oc <= dust_ui:
+            out.append(Finding(ONCHAIN_ZERO, mint, p.get("_rowid"), dbq, oc))
+        elif dbq is not None and abs(oc - dbq) > rel_tol * max(oc, dbq, 1e-12):
+            out.append(Finding(QTY_DRIFT, mint, p.get("_rowid"), dbq, oc))
+    for mint, h in holdings.items():
+        if mint not in tracked and h.ui > dust_ui:
+            out.append(Finding(UNTRACKED, mint, None, None, h.ui))
+    return out
+
+
+def apply(con: sqlite3.Connection, sch: PositionsSchema, findings: Iterable[Finding],
+          kinds: Iterable[str] = (ONCHAIN_ZERO, QTY_DRIFT), close_reason: str = ZERO_CLOSE_REASON) -> Dict[str, int]:
+    """Apply fixes for `kinds` in one transaction. Returns counts per kind."""
+    kinds = set(kinds)
+    ts = int(time.time())
+    close_sets, close_params = _close_sets(sch, ts, close_reason)
+    closes = [(f.rowid,) for f in findings if f.kind == ONCHAIN_ZERO and ONCHAIN_ZERO in kinds and f.rowid is not None]
+    syncs = [(f.onchain_qty, f.rowid) for f in findings if f.kind == QTY_DRIFT and QTY_DRIFT in kinds and f.rowid is not None]
+    n = {ONCHAIN_ZERO: 0, QTY_DRIFT: 0}
+    with con:
+        if closes and close_sets:
+            cur = con.executemany(f"UPDATE {sch.table} SET {', '.join(close_sets)} WHERE rowid=?",
+                                  [tuple(close_params) + c for c in closes])
+            n[ONCHAIN_ZERO] = cur.rowcount
+        if syncs and sch.qty_col:
+            cur = con.executemany(f"UPDATE {sch.table} SET {sch.qty_col}=? WHERE rowid=?", syncs)
+            n[QTY_DRIFT] = cur.rowcount
+    return n
+
+
+def reconcile(db_path: str, *, rpc_url: Optional[str] = None, owner: Optional[str] = None,
+              kinds: Iterable[str] = (ONCHAIN_ZERO, QTY_DRIFT), dry_run: bool = True,
+              only: Optional[Callable[[Finding], bool]] = None, close_reason: str = ZERO_CLOSE_REASON,
+              verbose: bool = True) -> Dict[str, Any]:
+    """
+    Full pass: holdings (1-2 RPC calls) -> diff -> one transaction.
+    `only(finding)` can narrow which findings are applied (e.g. qty0 rows).
+    """
+    rpc_url = rpc_url or default_rpc_url()
+    owner = owner or default_wallet()
+    if not owner:
+        raise SystemExit("❌ missing WALLET_PUBKEY/WALLET/TRADER_USER_PUBLIC_KEY (or KEYPAIR_PATH)")
+
+    t0 = time.time()
+    holdings = fetch_wallet_holdings(rpc_url, owner)
+    t_rpc = time.time() - t0
+
+    con = sqlite3.connect(db_path, timeout=30)
+    try:
+        sch = detect_schema(con)
+        positions = load_open_positions(con, sch)
+        findings = diff(positions, holdings, sch)
+        todo = [f for f in findings if only is None or only(f)]
+
+        by_kind: Dict[str, int] = {}
+        for f in findings:
+            by_kind[f.kind] = by_kind.get(f.kind, 0) + 1
+
+        if verbose:
+            print(f"[reconcile] db={db_path} table={sch.table} wallet={owner} rpc={rpc_url}", flush=True)
+            print(f"[reconcile] open_positions={len(positions)} wallet_mints={len(holdings)} rpc_dt={t_rpc:.2f}s findings={by_kind}", flush=True)
+            for f in todo[:200]:
+                print("  " + f.line(), flush=True)
+            if len(todo) > 200:
+                print(f"  ... (+{len(todo)-200} more)", flush=True)
+
+        applied = {ONCHAIN_ZERO: 0, QTY_DRIFT: 0}
+        if not dry_run:
+            applied = apply(con, sch, todo, kinds=kinds, close_reason=close_reason)
+        if verbose:
+            mode = "DRY_RUN (nothing written)" if dry_run else "APPLIED"
+            print(f"[reconcile] {mode} closed={applied[ONCHAIN_ZERO]} qty_synced={applied[QTY_DRIFT]} dt={time.time()-t0:.2f}s", flush=True)
+        return {
+            "positions": len(positions),
+            "holdings": len(holdings),
+            "findings": findings,
+            "by_kind": by_kind,
+            "applied": applied,
+            "dry_run": dry_run,
+        }
+    finally:
+        con.close()
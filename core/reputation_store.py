@@ -0,0 +1,275 @@
+"""
+Dev / mint reputation store (SQLite).
+
+Replaces the whole-file JSON rewrites of dev_db.json, blacklist_dev.json and
+blacklist_mint.json: every event is one indexed upsert, mint blacklist
+entries expire through an index on `until` (never rewritten on read), and
+hot lookups go through a small in-memory read cache.
+
+Legacy JSON files are imported once, the first time a store is opened.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_REPUTATION_DB = os.getenv("REPUTATION_DB", "state/reputation.sqlite")
+# how long a read stays cached in-process (other processes may write meanwhile)
+CACHE_TTL_S = float(os.getenv("REPUTATION_CACHE_TTL_S", "15"))
+CACHE_MAX = int(os.getenv("REPUTATION_CACHE_MAX", "50000"))
+EXPIRE_EVERY_S = float(os.getenv("REPUTATION_EXPIRE_EVERY_S", "60"))
+
+LEGACY_DEV_DB = os.getenv("DEV_DB_PATH", "dev_db.json")
+LEGACY_BLACKLIST_DEV = os.getenv("BLACKLIST_DEV_PATH", "state/blacklist_dev.json")
+LEGACY_BLACKLIST_MINT = os.getenv("BLACKLIST_MINT_PATH", "state/blacklist_mint.json")
+
+# legacy blacklist_mint.json entries with until=0 never expired (old risk_engine): stored with this expiry
+PERMANENT_UNTIL = 2 ** 62
+
+_DEV_DEFAULT = {"score": 0, "tokens": 0, "rugs": 0, "blacklisted": False, "last_seen": None}
+
+
+def _load_json(path: str) -> Dict[str, Any]:
+    try:
+        p = Path(path)
+        if p.exists():
+            d = json.loads(p.read_text(encoding="utf-8") or "{}")
+            return d if isinstance(d, dict) else {}
+    except Exception:
+        pass
+    return {}
+
+
+class ReputationStore:
+    def __init__(self, path: str = DEFAULT_REPUTATION_DB):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._lock = threading.RLock()
+        self._con = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        self._con.execute("PRAGMA journal_mode=WAL;")
+        self._con.execute("PRAGMA synchronous=NORMAL;")
+        self._init_schema()
+        self._dev_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._mint_cache: Dict[str, Tuple[float, Optional[Tuple[str, int]]]] = {}
+        self._last_expire = 0.0
+        self._import_legacy()
+
+    def _init_schema(self) -> None:
+        self._con.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS rep_meta (
+              k TEXT PRIMARY KEY,
+              v TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS devs (
+              dev TEXT PRIMARY KEY,
+              score INTEGER NOT NULL DEFAULT 0,
+              tokens INTEGER NOT NULL DEFAULT 0,
+              rugs INTEGER NOT NULL DEFAULT 0,
+              blacklisted INTEGER NOT NULL DEFAULT 0,
+              bl_reason TEXT,
+              last_seen REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_devs_blacklisted ON devs(blacklisted) WHERE blacklisted=1;
+
+            CREATE TABLE IF NOT EXISTS mint_blacklist (
+              mint TEXT PRIMARY KEY,
+              reason TEXT NOT NULL,
+              until INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mint_blacklist_until ON mint_blacklist(until);
+            """
+        )
+        self._con.commit()
+
+    def _import_legacy(self) -> None:
+        with self._lock:
+            if self._con.execute("SELECT 1 FROM rep_meta WHERE k='legacy_imported'").fetchone():
+                return
+            now = int(time.time())
+            devs = _load_json(LEGACY_DEV_DB)
+            bl_dev = _load_json(LEGACY_BLACKLIST_DEV)
+            bl_mint = _load_json(LEGACY_BLACKLIST_MINT)
+            with self._con:
+                self._insert_legacy_devs(devs)
+                self._con.execute("INSERT OR REPLACE INTO rep_meta(k, v) VALUES(?, ?)",
+                                  (self._legacy_devs_key(LEGACY_DEV_DB), str(now)))
+                for dev, reason in bl_dev.items():
+                    self._con.execute(
+                        "INSERT INTO devs(dev, blacklisted, bl_reason) VALUES(?,1,?) "
+                        "ON CONFLICT(dev) DO UPDATE SET blacklisted=1, bl_reason=excluded.bl_reason",
+                        (dev, str(reason or "BAD_DEV")),
+                    )
+                for mint, rec in bl_mint.items():
+                    if not isinstance(rec, dict):
+                        continue
+                    until = int(rec.get("until") or 0)
+                    if until <= 0:
+                        until = PERMANENT_UNTIL
+                    if until > now:
+                        self._con.execute(
+                            "INSERT OR REPLACE INTO mint_blacklist(mint, reason, until) VALUES(?,?,?)",
+                            (mint, str(rec.get("reason") or "BLACKLISTED"), until),
+                        )
+                self._con.execute("INSERT OR REPLACE INTO rep_meta(k, v) VALUES('legacy_imported', ?)", (str(now),))
+
+    def _insert_legacy_devs(self, devs: Dict[str, Any]) -> None:
+        for dev, p in devs.items():
+            if not isinstance(p, dict):
+                continue
+            self._con.execute(
+                "INSERT OR IGNORE INTO devs(dev, score, tokens, rugs, blacklisted, last_seen) VALUES(?,?,?,?,?,?)",
+                (dev, int(p.get("score") or 0), int(p.get("tokens") or 0), int(p.get("rugs") or 0),
+                 1 if p.get("blacklisted") else 0, p.get("last_seen")),
+            )
+
+    @staticmethod
+    def _legacy_devs_key(path: str) -> str:
+        return "legacy_devs:" + os.path.realpath(path)
+
+    def import_legacy_devs(self, path: str) -> bool:
+        """One-time import of a legacy dev_db.json (devs already in the store are kept). True if imported now."""
+        key = self._legacy_devs_key(path)
+        with self._lock:
+            if self._con.execute("SELECT 1 FROM rep_meta WHERE k=?", (key,)).fetchone():
+                return False
+            devs = _load_json(path)
+            with self._con:
+                self._insert_legacy_devs(devs)
+                self._con.execute("INSERT OR REPLACE INTO rep_meta(k, v) VALUES(?, ?)", (key, str(int(time.time()))))
+            self._dev_cache.clear()
+            return True
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._con.close()
+            except Exception:
+                pass
+
+    # ---- cache helpers ----
+    @staticmethod
+    def _cache_put(cache: Dict[str, Any], key: str, val: Any) -> None:
+        if len(cache) >= CACHE_MAX:
+            cache.clear()
+        cache[key] = (time.monotonic(), val)
+
+    @staticmethod
+    def _cache_get(cache: Dict[str, Any], key: str) -> Tuple[bool, Any]:
+        rec = cache.get(key)
+        if rec is None or time.monotonic() - rec[0] > CACHE_TTL_S:
+            return False, None
+        return True, rec[1]
+
+    # ---- devs ----
+    def get_dev(self, dev: str) -> Dict[str, Any]:
+        hit, p = self._cache_get(self._dev_cache, dev)
+        if hit:
+            return dict(p)
+        with self._lock:
+            row = self._con.execute(
+                "SELECT score, tokens, rugs, blacklisted, bl_reason, last_seen FROM devs WHERE dev=?", (dev,)
+            ).fetchone()
+        p = dict(_DEV_DEFAULT)
+        if row:
+            p.update(score=row["score"], tokens=row["tokens"], rugs=row["rugs"],
+                     blacklisted=bool(row["blacklisted"]), last_seen=row["last_seen"])
+            if row["bl_reason"]:
+                p["reason"] = row["bl_reason"]
+        self._cache_put(self._dev_cache, dev, p)
+        return dict(p)
+
+    def _dev_write(self, dev: str, sql: str, params: tuple) -> Dict[str, Any]:
+        with self._lock, self._con:
+            self._con.execute(sql, params)
+        self._dev_cache.pop(dev, None)
+        return self.get_dev(dev)
+
+    def dev_new_token(self, dev: str, ts: Optional[float] = None) -> Dict[str, Any]:
+        ts = time.time() if ts is None else float(ts)
+        return self._dev_write(
+            dev,
+            "INSERT INTO devs(dev, tokens, last_seen) VALUES(?,1,?) "
+            "ON CONFLICT(dev) DO UPDATE SET tokens=tokens+1, last_seen=excluded.last_seen",
+            (dev, ts),
+        )
+
+    def dev_flag_rug(self, dev: str, blacklist_after: int = 2) -> Dict[str, Any]:
+        return self._dev_write(
+            dev,
+            "INSERT INTO devs(dev, rugs, score, blacklisted) VALUES(?,1,-5,?) "
+            "ON CONFLICT(dev) DO UPDATE SET rugs=rugs+1, score=score-5, "
+            "blacklisted=CASE WHEN rugs+1>=? THEN 1 ELSE blacklisted END",
+            (dev, 1 if blacklist_after <= 1 else 0, int(blacklist_after)),
+        )
+
+    def blacklist_dev(self, dev: str, reason: str = "BAD_DEV") -> None:
+        self._dev_write(
+            dev,
+            "INSERT INTO devs(dev, blacklisted, bl_reason) VALUES(?,1,?) "
+            "ON CONFLICT(dev) DO UPDATE SET blacklisted=1, bl_reason=excluded.bl_reason",
+            (dev, reason or "BAD_DEV"),
+        )
+
+    def is_dev_blacklisted(self, dev: str) -> bool:
+        return bool(self.get_dev(dev).get("blacklisted"))
+
+    # ---- mints ----
+    def _expire(self, now: int) -> None:
+        if now - self._last_expire < EXPIRE_EVERY_S:
+            return
+        self._last_expire = now
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM mint_blacklist WHERE until<=?", (now,))
+
+    def blacklist_mint(self, mint: str, reason: str, ttl_s: int) -> int:
+        until = int(time.time()) + int(ttl_s)
+        with self._lock, self._con:
+            self._con.execute(
+                "INSERT OR REPLACE INTO mint_blacklist(mint, reason, until) VALUES(?,?,?)",
+                (mint, reason or "BLACKLISTED", until),
+            )
+        self._cache_put(self._mint_cache, mint, (reason or "BLACKLISTED", until))
+        return until
+
+    def mint_blacklisted(self, mint: str) -> Optional[Tuple[str, int]]:
+        """(reason, until) while the entry is live, else None. Expired rows are purged in bulk by index."""
+        now = int(time.time())
+        hit, rec = self._cache_get(self._mint_cache, mint)
+        if not hit:
+            with self._lock:
+                row = self._con.execute("SELECT reason, until FROM mint_blacklist WHERE mint=?", (mint,)).fetchone()
+            rec = (row["reason"], int(row["until"])) if row else None
+            self._cache_put(self._mint_cache, mint, rec)
+        self._expire(now)
+        if rec is None or rec[1] <= now:
+            return None
+        return rec
+
+    def unblacklist_mint(self, mint: str) -> None:
+        with self._lock, self._con:
+            self._con.execute("DELETE FROM mint_blacklist WHERE mint=?", (mint,))
+        self._mint_cache.pop(mint, None)
+
+
+_STORES: Dict[str, ReputationStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: Optional[str] = None) -> ReputationStore:
+    """One shared store per db path and process."""
+    path = path or DEFAULT_REPUTATION_DB
+    with _STORES_LOCK:
+        st = _STORES.get(path)
+        if st is None:
+            st = _STORES[path] = ReputationStore(path)
+        return st
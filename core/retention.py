@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Retention for the append-only SQLite tables (events, wallet_events).
+
+- rows older than the policy horizon are rolled up into per-mint/per-day
+  aggregate tables (events_daily, wallet_events_daily)
+- raw rows (data_json / raw_json) are moved to zlib-compressed archive files
+  under RETENTION_ARCHIVE_DIR, one frame per batch
+- deleted pages are handed back with PRAGMA incremental_vacuum
+
+Usage:
+  python -m core.retention                  # trades db (events) + brain db (wallet_events)
+  RETENTION_DRY_RUN=1 python -m core.retention
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+DAY_SEC = 86400
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name, "") or "").strip() or default)
+    except Exception:
+        return int(default)
+
+
+def _env_bool(name: str, default: str = "0") -> bool:
+    return (os.getenv(name, default) or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    events_keep_days: int = 7
+    wallet_events_keep_days: int = 14
+    batch_rows: int = 2000
+    max_batches: int = 50          # per table per run (keeps each run short)
+    vacuum_pages: int = 2000       # pages freed per incremental_vacuum call
+    archive_dir: str = "state/archive"
+    zlib_level: int = 6
+    allow_full_vacuum: bool = False  # one-time VACUUM needed to switch auto_vacuum mode
+    dry_run: bool = False
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        return cls(
+            events_keep_days=_env_int("RETENTION_EVENTS_DAYS", 7),
+            wallet_events_keep_days=_env_int("RETENTION_WALLET_EVENTS_DAYS", 14),
+            batch_rows=max(1, _env_int("RETENTION_BATCH_ROWS", 2000)),
+            max_batches=max(1, _env_int("RETENTION_MAX_BATCHES", 50)),
+            vacuum_pages=max(0, _env_int("RETENTION_VACUUM_PAGES", 2000)),
+            archive_dir=(os.getenv("RETENTION_ARCHIVE_DIR", "state/archive") or "state/archive").strip(),
+            zlib_level=min(9, max(1, _env_int("RETENTION_ZLIB_LEVEL", 6))),
+            allow_full_vacuum=_env_bool("RETENTION_ALLOW_FULL_VACUUM", "0"),
+            dry_run=_env_bool("RETENTION_DRY_RUN", "0"),
+        )
+
+
+# ---------------------------------------------------------------------------
+# archive frames: <u32 big-endian length><zlib(jsonl bytes)>
+# ---------------------------------------------------------------------------
+
+def _archive_path(policy: RetentionPolicy, db_path: str, table: str, day: int) -> str:
+    base = os.path.splitext(os.path.basename(db_path))[0] or "db"
+    stamp = time.strftime("%Y%m%d", time.gmtime(day * DAY_SEC))
+    return os.path.join(policy.archive_dir, base, f"{table}_{stamp}.jsonl.zz")
+
+
+def _append_frame(path: str, rows: List[Dict[str, Any]], level: int) -> int:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    raw = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in rows).encode("utf-8")
+    blob = zlib.compress(raw, level)
+    with open(path, "ab") as f:
+        f.write(struct.pack(">I", len(blob)))
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(blob)
+
+
+def iter_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield archived rows back from a .jsonl.zz file."""
+    with open(path, "rb") as f:
+        while True:
+            hdr = f.read(4)
+            if len(hdr) < 4:
+                return
+            (n,) = struct.unpack(">I", hdr)
+            blob = f.read(n)
+            if len(blob) < n:
+                return  # torn tail (crash mid-write): ignore
+            for line in zlib.decompress(blob).decode("utf-8").splitlines():
+                if line:
+                    yield json.loads(line)
+
+
+# ---------------------------------------------------------------------------
+# sqlite helpers
+# ---------------------------------------------------------------------------
+
+def _connect(path: str) -> sqlite3.Connection:
+    con = sqlite3.connect(path, timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL;")
+    con.execute("PRAGMA synchronous=NORMAL;")
+    return con
+
+
+def _has_table(con: sqlite3.Connection, table: str) -> bool:
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    return row is not None
+
+
+def _cols(con: sqlite3.Connection, table: str) -> List[str]:
+    return [r["name"] for r in con.execute(f"PRAGMA table_info({table})")]
+
+
+def ensure_rollup_tables(con: sqlite3.Connection) -> None:
+    con.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS events_daily (
+          mint TEXT NOT NULL,
+          day INTEGER NOT NULL,
+          status TEXT NOT NULL,
+          n INTEGER NOT NULL DEFAULT 0,
+          n_err INTEGER NOT NULL DEFAULT 0,
+          first_ts INTEGER,
+          last_ts INTEGER,
+          PRIMARY KEY(mint, day, status)
+        );
+
+        CREATE TABLE IF NOT EXISTS wallet_events_daily (
+          owner TEXT NOT NULL,
+          mint TEXT NOT NULL,
+          day INTEGER NOT NULL,
+          kind TEXT NOT NULL,
+          n INTEGER NOT NULL DEFAULT 0,
+          n_err INTEGER NOT NULL DEFAULT 0,
+          amount_sum REAL NOT NULL DEFAULT 0,
+          sol_change_sum REAL NOT NULL DEFAULT 0,
+          fee_sol_sum REAL NOT NULL DEFAULT 0,
+          first_ts INTEGER,
+          last_ts INTEGER,
+          PRIMARY KEY(owner, mint, day, kind)
+        );
+
+        CREATE TABLE IF NOT EXISTS retention_runs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          ts INTEGER NOT NULL,
+          tbl TEXT NOT NULL,
+          rows_archived INTEGER NOT NULL DEFAULT 0,
+          bytes_archived INTEGER NOT NULL DEFAULT 0,
+          cutoff_ts INTEGER NOT NULL
+        );
+        """
+    )
+
+
+def ensure_incremental_vacuum(con: sqlite3.Connection, policy: RetentionPolicy) -> bool:
+    """
+    auto_vacuum must be INCREMENTAL (2) for incremental_vacuum to free pages.
+    Switching an existing db needs one full VACUUM, which is gated by policy.
+    """
+    mode = int(con.execute("PRAGMA auto_vacuum").fetchone()[0])
+    if mode == 2:
+        return True
+    if not policy.allow_full_vacuum or policy.dry_run:
+        return False
+    con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    con.execute("VACUUM")
+    return int(con.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2
+
+
+def incremental_vacuum(con: sqlite3.Connection, pages: int) -> int:
+    free = int(con.execute("PRAGMA freelist_count").fetchone()[0])
+    if pages <= 0 or free <= 0:
+        return 0
+    n = min(pages, free)
+    con.execute(f"PRAGMA incremental_vacuum({int(n)})").fetchall()
+    return n
+
+
+# ---------------------------------------------------------------------------
+# per-table rollup
+# ---------------------------------------------------------------------------
+
+def _day(ts: Any) -> int:
+    try:
+        return int(ts) // DAY_SEC
+    except Exception:
+        return 0
+
+
+def _rollup_events(con: sqlite3.Connection, rows: List[sqlite3.Row]) -> None:
+    agg: Dict[tuple, List[int]] = {}
+    for r in rows:
+        ts = int(r["ts"] or 0)
+        k = (str(r["mint"] or ""), _day(ts), str(r["status"] or ""))
+        a = agg.get(k)
+        if a is None:
+            agg[k] = a = [0, 0, ts, ts]
+        a[0] += 1
+        a[1] += 1 if (r["err"] or "") else 0
+        a[2] = min(a[2], ts)
+        a[3] = max(a[3], ts)
+    con.executemany(
+        """
+        INSERT INTO events_daily(mint, day, status, n, n_err, first_ts, last_ts)
+        VALUES(?,?,?,?,?,?,?)
+        ON CONFLICT(mint, day, status) DO UPDATE SET
+          n=events_daily.n+excluded.n,
+          n_err=events_daily.n_err+excluded.n_err,
+          first_ts=MIN(events_daily.first_ts, excluded.first_ts),
+          last_ts=MAX(events_daily.last_ts, excluded.last_ts)
+        """,
+        [(k[0], k[1], k[2], a[0], a[1], a[2], a[3]) for k, a in agg.items()],
+    )
+
+
+def _f(x: Any) -> float:
+    try:
+        return float(x) if x is not None else 0.0
+    except Exception:
+        return 0.0
+
+
+def _rollup_wallet_events(con: sqlite3.Connection, rows: List[sqlite3.Row]) -> None:
+    agg: Dict[tuple, List[Any]] = {}
+    for r in rows:
+        ts = int(r["ts"] or 0)
+        k = (str(r["owner"] or ""), str(r["mint"] or ""), _day(ts), str(r["kind"] or ""))
+        a = agg.get(k)
+        if a is None:
+            agg[k] = a = [0, 0, 0.0, 0.0, 0.0, ts, ts]
+        a[0] += 1
+        a[1] += 1 if r["err"] else 0
+        a[2] += _f(r["amount"])
+        a[3] += _f(r["sol_change"])
+        a[4] += _f(r["fee_sol"])
+        a[5] = min(a[5], ts)
+        a[6] = max(a[6], ts)
+    con.executemany(
+        """
+        INSERT INTO wallet_events_daily(owner, mint, day, kind, n, n_err, amount_sum, sol_change_sum, fee_sol_sum, first_ts, last_ts)
+        VALUES(?,?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(owner, mint, day, kind) DO UPDATE SET
+          n=wallet_events_daily.n+excluded.n,
+          n_err=wallet_events_daily.n_err+excluded.n_err,
+          amount_sum=wallet_events_daily.amount_sum+excluded.amount_sum,
+          sol_change_sum=wallet_events_daily.sol_change_sum+excluded.sol_change_sum,
+          fee_sol_sum=wallet_events_daily.fee_sol_sum+excluded.fee_sol_sum,
+          first_ts=MIN(wallet_events_daily.first_ts, excluded.first_ts),
+          last_ts=MAX(wallet_events_daily.last_ts, excluded.last_ts)
+        """,
+        [(k[0], k[1], k[2], k[3], *a) for k, a in agg.items()],
+    )
+
+
+# table -> (rollup, columns it reads). BRAIN_DB carries two wallet_events
+# layouts (helius_wallet_ingest vs src/brain/schema.sql): a table missing the
+# rollup columns is still archived + pruned, just without the daily aggregate.
+_ROLLUPS = {
+    "events": (_rollup_events, ("ts", "mint", "status", "err")),
+    "wallet_events": (_rollup_wallet_events, ("ts", "owner", "mint", "kind", "amount", "sol_change", "fee_sol", "err")),
+}
+
+
+def _archive_rows(policy: RetentionPolicy, db_path: str, table: str, rows: List[sqlite3.Row]) -> int:
+    by_day: Dict[int, List[Dict[str, Any]]] = {}
+    for r in rows:
+        by_day.setdefault(_day(r["ts"]), []).append(dict(r))
+    nbytes = 0
+    for day, items in by_day.items():
+        nbytes += _append_frame(_archive_path(policy, db_path, table, day), items, policy.zlib_level)
+    return nbytes
+
+
+def prune_table(
+    con: sqlite3.Connection,
+    db_path: str,
+    table: str,
+    keep_days: int,
+    policy: RetentionPolicy,
+    now: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Roll up + archive + delete rows of `table` older than keep_days, in
+    batches ordered by rowid so each batch is one short write transaction.
+    """
+    out = {"table": table, "rows": 0, "bytes": 0, "cutoff_ts": 0, "skipped": "", "rollup": ""}
+    if table not in _ROLLUPS:
+        raise ValueError(f"retention: unsupported table {table}")
+    if not _has_table(con, table):
+        out["skipped"] = "no_table"
+        return out
+    if keep_days <= 0:
+        out["skipped"] = "disabled"
+        return out
+
+    now = int(time.time()) if now is None else int(now)
+    cutoff = now - int(keep_days) * DAY_SEC
+    out["cutoff_ts"] = cutoff
+    ensure_rollup_tables(con)
+    table_cols = _cols(con, table)
+    rollup, need = _ROLLUPS[table]
+    missing = [c for c in need if c not in table_cols]
+    if "ts" in missing:
+        out["skipped"] = "no_ts_column"
+        return out
+    if missing:
+        rollup = None
+        out["rollup"] = "skipped:missing_" + ",".join(missing)
+
+    if policy.dry_run:
+        row = con.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE ts < ?", (cutoff,)).fetchone()
+        out["rows"] = int(row["n"] or 0)
+        return out
+
+    cols = ", ".join(table_cols)
+    last_rowid = 0
+    for _ in range(policy.max_batches):
+        rows = con.execute(
+            f"SELECT rowid AS _rowid, {cols} FROM {table} WHERE ts < ? AND rowid > ? ORDER BY rowid LIMIT ?",
+            (cutoff, last_rowid, policy.batch_rows),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = int(rows[-1]["_rowid"])
+
+        # rollup + delete, then the archive frame (fsync'd) as the last step of
+        # the same transaction: a failing rollup/delete rolls back before anything
+        # is archived (reruns don't re-append frames), a failing archive rolls the
+        # delete back; only a crash between fsync and COMMIT can duplicate a frame.
+        with con:
+            if rollup is not None:
+                rollup(con, rows)
+            con.executemany(f"DELETE FROM {table} WHERE rowid=?", [(int(r["_rowid"]),) for r in rows])
+            nbytes = _archive_rows(policy, db_path, table, rows)
+        out["bytes"] += nbytes
+        out["rows"] += len(rows)
+
+        if len(rows) < policy.batch_rows:
+            break
+
+    if out["rows"]:
+        with con:
+            con.execute(
+                "INSERT INTO retention_runs(ts, tbl, rows_archived, bytes_archived, cutoff_ts) VALUES(?,?,?,?,?)",
+                (now, table, out["rows"], out["bytes"], cutoff),
+            )
+    return out
+
+
+def run_retention(db_path: str, tables: Dict[str, int], policy: Optional[RetentionPolicy] = None) -> List[Dict[str, Any]]:
+    """tables: {table_name: keep_days}"""
+    policy = policy or RetentionPolicy.from_env()
+    if not os.path.exists(db_path):
+        return [{"table": t, "rows": 0, "bytes": 0, "cutoff_ts": 0, "skipped": "no_db", "rollup": ""} for t in tables]
+    con = _connect(db_path)
+    try:
+        inc = ensure_incremental_vacuum(con, policy)
+        res = [prune_table(con, db_path, t, days, policy) for t, days in tables.items()]
+        freed = incremental_vacuum(con, policy.vacuum_pages) if (inc and not policy.dry_run) else 0
+        for r in res:
+            r["vacuum_pages"] = freed
+        return res
+    finally:
+        con.close()
+
+
+def main() -> None:
+    policy = RetentionPolicy.from_env()
+    trades_db = os.getenv("TRADES_DB_PATH", "state/trades.sqlite")
+    brain_db = os.getenv("BRAIN_DB", "state/brain.sqlite")
+
+    jobs = [
+        (trades_db, {"events": policy.events_keep_days}),
+        (brain_db, {"wallet_events": policy.wallet_events_keep_days}),
+    ]
+    extra = (os.getenv("RETENTION_EXTRA_EVENTS_DBS", "") or "").strip()
+    for p in [x.strip() for x in extra.split(",") if x.strip()]:
+        jobs.append((p, {"events": policy.events_keep_days}))
+
+    for db_path, tables in jobs:
+        t0 = time.time()
+        for r in run_retention(db_path, tables, policy):
+            print(
+                f"[RETENTION] db={db_path} table={r['table']} rows={r['rows']} bytes={r['bytes']} "
+                f"cutoff={r['cutoff_ts']} vacuum_pages={r.get('vacuum_pages', 0)} "
+                f"skipped={r['skipped'] or '-'} rollup={r.get('rollup') or 'ok'} dry_run={int(policy.dry_run)} dt={time.time() - t0:.2f}s",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,6 @@
 from __future__ import annotations
 
-import json
-
 # ---- Bot Lino: blacklist policy ----
-def _ttl_until(reason: str, normal_until: int, transient_until: int) -> int:
-    return transient_until if _is_transient_reason(reason) else normal_until
-
 def _is_transient_reason(reason: str) -> bool:
     r = (reason or "").lower()
     transient_keys = [
@@ -22,10 +17,11 @@ def _is_transient_reason(reason: str) -> bool:
         "unavailable",
     ]
     return any(k in r for k in transient_keys)
+import asyncio
 import os
 import time
-from pathlib import Path
-from typing import Any, Dict, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple, Optional
 
 from config import settings
 from core.anti_rug import AntiRug
@@ -33,10 +29,29 @@ from core.dev_profiler import DevProfiler
 from core.rpc_factory import build_rpc
 
 # -----------------------------
-# BLACKLIST FILES
+# VERDICT CACHE
 # -----------------------------
-BLACKLIST_DEV_PATH = Path(os.getenv("BLACKLIST_DEV_PATH", "state/blacklist_dev.json"))
-BLACKLIST_MINT_PATH = Path(os.getenv("BLACKLIST_MINT_PATH", "state/blacklist_mint.json"))
+# passes go stale fast (holders move); rejects follow the blacklist TTLs below
+RISK_PASS_TTL_S = float(os.getenv("RISK_PASS_TTL_S", "120"))
+# transient rejects (429 / timeout...): blacklist entry and cached verdict share this TTL
+RISK_TRANSIENT_TTL_S = int(os.getenv("RISK_TRANSIENT_TTL_S", "60"))
+RISK_VERDICT_MAX = int(os.getenv("RISK_VERDICT_MAX", "20000"))
+# concurrent on-chain checks in allow_buy_many; 0 => RPC_CONC * number of RPC urls
+RISK_CHECK_CONC = int(os.getenv("RISK_CHECK_CONC", "0"))
+
+
+@dataclass
+class RiskVerdict:
+    ok: bool
+    reason: str
+    ts: float
+    until: float
+    # raw inputs: program_owner, mint/freeze authority, supply, top1_pct, top10_pct, source...
+    inputs: Dict[str, Any] = field(default_factory=dict)
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.until
+
 
 # -----------------------------
 # RPC SINGLETON
@@ -58,26 +73,6 @@ def get_rpc(logger=None):
     return _RPC
 
 
-# -----------------------------
-# UTILS
-# -----------------------------
-def _load_json(path: Path, default):
-    try:
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        pass
-    return default
-
-
-def _save_json(path: Path, data) -> None:
-    try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    except Exception:
-        pass
-
-
 # -----------------------------
 # RISK CHECKER
 # -----------------------------
@@ -104,66 +99,126 @@ class RiskChecker:
 
         self.dev_profiler = DevProfiler()
 
-        self.bl_dev = _load_json(BLACKLIST_DEV_PATH, {})
-        self.bl_mint = _load_json(BLACKLIST_MINT_PATH, {})
+        # dev + mint blacklists live in the reputation store (legacy JSON imported once)
+        self.rep = self.dev_profiler.store
+
+        self.verdicts: Dict[str, RiskVerdict] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"verdict_hit": 0, "onchain_checks": 0}
+
+        conc = RISK_CHECK_CONC
+        if conc <= 0:
+            n_urls = len(getattr(self.rpc, "clients", None) or [self.rpc])
+            conc = max(1, int(os.getenv("RPC_CONC", "2"))) * n_urls
+        self._check_sem = asyncio.Semaphore(conc)
 
     # -------------------------
     # BLACKLIST HELPERS
     # -------------------------
     def _mint_blacklisted(self, mint: str) -> Optional[str]:
-        rec = self.bl_mint.get(mint)
+        rec = self.rep.mint_blacklisted(mint)
         if not rec:
             return None
-        until = _ttl_until(reason, int(rec.get("until") or 0), int(__import__('time').time()) + 60)
-        if until > int(time.time()):
-            return str(rec.get("reason") or "BLACKLISTED")
-        self.bl_mint.pop(mint, None)
-        _save_json(BLACKLIST_MINT_PATH, self.bl_mint)
-        return None
+        return str(rec[0] or "BLACKLISTED")
 
     def _blacklist_mint(self, mint: str, reason: str, ttl: int = 600):
-        self.bl_mint[mint] = {
-            "reason": reason,
-            "until": int(time.time()) + int(ttl),
-        }
-        _save_json(BLACKLIST_MINT_PATH, self.bl_mint)
+        # transient (429/timeout...) rejects only hold for RISK_TRANSIENT_TTL_S
+        self.rep.blacklist_mint(mint, reason, ttl_s=RISK_TRANSIENT_TTL_S if _is_transient_reason(reason) else int(ttl))
+
+    # -------------------------
+    # VERDICT CACHE HELPERS
+    # -------------------------
+    def _verdict_put(self, mint: str, ok: bool, reason: str, ttl: float, inputs: Optional[Dict[str, Any]] = None) -> RiskVerdict:
+        now = time.time()
+        if len(self.verdicts) >= RISK_VERDICT_MAX:
+            self.verdicts = {m: v for m, v in self.verdicts.items() if v.fresh(now)}
+        v = RiskVerdict(ok=ok, reason=reason, ts=now, until=now + float(ttl), inputs=dict(inputs or {}))
+        self.verdicts[mint] = v
+        return v
+
+    def verdict(self, mint: str) -> Optional[RiskVerdict]:
+        """Cached on-chain verdict for `mint` if still fresh (raw inputs in .inputs)."""
+        v = self.verdicts.get(mint)
+        if v is None:
+            return None
+        if not v.fresh():
+            self.verdicts.pop(mint, None)
+            return None
+        return v
+
+    def _reject(self, mint: str, bl_reason: str, ttl: int, reason: str, inputs: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
+        ttl = RISK_TRANSIENT_TTL_S if _is_transient_reason(bl_reason) else int(ttl)  # same expiry for both caches
+        self._blacklist_mint(mint, bl_reason, ttl=ttl)
+        self._verdict_put(mint, False, reason, ttl, inputs)
+        return False, reason
 
     # -------------------------
     # MAIN ENTRY
     # -------------------------
-    async def allow_buy(self, ov: Dict[str, Any]) -> Tuple[bool, str]:
+    def _precheck(self, ov: Dict[str, Any]) -> Tuple[str, Optional[Tuple[bool, str]]]:
+        """Cheap off-chain gates. Returns (mint, verdict) with verdict=None when on-chain check is still needed."""
         mint = str(ov.get("mint") or ov.get("token") or "")
         if not mint:
-            return False, "no mint"
+            return mint, (False, "no mint")
 
         # mint blacklist
         r = self._mint_blacklisted(mint)
         if r:
-            return False, f"mint blacklisted: {r}"
+            return mint, (False, f"mint blacklisted: {r}")
 
         # dev check
         dev = (ov.get("creator") or "").strip()
         if dev:
             if not self.dev_profiler.allow(dev):
-                return False, "dev blacklisted"
+                return mint, (False, "dev blacklisted")
 
         # liquidity / mc
         liq = float(ov.get("liquidity_usd") or 0)
         mc = float(ov.get("marketcap_usd") or 0)
 
         if liq < float(settings.MIN_LIQUIDITY_USD):
-            return False, f"low liquidity {liq:.0f}"
+            return mint, (False, f"low liquidity {liq:.0f}")
 
         if mc > 0 and mc > float(settings.MAX_MARKET_CAP_USD):
-            return False, f"mc too high {mc:.0f}"
+            return mint, (False, f"mc too high {mc:.0f}")
 
         # PAPER: skip on-chain
         if self.mode != "REAL":
-            return True, "ok(paper)"
+            return mint, (True, "ok(paper)")
+
+        v = self.verdict(mint)
+        if v is not None:
+            self.stats["verdict_hit"] += 1
+            return mint, (v.ok, v.reason)
+        return mint, None
 
+    async def _onchain(self, mint: str) -> Tuple[bool, str]:
+        # one check per mint at a time: concurrent callers share the in-flight result
+        fut = self._inflight.get(mint)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[mint] = fut
+        try:
+            async with self._check_sem:
+                res = await self._onchain_uncached(mint)
+            fut.set_result(res)
+            return res
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # retrieved: waiters (if any) still get it
+            raise
+        finally:
+            self._inflight.pop(mint, None)
+
+    async def _onchain_uncached(self, mint: str) -> Tuple[bool, str]:
         # -------------------------
         # ANTI RUG (ON-CHAIN)
         # -------------------------
+        self.stats["onchain_checks"] += 1
         try:
             res = await self.anti.check(
                 mint,
@@ -172,16 +227,47 @@ class RiskChecker:
                 require_renounced=True,
             )
         except Exception as e:
-            self._blacklist_mint(mint, "ANTI_RUG_EXCEPTION", ttl=300)
-            return False, f"anti_rug exception: {e}"
+            return self._reject(mint, "ANTI_RUG_EXCEPTION", 300, f"anti_rug exception: {e}")
 
+        inputs = dict(res.details or {})
         if not res.ok:
             # 429 safety → temporary cooldown only
             if "Too many requests" in res.reason or "429" in res.reason:
-                self._blacklist_mint(mint, "RPC_429", ttl=180)
-                return False, "rpc limited (cooldown)"
+                return self._reject(mint, "RPC_429", RISK_TRANSIENT_TTL_S, "rpc limited (cooldown)", inputs)
 
-            self._blacklist_mint(mint, "RISK_REJECT", ttl=1800)
-            return False, res.reason
+            return self._reject(mint, "RISK_REJECT", 1800, res.reason, inputs)
 
+        self._verdict_put(mint, True, "ok", RISK_PASS_TTL_S, inputs)
         return True, "ok"
+
+    async def allow_buy(self, ov: Dict[str, Any]) -> Tuple[bool, str]:
+        mint, pre = self._precheck(ov)
+        if pre is not None:
+            return pre
+        return await self._onchain(mint)
+
+    async def allow_buy_many(self, overviews: Iterable[Dict[str, Any]]) -> List[Tuple[bool, str]]:
+        """
+        Gate a whole scan: cheap gates and cached verdicts first, then the
+        remaining on-chain checks run concurrently (bounded by RISK_CHECK_CONC,
+        default = RPC pool concurrency). Results are aligned with `overviews`.
+        """
+        ovs = list(overviews or [])
+        out: List[Optional[Tuple[bool, str]]] = [None] * len(ovs)
+        pending: Dict[str, List[int]] = {}
+        for i, ov in enumerate(ovs):
+            mint, pre = self._precheck(ov)
+            if pre is not None:
+                out[i] = pre
+            else:
+                pending.setdefault(mint, []).append(i)
+
+        if pending:
+            mints = list(pending)
+            results = await asyncio.gather(*(self._onchain(m) for m in mints), return_exceptions=True)
+            for m, r in zip(mints, results):
+                if isinstance(r, BaseException):
+                    r = (False, f"anti_rug exception: {r}")
+                for i in pending[m]:
+                    out[i] = r
+        return [r if r is not None else (False, "no verdict") for r in out]
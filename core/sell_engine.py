@@ -6,6 +6,10 @@ import traceback
 import time
 import re
 
+from config import runtime
+from core import decision_trace, latency_trace, tick_store
+from core.bounded_cache import BoundedCache
+
 def _env_float(name: str, default: float) -> float:
     v = os.environ.get(name)
     if v is None or v == "":
@@ -33,52 +37,70 @@ class SellEngine:
     - TP1 / TP2 partiels + hard SL + time stop + trailing
     """
 
+    # per-mint runtime state: bounded (LRU + TTL) and pruned to open positions each run_once
+    STATE_MAX_MINTS = _env_int("SELL_STATE_MAX_MINTS", 5000)
+    STATE_TTL_S = _env_float("SELL_STATE_TTL_S", 86400.0)
+
+    def _state_cache(self, name: str) -> BoundedCache:
+        return BoundedCache(f"sell_engine.{name}", max_items=self.STATE_MAX_MINTS, ttl_s=self.STATE_TTL_S)
+
     def __init__(self, db, price_feed, trader=None):
-        self._mint_cooldowns = {}  # mint -> unix_ts until when sells are paused
-        try:
-            import os
-            self.SELL_COOLDOWN_JUP_CUSTOM_SEC = int(os.getenv('SELL_COOLDOWN_JUP_CUSTOM_SEC','21600'))
-        except Exception:
-            self.SELL_COOLDOWN_JUP_CUSTOM_SEC = 21600
+        self._mint_cooldowns = self._state_cache("mint_cooldowns")  # mint -> unix_ts until when sells are paused
         self.db = db
         self.price_feed = price_feed
         self.trader = trader  # ignored (compat)
 
-        # Fractions (0.01 = 1%)
-        self.TP1_PCT = float(os.getenv("SELL_TP1_PCT", "0.30"))
-        self.TP1_SIZE = float(os.getenv("SELL_TP1_SIZE", "0.35"))
-        self.TP2_PCT = float(os.getenv("SELL_TP2_PCT", "0.80"))
-        self.TP2_SIZE = float(os.getenv("SELL_TP2_SIZE", "0.35"))
+        # typed config snapshot (config.runtime): SELL_* / HARD_SL_PCT / cooldowns,
+        # re-applied in place by run_once() after a hot reload (caches are kept)
+        self.cfg = None
+        self._apply_cfg(runtime.current())
 
-        self.HARD_SL_PCT = -abs(_env_float('HARD_SL_PCT', _env_float('SELL_HARD_SL_PCT', 0.25)))
-        self.TRAIL_TIGHT = float(os.getenv("SELL_TRAIL_TIGHT", "0.10"))
-        self.TRAIL_WIDE  = float(os.getenv("SELL_TRAIL_WIDE",  "0.20"))
-
-        self.TIME_STOP_SEC = int(os.getenv("SELL_TIME_STOP_SEC", "900"))
-        self.TIME_STOP_MIN_PNL = float(os.getenv("SELL_TIME_STOP_MIN_PNL", "0.05"))
-
-        # 429 rate-limit handling (Jupiter lite-api)
-        self.SELL_429_COOLDOWN_SEC = int(os.getenv("SELL_429_COOLDOWN_SEC", "90"))
-        self.SELL_ROUTE_FAIL_COOLDOWN_SEC = int(os.getenv("SELL_ROUTE_FAIL_COOLDOWN_SEC", "2700"))  # 45min
         # --- runtime cooldown state (required by some paths, incl. simulate-bypass) ---
         # _global_cooldown: unix timestamp until which sells are globally blocked
         # _mint_cooldown: dict mint->unix timestamp until which that mint is blocked
         self._global_cooldown_store = float(getattr(self, "_global_cooldown", 0.0) or 0.0)
         # keep one single dict: alias _mint_cooldown to existing _mint_cooldowns (plural) if present
         if not hasattr(self, "_mint_cooldowns") or getattr(self, "_mint_cooldowns") is None:
-            self._mint_cooldowns = {}
+            self._mint_cooldowns = self._state_cache("mint_cooldowns")
         self._mint_cooldown_store = self._mint_cooldowns
-        self._mint_sell_cooldown_until = {}
-        self.SELL_429_MAX_RETRY = int(os.getenv("SELL_429_MAX_RETRY", "2"))
-        self.SELL_429_BACKOFF_SEC = int(os.getenv("SELL_429_BACKOFF_SEC", "20"))
+        self._mint_sell_cooldown_until = self._state_cache("mint_sell_cooldown_until")
         self._cfg_logged = False
-        self._blocked_until = {}  # mint -> ts until which we skip (e.g. no SOL)
+        self._blocked_until = self._state_cache("blocked_until")  # mint -> ts until which we skip (e.g. no SOL)
         # price feed 429 handling
-        self._price_cache = {}       # mint -> (price, ts)
-        self._price_429_until = {}   # mint -> ts until which price fetch is on cooldown
-        self._price_429_log_ts = {}  # mint -> ts of last [COOLDOWN] log (anti-spam)
-        self.PRICE_CACHE_TTL_S = int(os.getenv("PRICE_CACHE_TTL_S", "30"))
-        self.PRICE_429_COOLDOWN_S = int(os.getenv("PRICE_429_COOLDOWN_S", "90"))
+        self._price_cache = self._state_cache("price_cache")          # mint -> (price, ts)
+        self._price_429_until = self._state_cache("price_429_until")  # mint -> ts until which price fetch is on cooldown
+        self._price_429_log_ts = self._state_cache("price_429_log_ts")  # mint -> ts of last [COOLDOWN] log (anti-spam)
+
+    def _apply_cfg(self, cfg) -> None:
+        """Copy a config.runtime.Snapshot onto the engine attributes (startup and hot reload)."""
+        sc, ex = cfg.sell, cfg.sell.exit
+        # Fractions (0.01 = 1%)
+        self.TP1_PCT = float(ex.tp1_pct)
+        self.TP1_SIZE = float(ex.tp1_size)
+        self.TP2_PCT = float(ex.tp2_pct)
+        self.TP2_SIZE = float(ex.tp2_size)
+
+        self.HARD_SL_PCT = -abs(ex.hard_sl_pct)
+        self.TRAIL_TIGHT = float(ex.trail_tight)
+        self.TRAIL_WIDE = float(ex.trail_wide)
+
+        self.TIME_STOP_SEC = int(ex.time_stop_sec)
+        self.TIME_STOP_MIN_PNL = float(ex.time_stop_min_pnl)
+
+        # 429 rate-limit handling (Jupiter lite-api)
+        self.SELL_429_COOLDOWN_SEC = int(sc.cooldown_429_sec)
+        self.SELL_ROUTE_FAIL_COOLDOWN_SEC = int(sc.route_fail_cooldown_sec)  # 45min
+        self.SELL_429_MAX_RETRY = int(sc.max_429_retry)
+        self.SELL_429_BACKOFF_SEC = int(sc.backoff_429_sec)
+        self.SELL_COOLDOWN_JUP_CUSTOM_SEC = int(sc.jup_custom_cooldown_sec)
+        self.PRICE_CACHE_TTL_S = int(sc.price_cache_ttl_s)
+        self.PRICE_429_COOLDOWN_S = int(sc.price_429_cooldown_s)
+
+        self.SELL_FORCE_ALL = bool(sc.force_all)
+        self.SELL_DRY_RUN = bool(sc.dry_run)
+        if self.cfg is not None:
+            print(f"🔁 SELL_ENGINE_CFG reload v{self.cfg.version} -> v{cfg.version} ({cfg.reason})", flush=True)
+        self.cfg = cfg
 
     def _ui_qty(self, pos) -> float:
         try:
@@ -182,10 +204,10 @@ class SellEngine:
                 d = getattr(self, "_mint_sell_cooldown_until", None)
 
 
-                if not isinstance(d, dict):
+                if not isinstance(d, (dict, BoundedCache)):
 
 
-                    d = {}
+                    d = self._state_cache("mint_sell_cooldown_until")
 
 
                     setattr(self, "_mint_sell_cooldown_until", d)
@@ -254,6 +276,9 @@ class SellEngine:
 
     def _sell_exec(self, mint: str, ui_amount: float, reason: str) -> str:
         """Run src/sell_exec_wrap.py and return a marker or txsig."""
+        latency_trace.lap("decide")
+        latency_trace.annotate(reason=reason)
+        decision_trace.event("sell", mint, "SELL", reason, ui=ui_amount)
 
         # throttle swaps (best-effort)
         try:
@@ -281,6 +306,7 @@ class SellEngine:
         except Exception:
             pass
 
+        latency_trace.lap("throttle")
         cmd = [sys.executable, "-u", "src/sell_exec_wrap.py",
                "--mint", mint,
                "--ui", str(ui_amount),
@@ -289,7 +315,9 @@ class SellEngine:
 
         timeout_s = int(getattr(self, "SELL_EXEC_TIMEOUT_SEC", 180) or 180)
         try:
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
+            with latency_trace.span("exec"):
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s,
+                                      env=latency_trace.child_env())
         except subprocess.TimeoutExpired:
             return "__FAIL__"
         except Exception:
@@ -412,11 +440,15 @@ class SellEngine:
 
         return "__FAIL__"
     def run_once(self):
+        # one config snapshot per tick (hot reload lands between ticks)
+        cfg = runtime.current()
+        if cfg is not self.cfg:
+            self._apply_cfg(cfg)
 
         ### FORCE_SELL_ALL_SIM_BYPASS_TOP_V1 ###
         # If wrapper outcomes are simulated, bypass all price/on-chain checks and test cooldown logic safely.
-        _sim_map = os.getenv("SELL_WRAP_SIMULATE_MAP", "").strip()
-        _force = str(os.getenv("SELL_FORCE_ALL", "0")).lower() in ("1","true","yes","y")
+        _sim_map = cfg.sell.wrap_simulate_map
+        _force = cfg.sell.force_all
         if _force and _sim_map:
             print("[SELL] FORCE_SELL_ALL simulate-bypass (TOP) enabled", flush=True)
             # fetch open positions robustly across DB adapter variants
@@ -499,7 +531,7 @@ class SellEngine:
             return
         ### /FORCE_SELL_ALL_SIM_BYPASS_TOP_V1 ###
 
-        only_mint = (os.getenv("SELL_ONLY_MINT", "") or "").strip()
+        only_mint = cfg.sell.only_mint
         if only_mint:
             print("🧪 SELL_ONLY_MINT=", only_mint, flush=True)
 
@@ -524,12 +556,14 @@ class SellEngine:
         positions = self.db.get_open_positions() or []
         ### DBG_POS_LOOP_V3 ###
         try:
-            _force = bool(getattr(self, "SELL_FORCE_ALL", False)) or (str(__import__("os").getenv("SELL_FORCE_ALL","0")).strip() in ("1","true","True"))
-            print(f"[DBG] fetched positions: n={len(positions)} SELL_FORCE_ALL={_force}", flush=True)
+            _force = self.SELL_FORCE_ALL
+            decision_trace.event("positions", action="FETCH", n=len(positions), force_all=int(_force))
         except Exception as _e:
             print(f"[DBG] fetched positions: failed err={_e}", flush=True)
 
         print(f"💰 sell_engine: open_positions={len(positions)}", flush=True)
+        if not only_mint:
+            self._prune_mint_state(positions)
 
         for pos in positions:
 
@@ -539,7 +573,7 @@ class SellEngine:
 
                 _q = pos.get('qty_token') if hasattr(pos, 'get') else getattr(pos, 'qty_token', None)
 
-                print(f"[DBG] loop item mint={_m} qty={_q}", flush=True)
+                decision_trace.event("loop_item", mint=_m, qty=_q)
 
             except Exception as _e:
 
@@ -561,6 +595,18 @@ class SellEngine:
                 print(f"❌ sell_engine error mint={mint}: {e}", flush=True)
                 print(traceback.format_exc(), flush=True)
 
+    def _prune_mint_state(self, positions) -> None:
+        """Forget per-mint state of mints that are no longer open (closed positions)."""
+        try:
+            open_mints = {str((p.get("mint") if hasattr(p, "get") else getattr(p, "mint", "")) or "") for p in positions}
+            for name in ("_price_cache", "_price_429_until", "_price_429_log_ts", "_blocked_until",
+                         "_mint_sell_cooldown_until", "_mint_cooldowns"):
+                c = getattr(self, name, None)
+                if isinstance(c, BoundedCache):
+                    c.retain(open_mints)
+        except Exception:
+            pass
+
     # --- cooldown helpers (avoid name collisions with dict/float attrs) ---
     def _global_cooldown_add(self, sec: int, reason: str = ""):
         try:
@@ -592,8 +638,8 @@ class SellEngine:
                     sec = int(getattr(self, 'SELL_INSUFFICIENT_COOLDOWN_SEC', getattr(self, 'SELL_429_COOLDOWN_SEC', 180)) or 180)
             sec = int(sec or 0)
             store = getattr(self, '_mint_sell_cooldown_until', None)
-            if not isinstance(store, dict):
-                store = {}
+            if not isinstance(store, (dict, BoundedCache)):
+                store = self._state_cache("mint_sell_cooldown_until")
                 setattr(self, '_mint_sell_cooldown_until', store)
             until = now + max(sec, 0)
             store[mint] = max(float(store.get(mint, 0.0) or 0.0), until)
@@ -633,6 +679,7 @@ class SellEngine:
             p = float(self.price_feed.get_price(mint) or 0.0)
             if p > 0:
                 _cache[mint] = (p, now)
+                tick_store.record(mint, p, "sell", ts=now)
             return p
         except Exception as _err:
             _msg = str(_err)
@@ -646,6 +693,19 @@ class SellEngine:
             return 0.0
 
     def _handle_one(self, pos, now: float):
+        # latency trace per position: price -> decide -> exec (sell_exec child spans) -> close
+        mint = pos.get('mint') if isinstance(pos, dict) else getattr(pos, 'mint', None)
+        latency_trace.start("sell", mint=mint)
+        try:
+            return self._handle_one_decide(pos, now)
+        finally:
+            # only ticks that reached the swap are kept (e2e sample + spans line)
+            sold = latency_trace.has("exec")
+            if sold:
+                latency_trace.lap("close")
+            latency_trace.finish(keep=sold)
+
+    def _handle_one_decide(self, pos, now: float):
         # MINT_COOLDOWN_SKIP
         mint = pos.get('mint') if isinstance(pos, dict) else getattr(pos, 'mint', None)
         # SELL_COOLDOWN_GUARD
@@ -654,21 +714,22 @@ class SellEngine:
             until = float(getattr(self, "_mint_sell_cooldown_until", {}).get(mint, 0.0) or 0.0)
             if until and now < until:
                 left = int(until - now)
-                print(f"⏳ SELL mint cooldown active left={left}s mint={mint}", flush=True)
+                decision_trace.event("sell_skip", mint, "SKIP", "mint_sell_cooldown", left_s=left)
                 return
         except Exception:
             pass
         if mint and hasattr(self, '_mint_cooldowns'):
             until = self._mint_cooldowns.get(mint, 0)
             if until and now < until:
-                print(f"⏸️ SELL_COOLDOWN skip mint={mint} for {int(until-now)}s")
+                decision_trace.event("sell_skip", mint, "SKIP", "mint_cooldown", left_s=int(until - now))
                 return
         mint = str(pos.get("mint") or "")
         entry = self._entry(pos)
         qty_total = self._ui_qty(pos)
         entry_ts = float(pos.get("entry_ts") or pos.get("opened_ts") or 0.0)
 
-        price = self._get_price_cached(mint)
+        with latency_trace.span("price"):
+            price = self._get_price_cached(mint)
         # sanity: if high-water is wildly off (e.g. after pricing fix), reset it
         try:
             _hw = float(pos.get("high_water") or pos.get("max_price") or 0.0)
@@ -718,20 +779,31 @@ class SellEngine:
         tp1 = bool(pos.get("tp1_done"))
         tp2 = bool(pos.get("tp2_done"))
 
-        print(
-            "📈 PRICE mint=%s entry=%s price=%s pnl=%.2f%% tp1=%s tp2=%s hw=%s"
-            % (mint, entry, price, pnl * 100.0, int(tp1), int(tp2), hw),
-            flush=True,
-        )
+        # exit rules: profile recorded on the position at buy time (PUMP / NORMAL), else SELL_* (BASE)
+        ex = self.cfg.exit_for(pos)
+        if ex is self.cfg.sell.exit:
+            hard_sl, tp1_pct, tp1_size, tp2_pct, tp2_size = (self.HARD_SL_PCT, self.TP1_PCT, self.TP1_SIZE,
+                                                             self.TP2_PCT, self.TP2_SIZE)
+            trail_tight, trail_wide = self.TRAIL_TIGHT, self.TRAIL_WIDE
+            ts_sec, ts_min_pnl = self.TIME_STOP_SEC, self.TIME_STOP_MIN_PNL
+        else:
+            hard_sl, tp1_pct, tp1_size, tp2_pct, tp2_size = (-abs(ex.hard_sl_pct), ex.tp1_pct, ex.tp1_size,
+                                                             ex.tp2_pct, ex.tp2_size)
+            trail_tight, trail_wide = ex.trail_tight, ex.trail_wide
+            ts_sec, ts_min_pnl = ex.time_stop_sec, ex.time_stop_min_pnl
+
+        # PRICE line per position per tick -> decision sink (sampled/deduped, written off-thread)
+        decision_trace.event("price", mint, "HOLD", "", entry=entry, price=price, pnl=round(pnl, 6),
+                             tp1=int(tp1), tp2=int(tp2), hw=hw)
 
         # HARD SL (sell ALL)
         # FORCE: sell ALL open positions regardless of pnl (test cleanup)
-        if os.getenv('SELL_FORCE_ALL', '0') == '1':
+        if self.SELL_FORCE_ALL:
             try:
                 print(f"🧨 FORCE_SELL_ALL mint={mint} qty={qty_total}", flush=True)
             except Exception:
                 pass
-            if os.getenv('SELL_DRY_RUN', '0') == '1':
+            if self.SELL_DRY_RUN:
                 try:
                     print('🧪 SELL_DRY_RUN=1 -> skip FORCE_SELL_ALL sell', flush=True)
                 except Exception:
@@ -777,9 +849,9 @@ class SellEngine:
                     pass
             return
 
-        if pnl <= self.HARD_SL_PCT:
+        if pnl <= hard_sl:
             print(f"🔴 HARD_SL mint={mint} pnl={pnl:.2%}", flush=True)
-            if os.getenv("SELL_DRY_RUN", "0") == "1":
+            if self.SELL_DRY_RUN:
                 print("🧪 SELL_DRY_RUN=1 -> skip HARD_SL sell", flush=True)
                 return
             sell_qty = qty_total
@@ -873,15 +945,15 @@ class SellEngine:
             return
 
         # TIME STOP (sell ALL)  (condition: age > TIME_STOP_SEC AND pnl < TIME_STOP_MIN_PNL)
-        if entry_ts > 0 and (now - entry_ts) > self.TIME_STOP_SEC and pnl < self.TIME_STOP_MIN_PNL:
+        if entry_ts > 0 and (now - entry_ts) > ts_sec and pnl < ts_min_pnl:
             print(f"⏱️ TIME_STOP mint={mint} pnl={pnl:.2%}", flush=True)
-            if os.getenv("SELL_DRY_RUN", "0") == "1":
+            if self.SELL_DRY_RUN:
                 print("🧪 SELL_DRY_RUN=1 -> skip TIME_STOP sell", flush=True)
                 return
             sell_qty = qty_total
             # TIME_STOP_GUARD: only sell if pnl >= min pnl
-            if pnl < self.TIME_STOP_MIN_PNL:
-                print(f"⏱️ TIME_STOP skip: pnl {pnl:.2%} < min {self.TIME_STOP_MIN_PNL:.2%}")
+            if pnl < ts_min_pnl:
+                print(f"⏱️ TIME_STOP skip: pnl {pnl:.2%} < min {ts_min_pnl:.2%}")
                 return
             txsig = self._sell_exec(mint, sell_qty, "time_stop")
             if txsig == '__DUST__':
@@ -901,13 +973,13 @@ class SellEngine:
             return
 
         # TP1
-        if (not tp1) and pnl >= self.TP1_PCT:
-            sell_qty = qty_total * float(self.TP1_SIZE)
+        if (not tp1) and pnl >= tp1_pct:
+            sell_qty = qty_total * float(tp1_size)
             if sell_qty <= 0:
                 print(f"⏭️ TP1 SKIP qty<=0 mint={mint}", flush=True)
                 return
             print(f"🟢 TP1 mint={mint} qty={sell_qty}", flush=True)
-            if os.getenv("SELL_DRY_RUN", "0") == "1":
+            if self.SELL_DRY_RUN:
                 print("🧪 SELL_DRY_RUN=1 -> skip TP1 sell", flush=True)
                 return
             txsig = self._sell_exec(mint, sell_qty, "tp1")
@@ -932,13 +1004,13 @@ class SellEngine:
             return
 
         # TP2
-        if tp1 and (not tp2) and pnl >= self.TP2_PCT:
-            sell_qty = qty_total * float(self.TP2_SIZE)
+        if tp1 and (not tp2) and pnl >= tp2_pct:
+            sell_qty = qty_total * float(tp2_size)
             if sell_qty <= 0:
                 print(f"⏭️ TP2 SKIP qty<=0 mint={mint}", flush=True)
                 return
             print(f"🟢 TP2 mint={mint} qty={sell_qty}", flush=True)
-            if os.getenv("SELL_DRY_RUN", "0") == "1":
+            if self.SELL_DRY_RUN:
                 print("🧪 SELL_DRY_RUN=1 -> skip TP2 sell", flush=True)
                 return
             txsig = self._sell_exec(mint, sell_qty, "tp2")
@@ -963,11 +1035,11 @@ class SellEngine:
             return
 
         # TRAIL (sell ALL)
-        trail = self.TRAIL_WIDE if tp2 else self.TRAIL_TIGHT
+        trail = trail_wide if tp2 else trail_tight
         stop_price = hw * (1 - trail)
         if hw > 0 and price <= stop_price:
             print(f"🟠 TRAIL_STOP mint={mint} price={price} stop={stop_price} hw={hw}", flush=True)
-            if os.getenv("SELL_DRY_RUN", "0") == "1":
+            if self.SELL_DRY_RUN:
                 print("🧪 SELL_DRY_RUN=1 -> skip TRAIL sell", flush=True)
                 return
             sell_qty = qty_total
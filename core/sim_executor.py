@@ -0,0 +1,312 @@
+"""
+Simulated fills for paper trading: latency, AMM slippage, failures, fees.
+
+PaperExecutor (core.paper_executor / core.executor) fills at the price it is
+given, instantly and for free. SimExecutor fills the way the live buy / sell
+path would have:
+
+  latency   sampled span by span from the measured histograms
+            (core.latency_trace.aggregate(), keys "buy.<span>" / "sell.<span>"),
+            falling back to core.sim_service.Latency specs for spans never seen.
+            The quote is taken after the pre-quote spans (spawn, pick/decimals,
+            guards), the swap lands after quote -> swap_build -> sign -> send -> confirm.
+  slippage  constant-product pool rebuilt from liquidity (SOL side = liq_usd / 2 / sol_usd),
+            pool fee on the input (same leg math as sim_service.swap_out); the landed
+            amount is priced at the landing time, and a landed amount worse than the
+            quote by more than slippage_bps fails like the on-chain slippage check.
+  failures  quote 429 (trader_exec RL_SKIP / sell 429 cooldown), no route, tx not landed.
+  fees      base tx fee + priority fee per sent tx (landed or not).
+
+Prices are SOL per token (tick_store "price" = DexScreener priceNative). The
+caller supplies the market as two callables of time: price_at(mint, t) and
+liq_at(mint, t) -> (liq_usd, sol_usd); core.paper_sim.Market provides both.
+
+SimExecutor is a core.executor.Executor (sync, returns Fill). SimPaperExecutor
+is the async core.paper_executor.PaperExecutor drop-in for TradingEngine.
+"""
+from __future__ import annotations
+
+import bisect
+import copy
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core import latency_trace
+from core.executor import Executor, Fill
+from core.paper_executor import PaperExecutor
+from core.sim_service import Latency
+
+PAPER_SIM_SEED = int(os.getenv("PAPER_SIM_SEED", "1"))
+PAPER_SIM_LATENCY_WINDOW_S = float(os.getenv("PAPER_SIM_LATENCY_WINDOW_S", str(7 * 86400)))
+PAPER_SIM_LATENCY_MIN_N = int(os.getenv("PAPER_SIM_LATENCY_MIN_N", "20"))  # below: fallback spec
+PAPER_SIM_LATENCY_SCALE = float(os.getenv("PAPER_SIM_LATENCY_SCALE", "1.0"))
+PAPER_SIM_SLIPPAGE_BPS = int(float(os.getenv("PAPER_SIM_SLIPPAGE_BPS", os.getenv("SLIPPAGE_BPS", os.getenv("TRADER_SLIPPAGE_BPS", "120")))))
+PAPER_SIM_SELL_SLIPPAGE_BPS = int(float(os.getenv("PAPER_SIM_SELL_SLIPPAGE_BPS", os.getenv("SELL_SLIPPAGE_BPS", "300"))))
+PAPER_SIM_POOL_FEE_BPS = float(os.getenv("PAPER_SIM_POOL_FEE_BPS", os.getenv("SIM_FEE_BPS", "25")))
+PAPER_SIM_SOL_USD = float(os.getenv("PAPER_SIM_SOL_USD", os.getenv("SIM_SOL_USD", "150")))
+PAPER_SIM_TX_FEE_LAMPORTS = int(os.getenv("PAPER_SIM_TX_FEE_LAMPORTS", "5000"))
+PAPER_SIM_PRIORITY_LAMPORTS = int(os.getenv("PAPER_SIM_PRIORITY_LAMPORTS", "0"))
+PAPER_SIM_RATE_429 = float(os.getenv("PAPER_SIM_RATE_429", "0.02"))
+PAPER_SIM_RATE_NO_ROUTE = float(os.getenv("PAPER_SIM_RATE_NO_ROUTE", "0.01"))
+PAPER_SIM_RATE_LAND_FAIL = float(os.getenv("PAPER_SIM_RATE_LAND_FAIL", "0.03"))
+PAPER_SIM_LATENCY_FALLBACK = os.getenv("PAPER_SIM_LATENCY_FALLBACK", "")  # "quote=lognormal:150,0.5;confirm=900"
+
+SPANS_PRE = {"buy": ("spawn", "pick", "guards"), "sell": ("spawn", "decimals")}
+SPANS_LAND = ("quote", "swap_build", "sign", "send", "confirm")
+
+# span -> sim_service.Latency spec, used when the histogram has too few samples
+FALLBACK: Dict[str, str] = {
+    "spawn": "lognormal:250,0.3", "pick": "lognormal:30,0.5", "guards": "lognormal:120,0.6",
+    "decimals": "lognormal:60,0.5", "quote": "lognormal:180,0.5", "swap_build": "lognormal:200,0.5",
+    "sign": "fixed:2", "send": "lognormal:90,0.5", "confirm": "lognormal:1200,0.5",
+}
+
+
+def _parse_fallback(raw: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for part in (raw or "").replace(" ", "").split(";"):
+        k, sep, v = part.partition("=")
+        if sep and k and v:
+            out[k] = v
+    return out
+
+
+# -----------------------------
+# latency
+# -----------------------------
+class _HistSampler:
+    """Draw from a latency_trace.Histogram: bucket by weight, uniform inside it, clamped to [min, max]."""
+    __slots__ = ("idx", "cum", "total", "lo", "hi")
+
+    def __init__(self, h: latency_trace.Histogram):
+        self.idx: List[int] = sorted(h.counts)
+        self.cum: List[int] = []
+        acc = 0
+        for i in self.idx:
+            acc += h.counts[i]
+            self.cum.append(acc)
+        self.total = acc
+        self.lo, self.hi = h.min, h.max
+
+    def sample(self, rng: random.Random) -> float:
+        i = self.idx[bisect.bisect_right(self.cum, rng.random() * self.total)] if self.total else 0
+        b = latency_trace.BOUNDS_MS
+        lo = b[i - 1] if 0 < i <= len(b) else 0.0
+        hi = b[i] if i < len(b) else self.hi
+        return min(max(rng.uniform(lo, hi), self.lo), self.hi)
+
+
+class LatencyModel:
+    """
+    Per-span latency: measured histogram when it has >= min_n samples, otherwise the
+    FALLBACK spec. scale multiplies everything (what-if "RPC twice as slow").
+    """
+
+    def __init__(self, hists: Optional[Dict[str, latency_trace.Histogram]] = None,
+                 fallback: Optional[Dict[str, str]] = None, scale: float = PAPER_SIM_LATENCY_SCALE,
+                 min_n: int = PAPER_SIM_LATENCY_MIN_N):
+        self.scale = float(scale)
+        self.samplers: Dict[str, _HistSampler] = {
+            k: _HistSampler(h) for k, h in (hists or {}).items() if h.n >= max(1, min_n)}
+        spec = dict(FALLBACK)
+        spec.update(_parse_fallback(PAPER_SIM_LATENCY_FALLBACK))
+        spec.update(fallback or {})
+        self.fallback: Dict[str, Latency] = {k: Latency(v) for k, v in spec.items()}
+
+    @classmethod
+    def measured(cls, window_s: float = PAPER_SIM_LATENCY_WINDOW_S, **kw) -> "LatencyModel":
+        """Histograms recorded by latency_trace over window_s (empty dir -> fallback only)."""
+        try:
+            hists = latency_trace.aggregate(window_s)
+        except Exception:
+            hists = {}
+        return cls(hists, **kw)
+
+    @classmethod
+    def fixed(cls, ms_per_span: float = 0.0) -> "LatencyModel":
+        spans = set(SPANS_LAND) | {s for v in SPANS_PRE.values() for s in v}
+        return cls({}, fallback={s: f"fixed:{ms_per_span}" for s in spans}, scale=1.0)
+
+    def scaled(self, factor: float) -> "LatencyModel":
+        m = copy.copy(self)
+        m.scale = self.scale * float(factor)
+        return m
+
+    def span(self, kind: str, name: str, rng: random.Random) -> float:
+        s = self.samplers.get(f"{kind}.{name}")
+        if s is not None:
+            v = s.sample(rng)
+        else:
+            lat = self.fallback.get(name)
+            v = lat.sample(rng) if lat is not None else 0.0
+        return v * self.scale
+
+    def spans(self, kind: str, names: Sequence[str], rng: random.Random) -> float:
+        return sum(self.span(kind, n, rng) for n in names)
+
+    def sources(self) -> Dict[str, str]:
+        """span key -> "measured(n)" | fallback spec, for reports."""
+        out = {}
+        for kind, pre in SPANS_PRE.items():
+            for n in tuple(pre) + SPANS_LAND:
+                k = f"{kind}.{n}"
+                s = self.samplers.get(k)
+                out[k] = f"measured({s.total})" if s is not None else (self.fallback[n].spec if n in self.fallback else "0")
+        return out
+
+
+# -----------------------------
+# pool math
+# -----------------------------
+def pool_reserves(price: float, liq_usd: float, sol_usd: float) -> Tuple[float, float]:
+    """(sol_reserve, token_reserve) of a constant-product pool at price (SOL/token); half the liquidity per side."""
+    sr = max(0.0, liq_usd) / 2.0 / max(sol_usd, 1e-9)
+    return sr, (sr / price if price > 0 else 0.0)
+
+
+def swap_buy(sol_in: float, price: float, liq_usd: float, sol_usd: float, fee_bps: float) -> Tuple[float, float]:
+    """SOL -> token: (tokens_out, price_impact). No liquidity known -> fill at price, fee only."""
+    xin = sol_in * (1.0 - fee_bps / 1e4)
+    sr, tr = pool_reserves(price, liq_usd, sol_usd)
+    if sr <= 0 or tr <= 0:
+        return (xin / price if price > 0 else 0.0), 0.0
+    out = tr * xin / (sr + xin)
+    ideal = xin * tr / sr
+    return out, (1.0 - out / ideal) if ideal > 0 else 0.0
+
+
+def swap_sell(tok_in: float, price: float, liq_usd: float, sol_usd: float, fee_bps: float) -> Tuple[float, float]:
+    """token -> SOL: (sol_out, price_impact)."""
+    xin = tok_in * (1.0 - fee_bps / 1e4)
+    sr, tr = pool_reserves(price, liq_usd, sol_usd)
+    if sr <= 0 or tr <= 0:
+        return xin * price, 0.0
+    out = sr * xin / (tr + xin)
+    ideal = xin * sr / tr
+    return out, (1.0 - out / ideal) if ideal > 0 else 0.0
+
+
+# -----------------------------
+# executor
+# -----------------------------
+PriceAt = Callable[[str, float], float]
+LiqAt = Callable[[str, float], Tuple[float, float]]
+
+
+class SimExecutor(Executor):
+    """
+    buy(mint, price, sol_amount) / sell(mint, price, reason) like the other core.executor
+    executors, plus keyword extras: t (sim clock, default now), qty (sell size in tokens).
+    A sell without qty (the base Executor signature) or a buy of <= 0 SOL is refused:
+    ok=False, reason "no_qty" / "no_amount", nothing sent, no fee.
+    Fill.price is the effective SOL/token of the landed swap; Fill.ts is the landing time,
+    Fill.latency_ms the whole attempt (failures included), Fill.fee_sol the network fees paid.
+    """
+
+    def __init__(self, price_at: PriceAt, liq_at: Optional[LiqAt] = None, latency: Optional[LatencyModel] = None,
+                 seed: int = PAPER_SIM_SEED, slippage_bps: int = PAPER_SIM_SLIPPAGE_BPS,
+                 sell_slippage_bps: int = PAPER_SIM_SELL_SLIPPAGE_BPS, pool_fee_bps: float = PAPER_SIM_POOL_FEE_BPS,
+                 tx_fee_lamports: int = PAPER_SIM_TX_FEE_LAMPORTS, priority_lamports: int = PAPER_SIM_PRIORITY_LAMPORTS,
+                 rate_429: float = PAPER_SIM_RATE_429, rate_no_route: float = PAPER_SIM_RATE_NO_ROUTE,
+                 rate_land_fail: float = PAPER_SIM_RATE_LAND_FAIL):
+        self.price_at = price_at
+        self.liq_at = liq_at or (lambda mint, t: (0.0, PAPER_SIM_SOL_USD))
+        self.latency = latency or LatencyModel.measured()
+        self.rng = random.Random(seed)
+        self.slippage_bps = int(slippage_bps)
+        self.sell_slippage_bps = int(sell_slippage_bps)
+        self.pool_fee_bps = float(pool_fee_bps)
+        self.tx_fee_sol = (int(tx_fee_lamports) + int(priority_lamports)) / 1e9
+        self.rate_429 = float(rate_429)
+        self.rate_no_route = float(rate_no_route)
+        self.rate_land_fail = float(rate_land_fail)
+        self.stats: Dict[str, int] = {}
+
+    def _bump(self, k: str) -> None:
+        self.stats[k] = self.stats.get(k, 0) + 1
+
+    def _swap(self, kind: str, mint: str, amount: float, t0: float, slip_bps: int) -> Fill:
+        rng, lat = self.rng, self.latency
+        side = "buy" if kind == "buy" else "sell"
+        if not (amount > 0):
+            # nothing to swap: no tx, no fee, and no random draw (keeps runs comparable)
+            self._bump(f"{side}_refused")
+            return Fill(ok=False, price=0.0, reason="no_amount" if side == "buy" else "no_qty", ts=t0)
+        self._bump(f"{side}_attempt")
+        t_q = t0 + lat.spans(side, SPANS_PRE[side], rng) / 1000.0
+        q_ms = lat.span(side, "quote", rng)
+        if rng.random() < self.rate_429:
+            self._bump(f"{side}_429")
+            return Fill(ok=False, price=0.0, reason="quote_429", ts=t_q + q_ms / 1000.0, latency_ms=(t_q - t0) * 1000.0 + q_ms)
+        p_q = self.price_at(mint, t_q)
+        if not (p_q > 0) or rng.random() < self.rate_no_route:
+            self._bump(f"{side}_no_route")
+            return Fill(ok=False, price=0.0, reason="no_route", ts=t_q + q_ms / 1000.0, latency_ms=(t_q - t0) * 1000.0 + q_ms)
+        swap = swap_buy if side == "buy" else swap_sell
+        liq_q, sol_usd_q = self.liq_at(mint, t_q)
+        quoted, _ = swap(amount, p_q, liq_q, sol_usd_q, self.pool_fee_bps)
+
+        rest = ("swap_build", "sign", "send", "confirm")
+        t_land = t_q + (q_ms + lat.spans(side, rest, rng)) / 1000.0
+        ms = (t_land - t0) * 1000.0
+        if rng.random() < self.rate_land_fail:
+            self._bump(f"{side}_land_fail")
+            return Fill(ok=False, price=0.0, reason="land_fail", ts=t_land, latency_ms=ms, fee_sol=self.tx_fee_sol)
+        p_l = self.price_at(mint, t_land)
+        p_l = p_l if p_l > 0 else p_q
+        liq_l, sol_usd_l = self.liq_at(mint, t_land)
+        out, impact = swap(amount, p_l, liq_l, sol_usd_l, self.pool_fee_bps)
+        if out < quoted * (1.0 - slip_bps / 1e4):
+            self._bump(f"{side}_slippage")
+            return Fill(ok=False, price=0.0, reason="slippage", ts=t_land, latency_ms=ms, fee_sol=self.tx_fee_sol)
+        self._bump(f"{side}_ok")
+        if side == "buy":
+            px, qty = (amount / out if out > 0 else p_l), out
+        else:
+            px, qty = (out / amount if amount > 0 else p_l), amount
+        return Fill(ok=True, price=px, reason="sim_fill", qty=qty, fee_sol=self.tx_fee_sol, latency_ms=ms,
+                    ts=t_land, impact=impact, out=out, mark=p_l)
+
+    def buy(self, mint: str, price: float, sol_amount: float, t: Optional[float] = None) -> Fill:
+        return self._swap("buy", mint, float(sol_amount), time.time() if t is None else float(t), self.slippage_bps)
+
+    def sell(self, mint: str, price: float, reason: str, qty: float = 0.0, t: Optional[float] = None) -> Fill:
+        f = self._swap("sell", mint, float(qty), time.time() if t is None else float(t), self.sell_slippage_bps)
+        if f.ok:
+            f.reason = reason
+        return f
+
+
+class SimPaperExecutor(PaperExecutor):
+    """
+    core.paper_executor.PaperExecutor with SimExecutor fills (TradingEngine drop-in).
+    Tracks token balances so sell(mint, pct) sells pct of what the buy actually got.
+    """
+
+    def __init__(self, wallet, logger, sim: SimExecutor, clock: Optional[Callable[[], float]] = None):
+        super().__init__(wallet, logger)
+        self.sim = sim
+        self.clock = clock or time.time
+        self.balances: Dict[str, float] = {}
+
+    async def buy(self, mint: str, sol_amount: float, price: float) -> Dict[str, Any]:
+        f = self.sim.buy(mint, price, sol_amount, t=self.clock())
+        if f.ok:
+            self.balances[mint] = self.balances.get(mint, 0.0) + f.qty
+        self.logger.info("[SIM BUY] mint=%s sol=%s ok=%s px=%.3g lat=%.0fms %s", mint, sol_amount, f.ok, f.price,
+                         f.latency_ms, f.reason)
+        return {"tx": f"sim_buy_{mint}" if f.ok else None, "ok": f.ok, "fill": f}
+
+    async def sell(self, mint: str, pct: float = 1.0) -> Dict[str, Any]:
+        bal = self.balances.get(mint, 0.0)
+        qty = bal * min(1.0, max(0.0, float(pct)))
+        if qty <= 0:
+            return {"tx": None, "skipped": True}
+        f = self.sim.sell(mint, 0.0, "sim_sell", qty=qty, t=self.clock())
+        if f.ok:
+            self.balances[mint] = max(0.0, bal - qty)
+        self.logger.info("[SIM SELL] mint=%s pct=%.3f ok=%s px=%.3g lat=%.0fms %s", mint, pct, f.ok, f.price,
+                         f.latency_ms, f.reason)
+        return {"tx": f"sim_sell_{mint}" if f.ok else None, "ok": f.ok, "fill": f}
@@ -0,0 +1,1014 @@
+"""
+Local stand-in for Jupiter / Solana RPC / DexScreener (offline load tests, benchmarks).
+
+  python scripts/sim_service.py --port 8899 --seed 7
+  export JUP_BASE_URL=http://127.0.0.1:8899 RPC_HTTP=http://127.0.0.1:8899 \
+         SOLANA_RPC_HTTP=http://127.0.0.1:8899 SOLANA_RPC=http://127.0.0.1:8899 \
+         DEXSCREENER_BASE_URL=http://127.0.0.1:8899
+
+Routes (subset actually used by the bot):
+  GET  /swap/v1/quote                  Jupiter quote (ExactIn) priced off the synthetic path
+  POST /swap/v1/swap                   {"swapTransaction": unsigned v0 tx, signer = userPublicKey}
+  GET  /price/v3?ids=a,b               Jupiter price v3 (usdPrice)
+  GET  /latest/dex/search?q=           DexScreener search
+  GET  /latest/dex/tokens/<a,b>        DexScreener tokens (+ /tokens/v1/solana/<a,b>)
+  GET  /token-boosts/{top,latest}/v1, /token-profiles/latest/v1
+  POST /                               JSON-RPC (batch ok): getTokenSupply, getTokenAccountsByOwner,
+                                       getBalance, getAccountInfo, getTokenLargestAccounts,
+                                       getProgramAccounts, getLatestBlockhash, getSlot, getHealth,
+                                       sendTransaction, getSignatureStatuses, getSignaturesForAddress,
+                                       getTransaction
+  GET  / (Upgrade: websocket)          logsSubscribe / logsUnsubscribe (synthetic pump.fun Create logs)
+  GET  /sim/stats, POST /sim/reset
+
+Faults / shaping (env, or Sim(**overrides)):
+  SIM_LATENCY_MS            default latency spec: "lognormal:<median_ms>,<sigma>" | "normal:<mean>,<sd>"
+                            | "uniform:<lo>,<hi>" | "fixed:<ms>" | "<ms>" | "0"
+  SIM_LATENCY_<ROUTE>_MS    per route: QUOTE, SWAP, PRICE, DEX, RPC, SEND, WS
+  SIM_429_RATE              probability of HTTP 429 (SIM_429_RATE_JUP / _RPC / _DEX per service)
+  SIM_NO_ROUTE_RATE         quote -> 400 COULD_NOT_FIND_ANY_ROUTE
+  SIM_ROUTE_FAIL_RATE       sendTransaction -> simulation failed, custom program error 0x1788
+  SIM_CONFIRM_MS            processed -> confirmed delay (same spec syntax)
+
+Determinism: every random draw comes from SIM_SEED. Price paths are seeded per
+(seed, mint) and indexed by wall-clock step (SIM_PRICE_STEP_S), token launches
+follow a seeded schedule, and latency/fault draws come from dedicated seeded
+streams, so the same request sequence replays the same responses.
+
+Wallets are simulated: a swap built by /swap/v1/swap and landed by sendTransaction
+moves SOL/token balances (SIM_WALLET_SOL per new owner), so getBalance and
+getTokenAccountsByOwner reflect what the bot bought and sold. Signatures are not
+verified (no ed25519 here), only required to be non-zero.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from core.bounded_cache import BoundedCache
+
+SIM_HOST = os.getenv("SIM_HOST", "127.0.0.1")
+SIM_PORT = int(os.getenv("SIM_PORT", "8899"))
+SIM_SEED = int(os.getenv("SIM_SEED", "1"))
+SIM_TOKENS = int(os.getenv("SIM_TOKENS", "40"))                 # tokens listed at start
+SIM_SOL_USD = float(os.getenv("SIM_SOL_USD", "150"))
+SIM_PRICE_STEP_S = float(os.getenv("SIM_PRICE_STEP_S", "1.0"))
+SIM_PRICE_VOL = float(os.getenv("SIM_PRICE_VOL", "0.01"))       # log-return sigma per step
+SIM_PRICE_DRIFT = float(os.getenv("SIM_PRICE_DRIFT", "0.0"))    # log-return mean per step
+SIM_JUMP_RATE = float(os.getenv("SIM_JUMP_RATE", "0.0005"))     # rug/pump jumps per step
+SIM_JUMP_SIZE = float(os.getenv("SIM_JUMP_SIZE", "0.6"))        # |log| size of a jump
+SIM_MAX_AGE_S = float(os.getenv("SIM_MAX_AGE_S", "7200"))       # age of tokens listed at start
+SIM_LAUNCH_EVERY_S = float(os.getenv("SIM_LAUNCH_EVERY_S", "3"))  # mean gap between launches (0 = off)
+SIM_FEE_BPS = float(os.getenv("SIM_FEE_BPS", "25"))
+SIM_WALLET_SOL = float(os.getenv("SIM_WALLET_SOL", "10"))
+SIM_MINT_AUTH_RATE = float(os.getenv("SIM_MINT_AUTH_RATE", "0.1"))  # tokens failing AntiRug authorities
+SIM_LATENCY_MS = os.getenv("SIM_LATENCY_MS", "lognormal:40,0.5")
+SIM_CONFIRM_MS = os.getenv("SIM_CONFIRM_MS", "lognormal:800,0.4")
+SIM_429_RATE = float(os.getenv("SIM_429_RATE", "0"))
+SIM_NO_ROUTE_RATE = float(os.getenv("SIM_NO_ROUTE_RATE", "0"))
+SIM_ROUTE_FAIL_RATE = float(os.getenv("SIM_ROUTE_FAIL_RATE", "0"))
+SIM_LOG_EVERY_S = float(os.getenv("SIM_LOG_EVERY_S", "60"))
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+JUP_PROGRAM = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4"
+PUMP_PROGRAM = os.getenv("PUMPFUN_PROGRAM", "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+SLOT0 = 300_000_000
+SLOT_S = 0.4
+TX_FEE = 5000
+ATA_RENT = 2_039_280
+ROUTES = ("QUOTE", "SWAP", "PRICE", "DEX", "RPC", "SEND", "WS")
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# -----------------------------
+# base58 / compact-u16
+# -----------------------------
+_B58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_IDX = {c: i for i, c in enumerate(_B58)}
+
+
+def b58encode(b: bytes) -> str:
+    n = int.from_bytes(b, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = _B58[r] + out
+    pad = len(b) - len(b.lstrip(b"\0"))
+    return "1" * pad + out
+
+
+def b58decode(s: str) -> bytes:
+    n = 0
+    for c in s:
+        n = n * 58 + _B58_IDX[c]
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
+    pad = len(s) - len(s.lstrip("1"))
+    return b"\0" * pad + body
+
+
+def _cu16(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _read_cu16(buf: bytes, off: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[off]
+        off += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, off
+        shift += 7
+
+
+def _h(*parts: Any, n: int = 32) -> bytes:
+    d = hashlib.sha256(":".join(str(p) for p in parts).encode()).digest()
+    while len(d) < n:
+        d += hashlib.sha256(d).digest()
+    return d[:n]
+
+
+# -----------------------------
+# latency distributions
+# -----------------------------
+class Latency:
+    """'lognormal:<median_ms>,<sigma>' | 'normal:<mean>,<sd>' | 'uniform:<lo>,<hi>' | 'fixed:<ms>' | '<ms>'."""
+
+    def __init__(self, spec: str):
+        self.spec = (spec or "0").strip()
+        kind, _, args = self.spec.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        self.kind = kind.lower()
+        self.args = [float(x) for x in args.split(",") if x.strip()] or [0.0]
+
+    def sample(self, rng: random.Random) -> float:
+        a = self.args
+        if self.kind == "lognormal":
+            v = a[0] * math.exp(rng.gauss(0.0, a[1] if len(a) > 1 else 0.5))
+        elif self.kind == "normal":
+            v = rng.gauss(a[0], a[1] if len(a) > 1 else 0.0)
+        elif self.kind == "uniform":
+            v = rng.uniform(a[0], a[1] if len(a) > 1 else a[0])
+        else:
+            v = a[0]
+        return max(0.0, v)
+
+
+# -----------------------------
+# tokens / price paths
+# -----------------------------
+class Token:
+    __slots__ = ("mint", "symbol", "decimals", "supply", "born", "creator", "launch_sig", "dex_id",
+                 "liq_sol", "mint_auth", "top1", "pair", "_rng", "_lp", "_lock")
+
+    def __init__(self, seed: int, mint: str, born: float, creator: str = "", launch_sig: str = ""):
+        r = random.Random(f"{seed}:{mint}")
+        self.mint = mint
+        self.symbol = "".join(r.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(r.randint(3, 5)))
+        self.decimals = 6 if r.random() < 0.85 else 9
+        self.supply = 10 ** 9 * 10 ** self.decimals
+        self.born = born
+        self.creator = creator or b58encode(_h(seed, "creator", mint))
+        self.launch_sig = launch_sig
+        self.dex_id = r.choice(("pumpfun", "pumpfun", "raydium", "pumpswap"))
+        self.liq_sol = math.exp(r.uniform(math.log(15), math.log(800)))
+        self.mint_auth = b58encode(_h(seed, "auth", mint)) if r.random() < SIM_MINT_AUTH_RATE else None
+        self.top1 = r.uniform(0.02, 0.35)
+        self.pair = b58encode(_h(seed, "pair", mint))
+        self._rng = r
+        # prix initial en SOL par token (UI): mcap 30..3000 SOL
+        self._lp = array("d", [math.log(math.exp(r.uniform(math.log(30), math.log(3000))) / 1e9)])
+        self._lock = threading.Lock()
+
+    def step_of(self, t: float) -> int:
+        return max(0, int((t - self.born) / SIM_PRICE_STEP_S))
+
+    def price_at(self, t: float) -> float:
+        """SOL per token (UI units) at time t."""
+        k = self.step_of(t)
+        with self._lock:
+            lp, r = self._lp, self._rng
+            while len(lp) <= k:
+                x = lp[-1] + SIM_PRICE_DRIFT - 0.5 * SIM_PRICE_VOL ** 2 + r.gauss(0.0, SIM_PRICE_VOL)
+                if SIM_JUMP_RATE and r.random() < SIM_JUMP_RATE:
+                    x += SIM_JUMP_SIZE if r.random() < 0.35 else -SIM_JUMP_SIZE
+                lp.append(x)
+            return math.exp(lp[k])
+
+    def reserves(self, t: float) -> Tuple[float, float]:
+        """(sol_reserve, token_reserve) in UI units for a constant-product pool at price(t)."""
+        px = self.price_at(t)
+        return self.liq_sol, self.liq_sol / px
+
+
+class Sim:
+    """All simulator state; the HTTP handler only routes into it."""
+
+    def __init__(self, seed: int = SIM_SEED, n_tokens: int = SIM_TOKENS, **overrides: Any):
+        self.seed = int(seed)
+        self.t0 = time.time()
+        self.cfg = {
+            "latency_ms": SIM_LATENCY_MS, "confirm_ms": SIM_CONFIRM_MS,
+            "rate_429": SIM_429_RATE, "no_route_rate": SIM_NO_ROUTE_RATE,
+            "route_fail_rate": SIM_ROUTE_FAIL_RATE, "launch_every_s": SIM_LAUNCH_EVERY_S,
+        }
+        self.cfg.update({k: v for k, v in overrides.items() if v is not None})
+        base = Latency(str(self.cfg["latency_ms"]))
+        self.latency = {r: (Latency(os.getenv(f"SIM_LATENCY_{r}_MS")) if os.getenv(f"SIM_LATENCY_{r}_MS") else base)
+                        for r in ROUTES}
+        self.confirm = Latency(str(self.cfg["confirm_ms"]))
+        self.rate_429 = {svc: float(os.getenv(f"SIM_429_RATE_{svc.upper()}", self.cfg["rate_429"]))
+                         for svc in ("jup", "rpc", "dex")}
+        self._rng_lat = random.Random(f"{self.seed}:latency")
+        self._rng_fault = random.Random(f"{self.seed}:fault")
+        self._rng_launch = random.Random(f"{self.seed}:launch")
+        self._lock = threading.RLock()
+
+        self.tokens: Dict[str, Token] = {}
+        self.launches: List[Dict[str, Any]] = []   # {sig, mint, creator, ts, slot}
+        self._next_launch = self.t0
+        for i in range(int(n_tokens)):
+            mint = b58encode(_h(self.seed, "mint", i))
+            age = random.Random(f"{self.seed}:age:{i}").uniform(300.0, SIM_MAX_AGE_S)
+            self.tokens[mint] = Token(self.seed, mint, self.t0 - age)
+        self._advance_launches(self.t0)
+
+        self.wallets: Dict[str, Dict[str, Any]] = {}
+        self.swaps = BoundedCache("sim.swaps", max_items=50_000, ttl_s=120.0)
+        self.sigs = BoundedCache("sim.sigs", max_items=200_000, ttl_s=3600.0)
+        self._n_swap = 0
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    # ---- clock / draws ----
+    def slot(self, t: Optional[float] = None) -> int:
+        return SLOT0 + int(((t or time.time()) - self.t0) / SLOT_S)
+
+    def draw_latency(self, route: str) -> float:
+        with self._lock:
+            return self.latency.get(route, self.latency["RPC"]).sample(self._rng_lat)
+
+    def roll(self, p: float) -> bool:
+        if p <= 0:
+            return False
+        with self._lock:
+            return self._rng_fault.random() < p
+
+    def count(self, route: str, key: str = "n") -> None:
+        with self._lock:
+            c = self.counters.setdefault(route, {"n": 0, "429": 0, "fail": 0})
+            c[key] = c.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"seed": self.seed, "uptime_s": round(time.time() - self.t0, 1), "slot": self.slot(),
+                    "tokens": len(self.tokens), "launches": len(self.launches), "wallets": len(self.wallets),
+                    "swaps_pending": len(self.swaps), "sigs": len(self.sigs), "routes": dict(self.counters),
+                    "cfg": {k: v for k, v in self.cfg.items()}}
+
+    # ---- tokens ----
+    def _advance_launches(self, now: float) -> None:
+        every = float(self.cfg["launch_every_s"] or 0)
+        if every <= 0:
+            return
+        with self._lock:
+            while self._next_launch <= now:
+                t = self._next_launch
+                k = len(self.launches)
+                mint = b58encode(_h(self.seed, "launch", k))
+                creator = b58encode(_h(self.seed, "launch_creator", k))
+                sig = b58encode(_h(self.seed, "launch_sig", k, n=64))
+                self.tokens[mint] = Token(self.seed, mint, t, creator=creator, launch_sig=sig)
+                self.launches.append({"sig": sig, "mint": mint, "creator": creator, "ts": t, "slot": self.slot(t)})
+                self._next_launch = t + self._rng_launch.expovariate(1.0 / every)
+
+    def token(self, mint: str) -> Optional[Token]:
+        """Known token, or one created on the fly (seeded by mint) so any mint the bot asks about trades."""
+        if not mint or mint in (SOL_MINT, USDC_MINT):
+            return None
+        with self._lock:
+            tk = self.tokens.get(mint)
+            if tk is None:
+                try:
+                    if len(b58decode(mint)) != 32:
+                        return None
+                except Exception:
+                    return None
+                tk = Token(self.seed, mint, self.t0 - 1800.0)
+                self.tokens[mint] = tk
+            return tk
+
+    def sol_price(self, mint: str, t: float) -> Optional[float]:
+        """SOL per UI token."""
+        if mint == SOL_MINT:
+            return 1.0
+        if mint == USDC_MINT:
+            return 1.0 / SIM_SOL_USD
+        tk = self.token(mint)
+        return tk.price_at(t) if tk else None
+
+    def decimals(self, mint: str) -> int:
+        if mint == SOL_MINT:
+            return 9
+        if mint == USDC_MINT:
+            return 6
+        tk = self.token(mint)
+        return tk.decimals if tk else 0
+
+    # ---- wallets ----
+    def wallet(self, owner: str) -> Dict[str, Any]:
+        with self._lock:
+            w = self.wallets.get(owner)
+            if w is None:
+                w = self.wallets[owner] = {"sol": int(SIM_WALLET_SOL * 1e9), "tok": {}}
+            return w
+
+    # ---- swap math ----
+    def swap_out(self, in_mint: str, out_mint: str, amount: int, t: float) -> Optional[Tuple[int, float, int]]:
+        """(out_raw, price_impact, fee_raw) for an ExactIn swap through SOL, None if no route."""
+        if amount <= 0 or in_mint == out_mint:
+            return None
+        fee = SIM_FEE_BPS / 1e4
+
+        def leg(mint: str, x: float, buy: bool) -> Optional[Tuple[float, float]]:
+            if mint in (SOL_MINT, USDC_MINT):
+                px = self.sol_price(mint, t)
+                return (x / px, 0.0) if buy else (x * px, 0.0)
+            tk = self.token(mint)
+            if tk is None:
+                return None
+            sr, tr = tk.reserves(t)
+            xin = x * (1.0 - fee)
+            if buy:
+                out = tr * xin / (sr + xin)
+                ideal = xin * tr / sr
+            else:
+                out = sr * xin / (tr + xin)
+                ideal = xin * sr / tr
+            return out, (1.0 - out / ideal) if ideal > 0 else 0.0
+
+        x_ui = amount / 10 ** self.decimals(in_mint)
+        if in_mint == SOL_MINT:
+            r = leg(out_mint, x_ui, True)
+            if r is None:
+                return None
+            out_ui, impact = r
+        elif out_mint == SOL_MINT:
+            r = leg(in_mint, x_ui, False)
+            if r is None:
+                return None
+            out_ui, impact = r
+        else:
+            a = leg(in_mint, x_ui, False)
+            b = leg(out_mint, a[0], True) if a else None
+            if b is None:
+                return None
+            out_ui, impact = b[0], 1.0 - (1.0 - a[1]) * (1.0 - b[1])
+        out_raw = int(out_ui * 10 ** self.decimals(out_mint))
+        fee_raw = int(amount * fee)
+        return (out_raw, impact, fee_raw) if out_raw > 0 else None
+
+    # -----------------------------
+    # Jupiter
+    # -----------------------------
+    def jup_quote(self, q: Dict[str, str]) -> Tuple[int, Any]:
+        in_mint, out_mint = q.get("inputMint", ""), q.get("outputMint", "")
+        try:
+            amount = int(q.get("amount") or 0)
+            slip = int(q.get("slippageBps") or 50)
+        except ValueError:
+            return 400, {"error": "Invalid amount", "errorCode": "INVALID_REQUEST"}
+        t = time.time()
+        r = None if self.roll(float(self.cfg["no_route_rate"])) else self.swap_out(in_mint, out_mint, amount, t)
+        if r is None:
+            self.count("QUOTE", "fail")
+            return 400, {"error": "No routes found", "errorCode": "COULD_NOT_FIND_ANY_ROUTE"}
+        out_raw, impact, fee_raw = r
+        tk = self.token(out_mint if in_mint == SOL_MINT else in_mint)
+        amm = tk.pair if tk else b58encode(_h(self.seed, "amm", in_mint, out_mint))
+        return 200, {
+            "inputMint": in_mint, "inAmount": str(amount), "outputMint": out_mint, "outAmount": str(out_raw),
+            "otherAmountThreshold": str(int(out_raw * (1 - slip / 1e4))), "swapMode": "ExactIn",
+            "slippageBps": slip, "platformFee": None, "priceImpactPct": f"{impact:.6f}",
+            "routePlan": [{"swapInfo": {"ammKey": amm, "label": (tk.dex_id if tk else "sim").capitalize(),
+                                        "inputMint": in_mint, "outputMint": out_mint, "inAmount": str(amount),
+                                        "outAmount": str(out_raw), "feeAmount": str(fee_raw), "feeMint": in_mint},
+                           "percent": 100}],
+            "contextSlot": self.slot(t), "timeTaken": 0.001,
+        }
+
+    def jup_swap(self, body: Dict[str, Any]) -> Tuple[int, Any]:
+        quote = body.get("quoteResponse") or {}
+        user = str(body.get("userPublicKey") or "")
+        try:
+            payer = b58decode(user)
+            assert len(payer) == 32
+        except Exception:
+            return 400, {"error": "Invalid userPublicKey", "errorCode": "INVALID_REQUEST"}
+        if not quote.get("inputMint") or not quote.get("outAmount"):
+            return 400, {"error": "Invalid quoteResponse", "errorCode": "INVALID_REQUEST"}
+        with self._lock:
+            self._n_swap += 1
+            n = self._n_swap
+        blockhash = _h(self.seed, "blockhash", n)
+        # v0 message: 1 signer (payer), 1 readonly program, 1 instruction, no lookup tables
+        data = b"sim-swap:" + str(n).encode()
+        msg = (bytes([0x80, 1, 0, 1]) + _cu16(2) + payer + b58decode(JUP_PROGRAM) + blockhash
+               + _cu16(1) + bytes([1]) + _cu16(0) + _cu16(len(data)) + data + _cu16(0))
+        tx = _cu16(1) + bytes(64) + msg
+        self.swaps.set(blockhash, {"user": user, "quote": quote})
+        slot = self.slot()
+        return 200, {"swapTransaction": base64.b64encode(tx).decode(), "lastValidBlockHeight": slot + 150,
+                     "prioritizationFeeLamports": 0, "computeUnitLimit": 200_000,
+                     "dynamicSlippageReport": None, "simulationError": None}
+
+    def jup_price(self, q: Dict[str, str]) -> Tuple[int, Any]:
+        t = time.time()
+        out: Dict[str, Any] = {}
+        for m in [x for x in (q.get("ids") or "").split(",") if x]:
+            px = self.sol_price(m, t)
+            if px is None:
+                continue
+            tk = self.tokens.get(m)
+            ch = (px / tk.price_at(t - 86400.0) - 1.0) * 100.0 if tk else 0.0
+            out[m] = {"usdPrice": px * SIM_SOL_USD, "blockId": self.slot(t), "decimals": self.decimals(m),
+                      "priceChange24h": ch}
+        return 200, out
+
+    # -----------------------------
+    # DexScreener
+    # -----------------------------
+    def pair(self, tk: Token, t: float) -> Dict[str, Any]:
+        px = tk.price_at(t)
+        supply_ui = tk.supply / 10 ** tk.decimals
+        sr, tr = tk.reserves(t)
+
+        def chg(dt: float) -> float:
+            return round((px / tk.price_at(t - dt) - 1.0) * 100.0, 2)
+
+        def flow(dt: float) -> Tuple[int, int]:
+            # activite deterministe par bucket de 5 min, biaisee par le sens du prix
+            n_b = max(1, int(dt // 300))
+            buys = sells = 0
+            for b in range(n_b):
+                bucket = int((t - b * 300) // 300)
+                r = random.Random(f"{self.seed}:{tk.mint}:flow:{bucket}")
+                lam = 5 + tk.liq_sol / 20.0
+                up = 0.5 + max(-0.3, min(0.3, chg(300) / 100.0))
+                buys += int(r.expovariate(1.0 / (lam * up)))
+                sells += int(r.expovariate(1.0 / (lam * (1.0 - up))))
+            return buys, sells
+
+        txns, volume = {}, {}
+        m5, h1 = flow(300), flow(3600)
+        for k, (b, s) in (("m5", m5), ("h1", h1), ("h6", (h1[0] * 6, h1[1] * 6)), ("h24", (h1[0] * 24, h1[1] * 24))):
+            txns[k] = {"buys": b, "sells": s}
+            volume[k] = round((b + s) * 0.4 * SIM_SOL_USD, 2)
+        mcap = px * supply_ui * SIM_SOL_USD
+        return {
+            "chainId": "solana", "dexId": tk.dex_id, "url": f"https://dexscreener.com/solana/{tk.pair.lower()}",
+            "pairAddress": tk.pair,
+            "baseToken": {"address": tk.mint, "name": tk.symbol.title(), "symbol": tk.symbol},
+            "quoteToken": {"address": SOL_MINT, "name": "Wrapped SOL", "symbol": "SOL"},
+            "priceNative": f"{px:.12g}", "priceUsd": f"{px * SIM_SOL_USD:.12g}",
+            "txns": txns, "volume": volume,
+            "priceChange": {"m5": chg(300), "h1": chg(3600), "h6": chg(21600), "h24": chg(86400)},
+            "liquidity": {"usd": round(2 * sr * SIM_SOL_USD, 2), "base": round(tr, 2), "quote": round(sr, 4)},
+            "fdv": round(mcap, 2), "marketCap": round(mcap, 2), "pairCreatedAt": int(tk.born * 1000),
+        }
+
+    def dex_tokens(self, mints: List[str]) -> List[Dict[str, Any]]:
+        t = time.time()
+        return [self.pair(tk, t) for tk in (self.token(m) for m in mints[:30]) if tk is not None]
+
+    def dex_search(self, q: str) -> List[Dict[str, Any]]:
+        t = time.time()
+        ql = (q or "").strip().lower()
+        with self._lock:
+            toks = [tk for tk in self.tokens.values() if tk.born <= t]
+        hit = [tk for tk in toks if ql and (ql in tk.symbol.lower() or ql == tk.mint.lower() or ql == tk.dex_id)]
+        if not hit:
+            # recherche generique ("sol", "pump"...): les plus recents, ordre stable
+            hit = sorted(toks, key=lambda tk: (-tk.born, tk.mint))
+            hit = hit[int(hashlib.sha256(ql.encode()).digest()[0]) % 5:]
+        return [self.pair(tk, t) for tk in hit[:30]]
+
+    def dex_listing(self) -> List[Dict[str, Any]]:
+        t = time.time()
+        with self._lock:
+            toks = sorted((tk for tk in self.tokens.values() if tk.born <= t), key=lambda tk: -tk.born)[:30]
+        return [{"url": f"https://dexscreener.com/solana/{tk.mint.lower()}", "chainId": "solana",
+                 "tokenAddress": tk.mint, "amount": 10, "totalAmount": 10} for tk in toks]
+
+    # -----------------------------
+    # JSON-RPC
+    # -----------------------------
+    def rpc(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        rid = req.get("id")
+        method = str(req.get("method") or "")
+        params = req.get("params") or []
+        fn = getattr(self, "rpc_" + method, None)
+        self.count("rpc." + method)
+        if fn is None:
+            return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32601, "message": "Method not found"}}
+        try:
+            res = fn(*params) if isinstance(params, list) else fn(params)
+        except _RpcError as e:
+            return {"jsonrpc": "2.0", "id": rid, "error": e.obj}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+        return {"jsonrpc": "2.0", "id": rid, "result": res}
+
+    def _ctx(self, value: Any) -> Dict[str, Any]:
+        return {"context": {"apiVersion": "2.0.0-sim", "slot": self.slot()}, "value": value}
+
+    def rpc_getHealth(self, *_a: Any) -> str:
+        return "ok"
+
+    def rpc_getSlot(self, *_a: Any) -> int:
+        return self.slot()
+
+    def rpc_getBlockHeight(self, *_a: Any) -> int:
+        return self.slot() - 20_000_000
+
+    def rpc_getLatestBlockhash(self, *_a: Any) -> Dict[str, Any]:
+        s = self.slot()
+        return self._ctx({"blockhash": b58encode(_h(self.seed, "slot", s)), "lastValidBlockHeight": s + 150})
+
+    def rpc_getBalance(self, owner: str, *_a: Any) -> Dict[str, Any]:
+        return self._ctx(self.wallet(owner)["sol"])
+
+    def rpc_getTokenSupply(self, mint: str, *_a: Any) -> Dict[str, Any]:
+        d = self.decimals(mint)
+        tk = self.token(mint)
+        if tk is None and mint not in (SOL_MINT, USDC_MINT):
+            raise _RpcError(-32602, "Invalid param: not a Token mint")
+        amt = tk.supply if tk else 10 ** 18
+        return self._ctx({"amount": str(amt), "decimals": d, "uiAmount": amt / 10 ** d,
+                          "uiAmountString": str(amt // 10 ** d)})
+
+    def _token_account(self, owner: str, mint: str, raw: int) -> Dict[str, Any]:
+        d = self.decimals(mint)
+        ui = raw / 10 ** d
+        return {
+            "pubkey": b58encode(_h(self.seed, "ata", owner, mint)),
+            "account": {
+                "data": {"parsed": {"info": {"isNative": False, "mint": mint, "owner": owner, "state": "initialized",
+                                             "tokenAmount": {"amount": str(raw), "decimals": d, "uiAmount": ui,
+                                                             "uiAmountString": f"{ui:.{d}f}".rstrip("0").rstrip(".") or "0"}},
+                                    "type": "account"},
+                         "program": "spl-token", "space": 165},
+                "executable": False, "lamports": ATA_RENT, "owner": TOKEN_PROGRAM, "rentEpoch": 18446744073709551615,
+                "space": 165,
+            },
+        }
+
+    def rpc_getTokenAccountsByOwner(self, owner: str, flt: Optional[Dict[str, Any]] = None, *_a: Any) -> Dict[str, Any]:
+        w = self.wallet(owner)
+        want = (flt or {}).get("mint")
+        with self._lock:
+            items = [(m, raw) for m, raw in w["tok"].items() if not want or m == want]
+        return self._ctx([self._token_account(owner, m, raw) for m, raw in items])
+
+    def rpc_getAccountInfo(self, pubkey: str, *_a: Any) -> Dict[str, Any]:
+        if pubkey in self.wallets:
+            return self._ctx({"data": ["", "base64"], "executable": False, "lamports": self.wallets[pubkey]["sol"],
+                              "owner": "11111111111111111111111111111111", "rentEpoch": 0, "space": 0})
+        tk = self.token(pubkey)
+        if tk is None:
+            return self._ctx(None)
+        return self._ctx({
+            "data": {"parsed": {"info": {"decimals": tk.decimals, "freezeAuthority": None, "isInitialized": True,
+                                         "mintAuthority": tk.mint_auth, "supply": str(tk.supply)},
+                                "type": "mint"},
+                     "program": "spl-token", "space": 82},
+            "executable": False, "lamports": 1_461_600, "owner": TOKEN_PROGRAM, "rentEpoch": 18446744073709551615,
+            "space": 82,
+        })
+
+    def rpc_getTokenLargestAccounts(self, mint: str, *_a: Any) -> Dict[str, Any]:
+        tk = self.token(mint)
+        if tk is None:
+            raise _RpcError(-32602, "Invalid param: not a Token mint")
+        out = []
+        amt = tk.supply * tk.top1
+        for i in range(20):
+            raw = int(amt)
+            ui = raw / 10 ** tk.decimals
+            out.append({"address": b58encode(_h(self.seed, "holder", mint, i)), "amount": str(raw),
+                        "decimals": tk.decimals, "uiAmount": ui, "uiAmountString": str(ui)})
+            amt *= 0.6
+        return self._ctx(out)
+
+    def rpc_getProgramAccounts(self, *_a: Any) -> List[Any]:
+        return []
+
+    def rpc_getSignaturesForAddress(self, address: str, cfg: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        limit = int((cfg or {}).get("limit") or 1000)
+        self._advance_launches(time.time())
+        if address != PUMP_PROGRAM:
+            return []
+        with self._lock:
+            recent = self.launches[-limit:]
+        return [{"signature": e["sig"], "slot": e["slot"], "blockTime": int(e["ts"]), "err": None, "memo": None,
+                 "confirmationStatus": "finalized"} for e in reversed(recent)]
+
+    def _launch_tx(self, e: Dict[str, Any]) -> Dict[str, Any]:
+        tk = self.tokens[e["mint"]]
+        ui = tk.supply * 0.02 / 10 ** tk.decimals
+        return {
+            "slot": e["slot"], "blockTime": int(e["ts"]), "version": 0,
+            "transaction": {"signatures": [e["sig"]], "message": {
+                "accountKeys": [{"pubkey": e["creator"], "signer": True, "writable": True, "source": "transaction"},
+                                {"pubkey": e["mint"], "signer": True, "writable": True, "source": "transaction"},
+                                {"pubkey": PUMP_PROGRAM, "signer": False, "writable": False, "source": "transaction"}],
+                "instructions": [{"programId": PUMP_PROGRAM, "accounts": [e["mint"], e["creator"]], "data": "sim",
+                                  "stackHeight": None}],
+                "recentBlockhash": b58encode(_h(self.seed, "slot", e["slot"]))}},
+            "meta": {"err": None, "fee": TX_FEE, "preBalances": [], "postBalances": [], "preTokenBalances": [],
+                     "postTokenBalances": [{"accountIndex": 3, "mint": e["mint"], "owner": e["creator"],
+                                            "programId": TOKEN_PROGRAM,
+                                            "uiTokenAmount": {"amount": str(int(ui * 10 ** tk.decimals)),
+                                                              "decimals": tk.decimals, "uiAmount": ui,
+                                                              "uiAmountString": str(ui)}}],
+                     "innerInstructions": [{"index": 0, "instructions": [
+                         {"program": "spl-token", "programId": TOKEN_PROGRAM, "stackHeight": 2,
+                          "parsed": {"type": "initializeMint2",
+                                     "info": {"mint": e["mint"], "decimals": tk.decimals,
+                                              "mintAuthority": e["creator"]}}}]}],
+                     "logMessages": _launch_logs(), "computeUnitsConsumed": 120_000},
+        }
+
+    def rpc_getTransaction(self, sig: str, *_a: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for e in reversed(self.launches):
+                if e["sig"] == sig:
+                    return self._launch_tx(e)
+        st = self.sigs.get(sig)
+        if st is None or time.time() < st["at"]:
+            return None
+        return {"slot": st["slot"], "blockTime": int(st["at"]), "version": 0,
+                "transaction": {"signatures": [sig], "message": {"accountKeys": [
+                    {"pubkey": st["owner"], "signer": True, "writable": True, "source": "transaction"}]}},
+                "meta": {"err": st["err"], "fee": TX_FEE, "preTokenBalances": [], "postTokenBalances": [],
+                         "logMessages": []}}
+
+    def rpc_sendTransaction(self, tx_b64: str, cfg: Optional[Dict[str, Any]] = None) -> str:
+        cfg = cfg or {}
+        try:
+            raw = base64.b64decode(tx_b64)
+            nsig, off = _read_cu16(raw, 0)
+            sig0 = raw[off:off + 64]
+            msg = raw[off + 64 * nsig:]
+            p = 1 if msg[0] & 0x80 else 0
+            p += 3
+            nkeys, p = _read_cu16(msg, p)
+            keys = [msg[p + 32 * i:p + 32 * (i + 1)] for i in range(nkeys)]
+            blockhash = msg[p + 32 * nkeys:p + 32 * nkeys + 32]
+        except Exception:
+            raise _RpcError(-32602, "failed to deserialize solana_sdk::transaction::versioned::VersionedTransaction")
+        if not nsig or sig0 == bytes(64):
+            raise _RpcError(-32003, "Transaction signature verification failure")
+        sig = b58encode(sig0)
+        owner = b58encode(keys[0]) if keys else ""
+        now = time.time()
+        swap = self.swaps.pop(blockhash, None)
+        err = None
+        if swap is not None:
+            err = self._land_swap(owner, swap["quote"], now)
+        if err is not None and not cfg.get("skipPreflight"):
+            self.count("SEND", "fail")
+            code = err["InstructionError"][1]["Custom"]
+            raise _RpcError(-32002, f"Transaction simulation failed: Error processing Instruction 2: "
+                                    f"custom program error: {hex(code)}",
+                            {"err": err, "accounts": None, "unitsConsumed": 48_000, "returnData": None,
+                             "logs": [f"Program {JUP_PROGRAM} invoke [1]",
+                                      f"Program {JUP_PROGRAM} failed: custom program error: {hex(code)}"]})
+        with self._lock:
+            confirm_s = self.confirm.sample(self._rng_lat) / 1000.0
+        self.sigs.set(sig, {"owner": owner, "err": err, "slot": self.slot(now), "sent": now, "at": now + confirm_s})
+        return sig
+
+    def _land_swap(self, owner: str, quote: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+        """Apply a swap to the simulated wallet. Returns a tx err (InstructionError) or None."""
+        def custom(code: int) -> Dict[str, Any]:
+            return {"InstructionError": [2, {"Custom": code}]}
+
+        if self.roll(float(self.cfg["route_fail_rate"])):
+            return custom(0x1788)
+        in_mint, out_mint = quote.get("inputMint"), quote.get("outputMint")
+        amount = int(quote.get("inAmount") or 0)
+        r = self.swap_out(in_mint, out_mint, amount, now)
+        if r is None:
+            return custom(0x1788)
+        out_raw = r[0]
+        if out_raw < int(quote.get("otherAmountThreshold") or 0):
+            return custom(0x1771)  # SlippageToleranceExceeded
+        w = self.wallet(owner)
+        with self._lock:
+            tok = w["tok"]
+            rent = ATA_RENT if out_mint != SOL_MINT and out_mint not in tok else 0
+            if in_mint == SOL_MINT:
+                if w["sol"] < amount + TX_FEE + rent:
+                    return custom(0x1788)
+                w["sol"] -= amount + TX_FEE + rent
+            else:
+                if tok.get(in_mint, 0) < amount:
+                    return custom(0x1788)
+                if w["sol"] < TX_FEE + rent:
+                    return custom(0x1788)
+                tok[in_mint] -= amount
+                w["sol"] -= TX_FEE + rent
+            if out_mint == SOL_MINT:
+                w["sol"] += out_raw
+            else:
+                tok[out_mint] = tok.get(out_mint, 0) + out_raw
+        return None
+
+    def rpc_getSignatureStatuses(self, sigs: List[str], *_a: Any) -> Dict[str, Any]:
+        now = time.time()
+        out = []
+        for s in sigs or []:
+            st = self.sigs.get(s)
+            if st is None:
+                out.append(None)
+                continue
+            conf = "processed" if now < st["at"] else ("finalized" if now >= st["at"] + 12.8 else "confirmed")
+            out.append({"slot": st["slot"], "confirmations": None if conf == "finalized" else (0 if conf == "processed" else 1),
+                        "err": st["err"], "status": {"Ok": None} if st["err"] is None else {"Err": st["err"]},
+                        "confirmationStatus": conf})
+        return self._ctx(out)
+
+
+class _RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.obj = {"code": code, "message": message}
+        if data is not None:
+            self.obj["data"] = data
+
+
+def _launch_logs() -> List[str]:
+    return [f"Program {PUMP_PROGRAM} invoke [1]", "Program log: Instruction: Create",
+            f"Program {TOKEN_PROGRAM} invoke [2]", "Program log: Instruction: InitializeMint2",
+            f"Program {TOKEN_PROGRAM} success", f"Program {PUMP_PROGRAM} consumed 120000 of 200000 compute units",
+            f"Program {PUMP_PROGRAM} success"]
+
+
+# -----------------------------
+# HTTP / websocket front
+# -----------------------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive (+ requis par les clients websocket)
+    server_version = "LinoSim/1.0"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        return
+
+    @property
+    def sim(self) -> Sim:
+        return self.server.sim  # type: ignore[attr-defined]
+
+    def _send(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(obj, separators=(",", ":")).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _shape(self, route: str, svc: str) -> bool:
+        """Latency + 429 injection. Returns False when a 429 was sent."""
+        self.sim.count(route)
+        ms = self.sim.draw_latency(route)
+        if ms:
+            time.sleep(ms / 1000.0)
+        if self.sim.roll(self.sim.rate_429.get(svc, 0.0)):
+            self.sim.count(route, "429")
+            body = {"jsonrpc": "2.0", "id": None, "error": {"code": 429, "message": "Too many requests"}} \
+                if svc == "rpc" else {"code": 429, "message": "Too Many Requests"}
+            self._send(429, body, {"Retry-After": "1"})
+            return False
+        return True
+
+    def _body(self) -> Any:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        return json.loads(raw or b"null")
+
+    def do_GET(self) -> None:
+        if (self.headers.get("Upgrade") or "").lower() == "websocket":
+            return self._websocket()
+        u = urlsplit(self.path)
+        path = u.path.rstrip("/")
+        q = {k: v[-1] for k, v in parse_qs(u.query).items()}
+        sim = self.sim
+        sim._advance_launches(time.time())
+        if path.endswith("/quote"):
+            if self._shape("QUOTE", "jup"):
+                self._send(*sim.jup_quote(q))
+        elif path.endswith("/price/v3") or path.endswith("/price/v2"):
+            if self._shape("PRICE", "jup"):
+                self._send(*sim.jup_price(q))
+        elif path == "/latest/dex/search":
+            if self._shape("DEX", "dex"):
+                self._send(200, {"schemaVersion": "1.0.0", "pairs": sim.dex_search(q.get("q", ""))})
+        elif path.startswith("/latest/dex/tokens/"):
+            if self._shape("DEX", "dex"):
+                mints = unquote(path.rsplit("/", 1)[1]).split(",")
+                self._send(200, {"schemaVersion": "1.0.0", "pairs": sim.dex_tokens(mints) or None})
+        elif path.startswith("/tokens/v1/solana/"):
+            if self._shape("DEX", "dex"):
+                self._send(200, sim.dex_tokens(unquote(path.rsplit("/", 1)[1]).split(",")))
+        elif path.startswith("/token-boosts/") or path.startswith("/token-profiles/"):
+            if self._shape("DEX", "dex"):
+                self._send(200, sim.dex_listing())
+        elif path in ("/sim/stats", "/health"):
+            self._send(200, sim.stats() if path == "/sim/stats" else "ok")
+        else:
+            self._send(404, {"error": f"not simulated: {path}"})
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path.rstrip("/")
+        try:
+            body = self._body()
+        except Exception:
+            return self._send(400, {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+        sim = self.sim
+        if path.endswith("/swap"):
+            if self._shape("SWAP", "jup"):
+                self._send(*sim.jup_swap(body or {}))
+        elif path == "/sim/reset":
+            b = body or {}
+            self.server.sim = Sim(seed=int(b.get("seed", sim.seed)), n_tokens=int(b.get("tokens", SIM_TOKENS)),  # type: ignore[attr-defined]
+                                  **{k: b.get(k) for k in sim.cfg})
+            self._send(200, self.server.sim.stats())  # type: ignore[attr-defined]
+        else:
+            sim._advance_launches(time.time())
+            reqs = body if isinstance(body, list) else [body or {}]
+            route = "SEND" if any(isinstance(r, dict) and r.get("method") == "sendTransaction" for r in reqs) else "RPC"
+            if not self._shape(route, "rpc"):
+                return
+            res = [sim.rpc(r) for r in reqs if isinstance(r, dict)]
+            self._send(200, res if isinstance(body, list) else res[0])
+
+    # ---- websocket (logsSubscribe) ----
+    def _websocket(self) -> None:
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        _WsSession(self.sim, self.connection, self.rfile).run()
+
+
+class _WsSession:
+    def __init__(self, sim: Sim, sock: socket.socket, rfile: Any):
+        self.sim = sim
+        self.sock = sock
+        self.rfile = rfile                    # buffered: may already hold the first frames
+        self.subs: Dict[int, bool] = {}      # sub id -> pump.fun only
+        self.cursor = len(sim.launches)
+        self.closed = False
+        self._wlock = threading.Lock()
+        self._next_sub = 1
+
+    def _recv_exact(self, n: int) -> bytes:
+        buf = self.rfile.read(n)
+        if len(buf) < n:
+            raise ConnectionError("ws closed")
+        return buf
+
+    def _send_frame(self, payload: bytes, opcode: int = 0x1) -> None:
+        n = len(payload)
+        if n < 126:
+            hdr = struct.pack("!BB", 0x80 | opcode, n)
+        elif n < 1 << 16:
+            hdr = struct.pack("!BBH", 0x80 | opcode, 126, n)
+        else:
+            hdr = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+        with self._wlock:
+            self.sock.sendall(hdr + payload)
+
+    def send_json(self, obj: Any) -> None:
+        self._send_frame(json.dumps(obj, separators=(",", ":")).encode())
+
+    def _reader(self) -> None:
+        try:
+            while not self.closed:
+                b0, b1 = self._recv_exact(2)
+                op, n = b0 & 0x0F, b1 & 0x7F
+                if n == 126:
+                    n = struct.unpack("!H", self._recv_exact(2))[0]
+                elif n == 127:
+                    n = struct.unpack("!Q", self._recv_exact(8))[0]
+                mask = self._recv_exact(4) if b1 & 0x80 else b""
+                data = self._recv_exact(n)
+                if mask:
+                    data = bytes(c ^ mask[i % 4] for i, c in enumerate(data))
+                if op == 0x8:
+                    self._send_frame(data[:2], 0x8)
+                    break
+                if op == 0x9:
+                    self._send_frame(data, 0xA)
+                elif op == 0x1:
+                    self._on_text(data)
+        except Exception:
+            pass
+        self.closed = True
+
+    def _on_text(self, data: bytes) -> None:
+        try:
+            req = json.loads(data)
+        except Exception:
+            return
+        rid, method = req.get("id"), req.get("method")
+        if method == "logsSubscribe":
+            flt = (req.get("params") or ["all"])[0]
+            pump_only = isinstance(flt, dict) and PUMP_PROGRAM in (flt.get("mentions") or [])
+            sid, self._next_sub = self._next_sub, self._next_sub + 1
+            self.subs[sid] = pump_only or flt in ("all", "allWithVotes") or isinstance(flt, dict)
+            self.send_json({"jsonrpc": "2.0", "result": sid, "id": rid})
+        elif method == "logsUnsubscribe":
+            sid = int((req.get("params") or [0])[0])
+            self.send_json({"jsonrpc": "2.0", "result": self.subs.pop(sid, None) is not None, "id": rid})
+        else:
+            self.send_json({"jsonrpc": "2.0", "error": {"code": -32601, "message": "Method not found"}, "id": rid})
+
+    def run(self) -> None:
+        self.sock.settimeout(None)
+        threading.Thread(target=self._reader, name="sim-ws-reader", daemon=True).start()
+        try:
+            while not self.closed:
+                time.sleep(0.1)
+                self.sim._advance_launches(time.time())
+                new = self.sim.launches[self.cursor:]
+                if not new or not self.subs:
+                    self.cursor = len(self.sim.launches)
+                    continue
+                self.cursor += len(new)
+                for e in new:
+                    ms = self.sim.draw_latency("WS")
+                    if ms:
+                        time.sleep(ms / 1000.0)
+                    for sid in list(self.subs):
+                        self.send_json({"jsonrpc": "2.0", "method": "logsNotification", "params": {
+                            "result": {"context": {"slot": e["slot"]},
+                                       "value": {"signature": e["sig"], "err": None, "logs": _launch_logs()}},
+                            "subscription": sid}})
+        except Exception:
+            pass
+        self.closed = True
+
+
+def serve(host: str = SIM_HOST, port: int = SIM_PORT, sim: Optional[Sim] = None,
+          background: bool = True) -> ThreadingHTTPServer:
+    """Start the simulator. background=True returns immediately (daemon thread); port=0 picks a free port."""
+    srv = ThreadingHTTPServer((host, int(port)), _Handler)
+    srv.daemon_threads = True
+    srv.sim = sim or Sim()  # type: ignore[attr-defined]
+    h, p = srv.server_address[:2]
+    print(f"[sim] listening http://{h}:{p} (ws://{h}:{p}) seed={srv.sim.seed} tokens={len(srv.sim.tokens)}",  # type: ignore[attr-defined]
+          flush=True)
+    if background:
+        threading.Thread(target=srv.serve_forever, name="sim-http", daemon=True).start()
+    return srv
+
+
+def base_url(srv: ThreadingHTTPServer) -> str:
+    h, p = srv.server_address[:2]
+    return f"http://{h}:{p}"
+
+
+def env_for(srv: ThreadingHTTPServer) -> Dict[str, str]:
+    """Env overrides pointing every client of the bot at this simulator."""
+    url = base_url(srv)
+    return {"JUP_BASE_URL": url, "JUPITER_BASE_URL": url, "RPC_HTTP": url, "SOLANA_RPC_HTTP": url,
+            "SOLANA_RPC": url, "RPC_URL": url, "DEXSCREENER_BASE_URL": url}
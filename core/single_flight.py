@@ -0,0 +1,346 @@
+"""
+Single-flight coalescing for idempotent reads (quotes, prices, RPC reads).
+
+Concurrent identical requests collapse into one upstream call whose result
+(or exception) is fanned out to every waiter:
+
+- in-process: asyncio futures (coroutines) / events (threads), keyed by a
+  normalized request key (same normalization as jupiter_exec._quote_cache_key)
+- cross-process: per-key flock under SINGLEFLIGHT_DIR, same IPC style as
+  core.jup_rate_limit. The leader holds the lock while fetching and
+  publishes the JSON result; processes that found the lock taken wait for it
+  and reuse the result if it was written after they arrived (never an older
+  one), otherwise they fetch themselves. In the async path the file I/O runs
+  in worker threads (asyncio.to_thread), never on the event loop.
+
+Only results from this flight are shared: this is not a cache.
+Counters: stats() / log_stats().
+"""
+from __future__ import annotations
+
+import asyncio
+import errno
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except Exception:  # pragma: no cover - non-posix
+    fcntl = None
+
+SINGLEFLIGHT = os.getenv("SINGLEFLIGHT", "1").strip().lower() in ("1", "true", "yes", "on")
+SINGLEFLIGHT_XPROC = os.getenv("SINGLEFLIGHT_XPROC", "1").strip().lower() in ("1", "true", "yes", "on")
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR", "/tmp/lino_sf")
+# a follower never waits longer than this for another process' leader
+SINGLEFLIGHT_XPROC_WAIT_S = float(os.getenv("SINGLEFLIGHT_XPROC_WAIT_S", "20"))
+SINGLEFLIGHT_GC_S = float(os.getenv("SINGLEFLIGHT_GC_S", "120"))
+
+# JSON-RPC methods that are pure reads (safe to share). sendTransaction & co never are.
+RPC_READ_METHODS = {m.strip() for m in os.getenv(
+    "SINGLEFLIGHT_RPC_METHODS",
+    "getTokenSupply,getTokenAccountsByOwner,getAccountInfo,getMultipleAccounts,getBalance,"
+    "getTokenLargestAccounts,getTokenAccountBalance,getSignaturesForAddress,getTransaction,"
+    "getLatestBlockhash,getSignatureStatuses,getProgramAccounts",
+).split(",") if m.strip()}
+
+
+# -----------------------------
+# keys
+# -----------------------------
+def http_key(url: str, params: Optional[dict] = None) -> str:
+    # same normalization as jupiter_exec._quote_cache_key (sorted params, lists joined)
+    items = []
+    for k in sorted((params or {}).keys()):
+        v = (params or {}).get(k)
+        if isinstance(v, (list, tuple)):
+            v = ",".join(map(str, v))
+        items.append(f"{k}={v}")
+    return url + "?" + "&".join(items)
+
+
+def rpc_key(url: str, method: str, params: Any) -> Optional[str]:
+    """None when the method is not a shareable read."""
+    if method not in RPC_READ_METHODS:
+        return None
+    try:
+        return f"rpc:{url}:{method}:{json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+    except Exception:
+        return None
+
+
+# -----------------------------
+# stats
+# -----------------------------
+_STATS = {"calls": 0, "upstream": 0, "saved_inproc": 0, "saved_xproc": 0, "xproc_miss": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _bump(k: str, n: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[k] += n
+
+
+def stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        d = dict(_STATS)
+    saved = d["saved_inproc"] + d["saved_xproc"]
+    d["saved"] = saved
+    d["saved_ratio"] = round(saved / d["calls"], 3) if d["calls"] else 0.0
+    return d
+
+
+def log_stats(prefix: str = "[single_flight]") -> None:
+    s = stats()
+    print(f"{prefix} calls={s['calls']} upstream={s['upstream']} saved={s['saved']} "
+          f"(inproc={s['saved_inproc']} xproc={s['saved_xproc']}) ratio={s['saved_ratio']} xproc_miss={s['xproc_miss']}",
+          flush=True)
+
+
+# -----------------------------
+# cross-process (flock + result file)
+# -----------------------------
+_last_gc = 0.0
+
+
+def _paths(key: str) -> Tuple[str, str]:
+    h = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(SINGLEFLIGHT_DIR, h + ".lock"), os.path.join(SINGLEFLIGHT_DIR, h + ".json")
+
+
+def _xp_enabled() -> bool:
+    return SINGLEFLIGHT_XPROC and fcntl is not None
+
+
+def _xp_try_lead(key: str) -> Tuple[Optional[int], bool]:
+    """(fd, leader). fd is None if cross-process coalescing is unavailable."""
+    try:
+        os.makedirs(SINGLEFLIGHT_DIR, exist_ok=True)
+        fd = os.open(_paths(key)[0], os.O_CREAT | os.O_RDWR, 0o666)
+    except Exception:
+        return None, False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd, True
+    except OSError as e:
+        if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+            return fd, False
+        os.close(fd)
+        return None, False
+
+
+def _xp_release(fd: Optional[int]) -> None:
+    if fd is None:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    except Exception:
+        pass
+    try:
+        os.close(fd)
+    except Exception:
+        pass
+
+
+def _xp_wait(fd: int, timeout_s: float) -> bool:
+    """Block until the other process' leader releases the key lock (bounded)."""
+    t0 = time.monotonic()
+    delay = 0.005
+    while time.monotonic() - t0 < timeout_s:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return True
+        except OSError:
+            time.sleep(delay)
+            delay = min(0.05, delay * 2)
+    return False
+
+
+def _xp_publish(key: str, value: Any) -> None:
+    global _last_gc
+    path = _paths(key)[1]
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "v": value}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except Exception:
+        return
+    now = time.time()
+    if now - _last_gc > SINGLEFLIGHT_GC_S:
+        _last_gc = now
+        try:
+            for de in os.scandir(SINGLEFLIGHT_DIR):
+                try:
+                    if now - de.stat().st_mtime > SINGLEFLIGHT_GC_S:
+                        os.unlink(de.path)
+                except Exception:
+                    pass
+        except Exception:
+            pass
+
+
+def _xp_read(key: str, since: float) -> Tuple[bool, Any]:
+    try:
+        with open(_paths(key)[1], "r", encoding="utf-8") as f:
+            rec = json.load(f)
+        if float(rec.get("ts") or 0.0) >= since:
+            return True, rec.get("v")
+    except Exception:
+        pass
+    return False, None
+
+
+# -----------------------------
+# async
+# -----------------------------
+class _AFlight:
+    """One in-process flight: the upstream call runs in its own task, every caller awaits it shielded."""
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+_AFLIGHTS: Dict[Tuple[int, str], _AFlight] = {}
+
+
+async def _aleader(key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    if not _xp_enabled():
+        _bump("upstream")
+        return await fn()
+    # lock file / result file I/O goes through to_thread: never block the event loop
+    arrived = time.time()
+    fd, leader = await asyncio.to_thread(_xp_try_lead, key)
+    if fd is not None and not leader:
+        try:
+            ok = await asyncio.to_thread(_xp_wait, fd, SINGLEFLIGHT_XPROC_WAIT_S)
+        finally:
+            _xp_release(fd)
+        if ok:
+            hit, val = await asyncio.to_thread(_xp_read, key, arrived)
+            if hit:
+                _bump("saved_xproc")
+                return val
+        _bump("xproc_miss")
+        _bump("upstream")
+        return await fn()
+    try:
+        _bump("upstream")
+        val = await fn()
+        if fd is not None:
+            await asyncio.to_thread(_xp_publish, key, val)
+        return val
+    finally:
+        _xp_release(fd)
+
+
+def _adrop(k: Tuple[int, str], fl: _AFlight) -> None:
+    if _AFLIGHTS.get(k) is fl:
+        _AFLIGHTS.pop(k, None)
+
+
+async def do(key: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fn() once per key across concurrent callers (this loop + other processes).
+
+    A cancelled caller only stops waiting: the flight goes on for the others and
+    is cancelled only when its last waiter is gone.
+    """
+    if not SINGLEFLIGHT or not key:
+        return await fn()
+    _bump("calls")
+    loop = asyncio.get_running_loop()
+    k = (id(loop), key)
+    fl = _AFLIGHTS.get(k)
+    if fl is None:
+        fl = _AFLIGHTS[k] = _AFlight(loop.create_task(_aleader(key, fn)))
+        fl.task.add_done_callback(lambda _t, k=k, fl=fl: _adrop(k, fl))
+    else:
+        _bump("saved_inproc")
+    fl.waiters += 1
+    try:
+        return await asyncio.shield(fl.task)
+    finally:
+        fl.waiters -= 1
+        if fl.waiters <= 0 and not fl.task.done():
+            _adrop(k, fl)  # a later caller starts a fresh flight instead of joining a cancelled one
+            fl.task.cancel()
+
+
+# -----------------------------
+# sync (threads)
+# -----------------------------
+class _Call:
+    __slots__ = ("ev", "val", "exc")
+
+    def __init__(self):
+        self.ev = threading.Event()
+        self.val: Any = None
+        self.exc: Optional[BaseException] = None
+
+
+_SFLIGHTS: Dict[str, _Call] = {}
+_SLOCK = threading.Lock()
+
+
+def _sleader(key: str, fn: Callable[[], Any]) -> Any:
+    if not _xp_enabled():
+        _bump("upstream")
+        return fn()
+    arrived = time.time()
+    fd, leader = _xp_try_lead(key)
+    if fd is not None and not leader:
+        try:
+            ok = _xp_wait(fd, SINGLEFLIGHT_XPROC_WAIT_S)
+        finally:
+            _xp_release(fd)
+        if ok:
+            hit, val = _xp_read(key, arrived)
+            if hit:
+                _bump("saved_xproc")
+                return val
+        _bump("xproc_miss")
+        _bump("upstream")
+        return fn()
+    try:
+        _bump("upstream")
+        val = fn()
+        if fd is not None:
+            _xp_publish(key, val)
+        return val
+    finally:
+        _xp_release(fd)
+
+
+def do_sync(key: Optional[str], fn: Callable[[], Any]) -> Any:
+    """Thread flavour of do()."""
+    if not SINGLEFLIGHT or not key:
+        return fn()
+    _bump("calls")
+    with _SLOCK:
+        c = _SFLIGHTS.get(key)
+        leader = c is None
+        if leader:
+            c = _SFLIGHTS[key] = _Call()
+    if not leader:
+        _bump("saved_inproc")
+        c.ev.wait()
+        if c.exc is not None:
+            raise c.exc
+        return c.val
+    try:
+        c.val = _sleader(key, fn)
+        return c.val
+    except BaseException as e:
+        c.exc = e
+        raise
+    finally:
+        with _SLOCK:
+            if _SFLIGHTS.get(key) is c:
+                _SFLIGHTS.pop(key, None)
+        c.ev.set()
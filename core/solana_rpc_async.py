@@ -7,6 +7,8 @@ from typing import Any, Dict, Optional
 
 import aiohttp
 
+from core import http_pool, single_flight
+
 TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
 TOKEN_2022_PROGRAM_ID = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
 
@@ -60,10 +62,8 @@ class SolanaRPCAsync:
         }
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.timeout_s)
-            self._session = aiohttp.ClientSession(timeout=timeout)
-        return self._session
+        # shared pooled session (core.http_pool): keep-alive + DNS cache across clients
+        return await http_pool.aio_session()
 
 
     async def send_transaction(self, tx_bytes: bytes, skip_preflight: bool = False, max_retries: int = 3) -> str:
@@ -89,8 +89,8 @@ class SolanaRPCAsync:
 
 
     async def close(self) -> None:
-        if self._session and not self._session.closed:
-            await self._session.close()
+        # the session belongs to core.http_pool
+        self._session = None
 
     async def aclose(self) -> None:
         await self.close()
@@ -115,6 +115,11 @@ class SolanaRPCAsync:
             return False
 
     async def call(self, method: str, params: list) -> Any:
+        # pure reads (getTokenSupply, getTokenAccountsByOwner, ...) are coalesced while in flight
+        key = single_flight.rpc_key(self.rpc_url, method, params)
+        return await single_flight.do(key, lambda: self._call_upstream(method, params))
+
+    async def _call_upstream(self, method: str, params: list) -> Any:
         async with self._sem:
             sess = await self._get_session()
             payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
@@ -123,12 +128,13 @@ class SolanaRPCAsync:
             while True:
                 await self._throttle(method)
                 try:
-                    async with sess.post(self.rpc_url, json=payload) as resp:
+                    async with sess.post(self.rpc_url, json=payload, timeout=aiohttp.ClientTimeout(total=self.timeout_s)) as resp:
                         j = await resp.json(content_type=None)
 
                     if "error" in j and j["error"]:
                         err = j["error"]
                         if self._is_429(err) and attempt < self.max_retries:
+                            http_pool.record_retry(http_pool.host_of(self.rpc_url))
                             sleep_s = min(self.backoff_cap_s, self.backoff_base_s * (2**attempt))
                             sleep_s += (attempt % 3) * 0.07
                             await asyncio.sleep(sleep_s)
@@ -0,0 +1,533 @@
+"""
+Tick recorder: every observed price, appended to a columnar per-day store.
+
+Hot paths call record() / record_overview() / record_quote(); the call only
+enqueues a tuple, a background writer thread batches them to disk (same
+pattern as core.decision_trace: never blocks, drops + counts when full).
+
+Layout (one directory per UTC day, append-only):
+
+  TICK_DIR/YYYYMMDD/
+      ts.f8  mint.u4  src.u1  price.f8  price_usd.f8  liq_usd.f8
+      vol_m5.f8  vol_h1.f8  mcap.f8  px_raw.f8  impact_pct.f8
+      mints.txt     mint dictionary: line i = mint of id i
+      meta.json     columns / dtypes / sources (little endian)
+
+Every column file holds fixed-width little-endian values, row i of each file
+is the same tick, so a column is directly np.memmap-able (see Segment.column).
+Missing values are NaN.
+
+  price       SOL per UI token (sell engine price feed, DexScreener priceNative)
+  px_raw      lamports per raw token unit (Jupiter quotes, decimals unknown)
+  price_usd / liq_usd / vol_m5 / vol_h1 / mcap: DexScreener fields when known
+
+Several processes (sell engine, scanner, trader_exec one-shots) append to the
+same day: each batch is written under flock(.lock), dictionary first, then
+columns; readers use the shortest column so a torn batch is never visible.
+
+Read side: scan(mint=..., t0=..., t1=..., sources=...) returns columns
+(NumPy arrays when NumPy is installed, lists otherwise), iter_ticks() yields
+row dicts, last() gives the latest tick of a mint. CLI: scripts/ticks.py.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # windows: pas de verrou inter-process
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TICK_RECORD = os.getenv("TICK_RECORD", "1").strip().lower() in ("1", "true", "yes", "on")
+TICK_DIR = os.getenv("TICK_DIR", "state/ticks")
+TICK_QUEUE_MAX = int(os.getenv("TICK_QUEUE_MAX", "100000"))
+TICK_BATCH = int(os.getenv("TICK_BATCH", "5000"))
+TICK_FLUSH_S = float(os.getenv("TICK_FLUSH_S", "1.0"))
+TICK_KEEP_DAYS = float(os.getenv("TICK_KEEP_DAYS", "60"))  # 0 = keep everything
+
+NAN = float("nan")
+
+# (name, array typecode, numpy dtype); ts + mint + src first, then float fields in record() order
+_U32 = "I" if array("I").itemsize == 4 else "L"
+COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ("ts", "d", "<f8"),
+    ("mint", _U32, "<u4"),
+    ("src", "B", "u1"),
+    ("price", "d", "<f8"),
+    ("price_usd", "d", "<f8"),
+    ("liq_usd", "d", "<f8"),
+    ("vol_m5", "d", "<f8"),
+    ("vol_h1", "d", "<f8"),
+    ("mcap", "d", "<f8"),
+    ("px_raw", "d", "<f8"),
+    ("impact_pct", "d", "<f8"),
+)
+FIELDS = tuple(c[0] for c in COLUMNS[3:])
+_EXT = {"d": "f8", _U32: "u4", "B": "u1"}
+
+# append-only: ne jamais reordonner (les segments stockent l'index)
+SOURCES: Tuple[str, ...] = ("other", "sell", "scanner", "quote", "probe", "price_feed", "sim")
+_SRC_ID = {s: i for i, s in enumerate(SOURCES)}
+
+
+def _col_file(name: str, code: str) -> str:
+    return f"{name}.{_EXT[code]}"
+
+
+def day_of(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(ts))
+
+
+def _f(v: Any) -> float:
+    try:
+        x = float(v)
+        return x if math.isfinite(x) else NAN
+    except Exception:
+        return NAN
+
+
+# -----------------------------
+# stats
+# -----------------------------
+_STATS = {"recorded": 0, "dropped": 0, "written": 0, "write_errors": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def _bump(k: str, n: int = 1) -> None:
+    with _STATS_LOCK:
+        _STATS[k] += n
+
+
+def stats() -> Dict[str, int]:
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+# -----------------------------
+# segment writer (one per day dir)
+# -----------------------------
+class _SegmentWriter:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.ids: Dict[str, int] = {}
+        self._dict_off = 0
+        meta = os.path.join(path, "meta.json")
+        if not os.path.exists(meta):
+            tmp = f"{meta}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "columns": [[n, dt] for n, _, dt in COLUMNS],
+                           "sources": list(SOURCES), "day": os.path.basename(path)}, f)
+            os.replace(tmp, meta)
+
+    def _sync_dict(self, f) -> None:
+        """Read mints appended by other processes since our last look."""
+        f.seek(self._dict_off)
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].split(b"\n")[:-1]:
+            self.ids.setdefault(line.decode("ascii", "replace"), len(self.ids))
+        self._dict_off += end
+
+    def _repair(self) -> int:
+        """Truncate every column to the shortest one (torn batch after a crash)."""
+        sizes = []
+        for name, code, _ in COLUMNS:
+            p = os.path.join(self.path, _col_file(name, code))
+            sizes.append(os.path.getsize(p) // array(code).itemsize if os.path.exists(p) else 0)
+        n = min(sizes)
+        if max(sizes) != n:
+            for name, code, _ in COLUMNS:
+                p = os.path.join(self.path, _col_file(name, code))
+                if os.path.exists(p):
+                    os.truncate(p, n * array(code).itemsize)
+        return n
+
+    def append(self, rows: List[Tuple]) -> None:
+        lock = open(os.path.join(self.path, ".lock"), "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(os.path.join(self.path, "mints.txt"), "a+b") as df:
+                self._sync_dict(df)
+                new = []
+                for r in rows:
+                    if r[1] not in self.ids:
+                        self.ids[r[1]] = len(self.ids)
+                        new.append(r[1])
+                if new:
+                    blob = ("\n".join(new) + "\n").encode("ascii", "replace")
+                    df.seek(0, os.SEEK_END)
+                    df.write(blob)
+                    df.flush()
+                    self._dict_off += len(blob)
+            self._repair()
+            cols = [array(code) for _, code, _ in COLUMNS]
+            ids = self.ids
+            for r in rows:
+                cols[0].append(r[0])
+                cols[1].append(ids[r[1]])
+                cols[2].append(r[2])
+                for j in range(3, len(COLUMNS)):
+                    cols[j].append(r[j])
+            for (name, code, _), a in zip(COLUMNS, cols):
+                if sys.byteorder != "little":
+                    a.byteswap()
+                with open(os.path.join(self.path, _col_file(name, code)), "ab") as f:
+                    a.tofile(f)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+
+
+# -----------------------------
+# background writer
+# -----------------------------
+_Q: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=max(1, TICK_QUEUE_MAX))
+_WRITER: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+_SEGS: Dict[str, _SegmentWriter] = {}
+_last_prune = 0.0
+
+
+def _drain(batch: List[Tuple]) -> None:
+    global _last_prune
+    if not batch:
+        return
+    by_day: Dict[str, List[Tuple]] = {}
+    for r in batch:
+        by_day.setdefault(day_of(r[0]), []).append(r)
+    for day, rows in by_day.items():
+        try:
+            seg = _SEGS.get(day)
+            if seg is None:
+                if len(_SEGS) > 4:
+                    _SEGS.clear()
+                seg = _SEGS[day] = _SegmentWriter(os.path.join(TICK_DIR, day))
+            seg.append(rows)
+            _bump("written", len(rows))
+        except Exception as e:
+            _bump("write_errors")
+            print(f"⚠️ tick store write failed day={day}: {e}", flush=True)
+    now = time.time()
+    if TICK_KEEP_DAYS > 0 and now - _last_prune > 3600:
+        _last_prune = now
+        try:
+            prune(TICK_KEEP_DAYS)
+        except Exception:
+            pass
+
+
+def _writer() -> None:
+    stop = False
+    while not stop:
+        batch: List[Tuple] = []
+        try:
+            r = _Q.get(timeout=TICK_FLUSH_S)
+            if r is None:
+                stop = True
+            else:
+                batch.append(r)
+            while len(batch) < TICK_BATCH:
+                r = _Q.get_nowait()
+                if r is None:
+                    stop = True
+                    break
+                batch.append(r)
+        except queue.Empty:
+            pass
+        _drain(batch)
+
+
+def _ensure_writer() -> None:
+    global _WRITER
+    if _WRITER is not None:
+        return
+    with _WRITER_LOCK:
+        if _WRITER is not None:
+            return
+        t = threading.Thread(target=_writer, name="tick-store", daemon=True)
+        t.start()
+        _WRITER = t
+
+
+def close(timeout_s: float = 5.0) -> None:
+    """Flush everything queued and stop the writer (atexit)."""
+    global _WRITER
+    t = _WRITER
+    if t is None:
+        return
+    try:
+        _Q.put(None, timeout=timeout_s)
+    except Exception:
+        pass
+    t.join(timeout_s)
+    _WRITER = None
+
+
+atexit.register(close)
+
+
+# -----------------------------
+# record (caller side, cheap)
+# -----------------------------
+def record(mint: str, price: Any = NAN, source: str = "other", *, price_usd: Any = NAN, liq_usd: Any = NAN,
+           vol_m5: Any = NAN, vol_h1: Any = NAN, mcap: Any = NAN, px_raw: Any = NAN, impact_pct: Any = NAN,
+           ts: Optional[float] = None) -> None:
+    """Enqueue one tick. Never blocks, never raises."""
+    if not TICK_RECORD or not mint:
+        return
+    try:
+        row = (float(ts if ts is not None else time.time()), str(mint), _SRC_ID.get(source, 0),
+               _f(price), _f(price_usd), _f(liq_usd), _f(vol_m5), _f(vol_h1), _f(mcap), _f(px_raw), _f(impact_pct))
+        _ensure_writer()
+        _Q.put_nowait(row)
+        _bump("recorded")
+    except queue.Full:
+        _bump("dropped")
+    except Exception:
+        pass
+
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+
+def record_overview(ov: Dict[str, Any], source: str = "scanner") -> None:
+    """Tick from a DexScreener pair / TokenScanner overview. priceNative is in quote-token
+    units: kept only for SOL-quoted pairs (NaN otherwise, e.g. USDC pairs)."""
+    if not TICK_RECORD:
+        return
+    try:
+        p = ov.get("data") or ov.get("_raw") or ov
+        mint = ov.get("mint") or ((p.get("baseToken") or {}).get("address"))
+        sol_quoted = (p.get("quoteToken") or {}).get("address") == SOL_MINT
+        record(mint, p.get("priceNative") if sol_quoted else NAN, source,
+               price_usd=p.get("priceUsd") or ov.get("price_usd"),
+               liq_usd=(p.get("liquidity") or {}).get("usd") or ov.get("liquidity_usd"),
+               vol_m5=(p.get("volume") or {}).get("m5"), vol_h1=(p.get("volume") or {}).get("h1"),
+               mcap=p.get("marketCap") or p.get("fdv"))
+    except Exception:
+        pass
+
+
+def record_quote(mint: str, quote: Dict[str, Any], source: str = "quote") -> None:
+    """Tick from a Jupiter quote (either direction): px_raw = lamports per raw token unit."""
+    if not TICK_RECORD:
+        return
+    try:
+        in_amt, out_amt = float(quote.get("inAmount") or 0), float(quote.get("outAmount") or 0)
+        if in_amt <= 0 or out_amt <= 0:
+            return
+        px = in_amt / out_amt if quote.get("inputMint") == SOL_MINT else out_amt / in_amt
+        record(mint, NAN, source, px_raw=px, impact_pct=quote.get("priceImpactPct"))
+    except Exception:
+        pass
+
+
+# -----------------------------
+# read side
+# -----------------------------
+class Segment:
+    """One day of ticks (read-only view)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.day = os.path.basename(path.rstrip("/"))
+        sizes = []
+        for name, code, _ in COLUMNS:
+            p = os.path.join(path, _col_file(name, code))
+            sizes.append(os.path.getsize(p) // array(code).itemsize if os.path.exists(p) else 0)
+        self.n = min(sizes) if sizes else 0
+        self._mints: Optional[List[str]] = None
+
+    def mints(self) -> List[str]:
+        if self._mints is None:
+            try:
+                with open(os.path.join(self.path, "mints.txt"), "rb") as f:
+                    data = f.read()
+                self._mints = [m.decode("ascii", "replace") for m in data[:data.rfind(b"\n") + 1].split(b"\n")[:-1]]
+            except FileNotFoundError:
+                self._mints = []
+        return self._mints
+
+    def mint_id(self, mint: str) -> Optional[int]:
+        try:
+            return self.mints().index(mint)
+        except ValueError:
+            return None
+
+    def column(self, name: str):
+        """np.memmap of the first n rows (NumPy), else an array.array copy."""
+        code, dt = next((c, d) for n, c, d in COLUMNS if n == name)
+        p = os.path.join(self.path, _col_file(name, code))
+        if self.n == 0:
+            return np.empty(0, dtype=dt) if np is not None else array(code)
+        if np is not None:
+            return np.memmap(p, dtype=dt, mode="r", shape=(self.n,))
+        a = array(code)
+        with open(p, "rb") as f:
+            a.fromfile(f, self.n)
+        if sys.byteorder != "little":
+            a.byteswap()
+        return a
+
+
+def days(t0: Optional[float] = None, t1: Optional[float] = None, base: Optional[str] = None) -> List[str]:
+    """Day directories overlapping [t0, t1], oldest first."""
+    base = base or TICK_DIR
+    try:
+        ds = sorted(d for d in os.listdir(base) if len(d) == 8 and d.isdigit())
+    except FileNotFoundError:
+        return []
+    lo = day_of(t0) if t0 else "00000000"
+    hi = day_of(t1) if t1 else "99999999"
+    return [d for d in ds if lo <= d <= hi]
+
+
+def scan(mint: Optional[str] = None, t0: Optional[float] = None, t1: Optional[float] = None,
+         sources: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None,
+         base: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ticks in [t0, t1] (optionally one mint / some sources), sorted by ts.
+    Returns {column: values}; "mint" holds mint strings, "src" source names.
+    NumPy arrays when NumPy is installed, lists otherwise.
+    """
+    want = list(columns) if columns else [c[0] for c in COLUMNS]
+    for c in ("ts",):
+        if c not in want:
+            want.insert(0, c)
+    src_ids = {_SRC_ID[s] for s in sources or () if s in _SRC_ID} if sources else None
+    base = base or TICK_DIR
+    if np is not None:
+        return _scan_np(mint, t0, t1, src_ids, want, base)
+    out: Dict[str, List[Any]] = {c: [] for c in want}
+    rows = []
+    for r in iter_ticks(mint, t0, t1, sources, base=base):
+        rows.append(r)
+    rows.sort(key=lambda r: r["ts"])
+    for r in rows:
+        for c in want:
+            out[c].append(r[c])
+    return out
+
+
+def _scan_np(mint, t0, t1, src_ids, want, base) -> Dict[str, Any]:
+    parts: Dict[str, list] = {c: [] for c in want}
+    for d in days(t0, t1, base):
+        seg = Segment(os.path.join(base, d))
+        if not seg.n:
+            continue
+        mask = np.ones(seg.n, dtype=bool)
+        ts = seg.column("ts")
+        if t0:
+            mask &= ts >= t0
+        if t1:
+            mask &= ts <= t1
+        ids = seg.column("mint")
+        if mint:
+            mid = seg.mint_id(mint)
+            if mid is None:
+                continue
+            mask &= ids == mid
+        src = seg.column("src")
+        if src_ids is not None:
+            mask &= np.isin(src, list(src_ids))
+        if not mask.any():
+            continue
+        for c in want:
+            if c == "mint":
+                parts[c].append(np.asarray(seg.mints(), dtype=object)[ids[mask]])
+            elif c == "src":
+                parts[c].append(np.asarray(SOURCES, dtype=object)[src[mask]])
+            else:
+                parts[c].append(np.asarray(seg.column(c)[mask]))
+    out: Dict[str, Any] = {}
+    if not parts["ts"]:
+        for c in want:
+            dt = object if c in ("mint", "src") else next(d for n, _, d in COLUMNS if n == c)
+            out[c] = np.empty(0, dtype=dt)
+        return out
+    for c in want:
+        out[c] = np.concatenate(parts[c])
+    order = np.argsort(out["ts"], kind="stable")
+    return {c: v[order] for c, v in out.items()}
+
+
+def iter_ticks(mint: Optional[str] = None, t0: Optional[float] = None, t1: Optional[float] = None,
+               sources: Optional[Sequence[str]] = None, base: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Row dicts in file order (per day), no NumPy needed."""
+    base = base or TICK_DIR
+    src_ids = {_SRC_ID[s] for s in sources if s in _SRC_ID} if sources else None
+    for d in days(t0, t1, base):
+        seg = Segment(os.path.join(base, d))
+        if not seg.n:
+            continue
+        mid = seg.mint_id(mint) if mint else None
+        if mint and mid is None:
+            continue
+        names = seg.mints()
+        cols = {n: seg.column(n) for n, _, _ in COLUMNS}
+        ts, ids, src = cols["ts"], cols["mint"], cols["src"]
+        for i in range(seg.n):
+            if mid is not None and ids[i] != mid:
+                continue
+            t = ts[i]
+            if (t0 and t < t0) or (t1 and t > t1):
+                continue
+            if src_ids is not None and src[i] not in src_ids:
+                continue
+            r = {"ts": float(t), "mint": names[ids[i]] if ids[i] < len(names) else "",
+                 "src": SOURCES[src[i]] if src[i] < len(SOURCES) else "other"}
+            for f in FIELDS:
+                r[f] = float(cols[f][i])
+            yield r
+
+
+def last(mint: str, source: Optional[str] = None, within_s: float = 86400.0,
+         base: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Most recent tick of a mint (optionally from one source)."""
+    now = time.time()
+    best = None
+    for r in iter_ticks(mint, now - within_s, None, [source] if source else None, base=base):
+        if best is None or r["ts"] >= best["ts"]:
+            best = r
+    return best
+
+
+def summary(base: Optional[str] = None) -> List[Dict[str, Any]]:
+    base = base or TICK_DIR
+    out = []
+    for d in days(base=base):
+        p = os.path.join(base, d)
+        seg = Segment(p)
+        size = sum(os.path.getsize(os.path.join(p, f)) for f in os.listdir(p))
+        out.append({"day": d, "ticks": seg.n, "mints": len(seg.mints()), "bytes": size})
+    return out
+
+
+def prune(keep_days: float = TICK_KEEP_DAYS, base: Optional[str] = None) -> List[str]:
+    """Delete day directories older than keep_days."""
+    base = base or TICK_DIR
+    cutoff = day_of(time.time() - keep_days * 86400)
+    gone = []
+    for d in days(base=base):
+        if d < cutoff:
+            shutil.rmtree(os.path.join(base, d), ignore_errors=True)
+            gone.append(d)
+    return gone
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import aiohttp
 
+from core import tick_store
+from core.bounded_cache import BoundedCache
+
 
 logger = logging.getLogger("TokenScanner")
 
@@ -16,7 +20,7 @@ DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) LinoBot/1.0",
 }
 
-DEX_BASE = "https://api.dexscreener.com"
+DEX_BASE = os.getenv("DEXSCREENER_BASE_URL", "https://api.dexscreener.com").rstrip("/")
 
 
 def _cfg_get(cfg: Any, *names: str, default: Any = None) -> Any:
@@ -100,66 +104,134 @@ class TokenScanner:
 
         self._rl = _RateLimiter(self.cfg.global_rps)
         self._sem = asyncio.Semaphore(max(1, int(self.cfg.max_concurrency)))
+        self._session: Optional[aiohttp.ClientSession] = None
+        # pair key -> (fingerprint, overview|None) du dernier scan (retain par scan + cap LRU)
+        self._ov_cache = BoundedCache("scanner.ov_cache", max_items=20_000)
+        self.stats: Dict[str, int] = {"ov_built": 0, "ov_reused": 0}
 
         logger.info("[Scanner] ✅ limit=%s rps=%s conc=%s", self.cfg.new_listing_limit, self.cfg.global_rps, self.cfg.max_concurrency)
 
     # ---- public API expected by main.py ----
-    async def scan_once_async(self) -> List[Dict[str, Any]]:
+    async def scan_once_async(self, delta: bool = False) -> List[Dict[str, Any]]:
+        """
+        delta=False (defaut): snapshot complet, compat TradingEngine.on_overviews.
+        delta=True: seulement les overviews nouvelles ou dont la paire a change
+        depuis le scan precedent (fingerprint).
+        """
         pairs = await self._fetch_pairs()
 
+        cache = self._ov_cache
+        fresh: set = set()
         overviews: List[Dict[str, Any]] = []
+        changed: set = set()
         for p in pairs:
-            ov = self._to_overview(p)
+            key = self._pair_key(p)
+            fp = self._fingerprint(p)
+            hit = cache.get(key)
+            if hit is not None and hit[0] == fp:
+                self.stats["ov_reused"] += 1
+                ov = hit[1]
+                if ov is not None:
+                    # champs hors fingerprint (priceChange, h1...) lus via ov['data']
+                    ov["data"] = p
+                    ov["_raw"] = p
+            else:
+                self.stats["ov_built"] += 1
+                ov = self._to_overview(p)
+                if ov is not None:
+                    self._normalize(ov)
+                    changed.add(id(ov))
+                    tick_store.record_overview(ov)
+            cache.set(key, (fp, ov))
+            fresh.add(key)
             if ov is None:
                 continue
             overviews.append(ov)
 
+        # paires absentes de ce scan => oubliees (cache borne au dernier scan)
+        cache.retain(fresh)
+
         # tri score desc + cut limit
         overviews.sort(key=lambda x: float(x.get("score") or 0.0), reverse=True)
+        overviews = overviews[: int(self.cfg.new_listing_limit)]
+        if delta:
+            return [ov for ov in overviews if id(ov) in changed]
+        return overviews
+
+    @staticmethod
+    def _pair_key(p: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (p.get("chainId"), (p.get("dexId") or "").lower(), p.get("pairAddress") or p.get("pair_address"))
+
+    @staticmethod
+    def _fingerprint(p: Dict[str, Any]) -> Tuple[Any, ...]:
+        # seulement les champs lus par _to_overview / _normalize
+        base = p.get("baseToken") or {}
+        tx_m5 = (p.get("txns") or {}).get("m5") or {}
+        return (
+            base.get("address") or base.get("mint") or p.get("baseTokenAddress"),
+            base.get("symbol") or base.get("ticker"),
+            (p.get("liquidity") or {}).get("usd"),
+            (p.get("volume") or {}).get("m5"),
+            tx_m5.get("buys"),
+            tx_m5.get("sells"),
+            p.get("marketCap"),
+            p.get("fdv"),
+            p.get("priceUsd"),
+            p.get("priceNative"),
+            p.get("url"),
+        )
 
+    @staticmethod
+    def _normalize(ov: Dict[str, Any]) -> None:
         # --- NORMALIZE_KEYS_FOR_TRADINGENGINE ---
         # TradingEngine._maybe_buy attend: dex_id, price_usd, price, liquidity_usd, marketcap_usd
         try:
-            for ov in (overviews or []):
-                raw = ov.get("data") or ov.get("_raw") or {}
-
-                # dex_id
-                if not ov.get("dex_id"):
-                    ov["dex_id"] = str(ov.get("dexId") or raw.get("dexId") or "").lower().strip()
-
-                # price_usd / price
-                if ov.get("price_usd") in (None, 0, 0.0, ""):
-                    px = ov.get("priceUsd") or raw.get("priceUsd") or raw.get("price_usd") or ov.get("price")
-                    try:
-                        ov["price_usd"] = float(px or 0.0)
-                    except Exception:
-                        ov["price_usd"] = 0.0
-
-                if ov.get("price") in (None, 0, 0.0, ""):
-                    try:
-                        ov["price"] = float(ov.get("price_usd") or 0.0)
-                    except Exception:
-                        ov["price"] = 0.0
-
-                # liquidity_usd
-                if ov.get("liquidity_usd") in (None, 0, 0.0, ""):
-                    liq = ov.get("liq") or (raw.get("liquidity") or {}).get("usd") or (ov.get("liquidity") or {}).get("usd")
-                    try:
-                        ov["liquidity_usd"] = float(liq or 0.0)
-                    except Exception:
-                        ov["liquidity_usd"] = 0.0
-
-                # marketcap_usd
-                if ov.get("marketcap_usd") in (None, 0, 0.0, ""):
-                    mc = ov.get("marketCap") or raw.get("marketCap") or raw.get("fdv") or ov.get("fdv")
-                    try:
-                        ov["marketcap_usd"] = float(mc or 0.0)
-                    except Exception:
-                        ov["marketcap_usd"] = 0.0
+            raw = ov.get("data") or ov.get("_raw") or {}
+
+            # dex_id
+            if not ov.get("dex_id"):
+                ov["dex_id"] = str(ov.get("dexId") or raw.get("dexId") or "").lower().strip()
+
+            # price_usd / price
+            if ov.get("price_usd") in (None, 0, 0.0, ""):
+                px = ov.get("priceUsd") or raw.get("priceUsd") or raw.get("price_usd") or ov.get("price")
+                try:
+                    ov["price_usd"] = float(px or 0.0)
+                except Exception:
+                    ov["price_usd"] = 0.0
+
+            if ov.get("price") in (None, 0, 0.0, ""):
+                try:
+                    ov["price"] = float(ov.get("price_usd") or 0.0)
+                except Exception:
+                    ov["price"] = 0.0
+
+            # liquidity_usd
+            if ov.get("liquidity_usd") in (None, 0, 0.0, ""):
+                liq = ov.get("liq") or (raw.get("liquidity") or {}).get("usd") or (ov.get("liquidity") or {}).get("usd")
+                try:
+                    ov["liquidity_usd"] = float(liq or 0.0)
+                except Exception:
+                    ov["liquidity_usd"] = 0.0
+
+            # marketcap_usd
+            if ov.get("marketcap_usd") in (None, 0, 0.0, ""):
+                mc = ov.get("marketCap") or raw.get("marketCap") or raw.get("fdv") or ov.get("fdv")
+                try:
+                    ov["marketcap_usd"] = float(mc or 0.0)
+                except Exception:
+                    ov["marketcap_usd"] = 0.0
         except Exception:
             pass
 
-        return overviews[: int(self.cfg.new_listing_limit)]
+    async def aclose(self) -> None:
+        s = self._session
+        self._session = None
+        if s is not None and not s.closed:
+            await s.close()
+
+    async def close(self) -> None:
+        await self.aclose()
 
     # alias compat (au cas où)
     async def scan(self) -> List[Dict[str, Any]]:
@@ -175,6 +247,13 @@ class TokenScanner:
         return await self.scan_once_async()
 
     # ---- internals ----
+    def _get_session(self) -> aiohttp.ClientSession:
+        # une seule session (keep-alive) pour toute la vie du scanner
+        if self._session is None or self._session.closed:
+            conn = aiohttp.TCPConnector(limit=max(2, int(self.cfg.max_concurrency) * 2), ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=conn, headers=DEFAULT_HEADERS)
+        return self._session
+
     async def _dex_search(self, session: aiohttp.ClientSession, query: str) -> List[Dict[str, Any]]:
         url = f"{DEX_BASE}/latest/dex/search?q={query}"
         await self._rl.wait()
@@ -204,26 +283,27 @@ class TokenScanner:
         out: List[Dict[str, Any]] = []
         seen = set()
 
-        async with aiohttp.ClientSession() as session:
-            for q in qs:
-                pairs = await self._dex_search(session, str(q))
-                for p in pairs:
-                    if not isinstance(p, dict):
-                        continue
-                    if (p.get("chainId") or "").lower() != self.cfg.chain.lower():
-                        continue
-                    dex = (p.get("dexId") or "").lower()
-                    if dexes and dex not in dexes:
-                        continue
-
-                    pair_addr = p.get("pairAddress") or p.get("pair_address")
-                    if not pair_addr:
-                        continue
-                    key = (p.get("chainId"), dex, pair_addr)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    out.append(p)
+        # fan-out concurrent: _rl + _sem bornent le debit, gather garde l'ordre des queries
+        session = self._get_session()
+        results = await asyncio.gather(*[self._dex_search(session, str(q)) for q in qs])
+        for pairs in results:
+            for p in pairs:
+                if not isinstance(p, dict):
+                    continue
+                if (p.get("chainId") or "").lower() != self.cfg.chain.lower():
+                    continue
+                dex = (p.get("dexId") or "").lower()
+                if dexes and dex not in dexes:
+                    continue
+
+                pair_addr = p.get("pairAddress") or p.get("pair_address")
+                if not pair_addr:
+                    continue
+                key = (p.get("chainId"), dex, pair_addr)
+                if key in seen:
+                    continue
+                seen.add(key)
+                out.append(p)
 
         return out
 
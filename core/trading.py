@@ -93,9 +93,11 @@ import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from config import settings
-import requests
+from core import http_pool
 import builtins
 
+DEX_BASE = os.getenv("DEXSCREENER_BASE_URL", "https://api.dexscreener.com").rstrip("/")
+
 
 
 
@@ -371,8 +373,6 @@ class TradingEngine:
         Supporte JUPITER_API_KEY + base url.
         """
         try:
-            import httpx
-
             base = os.getenv("JUPITER_BASE_URL", getattr(settings, "JUPITER_BASE_URL", "https://api.jup.ag"))
             api_key = os.getenv("JUPITER_API_KEY", getattr(settings, "JUPITER_API_KEY", "")) or ""
             headers = {}
@@ -382,7 +382,7 @@ class TradingEngine:
             # endpoint "price/v3" (ids)
             url = base.rstrip("/") + "/price/v3"
             params = {"ids": mint, "t": str(time.time_ns())}
-            async with httpx.AsyncClient(timeout=10.0, headers=headers) as client:
+            async with http_pool.aclient(timeout=10.0, headers=headers) as client:
                 r = await client.get(url, params=params)
                 r.raise_for_status()
                 js = r.json()
@@ -447,8 +447,8 @@ class TradingEngine:
     async def _fetch_dex_txns_m5(self, mint: str) -> int:
         """Retourne buys+sells sur 5m via DexScreener (0 si inconnu)."""
         try:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{mint}"
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            url = f"{DEX_BASE}/latest/dex/tokens/{mint}"
+            async with http_pool.aclient(timeout=10.0) as client:
                 r = await client.get(url)
                 if r.status_code != 200:
                     return 0
@@ -507,8 +507,8 @@ class TradingEngine:
     def _fetch_price_dexscreener(self, mint: str) -> float:
         """Fallback price via DexScreener. Returns 0.0 if unavailable."""
         try:
-            url = f"https://api.dexscreener.com/latest/dex/tokens/{mint}"
-            r = requests.get(url, timeout=12)
+            url = f"{DEX_BASE}/latest/dex/tokens/{mint}"
+            r = http_pool.request("GET", url, timeout=12, raise_for_status=False)
             if r.status_code != 200:
                 return 0.0
             return 0.0
@@ -753,22 +753,41 @@ class TradingEngine:
         # Trie par score
         overviews = sorted((overviews or []), key=_score_overview, reverse=True)
 
-        did_buy = False
         scored = []  # STRAT_SCORE_V1
+        cands: List[Dict[str, Any]] = []
         for ov in overviews:
-            if did_buy:
-                break
-
             if not _passes_filters(ov):
                 continue
 
             mint: Optional[str] = ov.get("mint") or ov.get("token") or ov.get("address")
             price = ov.get("price_usd") or ov.get("price")
-            dex = (ov.get("dex_id") or ov.get("dexId") or "").lower().strip()
 
             if not mint or price in (None, 0, 0.0):
                 continue
             mint = str(mint)
+            if self._is_open(mint):
+                continue
+            cands.append(ov)
+
+        # risk gate for the whole scan at once (on-chain checks run concurrently)
+        if cands and risk_checker is not None:
+            many = getattr(risk_checker, "allow_buy_many", None)
+            if many is not None:
+                verdicts = await many(cands)
+            else:
+                verdicts = [await risk_checker.allow_buy(ov) for ov in cands]
+            for ov, (ok, why) in zip(cands, verdicts):
+                mint = str(ov.get("mint") or ov.get("token") or ov.get("address"))
+                if not ok:
+                    decision_trace(mint, str(ov.get("symbol") or ""), 'SKIP', f'risk:{why}')
+                    continue
+                v = risk_checker.verdict(mint) if hasattr(risk_checker, "verdict") else None
+                risk = v.inputs if v is not None else {}
+                s_ok, score, s_reason, _dbg = strat_gate_and_score(ov, risk)
+                if not s_ok:
+                    decision_trace(mint, str(ov.get("symbol") or ""), 'SKIP', f'strat:{s_reason}', {'score': score})
+                    continue
+                scored.append((score, ov, risk))
 
         # STRAT_SCORE_V1: pick best candidate
         if not scored:
@@ -776,7 +795,6 @@ class TradingEngine:
         scored.sort(key=lambda x: x[0], reverse=True)
         best_score, best_ov, best_risk = scored[0]
         try:
-            from core.decision_trace import trace as decision_trace
             m = (best_ov.get('mint') or best_ov.get('outputMint') or best_ov.get('baseToken',{}).get('address') or '').strip()
             sym = (best_ov.get('symbol') or best_ov.get('baseToken',{}).get('symbol') or '').strip()
             decision_trace(m, sym, 'PICK', 'best_score', {'score': best_score})
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Sweep SellEngine exit settings over recorded positions + ticks (core.backtest).
+
+  python scripts/backtest.py --since 30d
+  python scripts/backtest.py --since 30d --grid "tp1_pct=0.2:0.6:0.05;hard_sl_pct=0.1:0.4:0.05;trail_tight=0.05,0.1,0.15"
+  python scripts/backtest.py --profile PUMP --mints pump --grid "time_stop_sec=300,600,1200"
+  python scripts/backtest.py --since 7d --time-stop-sells --sort win_rate --top 30 --out state/backtest.json
+
+Base setting = SellEngine env (SELL_TP1_PCT, HARD_SL_PCT, ...) unless --profile picks the
+trader_exec DUAL_PROFILE values. Grid axes override the base.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import backtest
+
+
+def _dur(s: str) -> float:
+    s = s.strip().lower()
+    mult = {"s": 1, "m": 60, "h": 3600, "d": 86400}.get(s[-1:], None)
+    return float(s[:-1]) * mult if mult else float(s)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=backtest.BACKTEST_DB)
+    ap.add_argument("--ticks", default=None, help="tick store dir (default TICK_DIR)")
+    ap.add_argument("--since", default="30d", help="entries newer than this (30d, 12h, seconds)")
+    ap.add_argument("--grid", default="", help="axis=lo:hi:step or axis=v1,v2 ; separated by ';'")
+    ap.add_argument("--profile", choices=["env", "PUMP", "NORMAL"], default="env")
+    ap.add_argument("--mints", choices=["all", "pump", "other"], default="all",
+                    help="pump = mints ending in 'pump' (DUAL_PROFILE split)")
+    ap.add_argument("--step", type=float, default=backtest.BACKTEST_STEP_S, help="sell loop period (s)")
+    ap.add_argument("--horizon", default=str(int(backtest.BACKTEST_HORIZON_S)))
+    ap.add_argument("--sources", default=",".join(backtest.BACKTEST_SOURCES))
+    ap.add_argument("--fee-pct", type=float, default=backtest.BACKTEST_FEE_PCT)
+    ap.add_argument("--time-stop-sells", action="store_true",
+                    help="model TIME_STOP as 'sell all' (the live guard never sells)")
+    ap.add_argument("--sort", default="pnl_sol", choices=["pnl_sol", "ret_mean", "win_rate", "max_dd_sol"])
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--out", help="write the full result (every setting) as JSON")
+    args = ap.parse_args()
+
+    base = backtest.ExitParams.from_env()
+    if args.profile != "env":
+        base = replace(base, **backtest.PROFILES[args.profile])
+    grid = backtest.parse_grid(args.grid, base)
+
+    positions = backtest.load_positions(args.db, since=time.time() - _dur(args.since))
+    if args.mints != "all":
+        pump = args.mints == "pump"
+        positions = [p for p in positions if p.mint.lower().endswith("pump") == pump]
+    t0 = time.perf_counter()
+    paths = backtest.build_paths(positions, args.step, _dur(args.horizon), [s for s in args.sources.split(",") if s],
+                                 tick_dir=args.ticks)
+    t1 = time.perf_counter()
+    res = backtest.replay_grid(paths, grid, args.fee_pct, args.time_stop_sells)
+    t2 = time.perf_counter()
+    rows = backtest.summarize_fast(paths, grid, res)
+    print(f"[backtest] positions={len(positions)} with_ticks={paths.n} settings={len(grid)} "
+          f"load={t1 - t0:.2f}s replay={t2 - t1:.2f}s numpy={backtest.np is not None}", flush=True)
+    if not paths.n:
+        print("[backtest] no position has recorded ticks (TICK_RECORD / --ticks / --since ?)")
+        return 1
+
+    varied = [k for k in backtest.PARAM_NAMES if len({r["params"][k] for r in rows}) > 1]
+    rows_sorted = sorted(rows, key=lambda r: r[args.sort], reverse=args.sort != "max_dd_sol")
+    hdr = " ".join(f"{k:>12}" for k in varied)
+    print(f"{hdr} {'trades':>6} {'pnl_sol':>10} {'ret_mean':>9} {'win':>6} {'max_dd':>9} {'hold_s':>7}  exits")
+    for r in rows_sorted[: args.top]:
+        vals = " ".join(f"{r['params'][k]:>12g}" for k in varied)
+        ex = " ".join(f"{k}={v}" for k, v in r["exits"].items() if v)
+        print(f"{vals} {r['trades']:>6} {r['pnl_sol']:>10.4f} {r['ret_mean']:>9.2%} {r['win_rate']:>6.1%} "
+              f"{r['max_dd_sol']:>9.4f} {r['hold_mean_s']:>7.0f}  {ex}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "db": args.db, "profile": args.profile, "mints": args.mints,
+                       "grid": args.grid, "positions": len(positions), "with_ticks": paths.n, "step_s": args.step,
+                       "fee_pct": args.fee_pct, "time_stop_sells": args.time_stop_sells, "rows": rows}, f, indent=1)
+        print(f"[backtest] wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
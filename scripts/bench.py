@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the buy / sell / scoring hot paths (core.bench), against the local simulator.
+
+  python scripts/bench.py run [--only cpu. sell.] [--quick] [--label x] [--save-baseline]
+  python scripts/bench.py compare <result.json> [--baseline state/bench/baseline.json] [--threshold 0.10]
+  python scripts/bench.py list
+
+compare exits 1 when a benchmark is worse than the baseline by more than the threshold,
+errors, or is in the baseline but no longer produced (core.bench.FAIL_STATUSES).
+"""
+import argparse
+import os
+import shutil
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import bench
+
+
+def _print_compare(rows, warns, threshold):
+    for w in warns:
+        print(f"⚠️ {w}")
+    print(f"{'benchmark':<28} {'base':>14} {'current':>14} {'worse':>8}  status (threshold {threshold:.0%})")
+    for r in rows:
+        fmt = lambda v: f"{v:,.3f}" if isinstance(v, (int, float)) else "-"
+        d = f"{r['delta']:+.1%}" if r["delta"] is not None else "-"
+        print(f"{r['name']:<28} {fmt(r['base']):>14} {fmt(r['cur']):>14} {d:>8}  {r['status']}")
+    return bench.failures(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd")
+    r = sub.add_parser("run")
+    r.add_argument("--only", nargs="*", help="name prefixes/substrings, e.g. cpu. sell.run_once[100]")
+    r.add_argument("--quick", action="store_true", help="3 repeats instead of BENCH_REPEAT, big sell/brain sizes skipped")
+    r.add_argument("--seed", type=int, default=bench.BENCH_SEED)
+    r.add_argument("--sim-latency", default=bench.BENCH_SIM_LATENCY, help="sim latency spec (default 0)")
+    r.add_argument("--label", default="")
+    r.add_argument("--out", help="result path (default state/bench/bench-<ts>-<commit>.json)")
+    r.add_argument("--save-baseline", action="store_true", help="also copy the result to the baseline")
+    r.add_argument("--compare", action="store_true", help="compare against the baseline after the run")
+    r.add_argument("--threshold", type=float, default=bench.BENCH_THRESHOLD)
+    c = sub.add_parser("compare")
+    c.add_argument("result")
+    c.add_argument("--baseline", default=bench.BENCH_BASELINE)
+    c.add_argument("--threshold", type=float, default=bench.BENCH_THRESHOLD)
+    sub.add_parser("list")
+    args = ap.parse_args()
+
+    if args.cmd == "list":
+        for n in bench.names():
+            fn, unit, better = bench._BENCHES[n]
+            print(f"{n:<28} {unit:<5} {better} is better")
+        return 0
+
+    if args.cmd == "compare":
+        rows, warns = bench.compare(bench.load(args.result), bench.load(args.baseline), args.threshold)
+        return 1 if _print_compare(rows, warns, args.threshold) else 0
+
+    if args.cmd == "run":
+        res = bench.run(only=args.only, quick=args.quick, seed=args.seed, sim_latency=args.sim_latency,
+                        label=args.label)
+        path = bench.save(res, args.out)
+        print(f"[bench] saved {path}")
+        if args.save_baseline:
+            os.makedirs(os.path.dirname(os.path.abspath(bench.BENCH_BASELINE)), exist_ok=True)
+            shutil.copyfile(path, bench.BENCH_BASELINE)
+            print(f"[bench] baseline -> {bench.BENCH_BASELINE}")
+        elif args.compare and os.path.exists(bench.BENCH_BASELINE):
+            rows, warns = bench.compare(res, bench.load(bench.BENCH_BASELINE), args.threshold)
+            return 1 if _print_compare(rows, warns, args.threshold) else 0
+        return 0
+
+    ap.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
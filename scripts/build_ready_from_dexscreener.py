@@ -1,13 +1,15 @@
-import json, time
+import json, os, time
 import requests
 
 OUT_STATE = "state/ready_pump_early.jsonl"
 OUT_ROOT  = "ready_to_trade.jsonl"
 
+DEX_BASE = os.getenv("DEXSCREENER_BASE_URL", "https://api.dexscreener.com").rstrip("/")
+
 URLS = [
-    ("token-boosts/top",    "https://api.dexscreener.com/token-boosts/top/v1"),
-    ("token-boosts/latest", "https://api.dexscreener.com/token-boosts/latest/v1"),
-    ("token-profiles",      "https://api.dexscreener.com/token-profiles/latest/v1"),
+    ("token-boosts/top",    DEX_BASE + "/token-boosts/top/v1"),
+    ("token-boosts/latest", DEX_BASE + "/token-boosts/latest/v1"),
+    ("token-profiles",      DEX_BASE + "/token-profiles/latest/v1"),
 ]
 
 def fetch(url):
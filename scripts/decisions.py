@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Query the decision sink (core.decision_trace): why was a mint picked/skipped/sold.
+
+  python scripts/decisions.py --mint <MINT> --since 3600
+  python scripts/decisions.py --etype buy_skip --limit 50
+  python scripts/decisions.py --action SKIP --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import decision_trace
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mint")
+    ap.add_argument("--etype", help="pick, buy_skip, decision, price, sell, sell_skip, loop_item, positions")
+    ap.add_argument("--action", help="PICK, SKIP, REPICK, SELL, HOLD ...")
+    ap.add_argument("--since", type=float, default=86400.0, help="seconds back (default 24h)")
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    rows = decision_trace.query(mint=args.mint, etype=args.etype, action=args.action,
+                                since_s=args.since, limit=args.limit)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    print(f"sink={decision_trace.DECISION_SINK} rows={len(rows)}")
+    for r in reversed(rows):
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(r.get("ts") or 0)))
+        feats = " ".join(f"{k}={v}" for k, v in (r.get("f") or {}).items())
+        rep = f" +{int(r['repeat'])} folded" if r.get("repeat") else ""
+        print(f"{ts} {r.get('etype'):<10} {r.get('action') or '-':<6} {r.get('mint') or '-'} "
+              f"reason={r.get('reason') or '-'} {feats}{rep}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
-import os, json, time, random
+import os, json, time, random, sqlite3, threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from itertools import islice
 import requests
 
 READY_IN   = Path(os.getenv("READY_IN", "ready_to_trade.jsonl"))
 OUT        = Path(os.getenv("READY_OUT", "ready_to_trade_enriched.jsonl"))
 LIMIT      = int(os.getenv("READY_LIMIT", "200"))
-SLEEP      = float(os.getenv("READY_SLEEP", "0.12"))
+SLEEP      = float(os.getenv("READY_SLEEP", "0.12"))   # min interval between DS requests (shared)
 TIMEOUT    = float(os.getenv("DS_TIMEOUT", "8"))
 RETRIES    = int(os.getenv("DS_RETRIES", "2"))
 
+# tokens endpoint accepts up to 30 comma-separated addresses
+DS_BATCH   = max(1, min(30, int(os.getenv("DS_BATCH", "30"))))
+DS_CONC    = max(1, int(os.getenv("DS_CONC", "4")))
+DS_CACHE   = os.getenv("DS_CACHE_PATH", "state/ds_pair_cache.sqlite")
+DS_CACHE_TTL_S = float(os.getenv("DS_CACHE_TTL_S", "60"))
+
+DS_TOKENS_URL = os.getenv("DEXSCREENER_BASE_URL", "https://api.dexscreener.com").rstrip("/") + "/latest/dex/tokens/"
+
 def safe_float(x, d=0.0):
     try:
         return float(x)
@@ -31,21 +41,111 @@ def pick_best_pair(pairs):
 
 sess = requests.Session()
 sess.headers.update({"accept":"application/json", "user-agent":"lino-enricher/1.0"})
+sess.mount("https://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=DS_CONC))
 
-def fetch_ds(mint: str):
-    url = f"https://api.dexscreener.com/latest/dex/tokens/{mint}"
+
+class _Limiter:
+    """Min interval between requests, shared by all worker threads."""
+    def __init__(self, interval_s: float):
+        self.interval_s = max(0.0, float(interval_s))
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next)
+            self._next = t + self.interval_s
+        if t > now:
+            time.sleep(t - now)
+
+_limiter = _Limiter(SLEEP)
+
+
+class PairCache:
+    """mint -> best DexScreener pair (json), short TTL. sqlite so successive runs share it."""
+    def __init__(self, path: str, ttl_s: float):
+        self.ttl_s = float(ttl_s)
+        self._lock = threading.Lock()
+        self._con = None
+        if not path or self.ttl_s <= 0:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._con = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL;")
+        self._con.execute("PRAGMA synchronous=NORMAL;")
+        self._con.execute("CREATE TABLE IF NOT EXISTS ds_pair_cache (mint TEXT PRIMARY KEY, ts REAL NOT NULL, pair_json TEXT)")
+        self._con.commit()
+
+    def get_many(self, mints):
+        if self._con is None or not mints:
+            return {}
+        cutoff = time.time() - self.ttl_s
+        out = {}
+        with self._lock:
+            for i in range(0, len(mints), 500):
+                chunk = mints[i:i + 500]
+                q = "SELECT mint, pair_json FROM ds_pair_cache WHERE ts>=? AND mint IN (" + ",".join("?" * len(chunk)) + ")"
+                for mint, pj in self._con.execute(q, [cutoff, *chunk]):
+                    out[mint] = json.loads(pj) if pj else None
+        return out
+
+    def put_many(self, items):
+        if self._con is None or not items:
+            return
+        now = time.time()
+        rows = [(m, now, (json.dumps(p, separators=(",", ":")) if p else None)) for m, p in items.items()]
+        with self._lock:
+            self._con.executemany("INSERT OR REPLACE INTO ds_pair_cache(mint, ts, pair_json) VALUES(?,?,?)", rows)
+            self._con.commit()
+
+    def close(self):
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+
+def fetch_ds_many(mints):
+    """
+    One DexScreener request for up to DS_BATCH mints.
+    Returns ({mint: best_pair|None}, error|None). Pairs are attributed to the
+    requested mint whether it is the base or the quote token.
+    """
+    url = DS_TOKENS_URL + ",".join(mints)
     last_err = None
+    data = None
     for k in range(RETRIES + 1):
+        _limiter.wait()
         try:
             r = sess.get(url, timeout=TIMEOUT)
-            if r.status_code != 200:
-                last_err = f"http={r.status_code} body={r.text[:200]}"
-            else:
-                return r.json() or {}
+            if r.status_code == 200:
+                data = r.json() or {}
+                break
+            last_err = f"http={r.status_code} body={r.text[:200]}"
         except Exception as e:
             last_err = str(e)
         time.sleep(0.25 + 0.25*k + random.random()*0.1)
-    return {"_error": last_err}
+    if data is None:
+        return {}, last_err
+
+    wanted = set(mints)
+    by_mint = {m: [] for m in mints}
+    for p in data.get("pairs") or []:
+        if not isinstance(p, dict):
+            continue
+        for side in ("baseToken", "quoteToken"):
+            a = ((p.get(side) or {}).get("address") or "").strip()
+            if a in wanted:
+                by_mint[a].append(p)
+    return {m: pick_best_pair(ps) for m, ps in by_mint.items()}, None
+
+# compat: single mint lookup
+def fetch_ds(mint: str):
+    res, err = fetch_ds_many([mint])
+    if err:
+        return {"_error": err}
+    best = res.get(mint)
+    return {"pairs": [best] if best else []}
 
 def iter_ready(path: Path, limit: int):
     n = 0
@@ -68,66 +168,110 @@ def iter_ready(path: Path, limit: int):
             yield o
             n += 1
 
+def build_feat(o, best, err=None):
+    return {
+        "ts": int(o.get("ts") or time.time()),
+        "mint": (o.get("mint") or o.get("outputMint") or "").strip(),
+        "symbol": (o.get("symbol") or (best or {}).get("baseToken",{}).get("symbol") or "").strip(),
+        "creator": o.get("creator"),
+        "pump_sig": o.get("pump_sig"),
+        "mint_sig": o.get("mint_sig"),
+        "fetched_at": int(time.time()),
+        "ds_ok": bool(best),
+        "ds_error": err,
+        "dex_id": ((best or {}).get("dexId") or "").lower(),
+        "chain_id": (best or {}).get("chainId"),
+        "pair_address": (best or {}).get("pairAddress"),
+        "price_usd": safe_float((best or {}).get("priceUsd"), 0.0),
+        "liquidity_usd": safe_float(((best or {}).get("liquidity") or {}).get("usd"), 0.0),
+        "fdv": safe_float((best or {}).get("fdv"), 0.0),
+        "market_cap": safe_float((best or {}).get("marketCap"), 0.0),
+        "vol_5m": safe_float(((best or {}).get("volume") or {}).get("m5"), 0.0),
+        "vol_1h": safe_float(((best or {}).get("volume") or {}).get("h1"), 0.0),
+        "vol_24h": safe_float(((best or {}).get("volume") or {}).get("h24"), 0.0),
+        "chg_5m": safe_float((((best or {}).get("priceChange") or {}).get("m5")), 0.0),
+        "chg_1h": safe_float((((best or {}).get("priceChange") or {}).get("h1")), 0.0),
+        "chg_24h": safe_float((((best or {}).get("priceChange") or {}).get("h24")), 0.0),
+        "txns_5m": int(
+            safe_float(((((best or {}).get("txns") or {}).get("m5") or {}).get("buys")), 0.0) +
+            safe_float(((((best or {}).get("txns") or {}).get("m5") or {}).get("sells")), 0.0)
+        ),
+        "txns_1h": int(
+            safe_float(((((best or {}).get("txns") or {}).get("h1") or {}).get("buys")), 0.0) +
+            safe_float(((((best or {}).get("txns") or {}).get("h1") or {}).get("sells")), 0.0)
+        ),
+    }
+
+def enrich_iter(rows, cache=None, pool=None, stats=None):
+    """
+    Stream enrichment: pulls DS_BATCH*DS_CONC rows at a time from `rows`,
+    serves cached mints, fetches the rest as concurrent multi-token requests,
+    yields features in input order.
+    """
+    stats = stats if stats is not None else {}
+    for k in ("rows", "cache_hits", "requests"):
+        stats.setdefault(k, 0)
+    own_pool = pool is None
+    pool = pool or ThreadPoolExecutor(max_workers=DS_CONC)
+    rows = iter(rows)
+    try:
+        while True:
+            window = list(islice(rows, DS_BATCH * DS_CONC))
+            if not window:
+                break
+            mints = list(dict.fromkeys((o.get("mint") or o.get("outputMint") or "").strip() for o in window))
+            pairs = cache.get_many(mints) if cache is not None else {}
+            stats["cache_hits"] += len(pairs)
+            missing = [m for m in mints if m not in pairs]
+
+            errs = {}
+            groups = [missing[i:i + DS_BATCH] for i in range(0, len(missing), DS_BATCH)]
+            stats["requests"] += len(groups)
+            fresh = {}
+            for grp, (res, err) in zip(groups, pool.map(fetch_ds_many, groups)):
+                if err:
+                    for m in grp:
+                        errs[m] = err
+                    continue
+                fresh.update(res)
+            if cache is not None:
+                cache.put_many(fresh)
+            pairs.update(fresh)
+
+            for o in window:
+                mint = (o.get("mint") or o.get("outputMint") or "").strip()
+                stats["rows"] += 1
+                yield build_feat(o, pairs.get(mint), errs.get(mint))
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True)
+
 def main():
     if not READY_IN.exists():
         raise SystemExit(f"missing {READY_IN}")
 
-    OUT.write_text("", encoding="utf-8")
-
     total = 0
     ok = 0
+    stats = {}
+    cache = PairCache(DS_CACHE, DS_CACHE_TTL_S)
+    t0 = time.time()
+
+    # stream to tmp then rename: readers never see a half-written OUT
+    tmp = OUT.with_name(OUT.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as w:
+            for feat in enrich_iter(iter_ready(READY_IN, LIMIT), cache=cache, stats=stats):
+                total += 1
+                if feat["ds_ok"]:
+                    ok += 1
+                w.write(json.dumps(feat, ensure_ascii=False) + "\n")
+        os.replace(tmp, OUT)
+    finally:
+        cache.close()
 
-    for o in iter_ready(READY_IN, LIMIT):
-        total += 1
-        mint = (o.get("mint") or o.get("outputMint") or "").strip()
-
-        ds = fetch_ds(mint)
-        pairs = (ds or {}).get("pairs") or []
-        best = pick_best_pair(pairs)
-
-        feat = {
-            "ts": int(o.get("ts") or time.time()),
-            "mint": mint,
-            "symbol": (o.get("symbol") or (best or {}).get("baseToken",{}).get("symbol") or "").strip(),
-            "creator": o.get("creator"),
-            "pump_sig": o.get("pump_sig"),
-            "mint_sig": o.get("mint_sig"),
-            "fetched_at": int(time.time()),
-            "ds_ok": bool(best),
-            "ds_error": (ds or {}).get("_error"),
-            "dex_id": ((best or {}).get("dexId") or "").lower(),
-            "chain_id": (best or {}).get("chainId"),
-            "pair_address": (best or {}).get("pairAddress"),
-            "price_usd": safe_float((best or {}).get("priceUsd"), 0.0),
-            "liquidity_usd": safe_float(((best or {}).get("liquidity") or {}).get("usd"), 0.0),
-            "fdv": safe_float((best or {}).get("fdv"), 0.0),
-            "market_cap": safe_float((best or {}).get("marketCap"), 0.0),
-            "vol_5m": safe_float(((best or {}).get("volume") or {}).get("m5"), 0.0),
-            "vol_1h": safe_float(((best or {}).get("volume") or {}).get("h1"), 0.0),
-            "vol_24h": safe_float(((best or {}).get("volume") or {}).get("h24"), 0.0),
-            "chg_5m": safe_float((((best or {}).get("priceChange") or {}).get("m5")), 0.0),
-            "chg_1h": safe_float((((best or {}).get("priceChange") or {}).get("h1")), 0.0),
-            "chg_24h": safe_float((((best or {}).get("priceChange") or {}).get("h24")), 0.0),
-            "txns_5m": int(
-                safe_float(((((best or {}).get("txns") or {}).get("m5") or {}).get("buys")), 0.0) +
-                safe_float(((((best or {}).get("txns") or {}).get("m5") or {}).get("sells")), 0.0)
-            ),
-            "txns_1h": int(
-                safe_float(((((best or {}).get("txns") or {}).get("h1") or {}).get("buys")), 0.0) +
-                safe_float(((((best or {}).get("txns") or {}).get("h1") or {}).get("sells")), 0.0)
-            ),
-        }
-
-        if feat["ds_ok"]:
-            ok += 1
-
-        with OUT.open("a", encoding="utf-8") as w:
-            w.write(json.dumps(feat, ensure_ascii=False) + "\n")
-
-        if SLEEP > 0:
-            time.sleep(SLEEP)
-
-    print("READY_IN=", str(READY_IN), "limit=", LIMIT, "total=", total, "ds_ok=", ok)
+    print("READY_IN=", str(READY_IN), "limit=", LIMIT, "total=", total, "ds_ok=", ok,
+          "requests=", stats.get("requests", 0), "cache_hits=", stats.get("cache_hits", 0),
+          "dt=", round(time.time() - t0, 2))
     print("OUT=", str(OUT), "bytes=", (OUT.stat().st_size if OUT.exists() else 0))
 
 if __name__ == "__main__":
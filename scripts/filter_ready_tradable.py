@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
-import argparse, json, os, time
-import urllib.request, urllib.error
+import argparse, json, os, sys, time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import http_pool, tick_store
 
 SOL = "So11111111111111111111111111111111111111112"
 
@@ -58,11 +62,39 @@ def _jup_quote(base_url: str, out_mint: str, amount: int, slip_bps: int):
         + f"&amount={int(amount)}"
         + f"&slippageBps={int(slip_bps)}"
     )
-    req = urllib.request.Request(url, headers={"accept":"application/json"})
-    with urllib.request.urlopen(req, timeout=20) as r:
-        return json.loads(r.read().decode("utf-8", "replace"))
+    # pooled keep-alive connection (core.http_pool); 429 handled by _probe
+    return http_pool.get_json(url, headers={"accept":"application/json"}, timeout=20, retries=1)
 
-def main():
+def _probe(args, m: str):
+    """Jupiter quote probe for one mint -> (ok, bad, soft429)."""
+    bad=0
+    soft429=0
+    ok=False
+    for k in range(args.retries):
+        try:
+            q = _jup_quote(args.jup, m, args.amount, args.slip_bps)
+            tick_store.record_quote(m, q or {}, "probe")
+            ok=True
+            break
+        except http_pool.HttpError as e:
+            code=e.status
+            if code == 429:
+                soft429 += 1
+                if args.on429_keep == 1:
+                    ok=True
+                    break
+                time.sleep(0.8 + 0.4*k)
+                continue
+            bad += 1
+            ok=False
+            break
+        except Exception:
+            bad += 1
+            ok=False
+            break
+    return ok, bad, soft429
+
+def _build_parser():
     p=argparse.ArgumentParser()
     p.add_argument("--in", dest="inp", required=True)
     p.add_argument("--out", dest="out", required=True)
@@ -75,7 +107,10 @@ def main():
     p.add_argument("--min-score", type=float, default=float(os.getenv("BRAIN_SCORE_MIN","0.03")))
     p.add_argument("--top-n", type=int, default=int(os.getenv("BRAIN_TOPN","60")))
     p.add_argument("--max-neg-pnl-pct", type=float, default=float(os.getenv("FILTER_TRADABLE_MAX_NEG_PNL_PCT","5")))
-    args=p.parse_args()
+    return p
+
+def main():
+    args=_build_parser().parse_args()
 
     rows=_read_jsonl(args.inp)
     print(f"[filter_ready_tradable] rows_in={len(rows)} file={args.inp}", flush=True)
@@ -127,28 +162,9 @@ def main():
         if dt < args.min_interval_sec:
             time.sleep(args.min_interval_sec - dt)
 
-        ok=False
-        for k in range(args.retries):
-            try:
-                _ = _jup_quote(args.jup, m, args.amount, args.slip_bps)
-                ok=True
-                break
-            except urllib.error.HTTPError as e:
-                code=getattr(e,"code",None)
-                if code == 429:
-                    soft429 += 1
-                    if args.on429_keep == 1:
-                        ok=True
-                        break
-                    time.sleep(0.8 + 0.4*k)
-                    continue
-                bad += 1
-                ok=False
-                break
-            except Exception:
-                bad += 1
-                ok=False
-                break
+        ok, b, s429 = _probe(args, m)
+        bad += b
+        soft429 += s429
 
         last_t=time.time()
         if ok:
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Re-trade recorded candidate flow + prices (core.tick_store) under other settings (core.paper_sim).
+
+  python scripts/paper_sim.py --since 24h
+  python scripts/paper_sim.py --since 24h --set "tp1_pct=0.4,hard_sl_pct=0.3" --set "min_liq_usd=30000"
+  python scripts/paper_sim.py --day 20260301 --latency-scale 2 --set "" --set "max_open=10"
+  python scripts/paper_sim.py --since 6h --fixed-latency 0 --rate-429 0 --rate-land-fail 0   # frictionless-ish
+
+Each --set is one run: comma separated SimConfig / ExitParams fields over the base
+(SellEngine env exit settings, PAPER_SIM_* knobs). No --set = one run on the base.
+Latency comes from the latency_trace histograms (LATENCY_DIR) with fallbacks for
+spans never measured; --fixed-latency replaces all of it.
+"""
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+from dataclasses import replace
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import backtest, paper_sim, sim_executor
+
+
+def _dur(s: str) -> float:
+    s = s.strip().lower()
+    mult = {"s": 1, "m": 60, "h": 3600, "d": 86400}.get(s[-1:], None)
+    return float(s[:-1]) * mult if mult else float(s)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ticks", default=None, help="tick store dir (default TICK_DIR)")
+    ap.add_argument("--since", default="24h", help="window start, back from now (24h, 90m, seconds)")
+    ap.add_argument("--until", default="0", help="window end, back from now")
+    ap.add_argument("--day", help="one UTC day YYYYMMDD instead of --since/--until")
+    ap.add_argument("--set", action="append", default=None, metavar="k=v,k=v",
+                    help="one run per --set (SimConfig / ExitParams fields)")
+    ap.add_argument("--profile", choices=["env", "PUMP", "NORMAL"], default="env", help="base exit setting")
+    ap.add_argument("--seed", type=int, default=sim_executor.PAPER_SIM_SEED)
+    ap.add_argument("--latency-window", default=str(int(sim_executor.PAPER_SIM_LATENCY_WINDOW_S)))
+    ap.add_argument("--latency-scale", type=float, default=1.0)
+    ap.add_argument("--fixed-latency", type=float, default=None, help="ms per span instead of the histograms")
+    ap.add_argument("--rate-429", type=float, default=None)
+    ap.add_argument("--rate-no-route", type=float, default=None)
+    ap.add_argument("--rate-land-fail", type=float, default=None)
+    ap.add_argument("--sort", default="pnl_sol", choices=["pnl_sol", "ret_mean", "win_rate", "max_dd_sol", "trades"])
+    ap.add_argument("--out", help="write every run's report as JSON")
+    args = ap.parse_args()
+
+    if args.day:
+        t0 = float(calendar.timegm(time.strptime(args.day, "%Y%m%d")))
+        t1 = t0 + 86400.0
+    else:
+        now = time.time()
+        t0, t1 = now - _dur(args.since), now - _dur(args.until)
+
+    exit_base = backtest.ExitParams.from_env()
+    if args.profile != "env":
+        exit_base = replace(exit_base, **backtest.PROFILES[args.profile])
+    base = paper_sim.SimConfig(exit=exit_base, latency_scale=args.latency_scale, rate_429=args.rate_429,
+                               rate_no_route=args.rate_no_route, rate_land_fail=args.rate_land_fail)
+    configs = [paper_sim.parse_overrides(s, base) for s in (args.set or [""])]
+
+    w0 = time.perf_counter()
+    market = paper_sim.Market(t0, t1, tick_dir=args.ticks)
+    load_s = time.perf_counter() - w0
+    if args.fixed_latency is not None:
+        lat = sim_executor.LatencyModel.fixed(args.fixed_latency)
+    else:
+        lat = sim_executor.LatencyModel.measured(_dur(args.latency_window))
+    print(f"[paper_sim] window={(t1 - t0) / 3600:.1f}h mints={len(market.series)} ticks={market.ticks} "
+          f"candidates={len(market.flow)} load={load_s:.2f}s runs={len(configs)}", flush=True)
+    if not market.flow:
+        print("[paper_sim] no candidate ticks in the window (TICK_RECORD / --ticks / --since ?)")
+        return 1
+    measured = {k: v for k, v in lat.sources().items() if v.startswith("measured")}
+    print(f"[paper_sim] latency: {len(measured)} measured span(s), fallback for the rest", flush=True)
+
+    rows = paper_sim.run_many(market, configs, lat, seed=args.seed)
+    rows_sorted = sorted(rows, key=lambda r: r[args.sort], reverse=args.sort != "max_dd_sol")
+    print(f"{'run':<36} {'trades':>6} {'pnl_sol':>10} {'ret_mean':>9} {'win':>6} {'max_dd':>9} {'fees':>8} "
+          f"{'friction':>9} {'fail%':>6} {'x rt':>8}  exits")
+    for r in rows_sorted:
+        ex = " ".join(f"{k}={v}" for k, v in sorted(r["exits"].items()))
+        print(f"{(r['name'] or 'base')[:36]:<36} {r['trades']:>6} {r['pnl_sol']:>10.4f} {r['ret_mean']:>9.2%} "
+              f"{r['win_rate']:>6.1%} {r['max_dd_sol']:>9.4f} {r['fees_sol']:>8.4f} {r['friction_sol']:>9.4f} "
+              f"{r['fail_rate']:>6.1%} {r['speedup']:>8.0f}  {ex}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "t0": t0, "t1": t1, "seed": args.seed, "latency": lat.sources(),
+                       "runs": rows}, f, indent=1, default=str)
+        print(f"[paper_sim] wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
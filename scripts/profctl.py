@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Talk to a running process' profiler control socket (core.profiler).
+
+  python scripts/profctl.py run_live start 199
+  python scripts/profctl.py run_live stop
+  python scripts/profctl.py brain_loop mem 30
+  python scripts/profctl.py pumpfun_poller4 tasks
+  python scripts/profctl.py --list
+
+<target> is a process name (newest socket wins) or a socket path.
+"""
+import glob
+import os
+import socket
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core.profiler import PROFILER_DIR
+
+
+def _alive(path: str) -> bool:
+    try:
+        pid = int(os.path.basename(path).rsplit("-", 1)[1].split(".")[0])
+        os.kill(pid, 0)
+        return True
+    except Exception:
+        return False
+
+
+def _sockets(name: str = "*"):
+    socks = [p for p in glob.glob(os.path.join(PROFILER_DIR, f"{name}-*.sock")) if _alive(p)]
+    return sorted(socks, key=os.path.getmtime, reverse=True)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] == "--list":
+        for p in _sockets():
+            print(p)
+        return 0
+    target, cmd = sys.argv[1], " ".join(sys.argv[2:]) or "status"
+    path = target if target.endswith(".sock") else (_sockets(target) or [None])[0]
+    if not path:
+        print(f"no live profiler socket for {target} in {PROFILER_DIR}")
+        return 1
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.settimeout(60)
+    s.connect(path)
+    s.sendall((cmd + "\n").encode("utf-8"))
+    out = b""
+    while True:
+        chunk = s.recv(65536)
+        if not chunk:
+            break
+        out += chunk
+    s.close()
+    sys.stdout.write(out.decode("utf-8", "replace"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Reconcile open positions against the wallet in one pass.
+
+  python scripts/reconcile_positions.py            # dry-run report
+  python scripts/reconcile_positions.py --apply    # close zero-balance rows + sync qty drift
+
+Env: DB_PATH (state/trades.sqlite), RPC_URL/RPC_HTTP/SOLANA_RPC,
+     WALLET_PUBKEY/WALLET/TRADER_USER_PUBLIC_KEY (or KEYPAIR_PATH).
+"""
+import argparse
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core.reconcile import ONCHAIN_ZERO, QTY_DRIFT, reconcile
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=os.getenv("DB_PATH", os.getenv("TRADES_DB", "state/trades.sqlite")))
+    ap.add_argument("--apply", action="store_true", help="write fixes (default: dry-run report)")
+    ap.add_argument("--no-close", action="store_true", help="do not close ONCHAIN_ZERO rows")
+    ap.add_argument("--no-sync", action="store_true", help="do not sync QTY_DRIFT rows")
+    args = ap.parse_args()
+
+    kinds = []
+    if not args.no_close:
+        kinds.append(ONCHAIN_ZERO)
+    if not args.no_sync:
+        kinds.append(QTY_DRIFT)
+    reconcile(args.db, kinds=kinds, dry_run=not args.apply)
+
+
+if __name__ == "__main__":
+    main()
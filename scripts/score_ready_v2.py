@@ -99,6 +99,63 @@ def score(m: Dict[str, Any]) -> float:
     # normalize to 0..1.5 roughly
     return max(0.0, s)
 
+def load_gates() -> Dict[str, Any]:
+    # gates via env ONLY
+    return {
+        "score_min": float(os.getenv("SCORE_MIN", "0.0")),
+        "min_liq": float(os.getenv("SCORE_MIN_LIQ", "0")),
+        "min_vol24": float(os.getenv("SCORE_MIN_VOL24", "0")),
+        "min_tx1h": float(os.getenv("SCORE_MIN_TX1H", "0")),
+        "min_chg1h": float(os.getenv("SCORE_MIN_CHG1H", "-999")),
+        "max_fdv": float(os.getenv("SCORE_MAX_FDV", "1e18")),
+        "max_mcap": float(os.getenv("SCORE_MAX_MCAP", "1e18")),
+        "require_dex": os.getenv("SCORE_REQUIRE_DEX", "0") == "1",
+        "force_any": os.getenv("SCORE_FORCE_ANY", "0") == "1",
+    }
+
+def score_row(j: Dict[str, Any], g: Dict[str, Any]):
+    """Score one enriched row; returns the output row or None if gated out."""
+    m = get_metrics(j)
+    mint = m["mint"]
+    if not mint:
+        return None
+
+    if g["require_dex"] and not m.get("dex"):
+        return None
+
+    # gates (missing metrics == 0)
+    if m["liq"] < g["min_liq"]:
+        return None
+    if m["vol24"] < g["min_vol24"]:
+        return None
+    if m["tx1h"] < g["min_tx1h"]:
+        return None
+    if m["chg1h"] < g["min_chg1h"]:
+        return None
+    if m["fdv"] > g["max_fdv"]:
+        return None
+    if m["mcap"] > g["max_mcap"]:
+        return None
+
+    sc = score(m)
+
+    if sc < g["score_min"] and not g["force_any"]:
+        return None
+
+    out = dict(j)
+    out["mint"] = mint
+    if m["symbol"]:
+        out["symbol"] = m["symbol"]
+    out["score_used"] = float(sc)
+    out["liq"] = float(m["liq"])
+    out["vol24"] = float(m["vol24"])
+    out["tx1h"] = float(m["tx1h"])
+    out["chg1h"] = float(m["chg1h"])
+    out["fdv"] = float(m["fdv"])
+    out["mcap"] = float(m["mcap"])
+    out["dexes"] = m.get("dex")
+    return out
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="inp", default="ready_to_trade_enriched.jsonl")
@@ -106,16 +163,7 @@ def main():
     ap.add_argument("--limit", type=int, default=2000000)
     args = ap.parse_args()
 
-    # gates via env ONLY
-    score_min      = float(os.getenv("SCORE_MIN", "0.0"))
-    min_liq        = float(os.getenv("SCORE_MIN_LIQ", "0"))
-    min_vol24      = float(os.getenv("SCORE_MIN_VOL24", "0"))
-    min_tx1h       = float(os.getenv("SCORE_MIN_TX1H", "0"))
-    min_chg1h      = float(os.getenv("SCORE_MIN_CHG1H", "-999"))
-    max_fdv        = float(os.getenv("SCORE_MAX_FDV", "1e18"))
-    max_mcap       = float(os.getenv("SCORE_MAX_MCAP", "1e18"))
-    require_dex    = os.getenv("SCORE_REQUIRE_DEX", "0") == "1"
-    force_any      = os.getenv("SCORE_FORCE_ANY", "0") == "1"
+    gates = load_gates()
 
     kept = 0
     total = 0
@@ -138,45 +186,9 @@ def main():
                 bad += 1
                 continue
 
-            m = get_metrics(j)
-            mint = m["mint"]
-            if not mint:
-                continue
-
-            if require_dex and not m.get("dex"):
-                continue
-
-            # gates (missing metrics == 0)
-            if m["liq"] < min_liq:
+            out = score_row(j, gates)
+            if out is None:
                 continue
-            if m["vol24"] < min_vol24:
-                continue
-            if m["tx1h"] < min_tx1h:
-                continue
-            if m["chg1h"] < min_chg1h:
-                continue
-            if m["fdv"] > max_fdv:
-                continue
-            if m["mcap"] > max_mcap:
-                continue
-
-            sc = score(m)
-
-            if sc < score_min and not force_any:
-                continue
-
-            out = dict(j)
-            out["mint"] = mint
-            if m["symbol"]:
-                out["symbol"] = m["symbol"]
-            out["score_used"] = float(sc)
-            out["liq"] = float(m["liq"])
-            out["vol24"] = float(m["vol24"])
-            out["tx1h"] = float(m["tx1h"])
-            out["chg1h"] = float(m["chg1h"])
-            out["fdv"] = float(m["fdv"])
-            out["mcap"] = float(m["mcap"])
-            out["dexes"] = m.get("dex")
 
             g.write(json.dumps(out, ensure_ascii=False) + "\n")
             kept += 1
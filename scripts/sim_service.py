@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Run the local Jupiter / RPC / DexScreener simulator (core.sim_service).
+
+  python scripts/sim_service.py --port 8899 --seed 7
+  python scripts/sim_service.py --latency "lognormal:80,0.6" --p429 0.05 --route-fail 0.1
+  python scripts/sim_service.py --print-env     # exports to point the bot at it
+
+Then e.g.:  eval "$(python scripts/sim_service.py --print-env)"; python src/run_live.py
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import sim_service
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=sim_service.SIM_HOST)
+    ap.add_argument("--port", type=int, default=sim_service.SIM_PORT)
+    ap.add_argument("--seed", type=int, default=sim_service.SIM_SEED)
+    ap.add_argument("--tokens", type=int, default=sim_service.SIM_TOKENS)
+    ap.add_argument("--latency", help="default latency spec, e.g. lognormal:40,0.5 | fixed:10 | 0")
+    ap.add_argument("--confirm", help="confirm delay spec (same syntax)")
+    ap.add_argument("--p429", type=float, help="HTTP 429 probability (all services)")
+    ap.add_argument("--no-route", type=float, help="quote COULD_NOT_FIND_ANY_ROUTE probability")
+    ap.add_argument("--route-fail", type=float, help="sendTransaction 0x1788 probability")
+    ap.add_argument("--launch-every", type=float, help="mean seconds between pump.fun launches (0 = off)")
+    ap.add_argument("--print-env", action="store_true", help="print export lines and exit")
+    args = ap.parse_args()
+
+    if args.print_env:
+        url = f"http://{args.host}:{args.port}"
+        for k in ("JUP_BASE_URL", "JUPITER_BASE_URL", "RPC_HTTP", "SOLANA_RPC_HTTP", "SOLANA_RPC", "RPC_URL",
+                  "DEXSCREENER_BASE_URL"):
+            print(f"export {k}={url}")
+        return 0
+
+    sim = sim_service.Sim(seed=args.seed, n_tokens=args.tokens, latency_ms=args.latency, confirm_ms=args.confirm,
+                          rate_429=args.p429, no_route_rate=args.no_route, route_fail_rate=args.route_fail,
+                          launch_every_s=args.launch_every)
+    srv = sim_service.serve(args.host, args.port, sim=sim)
+    try:
+        while True:
+            time.sleep(max(1.0, sim_service.SIM_LOG_EVERY_S))
+            st = srv.sim.stats()
+            routes = " ".join(f"{k}={v['n']}/{v['429']}/{v['fail']}" for k, v in sorted(st["routes"].items())
+                              if not k.startswith("rpc."))
+            print(f"[sim] up={st['uptime_s']}s tokens={st['tokens']} launches={st['launches']} "
+                  f"wallets={st['wallets']} sigs={st['sigs']} n/429/fail: {routes}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    srv.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
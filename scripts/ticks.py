@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Inspect the tick store (core.tick_store).
+
+  python scripts/ticks.py summary
+  python scripts/ticks.py scan --mint <MINT> --since 3600 [--source sell scanner] [--limit 50]
+  python scripts/ticks.py last <MINT>
+  python scripts/ticks.py prune --keep-days 30
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import tick_store
+
+
+def _fmt(v):
+    if isinstance(v, float):
+        return "-" if math.isnan(v) else f"{v:.6g}"
+    return str(v)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default=tick_store.TICK_DIR)
+    sub = ap.add_subparsers(dest="cmd")
+    sub.add_parser("summary")
+    s = sub.add_parser("scan")
+    s.add_argument("--mint")
+    s.add_argument("--since", type=float, default=3600.0, help="seconds back (default 1h)")
+    s.add_argument("--source", nargs="*", help=" ".join(tick_store.SOURCES))
+    s.add_argument("--limit", type=int, default=100, help="last N ticks (0 = all)")
+    s.add_argument("--json", action="store_true")
+    l = sub.add_parser("last")
+    l.add_argument("mint")
+    l.add_argument("--source")
+    p = sub.add_parser("prune")
+    p.add_argument("--keep-days", type=float, default=tick_store.TICK_KEEP_DAYS)
+    args = ap.parse_args()
+
+    if args.cmd == "summary":
+        rows = tick_store.summary(args.dir)
+        for r in rows:
+            print(f"{r['day']} ticks={r['ticks']:>9} mints={r['mints']:>6} size={r['bytes'] / 1024 / 1024:.1f}MB")
+        print(f"days={len(rows)} ticks={sum(r['ticks'] for r in rows)} dir={args.dir}")
+    elif args.cmd == "scan":
+        rows = list(tick_store.iter_ticks(args.mint, time.time() - args.since, None, args.source, base=args.dir))
+        rows.sort(key=lambda r: r["ts"])
+        if args.limit:
+            rows = rows[-args.limit:]
+        if args.json:
+            print(json.dumps([{k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in r.items()}
+                              for r in rows], indent=2))
+            return
+        for r in rows:
+            ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["ts"]))
+            feats = " ".join(f"{f}={_fmt(r[f])}" for f in tick_store.FIELDS if not math.isnan(r[f]))
+            print(f"{ts} {r['src']:<10} {r['mint']} {feats}")
+    elif args.cmd == "last":
+        r = tick_store.last(args.mint, args.source, base=args.dir)
+        print(json.dumps({k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in (r or {}).items()},
+                         indent=2))
+    elif args.cmd == "prune":
+        gone = tick_store.prune(args.keep_days, base=args.dir)
+        print(f"pruned {len(gone)} day(s): {' '.join(gone)}")
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 import os, json, time, sqlite3, statistics
 from typing import Dict, Any, List, Tuple, Optional
+import sys
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from core.ready_store import publish_ready, write_jsonl_atomic
+from core import profiler
 import os
 import json
 import time
@@ -860,6 +866,147 @@ def _brain_is_stable_like(o: dict) -> bool:
     except Exception:
         return False
     return False
+
+
+def _brain_score_rows(brain: sqlite3.Connection, ready: List[Dict[str, Any]], now: int) -> List[Dict[str, Any]]:
+    """Score ready rows and upsert mint_scores (caller commits)."""
+    scored=[]
+    for o in ready:
+        mint=o.get("mint")
+        if not mint: 
+            continue
+
+        mkt=_score_market(o)
+        flow=_score_flow(o)
+        hist = _mint_hist_score(brain, mint)  # HIST_WIRE_MINT_HIST_V1
+
+        # --- HIST_METRICS_V1 ---
+        hist_n = 0
+        hist_wr = 0.0
+        hist_avg = 0.0
+        try:
+            _r = brain.execute("SELECT n_closed, win_rate, avg_pnl FROM mint_hist WHERE mint=?", (mint,)).fetchone()
+            if _r:
+                hist_n = int(_r[0] or 0)
+                hist_wr = float(_r[1] or 0.0)
+                hist_avg = float(_r[2] or 0.0)
+        except Exception:
+            pass
+        # penalize bad history (simple, safe)
+        try:
+            _min_n = int(os.getenv('HIST_BLOCK_MIN_N','2'))
+            _bad_avg = float(os.getenv('HIST_BLOCK_AVG_PNL','-0.10'))
+            _pen = float(os.getenv('HIST_BAD_PENALTY','0.25'))
+            if hist_n >= _min_n and hist_avg <= _bad_avg:
+                hist = max(0.0, hist - _pen)
+        except Exception:
+            pass
+        # --- /HIST_METRICS_V1 ---
+
+        score = W_MARKET*mkt + W_FLOW*flow + W_HIST*hist
+
+        hist = _hist_score(brain, mint)
+        reason=f"mkt={mkt:.2f} flow={flow:.2f} hist={hist:.2f} hn={hist_n} hwr={hist_wr:.2f} havg={hist_avg:.2f} w=({W_MARKET},{W_FLOW},{W_HIST})"
+
+        # upsert score
+        brain.execute("""
+        INSERT INTO mint_scores(mint,scored_at_ts,score,score_market,score_flow,score_history,reason)
+        VALUES (?,?,?,?,?,?,?)
+        ON CONFLICT(mint) DO UPDATE SET
+          scored_at_ts=excluded.scored_at_ts,
+          score=excluded.score,
+          score_market=excluded.score_market,
+          score_flow=excluded.score_flow,
+          score_history=excluded.score_history,
+          reason=excluded.reason
+        """, (mint, now, float(score), float(mkt), float(flow), float(hist), reason))
+
+        o2=dict(o)
+        o2["brain_score"]=round(float(score), 4)
+        o2["brain_score_market"]=round(float(mkt), 4)
+        o2["brain_score_flow"]=round(float(flow), 4)
+        o2["brain_score_history"]=round(float(hist), 4)
+        o2["brain_scored_at"]=now
+        scored.append(o2)
+
+    return scored
+
+
+def _brain_select(scored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort + min score + topN, then holdings / majors / stables filters."""
+    scored.sort(key=lambda x: float(x.get("brain_score") or 0.0), reverse=True)
+
+    # apply min score + topN
+    out=[]
+    for x in scored:
+        if float(x.get("brain_score") or 0.0) < MIN_SCORE:
+            continue
+        out.append(x)
+        if len(out) >= TOP_N:
+            break
+
+    # --- brain: filter holdings + majors (BEFORE writing file) ---
+    try:
+        pub = os.getenv("WALLET_PUBKEY","") or os.getenv("TRADER_USER_PUBLIC_KEY","")
+        thr = float(HOLDING_IGNORE_ABOVE)
+        dust = float(HOLDING_IGNORE_BELOW)
+        hold_mints = _brain_wallet_holdings_set(pub, thr, dust)
+        if hold_mints:
+            _b = len(out)
+            out = [o for o in out if str(o.get("mint","")) not in hold_mints]
+            if len(out) != _b:
+                print(f"🧠 brain_loop: filtered_by_holding_rpc={_b-len(out)} remaining={len(out)} thr={thr} dust={dust}")
+    except Exception as _e:
+        print("🧠 brain_loop: holdings filter failed:", _e)
+
+    try:
+        _b = len(out)
+        tmp=[]
+        for o in out:
+            sym = str(o.get("symbol","") or "").upper().strip()
+            if sym and sym in BRAIN_DENY_SYMBOLS:
+                continue
+            mc = float(o.get("market_cap") or 0.0)
+            liq = float(o.get("liquidity_usd") or 0.0)
+            if (BRAIN_MAX_MC > 0 and mc > BRAIN_MAX_MC):
+                continue
+            if (BRAIN_MAX_LIQ > 0 and liq > BRAIN_MAX_LIQ):
+                continue
+            tmp.append(o)
+        out = tmp
+        if len(out) != _b:
+            print(f"🧠 brain_loop: filtered_majors={_b-len(out)} remaining={len(out)} max_mc={BRAIN_MAX_MC} max_liq={BRAIN_MAX_LIQ}")
+    except Exception as _e:
+        print("🧠 brain_loop: majors filter failed:", _e)
+
+    # --- filter stables / pegged / symbols (EURC etc) ---
+    try:
+        _before = len(out)
+        out = [o for o in out if not _brain_is_stable_like(o)]
+        if len(out) != _before:
+            print(f"🧠 brain_loop: filtered_stables={_before-len(out)} remaining={len(out)}")
+    except Exception as _e:
+        print("🧠 brain_loop: stable filter failed:", _e)
+    return out
+
+
+def _brain_apply_skip(out: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # --- brain: filter out skip_mints (already holding / manual skip) ---
+    skip_mints = set()
+    try:
+        skip_mints = _brain_load_skip_mints() or set()
+    except Exception:
+        skip_mints = set()
+    if skip_mints:
+        _before = len(out)
+        out = [o for o in out if str(o.get('mint','')) not in skip_mints]
+        _removed = _before - len(out)
+        if _removed > 0:
+            print(f"🧠 brain_loop: filtered_by_skip={_removed} remaining={len(out)}")
+
+    return out
+
+
 def run_once(note: str = "brain_loop"):
     # --- HIST_FROM_TRADES_V1 (run_once hook) ---
     try:
@@ -1000,143 +1147,20 @@ def run_once(note: str = "brain_loop"):
     ready_path=_pick_ready_input()
     ready=_load_jsonl(ready_path)
 
-    scored=[]
     now=int(time.time())
-    for o in ready:
-        mint=o.get("mint")
-        if not mint: 
-            continue
-
-        mkt=_score_market(o)
-        flow=_score_flow(o)
-        hist = _mint_hist_score(brain, mint)  # HIST_WIRE_MINT_HIST_V1
-
-        # --- HIST_METRICS_V1 ---
-        hist_n = 0
-        hist_wr = 0.0
-        hist_avg = 0.0
-        try:
-            _r = brain.execute("SELECT n_closed, win_rate, avg_pnl FROM mint_hist WHERE mint=?", (mint,)).fetchone()
-            if _r:
-                hist_n = int(_r[0] or 0)
-                hist_wr = float(_r[1] or 0.0)
-                hist_avg = float(_r[2] or 0.0)
-        except Exception:
-            pass
-        # penalize bad history (simple, safe)
-        try:
-            _min_n = int(os.getenv('HIST_BLOCK_MIN_N','2'))
-            _bad_avg = float(os.getenv('HIST_BLOCK_AVG_PNL','-0.10'))
-            _pen = float(os.getenv('HIST_BAD_PENALTY','0.25'))
-            if hist_n >= _min_n and hist_avg <= _bad_avg:
-                hist = max(0.0, hist - _pen)
-        except Exception:
-            pass
-        # --- /HIST_METRICS_V1 ---
-
-        score = W_MARKET*mkt + W_FLOW*flow + W_HIST*hist
-
-        hist = _hist_score(brain, mint)
-        reason=f"mkt={mkt:.2f} flow={flow:.2f} hist={hist:.2f} hn={hist_n} hwr={hist_wr:.2f} havg={hist_avg:.2f} w=({W_MARKET},{W_FLOW},{W_HIST})"
-
-        # upsert score
-        brain.execute("""
-        INSERT INTO mint_scores(mint,scored_at_ts,score,score_market,score_flow,score_history,reason)
-        VALUES (?,?,?,?,?,?,?)
-        ON CONFLICT(mint) DO UPDATE SET
-          scored_at_ts=excluded.scored_at_ts,
-          score=excluded.score,
-          score_market=excluded.score_market,
-          score_flow=excluded.score_flow,
-          score_history=excluded.score_history,
-          reason=excluded.reason
-        """, (mint, now, float(score), float(mkt), float(flow), float(hist), reason))
-
-        o2=dict(o)
-        o2["brain_score"]=round(float(score), 4)
-        o2["brain_score_market"]=round(float(mkt), 4)
-        o2["brain_score_flow"]=round(float(flow), 4)
-        o2["brain_score_history"]=round(float(hist), 4)
-        o2["brain_scored_at"]=now
-        scored.append(o2)
+    scored=_brain_score_rows(brain, ready, now)
 
     brain.commit()
     brain.close()
 
-    scored.sort(key=lambda x: float(x.get("brain_score") or 0.0), reverse=True)
-
-    # apply min score + topN
-    out=[]
-    for x in scored:
-        if float(x.get("brain_score") or 0.0) < MIN_SCORE:
-            continue
-        out.append(x)
-        if len(out) >= TOP_N:
-            break
-
-    # --- brain: filter holdings + majors (BEFORE writing file) ---
-    try:
-        pub = os.getenv("WALLET_PUBKEY","") or os.getenv("TRADER_USER_PUBLIC_KEY","")
-        thr = float(HOLDING_IGNORE_ABOVE)
-        dust = float(HOLDING_IGNORE_BELOW)
-        hold_mints = _brain_wallet_holdings_set(pub, thr, dust)
-        if hold_mints:
-            _b = len(out)
-            out = [o for o in out if str(o.get("mint","")) not in hold_mints]
-            if len(out) != _b:
-                print(f"🧠 brain_loop: filtered_by_holding_rpc={_b-len(out)} remaining={len(out)} thr={thr} dust={dust}")
-    except Exception as _e:
-        print("🧠 brain_loop: holdings filter failed:", _e)
-
-    try:
-        _b = len(out)
-        tmp=[]
-        for o in out:
-            sym = str(o.get("symbol","") or "").upper().strip()
-            if sym and sym in BRAIN_DENY_SYMBOLS:
-                continue
-            mc = float(o.get("market_cap") or 0.0)
-            liq = float(o.get("liquidity_usd") or 0.0)
-            if (BRAIN_MAX_MC > 0 and mc > BRAIN_MAX_MC):
-                continue
-            if (BRAIN_MAX_LIQ > 0 and liq > BRAIN_MAX_LIQ):
-                continue
-            tmp.append(o)
-        out = tmp
-        if len(out) != _b:
-            print(f"🧠 brain_loop: filtered_majors={_b-len(out)} remaining={len(out)} max_mc={BRAIN_MAX_MC} max_liq={BRAIN_MAX_LIQ}")
-    except Exception as _e:
-        print("🧠 brain_loop: majors filter failed:", _e)
-
-    # --- filter stables / pegged / symbols (EURC etc) ---
-    try:
-        _before = len(out)
-        out = [o for o in out if not _brain_is_stable_like(o)]
-        if len(out) != _before:
-            print(f"🧠 brain_loop: filtered_stables={_before-len(out)} remaining={len(out)}")
-    except Exception as _e:
-        print("🧠 brain_loop: stable filter failed:", _e)
-    with open(READY_OUT,"w",encoding="utf-8") as w:
-        for x in out:
-            w.write(json.dumps(x, ensure_ascii=False) + "\n")
-
-    # --- brain: filter out skip_mints (already holding / manual skip) ---
-    skip_mints = set()
-    try:
-        skip_mints = _brain_load_skip_mints() or set()
-    except Exception:
-        skip_mints = set()
-    if skip_mints:
-        _before = len(out)
-        out = [o for o in out if str(o.get('mint','')) not in skip_mints]
-        _removed = _before - len(out)
-        if _removed > 0:
-            print(f"🧠 brain_loop: filtered_by_skip={_removed} remaining={len(out)}")
+    out=_brain_select(scored)
+    out=_brain_apply_skip(out)
 
-    os.makedirs(os.path.dirname(READY_OUT) or '.', exist_ok=True)
-    with open(READY_OUT, 'w', encoding='utf-8') as w:
-        for x in out:
-            w.write(json.dumps(x, ensure_ascii=False) + '\n')
+    # single atomic write (readers never see a truncated READY_OUT) + new store generation
+    write_jsonl_atomic(READY_OUT, out)
+    _gen = publish_ready(out, source="brain_loop")
+    if _gen is not None:
+        print(f"🧠 brain_loop: ready_store gen={_gen} n={len(out)}")
 
     print(f"🧠 brain_loop: ready_in={ready_path} in={len(ready)} -> out={len(out)} file={READY_OUT}")
 
@@ -1158,4 +1182,5 @@ def run_once(note: str = "brain_loop"):
         print("🧠 top1:", out[0].get('mint'), "score=", out[0].get('brain_score'))
 
 if __name__ == "__main__":
+    profiler.install("brain_loop")
     run_once()
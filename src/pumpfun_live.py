@@ -4,11 +4,13 @@ import time
 
 from core.pumpfun_listener import PumpfunOnChainListener
 from core.candidate_pipeline import CandidatePipeline
+from core import profiler
 
 logging.basicConfig(level=logging.INFO)
 
 
 async def main():
+    profiler.install("pumpfun_live")
     listener = PumpfunOnChainListener()
     pipeline = CandidatePipeline()
 
@@ -1,8 +1,17 @@
 import asyncio
+import os
 import time
 import logging
 import aiohttp
 
+import os as _os
+import sys as _sys
+_REPO = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+if _REPO not in _sys.path:
+    _sys.path.insert(0, _REPO)
+from core import bounded_cache, profiler
+from core.bounded_cache import BoundedSet
+
 PUMPFUN_PROGRAM_ID = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
 RPC = "https://api.mainnet-beta.solana.com"
 
@@ -14,7 +23,9 @@ async def rpc(session, method, params):
         return (await r.json()).get("result")
 
 async def main():
-    seen = set()
+    profiler.install("pumpfun_poller")
+    seen = BoundedSet("pumpfun_poller.seen_sigs", max_items=int(os.getenv("PUMPFUN_SEEN_SIGS_MAX", "20000")),
+                      ttl_s=float(os.getenv("PUMPFUN_SEEN_SIGS_TTL_S", "3600")))
 
     async with aiohttp.ClientSession() as session:
         logging.info("🚀 Pump.fun POLLER démarré")
@@ -60,6 +71,7 @@ async def main():
                     writable[:3],
                 )
 
+            bounded_cache.maybe_log_stats()
             await asyncio.sleep(1.2)
 
 if __name__ == "__main__":
@@ -7,12 +7,16 @@ from typing import Any, Dict, Optional, List
 import aiohttp
 
 from core.pumpfun_tracker import PumpfunTracker
+from core import bounded_cache, profiler
+from core.bounded_cache import BoundedSet
 
 # Pump.fun Program (creations)
 PUMPFUN_PROGRAM_ID = os.getenv("PUMPFUN_PROGRAM_ID", "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
 
 RPC_HTTP = os.getenv("SOLANA_RPC_HTTP", "https://api.mainnet-beta.solana.com")
 
+RESOLVE_EVERY_S = float(os.getenv("PUMPFUN_RESOLVE_EVERY_S", "2.0"))
+
 LOG = logging.getLogger("pumpfun_poller2")
 
 IGNORE_MINTS = {
@@ -122,13 +126,16 @@ async def get_tx_with_retries(session: aiohttp.ClientSession, sig: str, commitme
 
 async def main() -> None:
     logging.basicConfig(level=logging.INFO)
+    profiler.install("pumpfun_poller2")
     LOG.info("🚀 Pump.fun POLLER v2 (creator->WAIT_MINT->ARMED) démarré")
     LOG.info("   program=%s", PUMPFUN_PROGRAM_ID)
 
     tracker = PumpfunTracker()
 
-    seen_sigs = set()
+    seen_sigs = BoundedSet("pumpfun_poller2.seen_sigs", max_items=int(os.getenv("PUMPFUN_SEEN_SIGS_MAX", "20000")),
+                           ttl_s=float(os.getenv("PUMPFUN_SEEN_SIGS_TTL_S", "3600")))
     last_before = None  # pagination cursor
+    last_resolve = 0.0
 
     async with aiohttp.ClientSession() as session:
         while True:
@@ -157,9 +164,6 @@ async def main() -> None:
                     if not sig or sig in seen_sigs:
                         continue
                     seen_sigs.add(sig)
-                    if len(seen_sigs) > 4000:
-                        # simple memory bound
-                        seen_sigs = set(list(seen_sigs)[-2000:])
 
                     block_time = item.get("blockTime") or 0
                     created_ts = float(block_time) if block_time else time.time()
@@ -195,6 +199,16 @@ async def main() -> None:
                             mint, creator, age, sig
                         )
 
+                # resolve mints for every WATCH creator at once (throttled)
+                if time.time() - last_resolve >= RESOLVE_EVERY_S:
+                    last_resolve = time.time()
+                    for _, p in await tracker.tick_find_mints_many():
+                        logging.error(
+                            "🔥 [MINT_FOUND] mint=%s creator=%s age=%.2fs mint_sig=%s (resolver)",
+                            p["mint"], p["creator"], p["age"], p["mint_sig"]
+                        )
+
+                bounded_cache.maybe_log_stats()
                 # small sleep to avoid hammering RPC
                 await asyncio.sleep(0.35)
 
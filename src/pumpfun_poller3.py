@@ -5,6 +5,14 @@ from typing import Any, Dict, Optional, List
 
 import aiohttp
 
+import os as _os
+import sys as _sys
+_REPO = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+if _REPO not in _sys.path:
+    _sys.path.insert(0, _REPO)
+from core import bounded_cache, profiler
+from core.bounded_cache import BoundedSet
+
 log = logging.getLogger("pumpfun_poller3")
 
 # Pump.fun Program (create)
@@ -139,11 +147,13 @@ def pick_mint(tx: Dict[str, Any]) -> Optional[str]:
 
 async def main():
     logging.basicConfig(level=logging.INFO)
+    profiler.install("pumpfun_poller3")
     log.info("🚀 Pump.fun POLLER v3 (clean) démarré")
     log.info("   pumpfun_program=%s", PUMPFUN_PROGRAM_ID)
     log.info("   rpc_http=%s", RPC_HTTP)
 
-    seen_sigs = set()
+    seen_sigs = BoundedSet("pumpfun_poller3.seen_sigs", max_items=int(_os.getenv("PUMPFUN_SEEN_SIGS_MAX", "20000")),
+                           ttl_s=float(_os.getenv("PUMPFUN_SEEN_SIGS_TTL_S", "3600")))
 
     # PENDING: sig -> info (on recheck plus tard pour trouver le mint)
     PENDING: Dict[str, Dict[str, Any]] = {}
@@ -224,6 +234,7 @@ async def main():
             except Exception as e:
                 logging.warning("[loop] error=%s", e)
 
+            bounded_cache.maybe_log_stats()
             await asyncio.sleep(1.0)
 
 
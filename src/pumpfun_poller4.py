@@ -9,6 +9,14 @@ from typing import Any, Dict, List, Optional
 
 import aiohttp
 
+import os as _os
+import sys as _sys
+_REPO = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+if _REPO not in _sys.path:
+    _sys.path.insert(0, _REPO)
+from core import bounded_cache, profiler
+from core.bounded_cache import BoundedSet
+
 # ---------------- CONFIG ----------------
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
@@ -184,12 +192,14 @@ def record_mint_found(mint: str, creator: str, pump_sig: str, mint_sig: str) ->
 
 # ---------------- MAIN LOOP ----------------
 async def main() -> None:
+    profiler.install("pumpfun_poller4")
     log.info("🚀 Pump.fun POLLER v4 (MINT_FOUND) démarré")
     log.info("   pumpfun_program=%s", PUMPFUN_PROGRAM)
     log.info("   rpc_http=%s", RPC_HTTP)
     log.info("   recent_window=%ss", RECENT_WINDOW_S)
 
-    seen_sigs: set[str] = set()
+    seen_sigs = BoundedSet("pumpfun_poller4.seen_sigs", max_items=int(os.getenv("PUMPFUN_SEEN_SIGS_MAX", "20000")),
+                           ttl_s=float(os.getenv("PUMPFUN_SEEN_SIGS_TTL_S", "3600")))
     last_hb = 0.0
 
     async with aiohttp.ClientSession() as session:
@@ -234,9 +244,7 @@ async def main() -> None:
                 )
                 record_mint_found(mint, creator, sig, sig)
 
-            # small cap to avoid memory blow
-            if len(seen_sigs) > 20000:
-                seen_sigs = set(list(seen_sigs)[-10000:])
+            bounded_cache.maybe_log_stats()
 
             await asyncio.sleep(POLL_S)
 
@@ -1,7 +1,4 @@
-import json
 import os
-import time
-from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 import requests
@@ -35,35 +32,18 @@ def ultra_get_dev(mint: str) -> str:
     except Exception:
         return ""
 
-BLACKLIST_DEV_PATH = Path("state/blacklist_dev.json")
-BLACKLIST_MINT_PATH = Path("state/blacklist_mint.json")
-
-
-def _load_json(path: Path, default):
-    if not path.exists():
-        return default
-    try:
-        return json.loads(path.read_text(encoding="utf-8") or "")
-    except Exception:
-        return default
-
-
-def _save_json(path: Path, obj: Any):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
-
-
-def _load_blacklist_dev() -> Dict[str, str]:
-    return _load_json(BLACKLIST_DEV_PATH, {})
+# dev + mint blacklists: core.reputation_store (indexed upserts, TTL by index);
+# the legacy state/blacklist_*.json files are imported once on first open.
+def _store():
+    from core.reputation_store import get_store
+    return get_store()
 
 
 def blacklist_dev(dev: str, reason: str):
     dev = (dev or "").strip()
     if not dev:
         return
-    bl = _load_blacklist_dev()
-    bl[dev] = reason or "BAD_DEV"
-    _save_json(BLACKLIST_DEV_PATH, bl)
+    _store().blacklist_dev(dev, reason or "BAD_DEV")
     print(f"⛔ DEV BLACKLISTED {dev[:6]}… reason={reason}")
 
 
@@ -71,21 +51,14 @@ def is_dev_blacklisted(dev: str) -> bool:
     dev = (dev or "").strip()
     if not dev:
         return False
-    return dev in _load_blacklist_dev()
-
-
-def _load_blacklist_mint() -> Dict[str, Dict[str, Any]]:
-    # format: { mint: {"reason": "...", "until": epoch} }
-    return _load_json(BLACKLIST_MINT_PATH, {})
+    return _store().is_dev_blacklisted(dev)
 
 
 def blacklist_mint(mint: str, reason: str, ttl_sec: int = 900):
     mint = (mint or "").strip()
     if not mint:
         return
-    bl = _load_blacklist_mint()
-    bl[mint] = {"reason": reason or "BAD_MINT", "until": int(time.time()) + int(ttl_sec)}
-    _save_json(BLACKLIST_MINT_PATH, bl)
+    _store().blacklist_mint(mint, reason or "BAD_MINT", ttl_s=int(ttl_sec))
     print(f"⛔ TOKEN BLACKLISTED {mint[:6]}… {reason}")
 
 
@@ -93,20 +66,7 @@ def is_mint_blacklisted(mint: str) -> bool:
     mint = (mint or "").strip()
     if not mint:
         return False
-    bl = _load_blacklist_mint()
-    now = int(time.time())
-
-    # expire
-    changed = False
-    for k in list(bl.keys()):
-        until = int(bl[k].get("until") or 0)
-        if until and until < now:
-            del bl[k]
-            changed = True
-    if changed:
-        _save_json(BLACKLIST_MINT_PATH, bl)
-
-    return mint in bl
+    return _store().mint_blacklisted(mint) is not None
 
 
 # ---------------------------
@@ -150,9 +110,9 @@ def risk_check(mint: str) -> Tuple[bool, int, List[str], Dict[str, Any]]:
     if not mint or not (32 <= len(mint) <= 60):
         return (False, 0, ["INVALID_MINT"], {})
 
-    if is_mint_blacklisted(mint):
-        bl = _load_blacklist_mint().get(mint, {})
-        return (False, 0, ["MINT_BLACKLISTED"], {"blacklist": bl})
+    rec = _store().mint_blacklisted(mint)
+    if rec is not None:
+        return (False, 0, ["MINT_BLACKLISTED"], {"blacklist": {"reason": rec[0], "until": rec[1]}})
 
     # seuils (tu peux ajuster via env)
     MIN_LIQ_USD = float(os.getenv("RISK_MIN_LIQ_USD", "150000"))      # 150k$
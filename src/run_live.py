@@ -22,9 +22,13 @@ ROOT = str(_Path(__file__).resolve().parents[1])
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+from config import runtime
 from core.sell_engine import SellEngine
 from core.positions_db_adapter import PositionsDBAdapter
 from core.price_feed_dex import DexScreenerPriceFeed
+from core import bounded_cache, http_pool
+from core import latency_trace
+from core import profiler
 from src.trader_loop import trader_loop
 
 
@@ -36,6 +40,12 @@ async def _maybe_await(x):
 
 async def main():
     print("🚀 run_live: starting sell_engine + trader_loop", flush=True)
+    # SIGUSR2 / state/profiles/run_live-<pid>.sock: sampler, tracemalloc, task timing
+    profiler.install("run_live")
+    # local latency endpoint (LATENCY_METRICS_PORT>0): /metrics, /metrics.json
+    latency_trace.serve()
+    # typed config snapshot; kill -HUP / edits of config/*.py or CONFIG_ENV_FILE reload it between ticks
+    runtime.install()
 
     # Optional: reclaim SOL rent by closing empty token accounts
     if os.getenv("RECLAIM_RENT_ON_START", "0") == "1":
@@ -51,6 +61,12 @@ async def main():
     db = PositionsDBAdapter(db_path)
 
     price_feed = DexScreenerPriceFeed()
+    if os.getenv("LOCAL_QUOTE", "0") == "1":
+        # opt-in: pool-state pricing first, remote quote only when the pool is unknown.
+        # only pump.fun curves are found from the mint alone (Raydium pools need register())
+        from core.local_quote import LocalFirstPriceFeed, LocalQuoteEngine
+        price_feed = LocalFirstPriceFeed(LocalQuoteEngine(), price_feed)
+        print("✅ price_feed: local pool quotes (fallback DexScreener/Jupiter)", flush=True)
     try:
         sell_engine = SellEngine(db=db, price_feed=price_feed)
     except TypeError:
@@ -71,7 +87,11 @@ async def main():
                     return
             except Exception as err:
                 print("❌ sell_engine tick error: " + str(err), flush=True)
+            http_pool.maybe_log_stats()
+            latency_trace.maybe_log_summary()
+            bounded_cache.maybe_log_stats()
             await asyncio.sleep(sleep_s)
+            runtime.maybe_reload()
     # --- end SELL_ONLY ---
     one_shot = os.getenv("ONE_SHOT", "0") in ("1", "true", "True")
 
@@ -100,7 +120,11 @@ async def main():
         if one_shot:
             break
 
+        http_pool.maybe_log_stats()
+        latency_trace.maybe_log_summary()
+        bounded_cache.maybe_log_stats()
         await asyncio.sleep(sleep_s)
+        runtime.maybe_reload()
 
 
 if __name__ == "__main__":
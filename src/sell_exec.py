@@ -71,6 +71,11 @@ import requests
 from solders.keypair import Keypair
 from solders.transaction import VersionedTransaction
 
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO not in sys.path:
+    sys.path.insert(0, REPO)
+from core import latency_trace
+
 SOL_MINT = "So11111111111111111111111111111111111111112"
 
 def rpc_call(rpc: str, method: str, params):
@@ -148,6 +153,10 @@ def main():
     ap.add_argument("--reason", default="manual")
     args = ap.parse_args()
 
+    # continue SellEngine's sell trace (LINO_TRACE_CTX via sell_exec_wrap)
+    if latency_trace.from_env() is not None:
+        latency_trace.lap("spawn")
+
     base = os.getenv("JUP_BASE_URL", "https://lite-api.jup.ag").rstrip("/")
     rpc = os.getenv("SOLANA_RPC", "https://api.mainnet-beta.solana.com")
     slippage_bps = int(os.getenv("SELL_SLIPPAGE_BPS", os.getenv("SLIPPAGE_BPS", "300")))
@@ -159,7 +168,8 @@ def main():
     owner = str(kp.pubkey())
 
     ui_amt = Decimal(args.ui)
-    dec = get_decimals(rpc, args.mint)
+    with latency_trace.span("decimals"):
+        dec = get_decimals(rpc, args.mint)
 
     amt = int((ui_amt * (Decimal(10) ** dec)).quantize(Decimal("1"), rounding=ROUND_DOWN))
     if amt <= 0:
@@ -171,8 +181,10 @@ def main():
         flush=True,
     )
 
-    quote = jup_quote(base, args.mint, SOL_MINT, amt, slippage_bps)
-    swap = jup_swap(base, quote, owner)
+    with latency_trace.span("quote"):
+        quote = jup_quote(base, args.mint, SOL_MINT, amt, slippage_bps)
+    with latency_trace.span("swap_build"):
+        swap = jup_swap(base, quote, owner)
 
     tx_b64 = swap.get("swapTransaction")
     if not tx_b64:
@@ -183,21 +195,34 @@ def main():
         print("txsig=DRY_RUN_NO_TX_SENT", flush=True)
         return
 
-    raw = base64.b64decode(tx_b64)
-    vtx = VersionedTransaction.from_bytes(raw)
+    with latency_trace.span("sign"):
+        raw = base64.b64decode(tx_b64)
+        vtx = VersionedTransaction.from_bytes(raw)
 
-    # canonical solders signing for v0:
-    signed_vtx = VersionedTransaction(vtx.message, [kp])
-    signed_b64 = base64.b64encode(bytes(signed_vtx)).decode("utf-8")
+        # canonical solders signing for v0:
+        signed_vtx = VersionedTransaction(vtx.message, [kp])
+        signed_b64 = base64.b64encode(bytes(signed_vtx)).decode("utf-8")
 
-    txsig = send_tx(rpc, signed_b64)
+    with latency_trace.span("send"):
+        txsig = send_tx(rpc, signed_b64)
     print("txsig=" + txsig, flush=True)
 
+    # drift check vs local pool state: off the hot path (own thread, runs during confirm),
+    # never delays send nor confirm; only waited for (bounded) before the hard exit below
+    _xcheck = _start_crosscheck(rpc, args.mint, amt, quote)
+
     # confirm (non-fatal warning)
     try:
+        _t_conf = time.perf_counter()
         st = confirm_sig(rpc, txsig, timeout_s=int(os.getenv("SELL_CONFIRM_TIMEOUT_S", "35")))
+        _tr = latency_trace.current()
+        if _tr is not None:
+            _tr.add("confirm", (time.perf_counter() - _t_conf) * 1000.0)
         print("confirm=" + str(st), flush=True)
-        # patched: hard exit after confirm (uncatchable)
+        if _xcheck is not None:
+            _xcheck.join(timeout=float(os.getenv("LOCAL_QUOTE_CROSSCHECK_WAIT_S", "2")))
+        # patched: hard exit after confirm (uncatchable) -> atexit won't run, dump spans first
+        latency_trace.flush()
         os._exit(0)
         sys.exit(0)
         # ---- patched: stop after any successful confirm (processed/confirmed/finalized)
@@ -224,6 +249,23 @@ def main():
         pass
         print("WARN confirm:", e, flush=True)
 
+def _start_crosscheck(rpc: str, mint: str, amt: int, quote: dict):
+    """LocalQuoteEngine.cross_check in a daemon thread (its RPCs must not sit between send and confirm)."""
+    if os.getenv("LOCAL_QUOTE_CROSSCHECK", "1") != "1":
+        return None
+
+    def _run():
+        try:
+            from core.local_quote import LocalQuoteEngine
+            LocalQuoteEngine(rpc_url=rpc).cross_check(mint, "sell", amt, int(quote.get("outAmount") or 0), tag="sell_exec")
+        except Exception:
+            pass
+
+    import threading
+    th = threading.Thread(target=_run, name="local_quote_xcheck", daemon=True)
+    th.start()
+    return th
+
 if __name__ == "__main__":
     try:
         main()
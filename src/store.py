@@ -24,6 +24,7 @@ class TradeStore:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
         self._conn.execute("PRAGMA journal_mode=WAL;")
         self._conn.execute("PRAGMA synchronous=NORMAL;")
         self._init_schema()
@@ -61,6 +62,7 @@ class TradeStore:
             """
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_events_mint_ts ON events(mint, ts);")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);")
         self._conn.commit()
 
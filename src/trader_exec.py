@@ -375,7 +375,6 @@ def _pick_col(cols, *names):
 
 def _onchain_ui_balance_stable(mint: str, tries: int = 3, sleep_s: float = 0.6, timeout_s: float = 4.0) -> float:
     import os, time, json
-    import requests
     from solders.keypair import Keypair
 
     rpc = os.getenv("SOLANA_RPC", "https://api.mainnet-beta.solana.com")
@@ -397,7 +396,7 @@ def _onchain_ui_balance_stable(mint: str, tries: int = 3, sleep_s: float = 0.6,
         if time.time() - t0 > timeout_s:
             break
         try:
-            j = requests.post(rpc, json=payload, timeout=25).json()
+            j = http_pool.post(rpc, json=payload, timeout=25).json()
         except Exception:
             j = {}
         total = 0.0
@@ -441,12 +440,14 @@ def _db_insert(cur, table: str, data: dict):
     cur.execute(q, [use[k] for k in keys])
     return True
 
-def _db_record_buy_schema_safe(db_path: str, mint: str, txsig: str, symbol: str="", qty_token: float=0.0, price: float=0.0, qty_sol: float=0.0):
+def _db_record_buy_schema_safe(db_path: str, mint: str, txsig: str, symbol: str="", qty_token: float=0.0, price: float=0.0, qty_sol: float=0.0,
+                               exit_profile: str=""):
     """
     Schema-safe DB write for BUY:
       - trades(ts, side, mint, symbol, qty_token, price, txsig, qty)
-      - positions(mint, symbol, qty_token, entry_price, entry_ts, max_price, stop_price, status)
-    Avoids pnl_usd mismatch completely.
+      - positions(mint, symbol, qty_token, entry_price, entry_ts, max_price, stop_price, status, exit_profile)
+    Avoids pnl_usd mismatch completely. exit_profile (PUMP / NORMAL, config.runtime) is added
+    as a column when missing.
     """
     import sqlite3, time
     if not db_path:
@@ -489,7 +490,15 @@ def _db_record_buy_schema_safe(db_path: str, mint: str, txsig: str, symbol: str=
         "qty": float(qty_sol or 0.0),
     })
 
+    if exit_profile:
+        try:
+            if "exit_profile" not in _db_cols(cur, "positions"):
+                cur.execute("ALTER TABLE positions ADD COLUMN exit_profile TEXT NOT NULL DEFAULT ''")
+        except Exception as _e:
+            print(f"⚠️ DB: exit_profile column unavailable: {_e}", flush=True)
+
     _db_insert(cur, "positions", {
+        "exit_profile": exit_profile,
         "mint": mint,
         "symbol": symbol,
         "qty_token": float(qty_token or 0.0),
@@ -506,7 +515,6 @@ def _db_record_buy_schema_safe(db_path: str, mint: str, txsig: str, symbol: str=
     con.close()
     return True
 
-    import requests
     from solders.keypair import Keypair
 
     dbp = os.getenv("TRADES_DB_PATH", os.getenv("DB_PATH", "state/trades.sqlite"))
@@ -543,7 +551,7 @@ def _db_record_buy_schema_safe(db_path: str, mint: str, txsig: str, symbol: str=
         payload = {"jsonrpc":"2.0","id":1,"method":"getTokenAccountsByOwner",
                    "params":[owner, {"mint": mint}, {"encoding":"jsonParsed"}]}
         try:
-            j = requests.post(rpc, json=payload, timeout=25).json()
+            j = http_pool.post(rpc, json=payload, timeout=25).json()
         except Exception:
             return 0.0
         total = 0.0
@@ -766,7 +774,13 @@ import base64
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import requests
+import sys as _sys
+_REPO = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+if _REPO not in _sys.path:
+    _sys.path.insert(0, _REPO)
+from core import http_pool
+from config import runtime
+from core import decision_trace, latency_trace, tick_store
 
 
 def _load_skip_mints() -> set[str]:
@@ -837,14 +851,13 @@ def _is_last_buy_blocked(mint: str) -> bool:
 def _get_token_ui_balance(owner_pubkey: str, mint: str) -> float:
     # jsonParsed token accounts by owner+mint
     try:
-        import requests
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
             "method": "getTokenAccountsByOwner",
             "params": [owner_pubkey, {"mint": mint}, {"encoding": "jsonParsed"}],
         }
-        r = requests.post(RPC_HTTP, json=payload, timeout=20).json()
+        r = http_pool.post(RPC_HTTP, json=payload, timeout=20).json()
         accs = ((r.get("result") or {}).get("value") or [])
         ui = 0.0
         for a in accs:
@@ -967,14 +980,16 @@ def _pick_best_ready(ready: list) -> dict:
     # log minimal
     mint = (best.get("outputMint") or best.get("mint") or best.get("address") or "").strip()
     sym  = (best.get("symbol") or "").strip()
-    print(f"[DECISION] PICK mint={mint} sym={sym} score={best_score:.2f} dbg={best_dbg}")
+    _feats = {k: v for k, v in (best_dbg or {}).items() if isinstance(v, (int, float))}
+    _feats["score"] = round(best_score, 4)
+    decision_trace.event("pick", mint, "PICK", "best_score", sym=sym, **_feats)
     return best
 ### SOL_BALANCE_GUARD_V1 ###
 MIN_SOL_BUFFER_LAMPORTS = int(float(os.getenv('MIN_SOL_BUFFER_SOL','0.003')) * 1_000_000_000)  # fees/ATA buffer
 
 def _get_balance_lamports(rpc_http: str, pubkey: str) -> int:
     try:
-        rr = requests.post(rpc_http, json={'jsonrpc':'2.0','id':1,'method':'getBalance','params':[pubkey]}, timeout=20)
+        rr = http_pool.post(rpc_http, json={'jsonrpc':'2.0','id':1,'method':'getBalance','params':[pubkey]}, timeout=20)
         return int((rr.json().get('result') or {}).get('value') or 0)
     except Exception:
         return 0
@@ -1038,7 +1053,47 @@ def _headers() -> Dict[str, str]:
     return h
 
 
+READY_SOURCE = (os.getenv("READY_SOURCE", "file") or "file").strip().lower()
+READY_TOPK = int(os.getenv("READY_TOPK", "200") or 200)
+
+
+def _load_ready_from_store() -> Optional[list[dict]]:
+    """
+    READY_SOURCE=store: top-K of a ready_store generation, skip sets applied in the scan.
+    The generation is the one trader_loop woke up on (READY_STORE_GEN), so a publish landing
+    in between doesn't change the candidate set; current gen when unset or already pruned.
+    """
+    try:
+        from core.ready_store import ReadyStore
+    except Exception as e:
+        print(f"⚠️ ready_store unavailable ({e}) -> READY_FILE", flush=True)
+        return None
+    now = int(time.time())
+    exclude = _load_skip_set(os.getenv("SKIP_MINTS_FILE", "state/skip_mints_trader.txt"))
+    exclude |= _load_rlskip_set(os.getenv("RL_SKIP_FILE", "state/rl_skip_mints.json"), now)
+    try:
+        with ReadyStore() as st:
+            try:
+                gen = int(os.getenv("READY_STORE_GEN", "0") or 0)
+            except ValueError:
+                gen = 0
+            if gen <= 0 or st.gen_info(gen) is None:
+                gen = st.current_gen()
+            if gen <= 0:
+                return None
+            rows = st.top_k(READY_TOPK, exclude=exclude, gen=gen)
+    except Exception as e:
+        print(f"⚠️ ready_store read failed ({e}) -> READY_FILE", flush=True)
+        return None
+    print(f"   ready_store gen={gen} topk={len(rows)} excluded={len(exclude)}", flush=True)
+    return rows
+
+
 def _load_ready() -> list[dict]:
+    if READY_SOURCE == "store":
+        rows = _load_ready_from_store()
+        if rows is not None:
+            return rows
     if not READY_FILE.exists():
         return []
     out = []
@@ -1084,13 +1139,14 @@ def _load_keypair() -> Keypair:
 
 
 def _send_signed_b64(tx_b64: str, rpc_http: str) -> str:
-    kp = _load_keypair()
+    with latency_trace.span("sign"):
+        kp = _load_keypair()
 
-    raw_tx = VersionedTransaction.from_bytes(base64.b64decode(tx_b64))
-    sig = kp.sign_message(to_bytes_versioned(raw_tx.message))
-    signed_tx = VersionedTransaction.populate(raw_tx.message, [sig])
+        raw_tx = VersionedTransaction.from_bytes(base64.b64decode(tx_b64))
+        sig = kp.sign_message(to_bytes_versioned(raw_tx.message))
+        signed_tx = VersionedTransaction.populate(raw_tx.message, [sig])
 
-    encoded_tx = base64.b64encode(bytes(signed_tx)).decode("utf-8")
+        encoded_tx = base64.b64encode(bytes(signed_tx)).decode("utf-8")
 
     req = {
         "jsonrpc": "2.0",
@@ -1106,7 +1162,8 @@ def _send_signed_b64(tx_b64: str, rpc_http: str) -> str:
             },
         ],
     }
-    r = requests.post(rpc_http, json=req, timeout=35)
+    with latency_trace.span("send"):
+        r = http_pool.post(rpc_http, json=req, timeout=35)
     _append_dbg("SEND_STATUS=" + str(r.status_code))
     _append_dbg("SEND_BODY=" + (r.text[:2000] if r.text else ""))
 
@@ -1121,6 +1178,38 @@ def _send_signed_b64(tx_b64: str, rpc_http: str) -> str:
         raise RuntimeError(f"sendTransaction no result: {j}")
     return str(res)
 
+# 0 = pas de span confirm (défaut): the poll runs inside the buy subprocess and
+# trader_loop waits for it, so > 0 delays the next tick by up to that much
+LATENCY_BUY_CONFIRM_S = float(os.getenv("LATENCY_BUY_CONFIRM_S", "0"))
+
+
+def _latency_confirm_buy(txsig: str) -> None:
+    """Poll the buy signature (bounded) to time the 'confirm' span. Tracing only, never raises."""
+    tr = latency_trace.current()
+    if tr is None or LATENCY_BUY_CONFIRM_S <= 0 or not txsig:
+        return
+    t = time.perf_counter()
+    deadline = time.time() + LATENCY_BUY_CONFIRM_S
+    req = {"jsonrpc": "2.0", "id": 1, "method": "getSignatureStatuses",
+           "params": [[txsig], {"searchTransactionHistory": False}]}
+    while time.time() < deadline:
+        try:
+            j = http_pool.post(RPC_HTTP, json=req, timeout=5).json()
+            v = ((j.get("result") or {}).get("value") or [None])[0]
+            if v:
+                if v.get("err") is not None:
+                    latency_trace.annotate(confirm="err")
+                    return
+                if v.get("confirmationStatus") in ("confirmed", "finalized"):
+                    tr.add("confirm", (time.perf_counter() - t) * 1000.0)
+                    latency_trace.annotate(confirm=v.get("confirmationStatus"))
+                    return
+        except Exception:
+            pass
+        time.sleep(0.4)
+    latency_trace.annotate(confirm="timeout")
+
+
 def _row_mint(row: dict) -> str:
     if not isinstance(row, dict):
         return ""
@@ -1203,6 +1292,11 @@ def main() -> int:
         raise SystemExit(1)  # fatal: wallet pubkey missing
 
     print("🚀 trader_exec BUY")
+    # latency trace: continue trader_loop's buy trace (LINO_TRACE_CTX) or open one
+    if latency_trace.from_env() is not None:
+        latency_trace.lap("spawn")
+    else:
+        latency_trace.start("buy")
 
     # --- FAKE_SWAP429_N_V1 (test helper) ---
     try:
@@ -1363,6 +1457,7 @@ def main() -> int:
     if output_mint and (output_mint in skip_set or _is_last_buy_blocked(output_mint)):
         why = 'skip_file' if output_mint in skip_set else 'last_buy_cooldown'
         print(f"⚠️ re-pick: blocked by {why} mint={output_mint}")
+        decision_trace.event("buy_skip", output_mint, "REPICK", why)
         # remove blocked mints and pick again
         ready2 = [r for r in ready if (r.get('outputMint') or r.get('mint') or r.get('address') or '').strip() not in skip_set]
         cand2 = _pick_best_scored_ready(ready2) if USE_SCORED_IF_PRESENT else (ready2[0] if ready2 else None)
@@ -1374,26 +1469,24 @@ def main() -> int:
     if FORCE_OUTPUT_MINT:
         output_mint = FORCE_OUTPUT_MINT.strip()
         print(f"   [CFG] FORCE_OUTPUT_MINT -> {output_mint}")
+    latency_trace.annotate(mint=output_mint)
+    latency_trace.lap("pick")
     # --- DUAL_PROFILE_V1 ---
-    if str(output_mint).lower().endswith("pump"):
-        _profile = "PUMP"
-        os.environ["HARD_SL_PCT"]   = "-0.35"
-        os.environ["TP1_PCT"]       = "0.40"
-        os.environ["TP2_PCT"]       = "1.00"
-        os.environ["TIME_STOP_SEC"] = "600"
-    else:
-        _profile = "NORMAL"
-        os.environ["HARD_SL_PCT"]   = "-0.20"
-        os.environ["TP1_PCT"]       = "0.20"
-        os.environ["TP2_PCT"]       = "0.50"
-        os.environ["TIME_STOP_SEC"] = "1800"
-    print(f"   [PROFILE] {_profile} mint={output_mint} HARD_SL_PCT={os.environ['HARD_SL_PCT']} TP1={os.environ['TP1_PCT']} TP2={os.environ['TP2_PCT']} TIME_STOP_SEC={os.environ['TIME_STOP_SEC']}", flush=True)
+    # exit profile picked here, recorded on the position (positions.exit_profile) and applied by
+    # SellEngine via config.runtime (no os.environ mutation: run_live's SellEngine never saw it).
+    # opt-in SELL_USE_POSITION_PROFILE=1: off, nothing is recorded and no column is added
+    _cfg = runtime.current()
+    _profile = _cfg.recorded_profile_for_mint(str(output_mint))
+    if _profile:
+        _p = _cfg.profile(_profile)
+        print(f"   [PROFILE] {_profile} mint={output_mint} HARD_SL_PCT={_p.hard_sl_pct} TP1={_p.tp1_pct} TP2={_p.tp2_pct} TIME_STOP_SEC={_p.time_stop_sec}", flush=True)
     # --- /DUAL_PROFILE_V1 ---
     # skiplist + bag check
     try:
         skip = _load_skip_mints()
         if output_mint in skip:
             print(f"⚠️ skip BUY: mint in SKIP_MINTS_FILE mint={output_mint}")
+            decision_trace.event("buy_skip", output_mint, "SKIP", "skip_file")
             return 0
     except Exception:
         pass
@@ -1423,13 +1516,14 @@ def main() -> int:
                 print(f"🧠 holding cache used mint={output_mint} cached_ui={_cached}", flush=True)
                 ui = float(_cached)
 
-        IGNORE_DUST = float(os.getenv("IGNORE_HOLDING_BELOW", "0"))
+        IGNORE_DUST = float(_cfg.buy.ignore_holding_below)
 
         if ui < IGNORE_DUST:
             ui = 0.0
 
         if ui > 0.0:
             print(f"⚠️ skip BUY: already holding mint={output_mint} ui={ui}")
+            decision_trace.event("buy_skip", output_mint, "SKIP", "already_holding", ui=ui)
             _rl_skip_add(output_mint, int(os.getenv('HOLDING_SKIP_SEC','900')), reason='already_holding')
             if ui >= BAG_MIN_UI:
                 if str(os.getenv('AUTOSKIP_ALREADY_HOLDING','0')).strip() in ('1','true','True','yes','YES'):
@@ -1622,8 +1716,7 @@ def main() -> int:
 
     if _sol is None and _wallet:
         try:
-            import requests as _rq
-            _r = _rq.post(_rpc, json={"jsonrpc":"2.0","id":1,"method":"getBalance","params":[str(_wallet)]}, timeout=10)
+            _r = http_pool.post(_rpc, json={"jsonrpc":"2.0","id":1,"method":"getBalance","params":[str(_wallet)]}, timeout=10)
             if _r.status_code == 200:
                 _j = _r.json()
                 _lam = (((_j or {}).get("result") or {}).get("value"))
@@ -1689,6 +1782,7 @@ def main() -> int:
 
         return 0
     # QUOTE
+    latency_trace.lap("guards")
     qurl = os.getenv("JUP_QUOTE_URL", f"{JUP_BASE}/swap/v1/quote")
     params = {
         "inputMint": SOL_MINT,
@@ -1697,7 +1791,8 @@ def main() -> int:
         "slippageBps": str(SLIPPAGE_BPS),
     }
     try:
-        qr = requests.get(qurl, params=params, headers=_headers(), timeout=25)
+        with latency_trace.span("quote"):
+            qr = http_pool.get(qurl, params=params, headers=_headers(), timeout=25)
         _append_dbg("QUOTE_URL=" + qr.url)
         _append_dbg("QUOTE_STATUS=" + str(qr.status_code))
         _append_dbg("QUOTE_BODY=" + (qr.text[:2000] if qr.text else ""))
@@ -1804,6 +1899,7 @@ def main() -> int:
                 print(f"⚠️ AUTO_SKIP_NO_ROUTE handler error mint={output_mint} err={repr(_e)}", flush=True)
             return 0
         quote = qr.json()
+        tick_store.record_quote(str(output_mint), quote, "quote")
     except Exception as e:
         _write_err("quote_exc", {"error": str(e)})
         print("❌ quote exception:", e)
@@ -1814,7 +1910,8 @@ def main() -> int:
     body = {"quoteResponse": quote, "userPublicKey": WALLET_PUBKEY, "wrapAndUnwrapSol": True}
 
     try:
-        sr = requests.post(surl, headers=_headers(), json=body, timeout=35)
+        with latency_trace.span("swap_build"):
+            sr = http_pool.post(surl, headers=_headers(), json=body, timeout=35)
         _append_dbg("SWAP_STATUS=" + str(sr.status_code))
         _append_dbg("SWAP_BODY=" + (sr.text[:2000] if sr.text else ""))
         if sr.status_code != 200:
@@ -1949,18 +2046,20 @@ def main() -> int:
             print("✅ sent txsig=", txsig)
             # --- DB record BUY (schema-safe) ---
             # DB_GUARD_DRY_V1: avoid polluting DB in DRY_RUN / STOP_AFTER_BUILD_TX
-            if os.getenv('TRADER_DRY_RUN','0').strip().lower() in ('1','true','yes','on') or os.getenv('STOP_AFTER_BUILD_TX','0').strip().lower() in ('1','true','yes','on'):
+            if _cfg.buy.dry_run or _cfg.buy.stop_after_build_tx:
                 print('🧪 DB_GUARD_DRY_V1 -> skip DB record (dry/stop_after_build)', flush=True)
             else:
-                try:
-                    _dbp = os.getenv('TRADES_DB_PATH', os.getenv('DB_PATH', 'state/trades.sqlite'))
-                    _sym = locals().get('output_symbol') or locals().get('out_symbol') or locals().get('symbol') or ''
-                    _qty_sol = float(locals().get('amount_sol') or locals().get('buy_amount_sol') or 0.0)
-                    _price = float(locals().get('exec_price') or locals().get('price') or 0.0)
-                    _db_record_buy_schema_safe(_dbp, output_mint, txsig, symbol=_sym, qty_token=0.0, price=_price, qty_sol=_qty_sol)
-                    print(f"✅ DB: recorded BUY mint={output_mint} txsig={txsig[:8]}… db={_dbp}", flush=True)
-                except Exception as _e:
-                    print(f"⚠️ DB record BUY failed: {_e}", flush=True)
+                with latency_trace.span("db_record"):
+                    try:
+                        _dbp = _cfg.buy.trades_db_path
+                        _sym = locals().get('output_symbol') or locals().get('out_symbol') or locals().get('symbol') or ''
+                        _qty_sol = float(locals().get('amount_sol') or locals().get('buy_amount_sol') or 0.0)
+                        _price = float(locals().get('exec_price') or locals().get('price') or 0.0)
+                        _db_record_buy_schema_safe(_dbp, output_mint, txsig, symbol=_sym, qty_token=0.0, price=_price, qty_sol=_qty_sol,
+                                                   exit_profile=_profile)
+                        print(f"✅ DB: recorded BUY mint={output_mint} txsig={txsig[:8]}… db={_dbp}", flush=True)
+                    except Exception as _e:
+                        print(f"⚠️ DB record BUY failed: {_e}", flush=True)
             # ANTI_REBUY_AFTER_SEND_V1
             try:
                 _last_buy_set(output_mint)
@@ -1979,6 +2078,7 @@ def main() -> int:
                     _autoskip_mint(output_mint)
             except Exception as e:
                 print('⚠️ autoskip failed:', e)
+            _latency_confirm_buy(txsig)
             # EXIT2_AFTER_SEND_V1: signal parent loop that a swap was sent
             raise SystemExit(2)
             # record_last_buy
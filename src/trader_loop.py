@@ -8,6 +8,12 @@ import time
 import subprocess
 from pathlib import Path
 
+_REPO = str(Path(__file__).resolve().parents[1])
+if _REPO not in sys.path:
+    sys.path.insert(0, _REPO)
+from config import runtime
+from core import latency_trace
+
 
 # --- BUY_429_ADAPTIVE_V1 ---
 _BUY429_STATE_PATH = os.getenv("BUY_429_STATE_PATH", "/tmp/lino_buy429_state.json")
@@ -152,24 +158,73 @@ async def trader_loop():
     print("🧠 trader_loop (universe_builder -> exec -> sign -> send)", flush=True)
     print("   sleep_s=", sleep_s, "max_trades/h=", max_trades_per_hour, "cooldown_s=", cooldown_s, flush=True)
 
-    env = dict(os.environ)
-    env["PYTHONUNBUFFERED"] = "1"
-    env["PYTHONPATH"] = str(Path(__file__).resolve().parents[1]) + os.pathsep + env.get("PYTHONPATH","")
+    base_pythonpath = os.environ.get("PYTHONPATH", "")
+
+    def _child_base_env() -> dict:
+        # rebuilt every tick: a config.runtime hot reload (CONFIG_ENV_FILE overlay) lives in os.environ
+        e = dict(os.environ)
+        e["PYTHONUNBUFFERED"] = "1"
+        e["PYTHONPATH"] = str(Path(__file__).resolve().parents[1]) + os.pathsep + base_pythonpath
+        return e
+
+    env = _child_base_env()
+
+    # READY_SOURCE=store: only re-run the buy pick when a new ready generation
+    # lands (or after READY_STORE_MAX_IDLE_S), instead of re-ranking every tick
+    ready_store = None
+    if (os.getenv("READY_SOURCE", "file") or "").strip().lower() == "store":
+        try:
+            from core.ready_store import ReadyStore
+            ready_store = ReadyStore()
+        except Exception as e:
+            print("⚠️ trader_loop: ready_store unavailable:", e, flush=True)
+    max_idle_s = float(os.getenv("READY_STORE_MAX_IDLE_S", "120"))
+    last_gen = -1
+    last_rc = None
 
     while True:
         try:
+            # in run_live's combined mode this loop never returns: apply pending
+            # SIGHUP / config file changes here, before the child env is rebuilt
+            try:
+                runtime.maybe_reload()
+            except Exception as e:
+                print("⚠️ trader_loop: config reload failed:", e, flush=True)
+            env = _child_base_env()
+            if ready_store is not None:
+                # a failed poll falls back to a plain tick (trader_exec runs), never a silent skip
+                try:
+                    if last_rc == 0 and last_gen >= 0:
+                        gen = await asyncio.to_thread(ready_store.wait_for_gen, last_gen, max_idle_s)
+                        if gen > last_gen:
+                            print(f"🆕 ready_store gen={gen} (prev={last_gen})", flush=True)
+                    last_gen = await asyncio.to_thread(ready_store.current_gen)
+                    env["READY_STORE_GEN"] = str(last_gen)
+                except Exception as e:
+                    print(f"⚠️ trader_loop: ready_store poll failed ({type(e).__name__}: {e}) -> running trader_exec", flush=True)
+                    last_gen = -1
             print(f"TRADER_LOOP_PYTHON={sys.executable}")
-            rc = subprocess.run(
+            # one buy trace per tick; trader_exec continues it via LINO_TRACE_CTX
+            latency_trace.start("buy")
+            _rc = None
+            try:
+                with latency_trace.span("exec"):
+                    _rc = subprocess.run(
 
-                [sys.executable, "-u", "src/trader_exec.py"],
+                        [sys.executable, "-u", "src/trader_exec.py"],
 
-                check=False,
+                        check=False,
 
-                env=env,
+                        env=latency_trace.child_env(env),
 
-            ).returncode
+                    ).returncode
+            finally:
+                # rc=2 -> swap sent: only those make a buy.e2e sample / spans line
+                latency_trace.finish(outcome=f"rc={_rc}", keep=(_rc == 2))
+            rc = _rc
 
             print(f"TRADER_EXEC_RC={rc}", flush=True)
+            last_rc = rc
             # normalize_rc2_v1
             if rc == 2:
                 rc = 0
@@ -2,7 +2,12 @@ import os
 import json
 from pathlib import Path
 from typing import Any, Dict, List
-import requests
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO not in sys.path:
+    sys.path.insert(0, REPO)
+from core import http_pool
 
 JUP_BASE = os.getenv("JUP_BASE", "https://api.jup.ag").rstrip("/")
 TOKENS_BASE = os.getenv("JUP_TOKENS_BASE", f"{JUP_BASE}/tokens/v2").rstrip("/")
@@ -34,9 +39,7 @@ def _headers() -> Dict[str, str]:
     return h
 
 def _get_json(url: str, timeout: int = 20) -> Any:
-    r = requests.get(url, headers=_headers(), timeout=timeout)
-    r.raise_for_status()
-    return r.json()
+    return http_pool.get_json(url, headers=_headers(), timeout=timeout)
 
 def _f(x: Any, d: float = 0.0) -> float:
     try:
@@ -0,0 +1,42 @@
+"""
+core.account_cleanup packing (no network: local keypair + dummy blockhash).
+
+  python -m pytest -q tests/test_account_cleanup.py
+  python tests/test_account_cleanup.py
+"""
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from core.account_cleanup import PACKET_DATA_SIZE, Group, TokenAccount, TOKEN_PROGRAM_ID, close_group, ix_close_account, pack
+
+
+def _close(owner: Pubkey) -> Group:
+    acc = TokenAccount(str(Pubkey.new_unique()), str(Pubkey.new_unique()), TOKEN_PROGRAM_ID, 0, 6, 0.0)
+    return close_group(acc, owner)
+
+
+def test_oversize_group_is_skipped_not_fatal():
+    kp = Keypair()
+    owner = kp.pubkey()
+    # 40 closes that must land together: > PACKET_DATA_SIZE on its own
+    huge = Group([ix_close_account(Pubkey.new_unique(), owner, owner) for _ in range(40)], 40 * 3_000, "huge")
+    groups = [_close(owner), huge, _close(owner)]
+    skipped = []
+    packed = pack(kp, groups, Hash.default(), skipped=skipped)
+    assert [g.label for g, _ in skipped] == ["huge"]
+    assert [g for _, grp in packed for g in grp] == [groups[0], groups[2]]
+    assert all(len(bytes(tx)) <= PACKET_DATA_SIZE for tx, _ in packed)
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
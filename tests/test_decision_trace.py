@@ -0,0 +1,56 @@
+"""
+core.decision_trace dedup / folding (no sink, nothing written).
+
+  python -m pytest -q tests/test_decision_trace.py
+  python tests/test_decision_trace.py
+"""
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import decision_trace as dt
+
+MINT = "DecisionTestMint111111111111111111111111111"
+
+
+def _capture():
+    # records land in `out` instead of the writer queue; "jsonl" only so emit() doesn't short-circuit
+    out = []
+    dt._DEDUP.clear()
+    orig = (dt._enqueue, dt.DECISION_SINK)
+    dt._enqueue, dt.DECISION_SINK = out.append, "jsonl"
+    return out, orig
+
+
+def test_price_events_are_not_folded():
+    out, orig = _capture()
+    try:
+        for i, px in enumerate((1.0, 1.1, 1.2)):
+            dt.emit(dt.Decision("price", MINT, features={"price": px}, ts=100.0 + i))
+    finally:
+        dt._enqueue, dt.DECISION_SINK = orig
+    assert [r.features["price"] for r in out] == [1.0, 1.1, 1.2]
+
+
+def test_repeat_counts_folded_records_in_emit_and_flush():
+    out, orig = _capture()
+    try:
+        for i in range(4):  # 1 written + 3 folded
+            dt.emit(dt.Decision("buy_skip", MINT, "SKIP", "cooldown", ts=100.0 + i))
+        dt.emit(dt.Decision("buy_skip", MINT, "SKIP", "cooldown", ts=100.0 + dt.DECISION_DEDUP_S + 10))
+        for i in range(3):  # 1 written + 2 folded, flushed at exit
+            dt.emit(dt.Decision("sell_skip", MINT, "SKIP", "route", ts=200.0 + i))
+        dt._flush_folded()
+    finally:
+        dt._enqueue, dt.DECISION_SINK = orig
+    assert [(r.etype, r.repeat) for r in out] == [("buy_skip", 0), ("buy_skip", 3), ("sell_skip", 0), ("sell_skip", 2)]
+    assert out[-1].features == {"folded_only": 1}
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
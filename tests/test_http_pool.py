@@ -0,0 +1,80 @@
+"""
+core.http_pool sync pool: retry policy and scoped DNS cache (local server only).
+
+  python -m pytest -q tests/test_http_pool.py
+  python tests/test_http_pool.py
+"""
+import http.server
+import os
+import socket
+import sys
+import threading
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import http_pool
+
+HITS = []
+
+
+class _Always500(http.server.BaseHTTPRequestHandler):
+    def _reply(self):
+        HITS.append(self.command)
+        n = int(self.headers.get("Content-Length") or 0)
+        if n:
+            self.rfile.read(n)
+        self.send_response(500)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *a):
+        pass
+
+
+def _serve():
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Always500)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://localhost:{srv.server_address[1]}/"
+
+
+def test_post_is_not_retried_by_default_get_is():
+    srv, url = _serve()
+    backoff = http_pool.backoff_s
+    http_pool.backoff_s = lambda *a, **k: 0.0
+    try:
+        HITS.clear()
+        http_pool.request("POST", url, json={"method": "sendTransaction"}, raise_for_status=False)
+        assert HITS == ["POST"]
+        HITS.clear()
+        http_pool.request("GET", url, raise_for_status=False)
+        assert HITS == ["GET"] * max(1, http_pool.HTTP_RETRIES)
+        HITS.clear()
+        http_pool.request("POST", url, json={}, retries=2, raise_for_status=False)
+        assert HITS == ["POST", "POST"]
+    finally:
+        http_pool.backoff_s = backoff
+        srv.shutdown()
+
+
+def test_dns_cache_is_scoped_to_the_pool():
+    assert socket.getaddrinfo is not http_pool._cached_getaddrinfo
+    if not http_pool._dns_cache_on():
+        return
+    srv, url = _serve()
+    try:
+        http_pool._DNS.clear()
+        http_pool.session().close()  # drop kept-alive connections: next call opens one
+        http_pool.request("GET", url, retries=1, raise_for_status=False)
+        assert any(k[0] == "localhost" for k in http_pool._DNS)
+    finally:
+        srv.shutdown()
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
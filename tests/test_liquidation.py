@@ -0,0 +1,46 @@
+"""
+core.liquidation holdings (no network, no wallet).
+
+  python -m pytest -q tests/test_liquidation.py
+  python tests/test_liquidation.py
+"""
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core.account_cleanup import TOKEN_PROGRAM_ID, TokenAccount
+from core.liquidation import holdings_from_accounts
+
+MINT_A = "LiqTestMintA1111111111111111111111111111111"
+MINT_B = "LiqTestMintB1111111111111111111111111111111"
+
+
+def _acc(pubkey, mint, amount, decimals=6):
+    return TokenAccount(pubkey, mint, TOKEN_PROGRAM_ID, amount, decimals, amount / 10 ** decimals)
+
+
+def test_one_holding_per_mint():
+    hs = holdings_from_accounts([
+        _acc("ataA", MINT_A, 2_000_000),
+        _acc("auxA", MINT_A, 5_000_000),
+        _acc("emptyA", MINT_A, 0),
+        _acc("ataB", MINT_B, 1_000),
+    ])
+    by_mint = {h.mint: h for h in hs}
+    assert len(hs) == 2 and set(by_mint) == {MINT_A, MINT_B}
+    a = by_mint[MINT_A]
+    assert a.amount == 7_000_000 and abs(a.ui - 7.0) < 1e-9 and a.account == "auxA"
+
+
+def test_min_ui_applies_to_the_mint_total():
+    hs = holdings_from_accounts([_acc("x", MINT_A, 600_000), _acc("y", MINT_A, 600_000)], min_ui=1.0)
+    assert [h.amount for h in hs] == [1_200_000]
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
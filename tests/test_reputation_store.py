@@ -0,0 +1,43 @@
+"""
+core.reputation_store legacy JSON import (temp files only).
+
+  python -m pytest -q tests/test_reputation_store.py
+  python tests/test_reputation_store.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import reputation_store as rs
+
+
+def test_legacy_mint_blacklist_until_zero_is_permanent():
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as d:
+        bl = os.path.join(d, "blacklist_mint.json")
+        with open(bl, "w", encoding="utf-8") as f:
+            json.dump({"perm": {"reason": "RUG", "until": 0},
+                       "live": {"reason": "RPC_429", "until": now + 600},
+                       "gone": {"reason": "old", "until": now - 10}}, f)
+        orig = (rs.LEGACY_DEV_DB, rs.LEGACY_BLACKLIST_DEV, rs.LEGACY_BLACKLIST_MINT)
+        rs.LEGACY_DEV_DB, rs.LEGACY_BLACKLIST_DEV = os.path.join(d, "none1.json"), os.path.join(d, "none2.json")
+        rs.LEGACY_BLACKLIST_MINT = bl
+        try:
+            st = rs.ReputationStore(os.path.join(d, "rep.sqlite"))
+            assert st.mint_blacklisted("perm") == ("RUG", rs.PERMANENT_UNTIL)
+            assert st.mint_blacklisted("live") == ("RPC_429", now + 600)
+            assert st.mint_blacklisted("gone") is None
+        finally:
+            rs.LEGACY_DEV_DB, rs.LEGACY_BLACKLIST_DEV, rs.LEGACY_BLACKLIST_MINT = orig
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
@@ -0,0 +1,49 @@
+"""
+core.tick_store.record_overview price units (nothing written).
+
+  python -m pytest -q tests/test_tick_store.py
+  python tests/test_tick_store.py
+"""
+import math
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from core import tick_store
+
+MINT = "TickTestMint11111111111111111111111111111111"
+USDC = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def _recorded(pair):
+    out = []
+    orig = (tick_store.record, tick_store.TICK_RECORD)
+    tick_store.record = lambda mint, price, source, **kw: out.append((mint, price, kw["price_usd"]))
+    tick_store.TICK_RECORD = True
+    try:
+        tick_store.record_overview({"mint": MINT, "data": pair})
+    finally:
+        tick_store.record, tick_store.TICK_RECORD = orig
+    return out
+
+
+def test_price_native_kept_for_sol_quoted_pairs():
+    pair = {"baseToken": {"address": MINT}, "quoteToken": {"address": tick_store.SOL_MINT},
+            "priceNative": "0.0000012", "priceUsd": "0.0002"}
+    assert _recorded(pair) == [(MINT, "0.0000012", "0.0002")]
+
+
+def test_price_native_dropped_for_other_quotes():
+    for quote in ({"address": USDC}, None):
+        pair = {"baseToken": {"address": MINT}, "quoteToken": quote, "priceNative": "0.0002", "priceUsd": "0.0002"}
+        [(mint, price, usd)] = _recorded(pair)
+        assert mint == MINT and math.isnan(price) and usd == "0.0002"
+
+
+if __name__ == "__main__":
+    for _name, _fn in sorted(globals().items()):
+        if _name.startswith("test_") and callable(_fn):
+            _fn()
+            print(f"ok {_name}")
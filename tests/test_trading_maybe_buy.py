@@ -0,0 +1,58 @@
+"""
+core.trading.TradingEngine._maybe_buy rejection paths (no network, no wallet).
+
+  python -m pytest -q tests/test_trading_maybe_buy.py
+  python tests/test_trading_maybe_buy.py
+"""
+import asyncio
+import logging
+import os
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+os.environ.setdefault("DECISION_SINK", "off")
+os.environ.setdefault("DECISION_ECHO", "0")
+
+from core import trading
+
+MINT = "RiskRejectMint11111111111111111111111111111"
+
+
+class _RejectAll:
+    def __init__(self):
+        self.seen = []
+
+    async def allow_buy_many(self, ovs):
+        self.seen.extend(ov["mint"] for ov in ovs)
+        return [(False, "rug_suspect") for _ in ovs]
+
+
+def _engine() -> trading.TradingEngine:
+    # bypass __init__ (executor / positions file): only the state _maybe_buy reads
+    eng = trading.TradingEngine.__new__(trading.TradingEngine)
+    eng.logger = logging.getLogger("test_trading")
+    eng.positions = {}
+    eng.last_buy_ts_global = 0.0
+    eng.last_buy_ts_by_mint = {}
+    eng.buy_inflight = set()
+    return eng
+
+
+def test_risk_rejected_candidate_is_traced_not_raised():
+    traced = []
+    orig = trading.decision_trace
+    trading.decision_trace = lambda *a, **k: traced.append(a)
+    try:
+        risk = _RejectAll()
+        ov = {"mint": MINT, "symbol": "RJCT", "price_usd": 0.001}
+        asyncio.run(_engine()._maybe_buy([ov], risk))
+    finally:
+        trading.decision_trace = orig
+    assert risk.seen == [MINT]
+    assert traced == [(MINT, "RJCT", "SKIP", "risk:rug_suspect")]
+
+
+if __name__ == "__main__":
+    test_risk_rejected_candidate_is_traced_not_raised()
+    print("ok test_risk_rejected_candidate_is_traced_not_raised")